@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Analyse en lot d'un répertoire de logs Moxa, sans interface graphique.
+
+Chaque log est associé à une configuration ``config/moxa_config_*.json``,
+analysé par le moteur de règles local (en parallèle sur plusieurs
+processus), puis éventuellement enrichi par OpenAI avec un nombre limité
+d'appels simultanés. Les résultats sont consolidés dans un rapport JSON et
+un tableau CSV (une ligne par log).
+
+N'importe ni tkinter ni matplotlib : démarre vite sur un serveur ou en CI.
+
+Usage : python batch_analyze.py LOGS_DIR [--config-dir config] [--config fichier.json]
+        [--output rapport_lot] [--workers N] [--ai] [--ai-concurrency 2] [--fail-under SCORE]
+"""
+import argparse
+import csv
+import glob
+import json
+import os
+import re
+import sys
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import List, Optional, Tuple
+
+from moxa_log_analyzer import MoxaLogAnalyzer
+from moxa_log_parser import iter_file_lines
+
+LOG_PATTERNS = ("*.log", "*.txt")
+CONFIG_PATTERN = "moxa_config_*.json"
+DEFAULT_AI_CONCURRENCY = 2
+
+_CONFIG_STAMP = re.compile(r"moxa_config_(\d{8})_(\d{6})")
+_LOG_STAMP = re.compile(r"(\d{4})-?(\d{2})-?(\d{2})(?:[_T ](\d{2})(\d{2})(\d{2}))?")
+
+# Compteurs de MoxaLogAnalyzer.metrics repris dans le rapport de chaque log
+EVENT_COUNTERS = ("total_roaming_events", "successful_roaming", "failed_roaming",
+                  "ping_pong_events", "authentication_failures")
+
+# Colonnes du tableau CSV consolidé
+CSV_FIELDS = [
+    "fichier", "configuration", "score_global", "adapte_flotte_AMR", "roamings",
+    "handoff_moyen_ms", "handoff_max_ms", "ping_pong", "timeouts_auth", "deauth",
+    "aps_snr_zero", "redemarrages_wlan", "aps_problematiques", "recommandation_principale",
+    "source", "erreur",
+]
+
+
+def find_logs(directory: str, patterns=LOG_PATTERNS) -> List[str]:
+    """Fichiers de log du répertoire, triés par nom."""
+    paths = set()
+    for pattern in patterns:
+        paths.update(p for p in glob.glob(os.path.join(directory, pattern)) if os.path.isfile(p))
+    return sorted(paths)
+
+
+def _stamp(match: Optional[re.Match]) -> Optional[datetime]:
+    if match is None:
+        return None
+    try:
+        return datetime.strptime("".join(g for g in match.groups() if g), "%Y%m%d%H%M%S")
+    except ValueError:
+        return None
+
+
+def load_configs(config_dir: str) -> List[Tuple[Optional[datetime], str, dict]]:
+    """Configurations ``moxa_config_*.json`` : (horodatage du nom, chemin, contenu), par date."""
+    configs = []
+    for path in sorted(glob.glob(os.path.join(config_dir, CONFIG_PATTERN))):
+        with open(path, encoding="utf-8") as f:
+            config = json.load(f)
+        configs.append((_stamp(_CONFIG_STAMP.search(os.path.basename(path))), path, config))
+    configs.sort(key=lambda item: (item[0] or datetime.min, item[1]))
+    return configs
+
+
+def match_config(log_path: str, configs) -> Tuple[Optional[str], dict]:
+    """
+    Configuration d'un log : même suffixe de nom (``moxa_log_X`` ↔
+    ``moxa_config_X``), sinon la dernière configuration enregistrée avant la
+    date du log (nom du fichier, sinon date de modification), sinon la plus
+    ancienne.
+    """
+    if not configs:
+        return None, {}
+    name = os.path.splitext(os.path.basename(log_path))[0]
+    for _, path, config in configs:
+        suffix = os.path.basename(path)[len("moxa_config_"):-len(".json")]
+        if name.endswith(suffix):
+            return path, config
+
+    match = _LOG_STAMP.search(name)
+    when = None
+    if match:
+        day = datetime(int(match.group(1)), int(match.group(2)), int(match.group(3)))
+        when = _stamp(match) if match.group(4) else day + timedelta(days=1) - timedelta(seconds=1)
+    when = when or datetime.fromtimestamp(os.path.getmtime(log_path))
+    earlier = [item for item in configs if item[0] is not None and item[0] <= when]
+    _, path, config = earlier[-1] if earlier else configs[0]
+    return path, config
+
+
+def analyze_file(path: str, config: dict) -> dict:
+    """Analyse locale d'un log (exécutée dans un processus de travail)."""
+    try:
+        analyzer = MoxaLogAnalyzer()
+        report = analyzer.analyze_log_file(path, config)
+        report["evenements"] = {name: analyzer.metrics[name] for name in EVENT_COUNTERS}
+        return report
+    except Exception as e:
+        return {"error": f"{type(e).__name__}: {e}"}
+
+
+def enrich_file(path: str, config: dict, report: dict, ai_slots=None) -> dict:
+    """Enrichit le rapport local d'un log avec OpenAI (``ai_slots`` : limite partagée des appels)."""
+    text = "\n".join(iter_file_lines(path))
+    return MoxaLogAnalyzer(ai_slots=ai_slots).enrich_report(report, text, config)
+
+
+def summary_row(entry: dict) -> dict:
+    """Ligne du tableau CSV pour un log analysé."""
+    report = entry["rapport"]
+    row = {"fichier": entry["fichier"], "configuration": entry["configuration"] or ""}
+    if "error" in report:
+        row["erreur"] = report["error"]
+        return row
+    details = report["analyse_detaillee"]
+    recommendations = report["recommandations"]
+    row.update({
+        "score_global": report["score_global"],
+        "adapte_flotte_AMR": report["adapte_flotte_AMR"],
+        "roamings": report["evenements"]["total_roaming_events"],
+        "handoff_moyen_ms": details["handoff"]["moyen_ms"],
+        "handoff_max_ms": details["handoff"]["max_ms"],
+        "ping_pong": report["evenements"]["ping_pong_events"],
+        "timeouts_auth": details["timeouts_auth"]["nombre"],
+        "deauth": details["deauth_requests"]["total"],
+        "aps_snr_zero": len(details["problemes_snr"]["aps_snr_zero"]),
+        "redemarrages_wlan": details["stabilite_wlan"]["redemarrages"],
+        "aps_problematiques": len(report["problematic_aps"]),
+        "recommandation_principale": recommendations[0]["probleme"] if recommendations else "",
+        "source": report["source"],
+    })
+    return row
+
+
+def run_batch(log_dir: str, config_dir: str = "config", config_path: Optional[str] = None,
+              workers: Optional[int] = None, use_ai: bool = False,
+              ai_concurrency: int = DEFAULT_AI_CONCURRENCY, patterns=LOG_PATTERNS) -> dict:
+    """
+    Analyse tous les logs de ``log_dir`` et retourne le rapport consolidé.
+
+    Args:
+        log_dir: répertoire des logs Moxa
+        config_dir: répertoire des configurations ``moxa_config_*.json``
+        config_path: configuration unique à appliquer à tous les logs
+        workers: processus pour l'analyse locale (par défaut, le nombre de cœurs)
+        use_ai: enrichir les rapports avec OpenAI
+        ai_concurrency: appels OpenAI simultanés au maximum
+        patterns: motifs des fichiers de log
+    """
+    logs = find_logs(log_dir, patterns)
+    if config_path:
+        with open(config_path, encoding="utf-8") as f:
+            fixed = (config_path, json.load(f))
+        assignments = [fixed for _ in logs]
+    else:
+        configs = load_configs(config_dir)
+        assignments = [match_config(path, configs) for path in logs]
+
+    workers = min(workers or os.cpu_count() or 1, max(1, len(logs)))
+    if workers == 1:
+        reports = [analyze_file(path, config) for path, (_, config) in zip(logs, assignments)]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            reports = list(pool.map(analyze_file, logs, [config for _, config in assignments]))
+
+    if use_ai:
+        # Un seul sémaphore pour tous les appels : un long log analysé par
+        # extraits en parallèle compte autant d'appels que d'extraits en cours
+        ai_concurrency = max(1, ai_concurrency)
+        ai_slots = threading.BoundedSemaphore(ai_concurrency)
+        with ThreadPoolExecutor(max_workers=ai_concurrency) as pool:
+            futures = [pool.submit(enrich_file, path, config, report, ai_slots) if "error" not in report else None
+                       for path, (_, config), report in zip(logs, assignments, reports)]
+            reports = [future.result() if future else report for future, report in zip(futures, reports)]
+
+    entries = [{"fichier": os.path.basename(path), "chemin": path, "configuration": config_file,
+                "rapport": report}
+               for path, (config_file, _), report in zip(logs, assignments, reports)]
+    scores = [e["rapport"]["score_global"] for e in entries if "error" not in e["rapport"]]
+    return {
+        "genere_le": datetime.now().isoformat(timespec="seconds"),
+        "repertoire": os.path.abspath(log_dir),
+        "resume": {
+            "fichiers": len(entries),
+            "analyses": len(scores),
+            "erreurs": len(entries) - len(scores),
+            "score_moyen": round(sum(scores) / len(scores), 1) if scores else None,
+            "score_min": min(scores) if scores else None,
+            "non_adaptes_AMR": sum(1 for e in entries if e["rapport"].get("adapte_flotte_AMR") is False),
+        },
+        "logs": entries,
+    }
+
+
+def write_reports(result: dict, output: str) -> Tuple[str, str]:
+    """Écrit ``<output>.json`` et ``<output>.csv`` ; retourne leurs chemins."""
+    directory = os.path.dirname(os.path.abspath(output))
+    os.makedirs(directory, exist_ok=True)
+    json_path, csv_path = f"{output}.json", f"{output}.csv"
+    with open(json_path, "w", encoding="utf-8") as f:
+        json.dump(result, f, indent=2, ensure_ascii=False, default=str)
+    with open(csv_path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=CSV_FIELDS)
+        writer.writeheader()
+        for entry in result["logs"]:
+            writer.writerow(summary_row(entry))
+    return json_path, csv_path
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("log_dir", help="répertoire des logs Moxa")
+    parser.add_argument("--config-dir", default="config", help="répertoire des moxa_config_*.json")
+    parser.add_argument("--config", help="configuration unique pour tous les logs")
+    parser.add_argument("--output", default="rapport_lot", help="chemin des rapports, sans extension")
+    parser.add_argument("--workers", type=int, help="processus pour l'analyse locale")
+    parser.add_argument("--pattern", action="append", help="motif des fichiers de log (répétable)")
+    parser.add_argument("--ai", action="store_true", help="enrichir les rapports avec OpenAI")
+    parser.add_argument("--ai-concurrency", type=int, default=DEFAULT_AI_CONCURRENCY,
+                        help="appels OpenAI simultanés au maximum")
+    parser.add_argument("--fail-under", type=int, help="code de sortie 2 si un score est inférieur")
+    args = parser.parse_args(argv)
+
+    if not os.path.isdir(args.log_dir):
+        parser.error(f"répertoire introuvable : {args.log_dir}")
+    result = run_batch(args.log_dir, args.config_dir, args.config, args.workers, args.ai,
+                       args.ai_concurrency, tuple(args.pattern or LOG_PATTERNS))
+    json_path, csv_path = write_reports(result, args.output)
+
+    summary = result["resume"]
+    print(f"{summary['analyses']}/{summary['fichiers']} log(s) analysé(s), score moyen "
+          f"{summary['score_moyen']}, {summary['non_adaptes_AMR']} non adapté(s) AMR")
+    for entry in result["logs"]:
+        if "error" in entry["rapport"]:
+            print(f"  ERREUR {entry['fichier']} : {entry['rapport']['error']}", file=sys.stderr)
+    print(f"Rapports : {json_path}, {csv_path}")
+
+    if summary["erreurs"]:
+        return 1
+    if args.fail_under is not None and summary["score_min"] is not None and summary["score_min"] < args.fail_under:
+        return 2
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Micro-benchmark du rafraîchissement des graphiques (backend Agg, sans écran).
+
+Mesure le nombre d'images par seconde de la figure à trois axes de
+l'application pour 1k, 10k et 100k points :
+- rendu complet (``canvas.draw()``, comportement historique) ;
+- blitting (``BlitRenderer``) ;
+- blitting avec décimation min/max (``MinMaxPyramid``).
+
+Usage : python benchmarks/bench_blit.py [--frames 30] [--sizes 1000 10000 100000]
+"""
+import argparse
+import os
+import sys
+import time
+
+import matplotlib
+matplotlib.use('Agg')
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+# Ajouter le répertoire racine au path pour l'import
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ui.blit_renderer import BlitRenderer
+from ui.decimation import MinMaxPyramid
+
+
+def build_figure():
+    """Reproduit la figure principale : signal, qualité et jitter."""
+    fig = Figure(figsize=(10, 8))
+    fig.subplots_adjust(hspace=0.4)
+    canvas = FigureCanvasAgg(fig)
+    lines = []
+    for position, (title, ylim, style) in enumerate([
+        ("Force du signal WiFi", (-90, -30), 'b-'),
+        ("Qualité de la connexion", (0, 100), 'g-'),
+        ("Jitter de la latence", (0, 100), 'm-'),
+    ]):
+        ax = fig.add_subplot(311 + position)
+        ax.set_title(title)
+        ax.grid(True, alpha=0.3)
+        ax.set_ylim(*ylim)
+        line, = ax.plot([], [], style, linewidth=2, label=title)
+        ax.legend()
+        lines.append(line)
+    return fig, canvas, lines
+
+
+def make_series(size):
+    rng = np.random.default_rng(0)
+    return [
+        rng.integers(-90, -30, size),
+        rng.integers(0, 100, size),
+        rng.random(size) * 50,
+    ]
+
+
+def run(size, frames, mode):
+    fig, canvas, lines = build_figure()
+    series = make_series(size)
+    for line in lines:
+        line.axes.set_xlim(0, size)
+    renderer = BlitRenderer(canvas, lines) if mode != 'full' else None
+    pyramids = [MinMaxPyramid() for _ in series] if mode == 'decimated' else None
+    max_points = int(lines[0].axes.bbox.width) * 2
+
+    def frame(shift):
+        for i, (line, values) in enumerate(zip(lines, series)):
+            values = np.roll(values, shift)
+            if pyramids is not None:
+                pyramids[i].reset()
+                x, y = pyramids[i].decimate(values, 0, size, max_points)
+            else:
+                x, y = np.arange(size), values
+            line.set_data(x, y)
+        if renderer is None:
+            canvas.draw()
+        else:
+            renderer.update()
+
+    frame(0)  # premier rendu complet (capture des fonds)
+    started = time.perf_counter()
+    for shift in range(1, frames + 1):
+        frame(shift)
+    elapsed = time.perf_counter() - started
+    return frames / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--frames', type=int, default=30)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1_000, 10_000, 100_000])
+    args = parser.parse_args()
+
+    print(f"{'points':>8} | {'rendu complet':>13} | {'blitting':>9} | {'blit + décimation':>17}")
+    print('-' * 58)
+    for size in args.sizes:
+        full = run(size, args.frames, 'full')
+        blit = run(size, args.frames, 'blit')
+        decimated = run(size, args.frames, 'decimated')
+        print(f"{size:>8} | {full:>9.1f} fps | {blit:>5.1f} fps | {decimated:>13.1f} fps")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark de l'analyse parallèle d'un gros log Moxa.
+
+Génère un log syslog synthétique (1 Go par défaut, environ 10 % de lignes
+d'événements) puis mesure ``parse_file_parallel`` de 1 à N processus.
+
+Usage : python benchmarks/bench_moxa_parallel.py [--size-mb 1024] [--workers 1 2 4 8] [--path log.txt]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+# Ajouter le répertoire racine au path pour l'import
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from moxa_log_parser import parse_file_parallel
+
+APS = [f"00:90:e8:{i:02x}:{i * 7 % 256:02x}:{i * 13 % 256:02x}" for i in range(12)]
+
+
+def synthetic_block(rng, lines=10_000):
+    """Bloc de lignes syslog représentatif : surtout du bruit, quelques événements."""
+    out = []
+    for i in range(lines):
+        stamp = f"2025-05-07 {i // 3600 % 24:02d}:{i // 60 % 60:02d}:{i % 60:02d}"
+        ap = rng.choice(APS)
+        kind = rng.random()
+        if kind < 0.04:
+            out.append(f"{stamp} [INFO] Client roaming to AP {ap} completed, handoff time: {rng.randint(20, 300)} ms")
+        elif kind < 0.06:
+            out.append(f"{stamp} [WARNING] Deauthentication from AP [MAC: {ap}]")
+        elif kind < 0.07:
+            out.append(f"{stamp} [ERROR] Authentication timeout with AP {ap}")
+        elif kind < 0.10:
+            out.append(f"{stamp} [INFO] SNR: {rng.randint(5, 40)} dB on AP {ap}")
+        else:
+            out.append(f"{stamp} [DEBUG] wlan0 tx rate {rng.choice((24, 54, 144))} Mbps, rssi {rng.randint(-80, -40)} dBm")
+    return ("\n".join(out) + "\n").encode("utf-8")
+
+
+def generate(path, size_mb):
+    block = synthetic_block(random.Random(0))
+    target = size_mb * 1024 * 1024
+    with open(path, "wb") as f:
+        written = 0
+        while written < target:
+            f.write(block)
+            written += len(block)
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--size-mb', type=int, default=1024)
+    parser.add_argument('--workers', type=int, nargs='+')
+    parser.add_argument('--path', help="log existant à analyser (sinon un log synthétique est généré)")
+    args = parser.parse_args()
+
+    cores = os.cpu_count() or 1
+    workers = args.workers or sorted({1, 2, 4, 8, cores} & set(range(1, cores + 1)))
+
+    path = args.path
+    if path is None:
+        fd, path = tempfile.mkstemp(suffix='.log')
+        os.close(fd)
+        print(f"Génération de {args.size_mb} Mo de log synthétique...")
+        generate(path, args.size_mb)
+    size = os.path.getsize(path)
+
+    try:
+        print(f"{'processus':>9} | {'durée':>8} | {'débit':>10} | {'accélération':>12}")
+        print('-' * 49)
+        reference = baseline = None
+        for count in workers:
+            started = time.perf_counter()
+            metrics = parse_file_parallel(path, workers=count).metrics()
+            elapsed = time.perf_counter() - started
+            if reference is None:
+                reference, baseline = metrics, elapsed
+            elif metrics != reference:
+                raise SystemExit(f"Résultat différent avec {count} processus")
+            print(f"{count:>9} | {elapsed:>6.2f} s | {size / elapsed / 2**20:>6.1f} Mo/s | {baseline / elapsed:>11.2f}x")
+    finally:
+        if args.path is None:
+            os.remove(path)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark du rejeu de session à vitesse maximale.
+
+Génère un journal de session synthétique (100 000 échantillons par défaut,
+un par seconde sur plusieurs points d'accès) puis mesure le débit en
+échantillons/s de chaque étage du rejeu :
+décodage du journal projeté en mémoire, ``WifiCollector.collect_sample``
+avec le ``SampleStore`` et ses statistiques incrémentales, puis
+``WifiAnalyzer.analyze_samples`` sur la session complète.
+
+Usage : python benchmarks/bench_replay.py [--samples 100000] [--path session.wfj]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+# Ajouter le répertoire racine au path pour l'import
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from wifi.replay_collector import ReplayBackend
+from wifi.sample_store import TIMESTAMP_FORMAT
+from wifi.session_journal import FORMAT_SAMPLES, SessionJournal
+from wifi.wifi_analyzer import WifiAnalyzer
+from wifi.wifi_collector import WifiCollector
+
+APS = [f"00:90:e8:{i:02x}:{i * 7 % 256:02x}:{i * 13 % 256:02x}" for i in range(12)]
+
+
+def generate(path, count, seed=0):
+    """Journal de ``count`` échantillons au format de WifiCollector."""
+    rng = random.Random(seed)
+    start = datetime(2025, 5, 7, 8, 0, 0)
+    with SessionJournal(path, {'format': FORMAT_SAMPLES, 'session_id': 'bench'}, sync_every=10_000) as journal:
+        for i in range(count):
+            signal = rng.randint(-85, -40)
+            journal.append({
+                'timestamp': (start + timedelta(seconds=i)).strftime(TIMESTAMP_FORMAT),
+                'ssid': 'AMR-Prod', 'bssid': APS[i // 30 % len(APS)],
+                'signal_strength': signal, 'quality': min(100, 2 * (signal + 100)),
+                'channel': 36, 'band': '5 GHz', 'status': 'Connected',
+                'transmit_rate': '144 Mbps', 'receive_rate': '130 Mbps', 'raw_data': None,
+                'ping_latency': round(rng.uniform(2, 40), 1), 'jitter': 0.0,
+                'ping_target': '10.0.0.1', 'packet_loss': 0.0,
+            })
+
+
+def timed(label, count, func):
+    started = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - started
+    print(f"{label:<32} | {elapsed:>7.2f} s | {count / elapsed:>10,.0f} éch./s")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--samples', type=int, default=100_000)
+    parser.add_argument('--path', help="journal existant à rejouer (sinon un journal synthétique est généré)")
+    args = parser.parse_args()
+
+    path = args.path
+    if path is None:
+        fd, path = tempfile.mkstemp(suffix='.wfj')
+        os.close(fd)
+        os.remove(path)
+        print(f"Génération d'un journal de {args.samples} échantillons...")
+        generate(path, args.samples)
+
+    try:
+        def decode():
+            backend = ReplayBackend(path, speed=None)
+            backend.start()
+            count = sum(1 for _ in iter(backend.read_sample, None))
+            backend.stop()
+            return count
+
+        count = decode()
+        print(f"{'étage':<32} | {'durée':>9} | {'débit':>15}")
+        print('-' * 64)
+        timed("décodage du journal (mmap)", count, decode)
+
+        collector = WifiCollector(backend=ReplayBackend(path, speed=None))
+        collector.logger.disabled = True
+
+        def collect():
+            collector.start_collection()
+            while collector.is_collecting:
+                collector.collect_sample()
+            return collector.samples
+
+        samples = timed("collect_sample + statistiques", count, collect)
+        analysis = timed("WifiAnalyzer.analyze_samples", count, lambda: WifiAnalyzer().analyze_samples(samples))
+        stats = samples.stats
+        print(f"\n{len(samples)} échantillons, signal moyen {analysis.average_signal:.1f} dBm, "
+              f"{len(samples.unique_bssids())} BSSID, latence moyenne {stats.latency.mean:.1f} ms")
+    finally:
+        if args.path is None:
+            os.remove(path)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark du temps d'import de l'interface (``python -X importtime``).
+
+Importe ``runner`` dans un interpréteur neuf, plusieurs fois, et affiche le
+temps médian ainsi que les modules les plus coûteux. Échoue (code 1) si un
+module lourd est chargé au démarrage ou si le budget est dépassé.
+
+Usage : python benchmarks/bench_startup.py [--module runner] [--runs 5] [--budget-ms 500]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules chargés uniquement au premier usage (graphiques, analyses, OpenAI)
+HEAVY_MODULES = (
+    "matplotlib", "scipy", "PIL", "requests",
+    "moxa_log_analyzer", "amr_monitor", "src.ai.simple_moxa_analyzer", "src.ai.openai_client",
+)
+
+# Budget d'import de runner (numpy et Tk compris), en millisecondes
+STARTUP_BUDGET_MS = 500
+
+
+def parse_importtime(stderr: str) -> Dict[str, Tuple[int, int]]:
+    """Temps par module ``{nom: (propre_us, cumulé_us)}`` d'une sortie ``-X importtime``."""
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        modules[name.strip()] = (int(self_us), int(cumulative_us))
+    return modules
+
+
+def measure_imports(module: str = "runner") -> Dict[str, Tuple[int, int]]:
+    """Importe ``module`` dans un interpréteur neuf et retourne les temps par module."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=APP_DIR, capture_output=True, text=True, check=True,
+    )
+    return parse_importtime(result.stderr)
+
+
+def heavy_modules_loaded(modules: Dict[str, Tuple[int, int]]) -> List[str]:
+    """Modules lourds (ou leurs sous-modules) présents dans la mesure."""
+    return sorted(name for name in modules
+                  if any(name == heavy or name.startswith(heavy + ".") for heavy in HEAVY_MODULES))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--module', default='runner')
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--budget-ms', type=float, default=STARTUP_BUDGET_MS)
+    parser.add_argument('--top', type=int, default=15, help="modules les plus coûteux à afficher")
+    args = parser.parse_args()
+
+    runs = [measure_imports(args.module) for _ in range(args.runs)]
+    totals = [run[args.module][1] / 1000 for run in runs]
+    median = statistics.median(totals)
+    last = runs[-1]
+
+    print(f"Import de {args.module} : médiane {median:.0f} ms sur {args.runs} essais "
+          f"(min {min(totals):.0f}, max {max(totals):.0f}), budget {args.budget_ms:.0f} ms")
+    print(f"{'cumulé':>9} | {'propre':>8} | module")
+    for name, (self_us, cumulative_us) in sorted(last.items(), key=lambda item: -item[1][1])[:args.top]:
+        print(f"{cumulative_us / 1000:>6.1f} ms | {self_us / 1000:>5.1f} ms | {name}")
+
+    heavy = heavy_modules_loaded(last)
+    if heavy:
+        raise SystemExit(f"Modules lourds chargés au démarrage : {', '.join(heavy)}")
+    if median > args.budget_ms:
+        raise SystemExit(f"Démarrage trop lent : {median:.0f} ms > {args.budget_ms:.0f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark de WifiAnalyzer : chemins échantillon par échantillon contre l'API par lot.
+
+Génère une session synthétique (100 000 échantillons par défaut, deux bandes,
+plusieurs canaux) et compare :
+- l'ancien chemin : ``analyze_samples`` sur une liste, puis comptage des
+  déconnexions, distribution de qualité, stabilité glissante et ventilation
+  par bande/canal en boucles Python ;
+- ``WifiAnalyzer.analyze_batch`` sur les colonnes d'un ``SampleStore``.
+
+Les résultats des deux chemins sont vérifiés identiques.
+
+Usage : python benchmarks/bench_wifi_analyzer.py [--samples 100000] [--runs 3]
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+# Ajouter le répertoire racine au path pour l'import
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from wifi.sample_store import SampleStore
+from wifi.wifi_analyzer import QUALITY_BINS, QUALITY_LABELS, STABILITY_MAX_VARIATION, WifiAnalyzer
+from wifi.wifi_collector import WifiSample
+
+CHANNELS = {"2.4 GHz": (1, 6, 11), "5 GHz": (36, 40, 44, 48, 149)}
+
+
+def generate(count, seed=0):
+    rng = random.Random(seed)
+    samples = []
+    signal = -60
+    for i in range(count):
+        band = "5 GHz" if i // 500 % 3 else "2.4 GHz"
+        signal = max(-95, min(-30, signal + rng.randint(-4, 4)))
+        samples.append(WifiSample(
+            timestamp=f"2025-05-07 {i // 3600 % 24:02d}:{i // 60 % 60:02d}:{i % 60:02d}.000000",
+            ssid="AMR-Prod", bssid=f"00:90:e8:00:00:{i // 300 % 16:02x}",
+            signal_strength=signal, quality=min(100, 2 * (signal + 100)),
+            channel=rng.choice(CHANNELS[band]), band=band, status="Connected",
+            transmit_rate="144 Mbps", receive_rate="130 Mbps", ping_latency=12.0,
+        ))
+    return samples
+
+
+def legacy_analysis(analyzer, samples):
+    """Métriques calculées comme avant l'API par lot (boucles Python)."""
+    analyzer.analyze_samples(samples)
+    signals = [s.signal_strength for s in samples]
+
+    dropouts = 0
+    for i in range(1, len(signals)):
+        if signals[i] < analyzer.signal_threshold and signals[i - 1] >= analyzer.signal_threshold:
+            dropouts += 1
+
+    distribution = {label: 0 for label in reversed(QUALITY_LABELS)}
+    bounds = list(QUALITY_BINS) + [101]
+    for sample in samples:
+        for label, low, high in zip(QUALITY_LABELS, bounds, bounds[1:]):
+            if low <= sample.quality < high:
+                distribution[label] += 1
+                break
+
+    window = analyzer.stability_window
+    rolling = []
+    for end in range(window, len(signals) + 1):
+        chunk = signals[end - window:end]
+        variation = sum(abs(b - a) for a, b in zip(chunk, chunk[1:])) / (window - 1)
+        rolling.append(max(0.0, min(100.0, 100 * (1 - variation / STABILITY_MAX_VARIATION))))
+
+    by_band, by_channel = {}, {}
+    for i, sample in enumerate(samples):
+        dropped = i > 0 and signals[i] < analyzer.signal_threshold <= signals[i - 1]
+        for groups, key in ((by_band, sample.band), (by_channel, sample.channel)):
+            entry = groups.setdefault(key, {"count": 0, "dropouts": 0})
+            entry["count"] += 1
+            entry["dropouts"] += dropped
+    return dropouts, distribution, rolling, by_band, by_channel
+
+
+def best_of(runs, func):
+    times = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        result = func()
+        times.append(time.perf_counter() - started)
+    return min(times), statistics.median(times), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--samples', type=int, default=100_000)
+    parser.add_argument('--runs', type=int, default=3)
+    args = parser.parse_args()
+
+    samples = generate(args.samples)
+    store = SampleStore.from_samples(samples)
+    analyzer = WifiAnalyzer()
+
+    old_best, old_median, old = best_of(args.runs, lambda: legacy_analysis(analyzer, samples))
+    new_best, new_median, new = best_of(args.runs, lambda: analyzer.analyze_batch(store))
+
+    dropouts, distribution, rolling, by_band, by_channel = old
+    if (dropouts != new.dropout_count or distribution != new.quality_distribution
+            or len(rolling) != len(new.rolling_stability)
+            or max(abs(a - b) for a, b in zip(rolling, new.rolling_stability)) > 1e-9
+            or {k: (v["count"], v["dropouts"]) for k, v in by_band.items()}
+            != {k: (v["count"], v["dropouts"]) for k, v in new.by_band.items()}
+            or {k: (v["count"], v["dropouts"]) for k, v in by_channel.items()}
+            != {k: (v["count"], v["dropouts"]) for k, v in new.by_channel.items()}):
+        raise SystemExit("Résultats différents entre l'ancien chemin et analyze_batch")
+
+    print(f"{args.samples} échantillons, meilleur de {args.runs} essais")
+    print(f"{'chemin':<34} | {'meilleur':>9} | {'médiane':>9}")
+    print('-' * 60)
+    print(f"{'boucles Python (liste)':<34} | {old_best * 1000:>6.1f} ms | {old_median * 1000:>6.1f} ms")
+    print(f"{'analyze_batch (SampleStore)':<34} | {new_best * 1000:>6.1f} ms | {new_median * 1000:>6.1f} ms")
+    print(f"Accélération : {old_best / new_best:.0f}x — {new.dropout_count} déconnexions, "
+          f"stabilité moyenne {new.average_stability} %")
+
+
+if __name__ == '__main__':
+    main()
@@ -2,16 +2,38 @@
 # -*- coding: utf-8 -*-
 
 import numpy as np
-import matplotlib.pyplot as plt
-from matplotlib.figure import Figure
-from matplotlib.backends.backend_agg import FigureCanvasAgg
 import io
 import base64
 import logging
-from PIL import Image, ImageTk
 
+# matplotlib, scipy et PIL ne sont importés qu'à la génération d'un graphique
 logger = logging.getLogger(__name__)
 
+
+def _new_figure(size):
+    """Figure matplotlib (rendu Agg) aux dimensions données en pixels."""
+    from matplotlib.figure import Figure
+    return Figure(figsize=(size[0]/100, size[1]/100), dpi=100)
+
+
+def _to_photo_image(fig, size):
+    """Rend la figure et la convertit en image pour l'interface Tkinter."""
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from PIL import Image, ImageTk
+
+    canvas = FigureCanvasAgg(fig)
+    canvas.draw()
+
+    buf = io.BytesIO()
+    fig.savefig(buf, format='png')
+    buf.seek(0)
+
+    img = Image.open(buf)
+    img = img.resize(size, Image.LANCZOS)
+
+    return ImageTk.PhotoImage(img)
+
+
 def generate_heatmap(data, title="Distribution du signal WiFi", colormap="viridis", size=(800, 600)):
     """
     Génère une carte de chaleur à partir des données de signal WiFi
@@ -66,7 +88,7 @@ def generate_heatmap(data, title="Distribution du signal WiFi", colormap="viridi
         zi = griddata(positions, values, (xi, yi), method='linear', fill_value=-100)
 
         # Création de la figure
-        fig = Figure(figsize=(size[0]/100, size[1]/100), dpi=100)
+        fig = _new_figure(size)
         ax = fig.add_subplot(111)
 
         # Génération de la heatmap
@@ -81,17 +103,7 @@ def generate_heatmap(data, title="Distribution du signal WiFi", colormap="viridi
                   c='black', s=10, alpha=0.5, marker='o')
 
         # Conversion en image pour Tkinter
-        canvas = FigureCanvasAgg(fig)
-        canvas.draw()
-
-        buf = io.BytesIO()
-        fig.savefig(buf, format='png')
-        buf.seek(0)
-
-        img = Image.open(buf)
-        img = img.resize(size, Image.LANCZOS)
-
-        return ImageTk.PhotoImage(img)
+        return _to_photo_image(fig, size)
 
     except Exception as e:
         logger.error(f"Erreur lors de la génération de la heatmap: {e}")
@@ -115,7 +127,7 @@ def generate_signal_over_time_chart(timestamps, signal_values, title="Signal WiF
             logger.warning("Données insuffisantes ou incohérentes pour générer le graphique")
             return None
 
-        fig = Figure(figsize=(size[0]/100, size[1]/100), dpi=100)
+        fig = _new_figure(size)
         ax = fig.add_subplot(111)
 
         ax.plot(timestamps, signal_values, '-o', color='blue', alpha=0.7)
@@ -125,22 +137,14 @@ def generate_signal_over_time_chart(timestamps, signal_values, title="Signal WiF
         ax.grid(True, linestyle='--', alpha=0.7)
 
         # Rotation des labels pour meilleure lisibilité
-        plt.setp(ax.get_xticklabels(), rotation=45, ha='right')
+        for label in ax.get_xticklabels():
+            label.set_rotation(45)
+            label.set_horizontalalignment('right')
 
         fig.tight_layout()
 
         # Conversion en image pour Tkinter
-        canvas = FigureCanvasAgg(fig)
-        canvas.draw()
-
-        buf = io.BytesIO()
-        fig.savefig(buf, format='png')
-        buf.seek(0)
-
-        img = Image.open(buf)
-        img = img.resize(size, Image.LANCZOS)
-
-        return ImageTk.PhotoImage(img)
+        return _to_photo_image(fig, size)
 
     except Exception as e:
         logger.error(f"Erreur lors de la génération du graphique: {e}")
@@ -1,19 +1,128 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
+"""
+Historique des rapports d'analyse réseau.
 
+Chaque rapport reste un fichier JSON ``network_report_*.json`` ; un
+catalogue SQLite (``history_catalog.db`` dans le même répertoire) en garde
+un résumé indexé : identifiant, horodatage, zone, score et métriques clés.
+La vue d'historique pagine et filtre (dates, zone, score) sur ce catalogue
+sans ouvrir les rapports, qui ne sont lus qu'à l'affichage du détail.
+
+Le catalogue est mis à jour par ``save_report()`` ; à l'ouverture, les
+rapports ajoutés ou supprimés à la main sont rattrapés en comparant la
+liste des fichiers au catalogue (seuls les nouveaux fichiers sont lus).
+"""
 import os
 import json
+import sqlite3
+from dataclasses import dataclass
 from datetime import datetime
 import logging
+from typing import Dict, Iterable, List, Optional
+
+CATALOG_NAME = "history_catalog.db"
+REPORT_PREFIX = "network_report_"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS reports (
+    report_id TEXT PRIMARY KEY,
+    filename TEXT NOT NULL,
+    ts TEXT,
+    zone TEXT NOT NULL DEFAULT '',
+    score REAL,
+    signal_avg REAL,
+    signal_min REAL,
+    latency_avg REAL,
+    dropouts INTEGER,
+    recommendations INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_reports_ts ON reports(ts);
+CREATE INDEX IF NOT EXISTS idx_reports_zone_ts ON reports(zone, ts);
+CREATE INDEX IF NOT EXISTS idx_reports_score ON reports(score);
+"""
+
+_COLUMNS = ("report_id", "filename", "ts", "zone", "score", "signal_avg", "signal_min",
+            "latency_avg", "dropouts", "recommendations")
+
+
+@dataclass
+class ReportSummary:
+    """Résumé d'un rapport tel qu'enregistré dans le catalogue."""
+    report_id: str
+    path: str
+    timestamp: Optional[datetime]
+    zone: str = ""
+    score: Optional[float] = None
+    signal_avg: Optional[float] = None
+    signal_min: Optional[float] = None
+    latency_avg: Optional[float] = None
+    dropouts: Optional[int] = None
+    recommendations: int = 0
+
+
+def _format_ts(value: Optional[datetime]) -> Optional[str]:
+    # Format fixe : l'ordre des chaînes est l'ordre chronologique
+    return value.strftime("%Y-%m-%d %H:%M:%S.%f") if value else None
+
+
+def _parse_ts(value) -> Optional[datetime]:
+    try:
+        return datetime.fromisoformat(value) if value else None
+    except (TypeError, ValueError):
+        return None
+
+
+def _number(value) -> Optional[float]:
+    return float(value) if isinstance(value, (int, float)) and not isinstance(value, bool) else None
+
+
+def summarize_report(report: Dict, report_id: str, path: str) -> ReportSummary:
+    """
+    Extrait le résumé d'un rapport (rapport combiné de NetworkAnalyzer ou
+    analyse Moxa).
+
+    Le score est, par ordre de priorité : ``score``, ``score_global``, le
+    score global de l'analyse Moxa, puis la qualité de connexion WiFi.
+    """
+    wifi = report.get("wifi_analysis") or {}
+    moxa = report.get("moxa_analysis") if isinstance(report.get("moxa_analysis"), dict) else {}
+    signal = wifi.get("signal_strength") or {}
+    quality = wifi.get("quality") or {}
+    ping = report.get("ping") or {}
+    metadata = report.get("metadata") or {}
+
+    score = None
+    for candidate in (report.get("score"), report.get("score_global"), moxa.get("score_global"),
+                      quality.get("connection")):
+        score = _number(candidate)
+        if score is not None:
+            break
+
+    recommendations = report.get("recommendations") or report.get("recommandations") or []
+    return ReportSummary(
+        report_id=report_id,
+        path=path,
+        timestamp=_parse_ts(report.get("timestamp")),
+        zone=str(report.get("zone") or metadata.get("zone") or ""),
+        score=score,
+        signal_avg=_number(signal.get("average")),
+        signal_min=_number(signal.get("min")),
+        latency_avg=_number(ping.get("average_latency")),
+        dropouts=wifi.get("dropouts") if isinstance(wifi.get("dropouts"), int) else None,
+        recommendations=len(recommendations) if isinstance(recommendations, list) else 0,
+    )
+
 
 class HistoryManager:
     """Gestionnaire d'historique pour les rapports d'analyse réseau"""
 
-    def __init__(self, history_dir="logs"):
+    def __init__(self, history_dir="logs", catalog_path=None):
         """Initialise le gestionnaire d'historique
 
         Args:
             history_dir (str): Répertoire où stocker les rapports d'historique
+            catalog_path (str): Base SQLite du catalogue (par défaut dans history_dir)
         """
         self.history_dir = history_dir
 
@@ -23,8 +132,24 @@ class HistoryManager:
 
         self.logger = logging.getLogger(__name__)
 
+        self.catalog_path = catalog_path or os.path.join(self.history_dir, CATALOG_NAME)
+        self.conn = sqlite3.connect(self.catalog_path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(_SCHEMA)
+        self.sync_catalog()
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
     def save_report(self, report):
-        """Enregistre un rapport dans l'historique
+        """Enregistre un rapport dans l'historique et dans le catalogue
 
         Args:
             report (dict): Le rapport à sauvegarder
@@ -34,17 +159,24 @@ class HistoryManager:
         """
         try:
             # Génère un nom de fichier unique basé sur la date et l'heure
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"network_report_{timestamp}.json"
-            filepath = os.path.join(self.history_dir, filename)
+            now = datetime.now()
+            report_id = f"{REPORT_PREFIX}{now.strftime('%Y%m%d_%H%M%S')}"
+            suffix = 1
+            while os.path.exists(os.path.join(self.history_dir, f"{report_id}.json")):
+                report_id = f"{REPORT_PREFIX}{now.strftime('%Y%m%d_%H%M%S')}_{suffix}"
+                suffix += 1
+            filepath = os.path.join(self.history_dir, f"{report_id}.json")
 
             # Ajoute la date au rapport
-            report['timestamp'] = datetime.now().isoformat()
+            report['timestamp'] = now.isoformat()
 
             # Sauvegarde le rapport au format JSON
             with open(filepath, 'w', encoding='utf-8') as f:
                 json.dump(report, f, indent=4, ensure_ascii=False)
 
+            with self.conn:
+                self._upsert([summarize_report(report, report_id, filepath)])
+
             self.logger.info(f"Rapport sauvegardé: {filepath}")
             return filepath
         except Exception as e:
@@ -55,14 +187,11 @@ class HistoryManager:
         """Récupère la liste des rapports d'historique
 
         Returns:
-            list: Liste des chemins de fichiers des rapports
+            list: Liste des chemins de fichiers des rapports, du plus récent au plus ancien
         """
         try:
-            reports = []
-            for filename in os.listdir(self.history_dir):
-                if filename.startswith("network_report_") and filename.endswith(".json"):
-                    reports.append(os.path.join(self.history_dir, filename))
-            return sorted(reports, reverse=True)
+            rows = self.conn.execute("SELECT filename FROM reports ORDER BY ts DESC, report_id DESC")
+            return [os.path.join(self.history_dir, filename) for filename, in rows]
         except Exception as e:
             self.logger.error(f"Erreur lors de la récupération de l'historique: {e}")
             return []
@@ -82,3 +211,112 @@ class HistoryManager:
         except Exception as e:
             self.logger.error(f"Erreur lors du chargement du rapport {filepath}: {e}")
             return None
+
+    # --- Catalogue ----------------------------------------------------------
+
+    def _upsert(self, summaries: Iterable[ReportSummary]) -> None:
+        self.conn.executemany(
+            f"INSERT OR REPLACE INTO reports ({', '.join(_COLUMNS)}) VALUES ({', '.join('?' * len(_COLUMNS))})",
+            [(s.report_id, os.path.basename(s.path), _format_ts(s.timestamp), s.zone, s.score,
+              s.signal_avg, s.signal_min, s.latency_avg, s.dropouts, s.recommendations)
+             for s in summaries],
+        )
+
+    def sync_catalog(self):
+        """Rattrape les rapports ajoutés ou supprimés hors de save_report()
+
+        Returns:
+            tuple: (rapports indexés, entrées retirées)
+        """
+        try:
+            on_disk = {
+                filename[:-len(".json")]: filename
+                for filename in os.listdir(self.history_dir)
+                if filename.startswith(REPORT_PREFIX) and filename.endswith(".json")
+            }
+        except OSError as e:
+            self.logger.error(f"Erreur lors de la lecture de l'historique: {e}")
+            return 0, 0
+        known = {report_id for report_id, in self.conn.execute("SELECT report_id FROM reports")}
+
+        summaries = []
+        for report_id in on_disk.keys() - known:
+            path = os.path.join(self.history_dir, on_disk[report_id])
+            report = self.load_report(path)
+            if isinstance(report, dict):
+                summary = summarize_report(report, report_id, path)
+                if summary.timestamp is None:
+                    summary.timestamp = datetime.fromtimestamp(os.path.getmtime(path))
+                summaries.append(summary)
+        removed = [(report_id,) for report_id in known - on_disk.keys()]
+
+        with self.conn:
+            self._upsert(summaries)
+            self.conn.executemany("DELETE FROM reports WHERE report_id = ?", removed)
+        if summaries or removed:
+            self.logger.info(f"Catalogue d'historique : {len(summaries)} rapport(s) indexé(s), "
+                             f"{len(removed)} retiré(s)")
+        return len(summaries), len(removed)
+
+    @staticmethod
+    def _where(start, end, zone, min_score, max_score):
+        clauses, params = [], []
+        if start is not None:
+            clauses.append("ts >= ?")
+            params.append(_format_ts(start))
+        if end is not None:
+            clauses.append("ts < ?")
+            params.append(_format_ts(end))
+        if zone is not None:
+            clauses.append("zone = ?")
+            params.append(zone)
+        if min_score is not None:
+            clauses.append("score >= ?")
+            params.append(min_score)
+        if max_score is not None:
+            clauses.append("score <= ?")
+            params.append(max_score)
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def query_reports(self, start: Optional[datetime] = None, end: Optional[datetime] = None,
+                      zone: Optional[str] = None, min_score: Optional[float] = None,
+                      max_score: Optional[float] = None, limit: Optional[int] = 50,
+                      offset: int = 0) -> List[ReportSummary]:
+        """Page de résumés, du plus récent au plus ancien
+
+        Args:
+            start, end: plage ``[start, end[`` sur l'horodatage du rapport
+            zone: zone exacte
+            min_score, max_score: bornes du score (les rapports sans score sont exclus)
+            limit: taille de la page (None pour tout)
+            offset: nombre de résumés à sauter (page * limit)
+        """
+        where, params = self._where(start, end, zone, min_score, max_score)
+        sql = f"SELECT {', '.join(_COLUMNS)} FROM reports{where} ORDER BY ts DESC, report_id DESC"
+        if limit is not None:
+            sql += " LIMIT ? OFFSET ?"
+            params.extend([limit, offset])
+        return [self._summary(row) for row in self.conn.execute(sql, params)]
+
+    def count_reports(self, start: Optional[datetime] = None, end: Optional[datetime] = None,
+                      zone: Optional[str] = None, min_score: Optional[float] = None,
+                      max_score: Optional[float] = None) -> int:
+        """Nombre de rapports correspondant aux filtres (pour la pagination)"""
+        where, params = self._where(start, end, zone, min_score, max_score)
+        return self.conn.execute(f"SELECT COUNT(*) FROM reports{where}", params).fetchone()[0]
+
+    def get_summary(self, report_id: str) -> Optional[ReportSummary]:
+        """Résumé d'un rapport sans ouvrir son fichier"""
+        row = self.conn.execute(
+            f"SELECT {', '.join(_COLUMNS)} FROM reports WHERE report_id = ?", (report_id,)
+        ).fetchone()
+        return self._summary(row) if row else None
+
+    def zones(self) -> List[str]:
+        """Zones présentes dans l'historique"""
+        rows = self.conn.execute("SELECT DISTINCT zone FROM reports WHERE zone != '' ORDER BY zone")
+        return [zone for zone, in rows]
+
+    def _summary(self, row) -> ReportSummary:
+        report_id, filename, ts, *metrics = row
+        return ReportSummary(report_id, os.path.join(self.history_dir, filename), _parse_ts(ts), *metrics)
@@ -4,6 +4,8 @@ import os
 import json
 import requests
 
+from src.ai.openai_client import get_client
+
 class MoxaLogAnalyzer:
     """
     Analyse les logs Moxa via l'API OpenAI pour fournir des recommandations 
@@ -146,18 +148,13 @@ class MoxaLogAnalyzer:
 
         try:
             # Appeler l'API OpenAI
-            response = requests.post(
-                "https://api.openai.com/v1/chat/completions",
-                headers={
-                    "Authorization": f"Bearer {self.api_key}",
-                    "Content-Type": "application/json"
-                },
-                json={
-                    "model": "gpt-4",
-                    "messages": [{"role": "user", "content": prompt}],
-                    "temperature": 0.2,
-                    "max_tokens": 2000
-                }
+            response = get_client().chat(
+                [{"role": "user", "content": prompt}],
+                model="gpt-4",
+                temperature=0.2,
+                max_tokens=2000,
+                api_key=self.api_key,
+                timeout=60
             )
 
             if response.status_code != 200:
@@ -0,0 +1,245 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Stockage persistant des événements Moxa dans une base SQLite locale.
+
+Les logs collés ou importés sont analysés une seule fois : leurs événements
+(roaming, désauthentification, échecs d'authentification, SNR, handoff)
+sont enregistrés avec des index sur l'horodatage, l'AP et le type. Les
+analyses interrogent ensuite une plage horaire ou un AP sans relire le texte.
+
+Réimporter le même export n'ajoute rien : chaque événement est identifié par
+une empreinte de sa ligne, plus son rang d'apparition dans l'export pour une
+ligne horodatée répétée, ou son numéro de ligne si elle n'a pas
+d'horodatage : les lignes identiques d'un même export ne sont pas fusionnées.
+"""
+import hashlib
+import logging
+import os
+import sqlite3
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Union
+
+from moxa_log_parser import MoxaEvent, TimestampParser, iter_events, iter_file_lines, iter_log_lines
+
+DEFAULT_DB_PATH = os.path.join("logs_moxa", "moxa_events.db")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS imports (
+    id INTEGER PRIMARY KEY,
+    source TEXT,
+    imported_at TEXT NOT NULL,
+    lines INTEGER NOT NULL DEFAULT 0,
+    new_events INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS events (
+    id INTEGER PRIMARY KEY,
+    line_hash BLOB NOT NULL,
+    kind TEXT NOT NULL,
+    ts TEXT,
+    ap TEXT,
+    previous_ap TEXT,
+    value REAL,
+    success INTEGER NOT NULL DEFAULT 0,
+    detail TEXT NOT NULL DEFAULT '',
+    line_no INTEGER,
+    line TEXT NOT NULL,
+    import_id INTEGER REFERENCES imports(id),
+    UNIQUE (line_hash, kind)
+);
+CREATE INDEX IF NOT EXISTS idx_events_ts ON events(ts);
+CREATE INDEX IF NOT EXISTS idx_events_ap_ts ON events(ap, ts);
+CREATE INDEX IF NOT EXISTS idx_events_kind_ts ON events(kind, ts);
+"""
+
+_COLUMNS = "kind, line_no, line, ap, previous_ap, value, success, detail, ts"
+
+# Nombre de lignes insérées par executemany
+_BATCH_SIZE = 5000
+
+
+@dataclass
+class ImportResult:
+    """Bilan d'un import."""
+    import_id: int
+    lines: int
+    events: int
+    new_events: int
+
+    @property
+    def duplicates(self) -> int:
+        return self.events - self.new_events
+
+
+def _format_ts(value: Optional[datetime]) -> Optional[str]:
+    # ISO avec microsecondes fixes : l'ordre des chaînes est l'ordre chronologique
+    return value.strftime("%Y-%m-%d %H:%M:%S.%f") if value else None
+
+
+def _line_hash(event: MoxaEvent, occurrence: int = 0) -> bytes:
+    # Ligne horodatée répétée dans un même export (timeouts dans la même
+    # seconde...) : son rang d'apparition la distingue des précédentes
+    if not event.timestamp:
+        key = f"{event.line_no}\x00{event.line}"
+    elif occurrence:
+        key = f"{occurrence}\x00{event.line}"
+    else:
+        key = event.line
+    return hashlib.blake2b(key.encode("utf-8", "replace"), digest_size=16).digest()
+
+
+class MoxaEventStore:
+    """
+    Base d'événements Moxa.
+
+    Args:
+        path: fichier SQLite (``":memory:"`` pour une base temporaire)
+    """
+
+    def __init__(self, path: str = DEFAULT_DB_PATH):
+        self.path = path
+        if path != ":memory:":
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+        self.logger = logging.getLogger(__name__)
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # --- Import -------------------------------------------------------------
+
+    def import_lines(self, lines: Union[str, Iterable[str]], source: Optional[str] = None) -> ImportResult:
+        """
+        Analyse et enregistre les événements d'un log (texte ou lignes).
+        Les événements déjà présents sont ignorés.
+        """
+        timestamps = TimestampParser()
+        counter = {"lines": 0}
+
+        def counted(source_lines):
+            for line in source_lines:
+                counter["lines"] += 1
+                yield line
+
+        with self.conn:
+            cursor = self.conn.execute(
+                "INSERT INTO imports (source, imported_at) VALUES (?, ?)",
+                (source, datetime.now().isoformat(timespec="seconds")),
+            )
+            import_id = cursor.lastrowid
+            before = self.conn.total_changes
+            events = 0
+            batch = []
+            # Rang d'apparition de chaque ligne horodatée dans cet import
+            occurrences: Dict[bytes, int] = {}
+            last_line, occurrence = None, 0
+            for event in iter_events(counted(iter_log_lines(lines)), timestamps=timestamps):
+                events += 1
+                if event.timestamp and event.line_no != last_line:
+                    text_hash = _line_hash(event)
+                    occurrence = occurrences.get(text_hash, 0)
+                    occurrences[text_hash] = occurrence + 1
+                    last_line = event.line_no
+                batch.append((
+                    _line_hash(event, occurrence if event.timestamp else 0), event.kind, _format_ts(event.timestamp), event.mac,
+                    event.previous_mac, event.value, int(event.success), event.detail,
+                    event.line_no, event.line, import_id,
+                ))
+                if len(batch) >= _BATCH_SIZE:
+                    self._insert(batch)
+                    batch = []
+            if batch:
+                self._insert(batch)
+            new_events = self.conn.total_changes - before
+            self.conn.execute("UPDATE imports SET lines = ?, new_events = ? WHERE id = ?",
+                              (counter["lines"], new_events, import_id))
+
+        result = ImportResult(import_id, counter["lines"], events, new_events)
+        self.logger.info(f"Import Moxa {source or ''}: {new_events} nouveaux événements "
+                         f"({result.duplicates} déjà connus)")
+        return result
+
+    def import_file(self, path: str) -> ImportResult:
+        """Importe un fichier de log lu en flux."""
+        return self.import_lines(iter_file_lines(path), source=os.path.abspath(path))
+
+    def _insert(self, rows: List[tuple]) -> None:
+        self.conn.executemany(
+            "INSERT OR IGNORE INTO events (line_hash, kind, ts, ap, previous_ap, value, success,"
+            " detail, line_no, line, import_id) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            rows,
+        )
+
+    # --- Requêtes -----------------------------------------------------------
+
+    @staticmethod
+    def _where(start: Optional[datetime], end: Optional[datetime], ap: Optional[str],
+               kinds: Optional[Sequence[str]]):
+        clauses, params = [], []
+        if start is not None:
+            clauses.append("ts >= ?")
+            params.append(_format_ts(start))
+        if end is not None:
+            clauses.append("ts < ?")
+            params.append(_format_ts(end))
+        if ap is not None:
+            clauses.append("ap = ?")
+            params.append(ap.lower())
+        if kinds:
+            clauses.append(f"kind IN ({', '.join('?' * len(kinds))})")
+            params.extend(kinds)
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def events(self, start: Optional[datetime] = None, end: Optional[datetime] = None,
+               ap: Optional[str] = None, kinds: Optional[Sequence[str]] = None,
+               limit: Optional[int] = None) -> Iterator[MoxaEvent]:
+        """
+        Événements enregistrés, dans l'ordre chronologique puis d'import.
+
+        Args:
+            start, end: plage horaire ``[start, end[`` (les événements sans
+                horodatage sont exclus dès qu'une borne est donnée)
+            ap: adresse MAC de l'AP
+            kinds: types d'événements (``moxa_log_parser.ROAM``...)
+            limit: nombre maximal d'événements
+        """
+        where, params = self._where(start, end, ap, kinds)
+        sql = f"SELECT {_COLUMNS} FROM events{where} ORDER BY ts, id"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        for kind, line_no, line, mac, previous, value, success, detail, ts in self.conn.execute(sql, params):
+            yield MoxaEvent(kind, line_no, line, mac, value=value, previous_mac=previous,
+                            success=bool(success), detail=detail,
+                            timestamp=datetime.fromisoformat(ts) if ts else None)
+
+    def count_by_kind(self, start: Optional[datetime] = None, end: Optional[datetime] = None,
+                      ap: Optional[str] = None) -> dict:
+        """Nombre d'événements par type sur la plage et l'AP donnés."""
+        where, params = self._where(start, end, ap, None)
+        rows = self.conn.execute(f"SELECT kind, COUNT(*) FROM events{where} GROUP BY kind", params)
+        return dict(rows.fetchall())
+
+    def access_points(self) -> List[dict]:
+        """AP connus avec leur nombre d'événements et leur période d'activité."""
+        rows = self.conn.execute(
+            "SELECT ap, COUNT(*), MIN(ts), MAX(ts) FROM events WHERE ap IS NOT NULL"
+            " GROUP BY ap ORDER BY COUNT(*) DESC"
+        )
+        return [{"ap": ap, "events": count, "first_seen": first, "last_seen": last}
+                for ap, count, first, last in rows]
+
+    def __len__(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM events").fetchone()[0]
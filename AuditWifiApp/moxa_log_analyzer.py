@@ -1,9 +1,14 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 import json
-import requests
 import os
-import re
+from contextlib import nullcontext
+
+from src.ai.analysis_cache import cache_key, get_cache
+from src.ai.moxa_map_reduce import build_digest, chunk_lines, map_chunks, reduce_analyses, spread
+from src.ai.openai_client import get_client
+from moxa_log_parser import iter_file_lines, iter_log_lines, parse_file_parallel
+from moxa_rule_engine import MoxaRuleEngine, enrich_with_ai, performance_score
 
 class MoxaLogAnalyzer:
     """
@@ -11,8 +16,26 @@ class MoxaLogAnalyzer:
     d'optimisation des paramètres Moxa.
     """
 
-    def __init__(self):
+    MODEL = "gpt-4o-mini"
+    TEMPERATURE = 0.1
+
+    # Budget du prompt : au-delà, le log est résumé puis analysé par extraits
+    PROMPT_LOG_CHARS = 4000
+    CHUNK_TOKENS = 1000
+    SUMMARY_TOKENS = 1500
+    MAX_CHUNKS = 16
+    MAX_PARALLEL_CHUNKS = 4
+
+    def __init__(self, ai_slots=None):
+        """
+        Args:
+            ai_slots (threading.Semaphore, optional): limite partagée des appels
+                OpenAI simultanés, extraits d'un même log compris (analyse en lot)
+        """
         self.api_key = os.getenv("OPENAI_API_KEY")
+        self.ai_slots = ai_slots
+        # Vrai si la dernière analyse a été servie par le cache disque
+        self.last_cache_hit = False
 
         # Configuration par défaut
         self.current_config = {
@@ -61,18 +84,49 @@ class MoxaLogAnalyzer:
             if key in self.current_config:
                 self.current_config[key] = value
 
-    def analyze_logs(self, log_content, current_config):
+    def analyze_logs(self, log_content, current_config, use_ai=True):
         """
-        Analyse les logs Moxa via l'API OpenAI et retourne un dictionnaire
-        avec les résultats de l'analyse et des recommandations.
+        Analyse les logs Moxa et retourne un dictionnaire avec les résultats
+        de l'analyse et des recommandations.
+
+        Le rapport complet est d'abord calculé localement par le moteur de
+        règles ; si une clé API est disponible et ``use_ai`` est vrai, OpenAI
+        l'enrichit (recommandations et commentaire). En cas d'échec de l'API,
+        le rapport local est retourné tel quel.
         """
         if not log_content:
-            raise ValueError("Le contenu des logs est vide")        # Mettre à jour la configuration actuelle
+            raise ValueError("Le contenu des logs est vide")
+        # Mettre à jour la configuration actuelle
         self.set_current_config(current_config)
 
-        # Si pas de clé API ou clé de test, utiliser l'analyse locale
-        if not self.api_key or self.api_key == 'test-key':
-            return self._local_fallback_analysis(log_content, current_config)
+        self.last_cache_hit = False
+        report = self._local_fallback_analysis(log_content, current_config)
+        if not use_ai:
+            return report
+        return self.enrich_report(report, log_content, current_config)
+
+    @property
+    def ai_enabled(self):
+        """Vrai si une clé API réelle est disponible (pas de clé de test)."""
+        return bool(self.api_key) and self.api_key != 'test-key'
+
+    def enrich_report(self, report, log_content, current_config):
+        """
+        Enrichit un rapport local avec l'analyse d'OpenAI. Sans clé API ou en
+        cas d'échec de l'API, le rapport local est retourné tel quel.
+        """
+        self.last_cache_hit = False
+        # Si pas de clé API ou clé de test, l'analyse locale suffit
+        if not self.ai_enabled:
+            return report
+
+        # Réutiliser une analyse identique déjà obtenue
+        cache = get_cache()
+        key = cache_key(log_content, current_config, None, self.MODEL, self.TEMPERATURE, kind="moxa_log_analyzer")
+        cached = cache.get(key) if cache else None
+        if cached is not None:
+            self.last_cache_hit = True
+            return enrich_with_ai(report, cached["value"])
 
         # Nettoyer et préparer les logs
         clean_logs = log_content.replace("\r\n", "\n").strip()
@@ -80,7 +134,25 @@ class MoxaLogAnalyzer:
         # Ajouter la configuration actuelle au prompt pour permettre à l'IA de l'évaluer
         config_text = json.dumps(current_config, indent=2)
 
-        # Créer le prompt pour l'IA
+        try:
+            if len(clean_logs) <= self.PROMPT_LOG_CHARS:
+                analysis_result = self._request_analysis(
+                    self._build_prompt(config_text, f"LOGS À ANALYSER:\n{clean_logs}")
+                )
+            else:
+                # Log trop long pour un seul prompt : résumé local puis analyse par morceaux
+                analysis_result = self._map_reduce_analysis(clean_logs, config_text)
+        except Exception:
+            # API injoignable ou réponse inexploitable : le rapport local suffit
+            return report
+        if "error" in analysis_result:
+            return report
+        if cache:
+            cache.set(key, analysis_result)
+        return enrich_with_ai(report, analysis_result)
+
+    def _build_prompt(self, config_text, logs_section):
+        """Prompt d'analyse : schéma JSON attendu, configuration et logs (ou extrait)."""
         prompt = (
             "En tant qu'expert Wi-Fi industriel spécialisé dans les appareils Moxa, analyser ces logs en recherchant spécifiquement:\n"
             "1. Effet 'ping-pong' : détection des roaming répétés entre mêmes APs (<30 sec)\n"
@@ -191,102 +263,98 @@ class MoxaLogAnalyzer:
             "5. SNR = 0 sur plus de 3 APs\n\n"
 
             f"CONFIGURATION ACTUELLE:\n{config_text}\n\n"
-            f"LOGS À ANALYSER:\n{clean_logs[:4000]}\n\n"  # Limiter pour éviter les tokens excessifs
+            f"{logs_section}\n\n"
             "IMPORTANT: Répondre UNIQUEMENT avec du JSON valide, sans texte avant ou après."
         )
+        return prompt
 
-        try:
-            # Appel à l'API OpenAI
-            response = requests.post(
-                "https://api.openai.com/v1/chat/completions",
-                headers={
-                    "Authorization": f"Bearer {self.api_key}",
-                    "Content-Type": "application/json"
-                },
-                json={
-                    "model": "gpt-4o-mini",
-                    "messages": [
-                        {
-                            "role": "system",
-                            "content": "Tu es un expert en Wi-Fi industriel spécialisé dans les appareils Moxa. Analyse les logs et réponds UNIQUEMENT en JSON valide."
-                        },
-                        {
-                            "role": "user",
-                            "content": prompt
-                        }
-                    ],
-                    "max_tokens": 3000,
-                    "temperature": 0.1
-                },
+    def _request_analysis(self, prompt):
+        """
+        Envoie un prompt d'analyse et retourne le JSON de la réponse, ou un
+        dictionnaire ``error``. Les erreurs réseau sont propagées.
+        """
+        # Appel à l'API OpenAI (dans la limite partagée d'appels simultanés)
+        with self.ai_slots or nullcontext():
+            response = get_client().chat(
+                [
+                    {
+                        "role": "system",
+                        "content": "Tu es un expert en Wi-Fi industriel spécialisé dans les appareils Moxa. Analyse les logs et réponds UNIQUEMENT en JSON valide."
+                    },
+                    {
+                        "role": "user",
+                        "content": prompt
+                    }
+                ],
+                model=self.MODEL,
+                temperature=self.TEMPERATURE,
+                max_tokens=3000,
+                api_key=self.api_key,
                 timeout=30
             )
 
-            if response.status_code == 200:
-                result = response.json()
-                content = result['choices'][0]['message']['content'].strip()
-
-                # Nettoyer le contenu pour extraire le JSON
-                if content.startswith('```json'):
-                    content = content[7:]  # Enlever ```json
-                if content.endswith('```'):
-                    content = content[:-3]  # Enlever ```
-                content = content.strip()
-
-                try:
-                    analysis_result = json.loads(content)
-                    return analysis_result
-                except json.JSONDecodeError as e:
-                    return {
-                        "error": f"Erreur de parsing JSON: {e}",
-                        "raw_content": content
-                    }
-            else:                return {
-                    "error": f"Erreur API OpenAI: {response.status_code}",
-                    "message": response.text
+        if response.status_code == 200:
+            result = response.json()
+            content = result['choices'][0]['message']['content'].strip()
+
+            # Nettoyer le contenu pour extraire le JSON
+            if content.startswith('```json'):
+                content = content[7:]  # Enlever ```json
+            if content.endswith('```'):
+                content = content[:-3]  # Enlever ```
+            content = content.strip()
+
+            try:
+                return json.loads(content)
+            except json.JSONDecodeError as e:
+                return {
+                    "error": f"Erreur de parsing JSON: {e}",
+                    "raw_content": content
                 }
+        else:
+            return {
+                "error": f"Erreur API OpenAI: {response.status_code}",
+                "message": response.text
+            }
 
-        except requests.exceptions.RequestException as e:
-            # Fall back to local analysis when API is unreachable
-            return self._local_fallback_analysis(log_content, current_config)
-        except Exception as e:
-            # Fall back to local analysis for any other API errors
-            return self._local_fallback_analysis(log_content, current_config)
+    def _map_reduce_analysis(self, clean_logs, config_text):
+        """
+        Analyse d'un log plus long que le prompt : le log est résumé localement,
+        ses lignes d'événements sont découpées en morceaux analysés en parallèle,
+        puis les réponses sont fusionnées au même format JSON.
+        """
+        digest = build_digest(clean_logs)
+        summary = digest.summary_text(self.SUMMARY_TOKENS)
+        all_chunks = chunk_lines(digest.event_lines, self.CHUNK_TOKENS) or [""]
+        chunks = spread(all_chunks, self.MAX_CHUNKS)
+
+        def analyze_chunk(chunk, index, total):
+            return self._request_analysis(self._build_prompt(
+                config_text,
+                f"RÉSUMÉ GLOBAL DU LOG (agrégé localement, {digest.total_lines} lignes):\n{summary}\n\n"
+                f"LIGNES D'ÉVÉNEMENTS - EXTRAIT {index}/{total}:\n{chunk}"
+            ))
+
+        partials = [p for p in map_chunks(chunks, analyze_chunk, self.MAX_PARALLEL_CHUNKS) if p]
+        if not partials:
+            raise RuntimeError("Aucun extrait du log n'a pu être analysé")
+
+        result = reduce_analyses(partials, digest)
+        result["map_reduce"] = {
+            "lignes": digest.total_lines,
+            "lignes_evenements": len(digest.event_lines),
+            "extraits": len(all_chunks),
+            "extraits_analyses": len(partials),
+            "extraits_en_echec": len(chunks) - len(partials),
+        }
+        return result
 
     def calculate_performance_score(self):
         """
         Calcule un score de performance basé sur les métriques collectées.
         Score de 0 à 100, où 100 est la performance optimale.
         """
-        if not self.metrics["handoff_times"]:
-            return 50  # Score neutre si pas de données
-
-        # Score de base
-        base_score = 100
-
-        # Pénalités pour les temps de handoff élevés
-        avg_handoff = sum(self.metrics["handoff_times"]) / len(self.metrics["handoff_times"])
-        if avg_handoff > 100:
-            base_score -= (avg_handoff - 100) * 0.5  # Pénalité progressive
-
-        # Pénalités pour les ping-pong
-        ping_pong_penalty = self.metrics["ping_pong_events"] * 10
-        base_score -= min(30, ping_pong_penalty)  # Maximum 30 points de pénalité
-
-        # Pénalités pour les chutes de SNR
-        snr_drops_penalty = len(self.metrics["snr_drops"]) * 5
-        base_score -= min(20, snr_drops_penalty)  # Maximum 20 points de pénalité
-
-        # Pénalités pour les échecs d'authentification
-        auth_penalty = self.metrics["authentication_failures"] * 3
-        base_score -= min(15, auth_penalty)  # Maximum 15 points de pénalité
-
-        # Pénalités pour la fréquence de roaming excessive
-        if self.metrics["total_roaming_events"] > 10:
-            freq_penalty = (self.metrics["total_roaming_events"] - 10) * 2
-            base_score -= min(15, freq_penalty)
-
-        # Assurer que le score reste dans la fourchette 0-100
-        return max(0, min(100, round(base_score)))
+        return performance_score(self.metrics)
 
     def _get_ping_pong_analysis(self):
         """Analyse des événements ping-pong détectés."""
@@ -486,104 +554,44 @@ class MoxaLogAnalyzer:
             "config_changes": config_changes
         }
 
-    def _local_fallback_analysis(self, log_content, current_config):
+    def analyze_log_file(self, path, current_config, workers=1):
         """
-        Fallback local analysis when OpenAI API is unavailable.
-        Used primarily for testing.
+        Analyse locale d'un fichier de log lu en flux, sans le charger en
+        mémoire (exports syslog volumineux).
+
+        Args:
+            path: chemin du fichier de log
+            current_config: configuration Moxa actuelle
+            workers: nombre de processus ; au-delà de 1, le fichier est découpé
+                en morceaux analysés en parallèle (None = tous les cœurs)
         """
-        # Reset metrics
-        self.metrics = {
-            "total_roaming_events": 0,
-            "successful_roaming": 0,
-            "failed_roaming": 0,
-            "handoff_times": [],
-            "ping_pong_events": 0,
-            "authentication_failures": 0,
-            "snr_drops": [],
-            "ap_changes": [],            "deauth_requests": {"total": 0, "par_ap": {}},
-            "duration_minutes": 1,
-        }
-          # Parse logs for specific patterns
-        lines = log_content.split('\n')
-
-        for line in lines:
-            # Detection des deauth requests
-            if "deauth" in line.lower() or "deauthentication" in line.lower():
-                self.metrics["deauth_requests"]["total"] += 1
-                # Extract AP MAC for deauth
-                ap_match = re.search(r'([0-9a-fA-F]{2}:[0-9a-fA-F]{2}:[0-9a-fA-F]{2}:[0-9a-fA-F]{2}:[0-9a-fA-F]{2}:[0-9a-fA-F]{2})', line)
-                if ap_match:
-                    ap_mac = ap_match.group(1).lower()
-                    if ap_mac not in self.metrics["deauth_requests"]["par_ap"]:
-                        self.metrics["deauth_requests"]["par_ap"][ap_mac] = 0
-                    self.metrics["deauth_requests"]["par_ap"][ap_mac] += 1
-
-            # Detection des événements de roaming
-            if "roaming" in line.lower() or "associated with" in line.lower() or "connected to ap" in line.lower():
-                self.metrics["total_roaming_events"] += 1
-
-            # Detection des temps de handoff
-            handoff_match = re.search(r'handoff time:\s*(\d+)\s*ms', line.lower())
-            if handoff_match:
-                handoff_time = int(handoff_match.group(1))
-                self.metrics["handoff_times"].append(handoff_time)
-
-            # Detection des problèmes d'authentification
-            if "authentication timeout" in line.lower() or "auth failed" in line.lower() or "authentication failed" in line.lower():
-                self.metrics["authentication_failures"] += 1
-
-            # Detection des chutes de SNR
-            if "snr" in line.lower() and ("0" in line or "drop" in line.lower()):
-                self.metrics["snr_drops"].append(line.strip())
-          # No need to simulate handoff times as they are parsed from logs
-          # Generate config changes based on detected issues
-        config_changes = []
-
-        # Check for authentication failures - recommend increasing transmission power
-        if self.metrics["authentication_failures"] > 0:
-            config_changes.append({
-                "param": "max_transmission_power",
-                "current": current_config.get("max_transmission_power", 10),
-                "suggested": 20,
-                "reason": "Authentication failures detected"
-            })
-
-        # Check for high handoff times - recommend RTS threshold adjustment
-        if self.metrics["handoff_times"] and max(self.metrics["handoff_times"]) > 150:
-            config_changes.append({
-                "param": "rts_threshold",
-                "current": current_config.get("rts_threshold", 2346),
-                "suggested": 1500,
-                "reason": "High handoff times detected"
-            })
+        self.set_current_config(current_config)
+        if workers == 1:
+            accumulator = MoxaRuleEngine().consume_lines(iter_file_lines(path))
+        else:
+            accumulator = parse_file_parallel(path, workers, factory=MoxaRuleEngine)
+        return self._local_result(accumulator, current_config)
 
-        # Check for frequent roaming - recommend fragmentation threshold
-        if self.metrics["total_roaming_events"] > 3:
-            config_changes.append({
-                "param": "fragmentation_threshold",
-                "current": current_config.get("fragmentation_threshold", 2346),
-                "suggested": 1500,
-                "reason": "Frequent roaming events detected"
-            })
+    def analyze_store(self, store, current_config, start=None, end=None, ap=None):
+        """
+        Analyse locale des événements enregistrés dans un ``MoxaEventStore``,
+        sur une plage horaire et/ou pour un AP, sans relire les logs.
+        """
+        self.set_current_config(current_config)
+        accumulator = MoxaRuleEngine().consume(store.events(start, end, ap))
+        return self._local_result(accumulator, current_config)
 
-        # Return format compatible with tests
-        return {
-            "adapte_flotte_AMR": self.calculate_performance_score() > 70,
-            "score_global": self.calculate_performance_score(),
-            "analyse_detaillee": {
-                "ping_pong": {
-                    "detecte": self.metrics["ping_pong_events"] > 0,
-                    "occurrences": [],
-                    "gravite": self.metrics["ping_pong_events"],
-                    "details": {"temps_min_entre_roaming": "30 sec", "paires_ap_affectees": []}
-                },
-                "deauth_requests": self.metrics["deauth_requests"],
-                "timeouts_auth": {
-                    "nombre": self.metrics["authentication_failures"],
-                    "temps_moyen_ms": 0,
-                    "details": {"causes_principales": ["timeout"], "aps_concernes": []}
-                }
-            },
-            "config_changes": config_changes,
-            "recommandations": []
-        }
+    def _local_fallback_analysis(self, log_content, current_config):
+        """
+        Analyse locale complète, sans appel à OpenAI.
+        """
+        # Un seul passage sur les lignes : chaque ligne est classée en
+        # événements typés par moxa_log_parser, puis évaluée par les règles.
+        accumulator = MoxaRuleEngine().consume_lines(iter_log_lines(log_content))
+        return self._local_result(accumulator, current_config)
+
+    def _local_result(self, engine, current_config):
+        """Rapport du moteur de règles ; ses métriques deviennent ``self.metrics``."""
+        report = engine.report(current_config)
+        self.metrics = engine.metrics()
+        return report
@@ -0,0 +1,397 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Lecture en flux des logs Moxa.
+
+Les exports syslog de la flotte AMR font plusieurs centaines de Mo : on ne
+les charge pas en mémoire et on ne relance pas une série de recherches par
+ligne et par analyseur. Chaque ligne est mise une seule fois en minuscules
+puis classée en événements typés (roaming, désauthentification, échec
+d'authentification, SNR, temps de handoff, redémarrage de l'interface
+WLAN) ; les expressions précompilées ne servent qu'à extraire les valeurs.
+Les analyseurs consomment ensuite ce flux d'événements.
+"""
+import codecs
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+# Types d'événements
+ROAM = "roam"
+DEAUTH = "deauth"
+AUTH_FAILURE = "auth_failure"
+SNR = "snr"
+HANDOFF = "handoff"
+WLAN_RESTART = "wlan_restart"
+
+# La ligne est classée par des tests de sous-chaînes sur sa version en
+# minuscules : exécutés en C, ils sont bien plus rapides sous CPython qu'une
+# grande alternative regex, essayée à chaque position de la ligne. Les
+# expressions ne servent qu'à extraire des valeurs, une fois la ligne classée.
+_HANDOFF_PATTERN = re.compile(r"handoff time:\s*(\d+)\s*ms")
+_MAC_PATTERN = re.compile(r"([0-9a-fA-F]{2}(?::[0-9a-fA-F]{2}){5})")
+_SNR_VALUE_PATTERN = re.compile(r"snr\s*[:=]?\s*(-?\d+)")
+
+
+@dataclass
+class MoxaEvent:
+    """Événement extrait d'une ligne de log Moxa."""
+    kind: str
+    line_no: int
+    line: str
+    mac: Optional[str] = None          # AP en minuscules : 1re MAC de la ligne, la dernière pour un roaming
+    value: Optional[float] = None      # temps de handoff (ms) ou SNR (dB)
+    previous_mac: Optional[str] = None  # AP de départ d'un roaming (« from X to Y »)
+    success: bool = False              # roaming annoncé comme réussi
+    detail: str = ""                   # roaming/association, drop pour le SNR
+    timestamp: Optional[datetime] = None
+
+
+def iter_log_lines(source: Union[str, Iterable[str]]) -> Iterator[str]:
+    """Lignes d'un texte de log ou d'un itérable de lignes, sans fin de ligne."""
+    if isinstance(source, str):
+        # Texte déjà en mémoire : le découpage en C est bien plus rapide
+        # qu'une itération sur un io.StringIO.
+        source = source.split("\n")
+    return (line.rstrip("\r\n") for line in source)
+
+
+def detect_encoding(path: str, default: str = "utf-8") -> str:
+    """Encodage d'un export de log (les exports Windows sont souvent en UTF-16)."""
+    with open(path, "rb") as f:
+        head = f.read(4)
+    if head.startswith(codecs.BOM_UTF8):
+        return "utf-8-sig"
+    if head.startswith((codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)):
+        return "utf-16"
+    return default
+
+
+def iter_file_lines(path: str, encoding: Optional[str] = None) -> Iterator[str]:
+    """Lit un fichier de log ligne par ligne, sans le charger en mémoire."""
+    # newline="\n" : mêmes coupures de ligne que l'analyse d'un texte ou d'un morceau
+    with open(path, "r", encoding=encoding or detect_encoding(path), errors="replace", newline="\n") as f:
+        for line in f:
+            yield line.rstrip("\r\n")
+
+
+def parse_line(line: str, line_no: int = 0) -> List[MoxaEvent]:
+    """Classe une ligne : retourne ses événements (liste vide si aucun)."""
+    lower = line.lower()
+    deauth = "deauth" in lower
+    roaming = "roaming" in lower
+    association = not roaming and ("associated with" in lower or "connected to ap" in lower)
+    handoff = _HANDOFF_PATTERN.search(lower) if "handoff" in lower else None
+    auth_failure = "auth" in lower and ("authentication timeout" in lower or "auth failed" in lower
+                                        or "authentication failed" in lower)
+    snr = "snr" in lower
+    wlan_restart = ("wlan" in lower or "wireless" in lower) and (
+        "restart" in lower or "reset" in lower or "link down" in lower or "reinit" in lower)
+    if not (deauth or roaming or association or handoff or auth_failure or snr or wlan_restart):
+        return []
+
+    text = line.strip()
+    # Une adresse MAC contient au moins cinq « : » : évite la recherche sinon
+    macs = _MAC_PATTERN.findall(line) if line.count(":") >= 5 else ()
+    mac = macs[0].lower() if macs else None
+    events = []
+
+    if deauth:
+        events.append(MoxaEvent(DEAUTH, line_no, text, mac))
+    if roaming or association:
+        # « roaming from AP X to AP Y » : l'AP retenu est le dernier cité (la cible)
+        events.append(MoxaEvent(
+            ROAM, line_no, text, macs[-1].lower() if macs else None,
+            previous_mac=macs[0].lower() if len(macs) > 1 else None,
+            success="successful" in lower or "completed" in lower,
+            detail="roaming" if roaming else "association",
+        ))
+    if handoff:
+        events.append(MoxaEvent(HANDOFF, line_no, text, mac, value=int(handoff.group(1))))
+    if auth_failure:
+        events.append(MoxaEvent(AUTH_FAILURE, line_no, text, mac))
+    if snr:
+        value = _SNR_VALUE_PATTERN.search(lower)
+        events.append(MoxaEvent(
+            SNR, line_no, text, mac,
+            value=float(value.group(1)) if value else None,
+            # Même critère que l'analyse historique : un « 0 » ou « drop » dans la ligne
+            detail="drop" if ("0" in line or "drop" in lower) else "",
+        ))
+    if wlan_restart:
+        events.append(MoxaEvent(WLAN_RESTART, line_no, text, mac))
+    return events
+
+
+def iter_events(lines: Iterable[str], first_line: int = 1,
+                timestamps: Optional["TimestampParser"] = None) -> Iterator[MoxaEvent]:
+    """
+    Flux d'événements d'une suite de lignes.
+
+    Si ``timestamps`` est fourni, l'horodatage n'est lu que sur les lignes
+    qui portent un événement.
+    """
+    for line_no, line in enumerate(lines, first_line):
+        events = parse_line(line, line_no)
+        if events and timestamps is not None:
+            stamp = timestamps.parse(line)
+            for event in events:
+                event.timestamp = stamp
+        yield from events
+
+
+class TimestampParser:
+    """
+    Lecture rapide de l'horodatage en tête des lignes de log.
+
+    Le format est détecté sur la première ligne reconnue puis mis en cache :
+    les lignes suivantes ne testent que ce format (une expression ancrée et
+    quelques ``int()``), sans ``strptime``. Un nouveau format n'est recherché
+    que si le format en cache échoue. Utiliser une instance par fichier.
+
+    Formats reconnus :
+        - ISO : ``2025-05-07 10:00:00[.123]`` ou ``2025-05-07T10:00:00``
+        - Moxa : ``2025/05/07 10:00:00``
+        - syslog : ``May  7 10:00:00`` (année fournie, par défaut l'année en cours)
+    Un préfixe ``<pri>`` ou ``[`` est toléré.
+    """
+
+    _PREFIX = r"\s*(?:<\d+>)?\[?"
+    _TIME = r"(\d{1,2}):(\d{2}):(\d{2})(?:[.,](\d{1,6}))?"
+    FORMATS = {
+        "iso": re.compile(_PREFIX + r"(\d{4})-(\d{2})-(\d{2})[T ]" + _TIME),
+        "moxa": re.compile(_PREFIX + r"(\d{4})/(\d{2})/(\d{2})\s+" + _TIME),
+        "syslog": re.compile(_PREFIX + r"([A-Z][a-z]{2})\s+(\d{1,2})\s+" + _TIME),
+    }
+    MONTHS = {name: i for i, name in enumerate(
+        ("Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"), 1)}
+
+    def __init__(self, year: Optional[int] = None):
+        self.year = year or datetime.now().year
+        self.format: Optional[str] = None
+
+    def parse(self, line: str) -> Optional[datetime]:
+        """Horodatage de la ligne, ou None s'il n'est pas reconnu."""
+        if self.format is not None:
+            stamp = self._parse_as(self.format, line)
+            if stamp is not None:
+                return stamp
+        for name in self.FORMATS:
+            if name != self.format:
+                stamp = self._parse_as(name, line)
+                if stamp is not None:
+                    self.format = name
+                    return stamp
+        return None
+
+    def _parse_as(self, name: str, line: str) -> Optional[datetime]:
+        match = self.FORMATS[name].match(line)
+        if match is None:
+            return None
+        if name == "syslog":
+            month_name, day, hour, minute, sec, fraction = match.groups()
+            month = self.MONTHS.get(month_name)
+            if month is None:
+                return None
+            year, day = self.year, int(day)
+        else:
+            year, month, day, hour, minute, sec, fraction = match.groups()
+            year, month, day = int(year), int(month), int(day)
+        micro = int(fraction.ljust(6, "0")) if fraction else 0
+        try:
+            return datetime(year, month, day, int(hour), int(minute), int(sec), micro)
+        except ValueError:
+            return None
+
+
+class MoxaMetricsAccumulator:
+    """
+    Métriques de l'analyse locale, calculées au fil des événements.
+
+    Les accumulateurs de morceaux consécutifs d'un même fichier se combinent
+    avec ``merge()`` : les numéros de ligne sont décalés et le changement
+    d'AP à cheval sur la frontière entre deux morceaux est reconstitué.
+    """
+
+    def __init__(self):
+        self.line_count = 0
+        self.total_roaming_events = 0
+        self.handoff_times: List[int] = []
+        self.authentication_failures = 0
+        self.snr_drops: List[str] = []
+        self.deauth_total = 0
+        self.deauth_per_ap: Dict[str, int] = {}
+        self.ap_changes: List[dict] = []
+        # Premier et dernier roaming portant une adresse MAC (raccord des morceaux)
+        self.first_roam: Optional[Tuple[int, str]] = None
+        self.last_roam: Optional[Tuple[int, str]] = None
+
+    def add(self, event: MoxaEvent) -> None:
+        kind = event.kind
+        if kind == ROAM:
+            self.total_roaming_events += 1
+            if event.mac:
+                self._add_roam(event.line_no, event.mac)
+        elif kind == DEAUTH:
+            self.deauth_total += 1
+            if event.mac:
+                self.deauth_per_ap[event.mac] = self.deauth_per_ap.get(event.mac, 0) + 1
+        elif kind == HANDOFF:
+            self.handoff_times.append(int(event.value))
+        elif kind == AUTH_FAILURE:
+            self.authentication_failures += 1
+        elif kind == SNR and event.detail == "drop":
+            self.snr_drops.append(event.line)
+
+    def _add_roam(self, line_no: int, mac: str) -> None:
+        if self.first_roam is None:
+            self.first_roam = (line_no, mac)
+        if self.last_roam is not None and self.last_roam[1] != mac:
+            self.ap_changes.append({"line": line_no, "previous_ap": self.last_roam[1], "ap": mac})
+        self.last_roam = (line_no, mac)
+
+    def consume(self, events: Iterable[MoxaEvent]) -> "MoxaMetricsAccumulator":
+        for event in events:
+            self.add(event)
+        return self
+
+    def consume_lines(self, lines: Iterable[str]) -> "MoxaMetricsAccumulator":
+        """Analyse des lignes, numérotées à la suite de celles déjà vues."""
+        add = self.add
+        line_no = self.line_count
+        for line_no, line in enumerate(lines, self.line_count + 1):
+            for event in parse_line(line, line_no):
+                add(event)
+        self.line_count = line_no
+        return self
+
+    def merge(self, other: "MoxaMetricsAccumulator") -> "MoxaMetricsAccumulator":
+        """Ajoute les métriques du morceau qui suit immédiatement celui-ci."""
+        offset = self.line_count
+        self.line_count += other.line_count
+        self.total_roaming_events += other.total_roaming_events
+        self.handoff_times.extend(other.handoff_times)
+        self.authentication_failures += other.authentication_failures
+        self.snr_drops.extend(other.snr_drops)
+        self.deauth_total += other.deauth_total
+        for mac, count in other.deauth_per_ap.items():
+            self.deauth_per_ap[mac] = self.deauth_per_ap.get(mac, 0) + count
+
+        if other.first_roam is not None:
+            first_line, first_mac = other.first_roam
+            if self.last_roam is not None and self.last_roam[1] != first_mac:
+                self.ap_changes.append({"line": first_line + offset,
+                                        "previous_ap": self.last_roam[1], "ap": first_mac})
+            if self.first_roam is None:
+                self.first_roam = (first_line + offset, first_mac)
+            self.last_roam = (other.last_roam[0] + offset, other.last_roam[1])
+        self.ap_changes.extend(dict(change, line=change["line"] + offset) for change in other.ap_changes)
+        return self
+
+    def metrics(self) -> dict:
+        """Dictionnaire au format de ``MoxaLogAnalyzer.metrics``."""
+        return {
+            "total_roaming_events": self.total_roaming_events,
+            "successful_roaming": 0,
+            "failed_roaming": 0,
+            "handoff_times": list(self.handoff_times),
+            "ping_pong_events": 0,
+            "authentication_failures": self.authentication_failures,
+            "snr_drops": list(self.snr_drops),
+            "ap_changes": list(self.ap_changes),
+            "deauth_requests": {"total": self.deauth_total, "par_ap": dict(self.deauth_per_ap)},
+            "duration_minutes": 1,
+        }
+
+
+# --- Analyse parallèle d'un fichier ---------------------------------------
+
+# Taille maximale d'un morceau lu d'un bloc par un processus
+MAX_CHUNK_BYTES = 64 * 1024 * 1024
+
+
+def chunk_ranges(path: str, chunks: int, max_chunk_bytes: int = MAX_CHUNK_BYTES) -> List[Tuple[int, int]]:
+    """
+    Découpe un fichier en plages d'octets ``(début, fin)`` alignées sur des
+    débuts de ligne, en au moins ``chunks`` morceaux d'au plus ``max_chunk_bytes``.
+    """
+    size = os.path.getsize(path)
+    if size == 0:
+        return []
+    chunks = max(chunks, -(-size // max_chunk_bytes))
+    step = max(1, -(-size // chunks))
+    ranges = []
+    start = 0
+    with open(path, "rb") as f:
+        while start < size:
+            end = start + step
+            if end < size:
+                # Avancer jusqu'au début de la ligne suivante
+                f.seek(end)
+                f.readline()
+                end = f.tell()
+            end = min(end, size)
+            ranges.append((start, end))
+            start = end
+    return ranges
+
+
+def parse_chunk(path: str, start: int, end: int, encoding: str = "utf-8",
+                factory: Callable[[], Any] = MoxaMetricsAccumulator):
+    """
+    Métriques d'une plage d'octets (numéros de ligne relatifs au morceau).
+
+    ``factory`` crée l'accumulateur : toute classe offrant ``consume_lines``
+    et ``merge`` comme ``MoxaMetricsAccumulator`` (``moxa_rule_engine.MoxaRuleEngine``).
+    """
+    with open(path, "rb") as f:
+        f.seek(start)
+        data = f.read(end - start)
+    if encoding == "utf-8-sig" and start > 0:
+        encoding = "utf-8"
+    text = data.decode(encoding, errors="replace")
+    if text.endswith("\n"):
+        text = text[:-1]
+    accumulator = factory()
+    if text:
+        accumulator.consume_lines(iter_log_lines(text))
+    return accumulator
+
+
+def _parse_chunk_job(job: Tuple[str, int, int, str, Callable[[], Any]]):
+    return parse_chunk(*job)
+
+
+def parse_file_parallel(path: str, workers: Optional[int] = None,
+                        max_chunk_bytes: int = MAX_CHUNK_BYTES,
+                        factory: Callable[[], Any] = MoxaMetricsAccumulator):
+    """
+    Analyse un fichier de log en parallèle sur plusieurs processus.
+
+    Le fichier est découpé aux frontières de ligne, chaque morceau est analysé
+    dans un ``ProcessPoolExecutor`` et les accumulateurs sont fusionnés dans
+    l'ordre du fichier : le résultat est identique à une lecture séquentielle.
+
+    Args:
+        path: chemin du fichier de log
+        workers: nombre de processus (par défaut, le nombre de cœurs)
+        max_chunk_bytes: taille maximale d'un morceau
+        factory: classe d'accumulateur (importable par les processus)
+    """
+    workers = workers or os.cpu_count() or 1
+    encoding = detect_encoding(path)
+    if encoding == "utf-16" or workers == 1:
+        # Les fins de ligne UTF-16 ne se repèrent pas octet par octet
+        return factory().consume_lines(iter_file_lines(path, encoding))
+
+    # Plusieurs morceaux par processus pour équilibrer la charge
+    ranges = chunk_ranges(path, workers * 4, max_chunk_bytes)
+    result = factory()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        jobs = [(path, start, end, encoding, factory) for start, end in ranges]
+        for partial in pool.map(_parse_chunk_job, jobs):
+            result.merge(partial)
+    return result
@@ -3,7 +3,70 @@
 import os
 import json
 import requests
-from datetime import datetime, timedelta
+from datetime import timedelta
+
+from moxa_log_parser import ROAM, TimestampParser, iter_events, iter_log_lines, parse_line
+
+# Retour vers l'AP précédent en moins de 30 s : effet ping-pong
+PING_PONG_WINDOW = timedelta(seconds=30)
+
+
+def detect_ping_pong(roams, window=PING_PONG_WINDOW):
+    """
+    Détecte les allers-retours rapides entre deux points d'accès.
+
+    Un ping-pong est un passage A → B suivi du retour B → A en moins de
+    ``window``. Un seul passage sur les événements (temps linéaire) : seul le
+    dernier changement d'AP est conservé. Les événements sans horodatage ou
+    sans AP sont ignorés.
+
+    Args:
+        roams: itérable de ``(timestamp, ap, ap_precedent)`` dans l'ordre du
+            log ; ``ap_precedent`` (ou None) est l'AP de départ annoncé
+        window: délai maximal entre l'aller et le retour
+
+    Returns:
+        list: une entrée par paire d'AP (la plus touchée d'abord) avec le
+        nombre de ping-pongs, l'intervalle minimal (s) et les plages horaires
+    """
+    pairs = {}
+    current_ap = None
+    last_change = None  # (timestamp, ap_depart, ap_arrivee)
+
+    for timestamp, ap, origin in roams:
+        if timestamp is None or not ap:
+            continue
+        if origin and origin != current_ap:
+            # AP de départ annoncé par la ligne : il fait foi
+            current_ap = origin
+        if current_ap is not None and ap != current_ap:
+            if last_change is not None:
+                changed_at, origin, target = last_change
+                interval = timestamp - changed_at
+                if origin == ap and target == current_ap and timedelta(0) <= interval <= window:
+                    key = tuple(sorted((origin, target)))
+                    pair = pairs.get(key)
+                    if pair is None:
+                        pair = pairs[key] = {"ap_a": key[0], "ap_b": key[1], "count": 0,
+                                             "min_interval_s": None, "ranges": []}
+                    pair["count"] += 1
+                    seconds = interval.total_seconds()
+                    if pair["min_interval_s"] is None or seconds < pair["min_interval_s"]:
+                        pair["min_interval_s"] = seconds
+                    ranges = pair["ranges"]
+                    # Les ping-pongs qui s'enchaînent forment une seule plage
+                    if ranges and ranges[-1][1] >= changed_at:
+                        ranges[-1][1] = timestamp
+                    else:
+                        ranges.append([changed_at, timestamp])
+            last_change = (timestamp, current_ap, ap)
+        current_ap = ap
+
+    result = []
+    for pair in sorted(pairs.values(), key=lambda p: -p["count"]):
+        pair["ranges"] = [{"start": start.isoformat(), "end": end.isoformat()} for start, end in pair["ranges"]]
+        result.append(pair)
+    return result
 
 class MoxaRoamingAnalyzer:
     """
@@ -14,6 +77,7 @@ class MoxaRoamingAnalyzer:
 
     def __init__(self):
         self.roaming_events = []
+        self._timestamps = TimestampParser()
         self.current_metrics = {
             "total_events": 0,
             "successful": 0,
@@ -34,12 +98,32 @@ class MoxaRoamingAnalyzer:
         Returns:
             dict: Résultats de l'analyse avec métriques et recommandations
         """
+        return self._analyze(lambda: self._parse_logs(logs), config)
+
+    def analyze_store(self, store, start=None, end=None, ap=None, config=None):
+        """
+        Analyse les événements de roaming déjà enregistrés dans un ``MoxaEventStore``.
+
+        Args:
+            store (MoxaEventStore): Base d'événements Moxa
+            start, end (datetime, optional): Plage horaire analysée
+            ap (str, optional): Limiter aux roamings vers cet AP
+            config (dict, optional): Configuration actuelle du Moxa
+
+        Returns:
+            dict: Résultats de l'analyse avec métriques et recommandations
+        """
+        return self._analyze(
+            lambda: self._collect_roams(store.events(start, end, ap, kinds=[ROAM])), config
+        )
+
+    def _analyze(self, collect, config):
         try:
             # Réinitialiser les métriques
             self._reset_metrics()
 
             # Analyser les logs
-            self._parse_logs(logs)
+            collect()
 
             # Calculer les métriques
             self._calculate_metrics()
@@ -77,13 +161,23 @@ class MoxaRoamingAnalyzer:
         Parse les logs pour extraire les événements de roaming.
 
         Args:
-            logs (str): Les logs à analyser
+            logs (str | Iterable[str]): Les logs à analyser (texte ou lignes)
         """
-        for line in logs.split('\n'):
-            if "roaming" in line.lower():
-                event = self._parse_roaming_event(line)
-                if event:
-                    self.roaming_events.append(event)
+        # Un analyseur d'horodatage par log : le format détecté est mis en cache
+        self._timestamps = TimestampParser()
+        self._collect_roams(iter_events(iter_log_lines(logs), timestamps=self._timestamps))
+
+    def _collect_roams(self, events):
+        """Retient les événements de roaming d'un flux d'événements ``MoxaEvent``."""
+        for event in events:
+            if event.kind == ROAM and event.detail == "roaming":
+                self.roaming_events.append({
+                    "timestamp": event.timestamp,
+                    "ap": event.mac,
+                    "previous_ap": event.previous_mac,
+                    "success": event.success,
+                    "line": event.line
+                })
 
     def _parse_roaming_event(self, line):
         """
@@ -95,18 +189,16 @@ class MoxaRoamingAnalyzer:
         Returns:
             dict: Les informations de l'événement de roaming
         """
-        try:
-            # Exemple basique de parsing, à adapter selon le format réel des logs
-            timestamp = self._extract_timestamp(line)
-            success = "successful" in line.lower() or "completed" in line.lower()
-
-            return {
-                "timestamp": timestamp,
-                "success": success,
-                "line": line.strip()
-            }
-        except:
-            return None
+        for event in parse_line(line):
+            if event.kind == ROAM:
+                return {
+                    "timestamp": self._extract_timestamp(line),
+                    "ap": event.mac,
+                    "previous_ap": event.previous_mac,
+                    "success": event.success,
+                    "line": event.line
+                }
+        return None
 
     def _extract_timestamp(self, line):
         """
@@ -116,10 +208,9 @@ class MoxaRoamingAnalyzer:
             line (str): La ligne de log
 
         Returns:
-            datetime: Le timestamp extrait
+            datetime | None: Le timestamp extrait, None s'il n'est pas reconnu
         """
-        # À implémenter selon le format réel des logs
-        return datetime.now()
+        return self._timestamps.parse(line)
 
     def _calculate_metrics(self):
         """Calcule les métriques basées sur les événements de roaming collectés."""
@@ -140,21 +231,19 @@ class MoxaRoamingAnalyzer:
         """
         Détecte les événements de ping-pong dans les événements de roaming.
 
+        Le détail par paire d'AP est placé dans ``current_metrics["ping_pong"]``.
+
         Returns:
             int: Nombre d'événements ping-pong détectés
         """
-        ping_pong_count = 0
-        last_timestamp = None
-        PING_PONG_THRESHOLD = timedelta(seconds=30)  # Seuil configurable
-
-        for event in self.roaming_events:
-            if last_timestamp:
-                time_diff = event["timestamp"] - last_timestamp
-                if time_diff < PING_PONG_THRESHOLD:
-                    ping_pong_count += 1
-            last_timestamp = event["timestamp"]
-
-        return ping_pong_count
+        pairs = detect_ping_pong(
+            (e["timestamp"], e["ap"], e["previous_ap"]) for e in self.roaming_events
+        )
+        self.current_metrics["ping_pong"] = {
+            "window_seconds": PING_PONG_WINDOW.total_seconds(),
+            "pairs": pairs,
+        }
+        return sum(pair["count"] for pair in pairs)
 
     def _generate_recommendations(self, config):
         """
@@ -0,0 +1,611 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Moteur de règles local pour l'analyse des logs Moxa.
+
+Tout ce que le prompt de ``MoxaLogAnalyzer`` demande à OpenAI (ping-pong,
+SNR, timeouts d'authentification, distribution des handoff,
+désauthentifications, stabilité WLAN, AP problématiques, suggestions de
+configuration) se calcule à partir du flux d'événements de
+``moxa_log_parser``, en un seul passage. Le rapport produit suit le même
+schéma JSON que la réponse d'OpenAI : l'appel à l'API devient un
+enrichissement facultatif (recommandations et commentaire rédigés) et non
+plus le chemin critique de l'analyse.
+
+Les règles sont déterministes : les mêmes logs et la même configuration
+donnent toujours le même rapport.
+"""
+import re
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from moxa_log_parser import (AUTH_FAILURE, DEAUTH, HANDOFF, ROAM, SNR, WLAN_RESTART, MoxaEvent,
+                             MoxaMetricsAccumulator, TimestampParser, parse_line)
+from moxa_roaming_analyzer import PING_PONG_WINDOW, detect_ping_pong
+
+# Seuils des règles (alignés sur les critères d'invalidité du prompt)
+SNR_LOW_DB = 10
+SLOW_HANDOFF_MS = 200
+MAX_HANDOFF_MS = 500
+MAX_PING_PONG = 10
+MAX_AUTH_TIMEOUTS = 5
+MAX_SNR_ZERO_APS = 3
+MAX_EPISODES = 20
+
+# Tranches de la distribution des temps de handoff (ms, bornes incluses)
+HANDOFF_BUCKETS = ((0, 50), (51, 100), (101, 200), (201, 500))
+
+_DURATION_PATTERN = re.compile(r"(\d+)\s*ms")
+
+
+@dataclass
+class ApStats:
+    """Compteurs d'un point d'accès."""
+    roams_in: int = 0
+    successful_roams: int = 0
+    failed_roams: int = 0
+    handoff_total: int = 0
+    handoff_count: int = 0
+    slow_handoffs: int = 0
+    snr_total: float = 0.0
+    snr_count: int = 0
+    snr_zero: int = 0
+    snr_low: int = 0
+    deauths: int = 0
+    auth_failures: int = 0
+    wlan_restarts: int = 0
+
+    def merge(self, other: "ApStats") -> None:
+        for name in self.__dataclass_fields__:
+            setattr(self, name, getattr(self, name) + getattr(other, name))
+
+
+@dataclass
+class _Findings:
+    aps: Dict[str, ApStats] = field(default_factory=dict)
+    roams: List[tuple] = field(default_factory=list)
+    successful_roams: int = 0
+    failed_roams: int = 0
+    snr_episodes: List[dict] = field(default_factory=list)
+    snr_low_total: int = 0
+    auth_causes: Counter = field(default_factory=Counter)
+    auth_durations: List[int] = field(default_factory=list)
+    wlan_restarts: int = 0
+    restart_causes: Counter = field(default_factory=Counter)
+
+
+def performance_score(metrics: dict) -> int:
+    """
+    Score de performance de 0 à 100 à partir des métriques au format
+    ``MoxaLogAnalyzer.metrics`` (100 = performance optimale).
+    """
+    if not metrics["handoff_times"]:
+        return 50  # Score neutre si pas de données
+
+    # Score de base
+    base_score = 100
+
+    # Pénalités pour les temps de handoff élevés
+    avg_handoff = sum(metrics["handoff_times"]) / len(metrics["handoff_times"])
+    if avg_handoff > 100:
+        base_score -= (avg_handoff - 100) * 0.5  # Pénalité progressive
+
+    # Pénalités pour les ping-pong
+    ping_pong_penalty = metrics["ping_pong_events"] * 10
+    base_score -= min(30, ping_pong_penalty)  # Maximum 30 points de pénalité
+
+    # Pénalités pour les chutes de SNR
+    snr_drops_penalty = len(metrics["snr_drops"]) * 5
+    base_score -= min(20, snr_drops_penalty)  # Maximum 20 points de pénalité
+
+    # Pénalités pour les échecs d'authentification
+    auth_penalty = metrics["authentication_failures"] * 3
+    base_score -= min(15, auth_penalty)  # Maximum 15 points de pénalité
+
+    # Pénalités pour la fréquence de roaming excessive
+    if metrics["total_roaming_events"] > 10:
+        freq_penalty = (metrics["total_roaming_events"] - 10) * 2
+        base_score -= min(15, freq_penalty)
+
+    # Assurer que le score reste dans la fourchette 0-100
+    return max(0, min(100, round(base_score)))
+
+
+class MoxaRuleEngine:
+    """
+    Analyse locale complète, calculée au fil des événements.
+
+    S'utilise comme ``MoxaMetricsAccumulator`` (``add``, ``consume``,
+    ``consume_lines``, ``merge``), y compris dans ``parse_file_parallel`` ;
+    ``report()`` produit ensuite le rapport au schéma de ``analyze_logs``.
+    Les événements sans AP sont attribués au dernier AP de roaming connu.
+    """
+
+    def __init__(self, year: Optional[int] = None):
+        self.base = MoxaMetricsAccumulator()
+        self.timestamps = TimestampParser(year)
+        self.findings = _Findings()
+        self.current_ap: Optional[str] = None
+        # Événements sans AP vus avant le premier roaming : attribués au
+        # dernier AP du morceau précédent lors du merge()
+        self.pending = ApStats()
+
+    @property
+    def line_count(self) -> int:
+        return self.base.line_count
+
+    def _ap(self, mac: Optional[str]) -> ApStats:
+        mac = mac or self.current_ap
+        if mac is None:
+            return self.pending
+        stats = self.findings.aps.get(mac)
+        if stats is None:
+            stats = self.findings.aps[mac] = ApStats()
+        return stats
+
+    def add(self, event: MoxaEvent) -> None:
+        self.base.add(event)
+        findings = self.findings
+        kind = event.kind
+        if kind == ROAM:
+            failed = not event.success and "fail" in event.line.lower()
+            if event.success:
+                findings.successful_roams += 1
+            elif failed:
+                findings.failed_roams += 1
+            if event.mac:
+                self.current_ap = event.mac
+                stats = self._ap(event.mac)
+                stats.roams_in += 1
+                stats.successful_roams += event.success
+                stats.failed_roams += failed
+                findings.roams.append((event.timestamp, event.mac, event.previous_mac))
+        elif kind == HANDOFF:
+            # Le handoff est celui du roaming de la même ligne (ou du dernier)
+            stats = self._ap(self.current_ap or event.mac)
+            stats.handoff_total += int(event.value)
+            stats.handoff_count += 1
+            stats.slow_handoffs += event.value > SLOW_HANDOFF_MS
+        elif kind == SNR:
+            stats = self._ap(event.mac)
+            value = event.value
+            if value is not None:
+                stats.snr_total += value
+                stats.snr_count += 1
+            if value is not None and value < SNR_LOW_DB:
+                findings.snr_low_total += 1
+                stats.snr_low += 1
+                stats.snr_zero += value == 0
+                if len(findings.snr_episodes) < MAX_EPISODES:
+                    findings.snr_episodes.append({
+                        "ap": event.mac or self.current_ap,
+                        "snr": int(value),
+                        "timestamp": event.timestamp.strftime("%H:%M:%S") if event.timestamp else None,
+                    })
+        elif kind == DEAUTH:
+            self._ap(event.mac).deauths += 1
+        elif kind == AUTH_FAILURE:
+            self._ap(event.mac).auth_failures += 1
+            lower = event.line.lower()
+            findings.auth_causes["timeout" if "timeout" in lower else "echec_auth"] += 1
+            duration = _DURATION_PATTERN.search(lower)
+            if duration:
+                findings.auth_durations.append(int(duration.group(1)))
+        elif kind == WLAN_RESTART:
+            findings.wlan_restarts += 1
+            self._ap(event.mac).wlan_restarts += 1
+            lower = event.line.lower()
+            if "beacon" in lower:
+                cause = "perte_beacon"
+            elif "inactiv" in lower or "idle" in lower:
+                cause = "inactivite"
+            elif "watchdog" in lower or "overload" in lower or "surcharge" in lower:
+                cause = "surcharge"
+            else:
+                cause = "inconnue"
+            findings.restart_causes[cause] += 1
+
+    def consume(self, events: Iterable[MoxaEvent]) -> "MoxaRuleEngine":
+        for event in events:
+            self.add(event)
+        return self
+
+    def consume_lines(self, lines: Iterable[str]) -> "MoxaRuleEngine":
+        """Analyse des lignes, numérotées à la suite de celles déjà vues."""
+        add = self.add
+        parse_timestamp = self.timestamps.parse
+        line_no = self.base.line_count
+        for line_no, line in enumerate(lines, self.base.line_count + 1):
+            events = parse_line(line, line_no)
+            if events:
+                # Horodatage lu uniquement sur les lignes porteuses d'événements
+                stamp = parse_timestamp(line)
+                for event in events:
+                    event.timestamp = stamp
+                    add(event)
+        self.base.line_count = line_no
+        return self
+
+    def merge(self, other: "MoxaRuleEngine") -> "MoxaRuleEngine":
+        """Ajoute les constats du morceau qui suit immédiatement celui-ci."""
+        self.base.merge(other.base)
+        mine, theirs = self.findings, other.findings
+        self._ap(None).merge(other.pending)
+        for mac, stats in theirs.aps.items():
+            if mac in mine.aps:
+                mine.aps[mac].merge(stats)
+            else:
+                mine.aps[mac] = stats
+        mine.roams.extend(theirs.roams)
+        mine.successful_roams += theirs.successful_roams
+        mine.failed_roams += theirs.failed_roams
+        mine.snr_episodes.extend(theirs.snr_episodes[:MAX_EPISODES - len(mine.snr_episodes)])
+        mine.snr_low_total += theirs.snr_low_total
+        mine.auth_causes.update(theirs.auth_causes)
+        mine.auth_durations.extend(theirs.auth_durations)
+        mine.wlan_restarts += theirs.wlan_restarts
+        mine.restart_causes.update(theirs.restart_causes)
+        if other.current_ap is not None:
+            self.current_ap = other.current_ap
+        return self
+
+    # --- Rapport --------------------------------------------------------------
+
+    def metrics(self, ping_pairs: Optional[List[dict]] = None) -> dict:
+        """Métriques au format de ``MoxaLogAnalyzer.metrics``, ping-pong et issue des roamings compris."""
+        if ping_pairs is None:
+            ping_pairs = detect_ping_pong(self.findings.roams, PING_PONG_WINDOW)
+        metrics = self.base.metrics()
+        metrics["successful_roaming"] = self.findings.successful_roams
+        metrics["failed_roaming"] = self.findings.failed_roams
+        metrics["ping_pong_events"] = sum(p["count"] for p in ping_pairs)
+        return metrics
+
+    def report(self, config: Optional[dict] = None) -> dict:
+        """Rapport complet au schéma de ``MoxaLogAnalyzer.analyze_logs``."""
+        config = config or {}
+        findings = self.findings
+        ping_pairs = detect_ping_pong(findings.roams, PING_PONG_WINDOW)
+        metrics = self.metrics(ping_pairs)
+        handoffs = metrics["handoff_times"]
+        ping_count = metrics["ping_pong_events"]
+        auth_count = metrics["authentication_failures"]
+        snr_zero_aps = {mac: s.snr_zero for mac, s in findings.aps.items() if s.snr_zero}
+
+        score = performance_score(metrics)
+        invalid = self._invalidity(handoffs, ping_count, auth_count, snr_zero_aps)
+        if invalid and score == 0:
+            invalid.insert(0, "Score nul")
+        suggestions, justifications = self._suggestions(config, ping_count, auth_count, handoffs)
+        recommendations = self._recommendations(metrics, ping_pairs, snr_zero_aps, suggestions)
+
+        report = {
+            "adapte_flotte_AMR": score > 70 and not invalid,
+            "score_global": score,
+            "analyse_detaillee": {
+                "ping_pong": {
+                    "detecte": ping_count > 0,
+                    "occurrences": [f"{p['ap_a']}-{p['ap_b']}: {p['count']} fois en "
+                                    f"{p['min_interval_s']:g} sec minimum" for p in ping_pairs],
+                    "gravite": min(10, ping_count * 2),
+                    "details": {
+                        "temps_min_entre_roaming": (f"{min(p['min_interval_s'] for p in ping_pairs):g} sec"
+                                                    if ping_pairs else "N/A"),
+                        "paires_ap_affectees": [f"{p['ap_a']}-{p['ap_b']}" for p in ping_pairs],
+                        "plages": [r for p in ping_pairs for r in p["ranges"]][:MAX_EPISODES],
+                    },
+                },
+                "problemes_snr": {
+                    "aps_snr_zero": [f"{mac}: {count} occurrences" for mac, count in
+                                     sorted(snr_zero_aps.items(), key=lambda item: -item[1])],
+                    "seuil_roaming_inadapte": findings.snr_low_total > 3,
+                    "details": {
+                        "seuil_actuel": (f"{config['roaming_difference']} dB"
+                                         if config.get("roaming_difference") is not None else "N/A"),
+                        "seuil_recommande": f"{suggestions['roaming_difference']} dB",
+                        "episodes_critiques": list(findings.snr_episodes),
+                    },
+                },
+                "timeouts_auth": {
+                    "nombre": auth_count,
+                    "temps_moyen_ms": (round(sum(findings.auth_durations) / len(findings.auth_durations))
+                                       if findings.auth_durations else 0),
+                    "details": {
+                        "causes_principales": [cause for cause, _ in findings.auth_causes.most_common()],
+                        "aps_concernes": [f"{mac}: {s.auth_failures} fois" for mac, s in
+                                          sorted(findings.aps.items(), key=lambda item: -item[1].auth_failures)
+                                          if s.auth_failures],
+                    },
+                },
+                "handoff": self._handoff_section(handoffs),
+                "stabilite_wlan": {
+                    "redemarrages": findings.wlan_restarts,
+                    "causes": [cause for cause, _ in findings.restart_causes.most_common()],
+                    "impact": (f"{findings.wlan_restarts} redémarrage(s) de l'interface WLAN : "
+                               "coupure de connexion des AMR pendant chaque redémarrage"
+                               if findings.wlan_restarts else "Aucun redémarrage détecté"),
+                },
+                "deauth_requests": metrics["deauth_requests"],
+            },
+            "parametres_actuels": self._current_parameters(config, ping_count, auth_count, handoffs),
+            "recommandations": recommendations,
+            "details_configuration": {
+                "suggestions": suggestions,
+                "justifications": justifications,
+            },
+            "problematic_aps": self._problematic_aps(ping_pairs),
+            "analysis": self._summary_text(metrics, ping_pairs, snr_zero_aps, invalid, score),
+            "criteres_invalidite": invalid,
+            "config_changes": self._config_changes(config, metrics, suggestions),
+            "source": "local",
+        }
+        return report
+
+    @staticmethod
+    def _invalidity(handoffs, ping_count, auth_count, snr_zero_aps) -> List[str]:
+        invalid = []
+        if handoffs and max(handoffs) > MAX_HANDOFF_MS:
+            invalid.append(f"Temps de handoff > {MAX_HANDOFF_MS} ms ({max(handoffs)} ms)")
+        if ping_count > MAX_PING_PONG:
+            invalid.append(f"Plus de {MAX_PING_PONG} événements ping-pong ({ping_count})")
+        if auth_count > MAX_AUTH_TIMEOUTS:
+            invalid.append(f"Plus de {MAX_AUTH_TIMEOUTS} timeouts d'authentification ({auth_count})")
+        if len(snr_zero_aps) > MAX_SNR_ZERO_APS:
+            invalid.append(f"SNR = 0 sur plus de {MAX_SNR_ZERO_APS} AP ({len(snr_zero_aps)})")
+        return invalid
+
+    def _handoff_section(self, handoffs: List[int]) -> dict:
+        distribution = Counter()
+        for value in handoffs:
+            for low, high in HANDOFF_BUCKETS:
+                if value <= high:
+                    distribution[f"{low}-{high}ms"] += 1
+                    break
+            else:
+                distribution[f">{HANDOFF_BUCKETS[-1][1]}ms"] += 1
+        labels = [f"{low}-{high}ms" for low, high in HANDOFF_BUCKETS] + [f">{HANDOFF_BUCKETS[-1][1]}ms"]
+        return {
+            "min_ms": min(handoffs) if handoffs else 0,
+            "max_ms": max(handoffs) if handoffs else 0,
+            "moyen_ms": round(sum(handoffs) / len(handoffs)) if handoffs else 0,
+            "distribution": [f"{label}: {distribution[label]}" for label in labels if distribution[label]],
+            "details": {
+                "performances_par_ap": [
+                    {"ap": mac, "temps_moyen": round(s.handoff_total / s.handoff_count),
+                     "succes": s.successful_roams}
+                    for mac, s in sorted(self.findings.aps.items()) if s.handoff_count
+                ],
+            },
+        }
+
+    def _suggestions(self, config, ping_count, auth_count, handoffs) -> Tuple[dict, List[str]]:
+        """Valeurs de configuration suggérées et leurs justifications."""
+        justifications = []
+        low_snr = self.findings.snr_low_total
+
+        difference = config.get("roaming_difference")
+        if ping_count:
+            base = difference if difference is not None else 8
+            suggested_difference = max(base, min(12, base + 3))
+            justifications.append(f"{ping_count} ping-pong(s) entre AP : une différence de roaming plus "
+                                  "élevée stabilise l'association")
+        elif low_snr > 3:
+            base = difference if difference is not None else 8
+            suggested_difference = max(5, base - 2)
+            justifications.append(f"Le SNR passe {low_snr} fois sous {SNR_LOW_DB} dB : déclencher le "
+                                  "roaming plus tôt")
+        else:
+            suggested_difference = difference if difference is not None else 8
+
+        timeout = config.get("auth_timeout")
+        if auth_count:
+            suggested_timeout = min(30, max(10, (timeout or 5) + 5))
+            justifications.append(f"{auth_count} échec(s) d'authentification : allonger le délai "
+                                  "d'authentification")
+        else:
+            suggested_timeout = timeout if timeout is not None else 10
+
+        rate = config.get("min_transmission_rate")
+        if (low_snr or (handoffs and max(handoffs) > SLOW_HANDOFF_MS)) and (rate is None or rate < 12):
+            suggested_rate = 12
+            justifications.append("Un débit minimal de 12 Mb/s évite de rester associé à un AP au "
+                                  "signal dégradé")
+        else:
+            suggested_rate = rate if rate is not None else 12
+
+        if not justifications:
+            justifications.append("Aucun problème majeur détecté : configuration actuelle conservée")
+        return {
+            "min_transmission_rate": suggested_rate,
+            "roaming_difference": suggested_difference,
+            "auth_timeout": suggested_timeout,
+        }, justifications
+
+    def _current_parameters(self, config, ping_count, auth_count, handoffs) -> dict:
+        low_snr = self.findings.snr_low_total
+        difference = config.get("roaming_difference")
+        return {
+            "turbo_roaming_correct": bool(config.get("turbo_roaming")) or not handoffs or max(handoffs) < 100,
+            "roaming_mechanism_correct": config.get("roaming_mechanism") == "snr" or low_snr == 0,
+            "roaming_difference_correct": (not ping_count and low_snr <= 3
+                                           and (difference is None or 5 <= difference <= 10)),
+            "auth_timeout_correct": auth_count == 0,
+        }
+
+    def _recommendations(self, metrics, ping_pairs, snr_zero_aps, suggestions) -> List[dict]:
+        recommendations = []
+        findings = self.findings
+        handoffs = metrics["handoff_times"]
+        if ping_pairs:
+            recommendations.append({
+                "probleme": f"Effet ping-pong entre {len(ping_pairs)} paire(s) d'AP "
+                            f"({metrics['ping_pong_events']} allers-retours < {PING_PONG_WINDOW.seconds} s)",
+                "solution": "Augmenter la différence de signal requise pour le roaming",
+                "priorite": 1,
+                "parametres": {"roaming_difference": suggestions["roaming_difference"]},
+            })
+        if metrics["authentication_failures"]:
+            recommendations.append({
+                "probleme": f"{metrics['authentication_failures']} échec(s) ou timeout(s) d'authentification",
+                "solution": "Vérifier la configuration de sécurité (RADIUS, clés) et allonger le délai "
+                            "d'authentification",
+                "priorite": 1,
+                "parametres": {"auth_timeout": suggestions["auth_timeout"], "turbo_roaming": "Activer"},
+            })
+        if snr_zero_aps or findings.snr_low_total:
+            recommendations.append({
+                "probleme": f"SNR inférieur à {SNR_LOW_DB} dB ({findings.snr_low_total} fois, "
+                            f"SNR nul sur {len(snr_zero_aps)} AP)",
+                "solution": "Revoir l'implantation et la puissance des AP concernés",
+                "priorite": 1 if snr_zero_aps else 2,
+                "parametres": {"min_transmission_rate": suggestions["min_transmission_rate"]},
+            })
+        if handoffs and max(handoffs) > SLOW_HANDOFF_MS:
+            recommendations.append({
+                "probleme": f"Temps de handoff élevés (max {max(handoffs)} ms)",
+                "solution": "Activer le Turbo Roaming et réduire les seuils RTS/fragmentation",
+                "priorite": 1 if max(handoffs) > MAX_HANDOFF_MS else 2,
+                "parametres": {"turbo_roaming": "Activer"},
+            })
+        if metrics["deauth_requests"]["total"] > 3:
+            recommendations.append({
+                "probleme": f"Nombre élevé de désauthentifications ({metrics['deauth_requests']['total']})",
+                "solution": "Analyser les causes possibles (interférences, configuration de sécurité) "
+                            "sur les AP concernés",
+                "priorite": 2,
+                "parametres": {},
+            })
+        if metrics["failed_roaming"]:
+            recommendations.append({
+                "probleme": f"{metrics['failed_roaming']} roaming(s) en échec",
+                "solution": "Vérifier la couverture entre AP voisins et la cohérence des SSID/sécurité",
+                "priorite": 2,
+                "parametres": {},
+            })
+        if findings.wlan_restarts:
+            recommendations.append({
+                "probleme": f"{findings.wlan_restarts} redémarrage(s) de l'interface WLAN",
+                "solution": "Mettre à jour le firmware et vérifier l'alimentation du client Moxa",
+                "priorite": 2,
+                "parametres": {},
+            })
+        return sorted(recommendations, key=lambda r: r["priorite"])
+
+    def _problematic_aps(self, ping_pairs) -> List[dict]:
+        ping_by_ap = Counter()
+        for pair in ping_pairs:
+            ping_by_ap[pair["ap_a"]] += pair["count"]
+            ping_by_ap[pair["ap_b"]] += pair["count"]
+        result = []
+        for mac, s in self.findings.aps.items():
+            issues = []
+            if ping_by_ap[mac]:
+                issues.append(f"Ping-pong ({ping_by_ap[mac]})")
+            if s.snr_zero:
+                issues.append(f"SNR nul ({s.snr_zero})")
+            if s.snr_low > s.snr_zero:
+                issues.append(f"SNR < {SNR_LOW_DB} dB ({s.snr_low - s.snr_zero})")
+            if s.deauths:
+                issues.append(f"Désauthentifications ({s.deauths})")
+            if s.auth_failures:
+                issues.append(f"Échecs d'authentification ({s.auth_failures})")
+            if s.failed_roams:
+                issues.append(f"Roamings en échec ({s.failed_roams})")
+            if s.slow_handoffs:
+                issues.append(f"Handoff > {SLOW_HANDOFF_MS} ms ({s.slow_handoffs})")
+            if s.wlan_restarts:
+                issues.append(f"Redémarrages WLAN ({s.wlan_restarts})")
+            if issues:
+                result.append({
+                    "ap_mac": mac,
+                    "issues": issues,
+                    "occurrences": (ping_by_ap[mac] + s.snr_low + s.deauths + s.auth_failures
+                                    + s.failed_roams + s.slow_handoffs + s.wlan_restarts),
+                    "avg_snr": round(s.snr_total / s.snr_count, 1) if s.snr_count else None,
+                })
+        result.sort(key=lambda ap: (-ap["occurrences"], ap["ap_mac"]))
+        return result[:MAX_EPISODES]
+
+    def _summary_text(self, metrics, ping_pairs, snr_zero_aps, invalid, score) -> str:
+        handoffs = metrics["handoff_times"]
+        parts = [f"Analyse locale : {metrics['total_roaming_events']} roaming(s), score {score}/100."]
+        if handoffs:
+            parts.append(f"Handoff moyen {round(sum(handoffs) / len(handoffs))} ms "
+                         f"(min {min(handoffs)}, max {max(handoffs)}).")
+        if ping_pairs:
+            worst = ping_pairs[0]
+            parts.append(f"Ping-pong détecté sur {len(ping_pairs)} paire(s) d'AP, surtout "
+                         f"{worst['ap_a']}-{worst['ap_b']} ({worst['count']} fois).")
+        if snr_zero_aps:
+            parts.append(f"SNR nul observé sur {len(snr_zero_aps)} AP.")
+        if metrics["authentication_failures"]:
+            parts.append(f"{metrics['authentication_failures']} échec(s) d'authentification.")
+        if metrics["deauth_requests"]["total"]:
+            parts.append(f"{metrics['deauth_requests']['total']} désauthentification(s).")
+        if invalid:
+            parts.append("Réseau non adapté à une flotte d'AMR : " + " ; ".join(invalid) + ".")
+        return " ".join(parts)
+
+    @staticmethod
+    def _config_changes(config, metrics, suggestions) -> List[dict]:
+        """Changements de configuration proposés (paramètre, valeur actuelle, suggestion, raison)."""
+        changes = []
+        # Échecs d'authentification : augmenter la puissance d'émission
+        if metrics["authentication_failures"] > 0:
+            changes.append({
+                "param": "max_transmission_power",
+                "current": config.get("max_transmission_power", 10),
+                "suggested": 20,
+                "reason": "Authentication failures detected"
+            })
+        # Temps de handoff élevés : ajuster le seuil RTS
+        if metrics["handoff_times"] and max(metrics["handoff_times"]) > 150:
+            changes.append({
+                "param": "rts_threshold",
+                "current": config.get("rts_threshold", 2346),
+                "suggested": 1500,
+                "reason": "High handoff times detected"
+            })
+        # Roaming fréquent : ajuster le seuil de fragmentation
+        if metrics["total_roaming_events"] > 3:
+            changes.append({
+                "param": "fragmentation_threshold",
+                "current": config.get("fragmentation_threshold", 2346),
+                "suggested": 1500,
+                "reason": "Frequent roaming events detected"
+            })
+        for param, suggested in suggestions.items():
+            current = config.get(param)
+            if current is not None and current != suggested:
+                changes.append({"param": param, "current": current, "suggested": suggested,
+                                "reason": "Suggestion du moteur de règles"})
+        return changes
+
+
+def enrich_with_ai(report: dict, ai_result: dict) -> dict:
+    """
+    Complète un rapport local avec une réponse d'OpenAI au même schéma.
+
+    Les sections calculées localement (métriques, ping-pong, SNR, AP
+    problématiques, suggestions) sont conservées : elles portent sur tout le
+    log. OpenAI ajoute ses recommandations, ses justifications et son
+    commentaire ; sa réponse complète reste disponible sous ``analyse_ia``.
+    """
+    result = dict(report)
+    known = {r.get("probleme") for r in report["recommandations"]}
+    extra = [r for r in ai_result.get("recommandations", [])
+             if isinstance(r, dict) and r.get("probleme") not in known]
+    result["recommandations"] = report["recommandations"] + extra
+    details = dict(report["details_configuration"])
+    ai_justifications = (ai_result.get("details_configuration") or {}).get("justifications", [])
+    details["justifications"] = details["justifications"] + [
+        j for j in ai_justifications if j not in details["justifications"]]
+    result["details_configuration"] = details
+    if ai_result.get("analysis"):
+        result["analysis"] = f"{report['analysis']}\n\n{ai_result['analysis']}"
+    if "map_reduce" in ai_result:
+        result["map_reduce"] = ai_result["map_reduce"]
+    result["analyse_ia"] = ai_result
+    result["source"] = "local+ia"
+    return result
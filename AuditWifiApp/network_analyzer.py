@@ -2,13 +2,14 @@
 # -*- coding: utf-8 -*-
 import os
 import json
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Union
 from datetime import datetime
 import logging
 
 from wifi.wifi_analyzer import WifiAnalyzer, WifiAnalysis
 from wifi.wifi_collector import WifiCollector, WifiSample
-from moxa_log_analyzer import MoxaLogAnalyzer
+from wifi.sample_store import SampleStore
+from moxa_log_parser import iter_log_lines
 
 class NetworkAnalyzer:
     """
@@ -18,14 +19,20 @@ class NetworkAnalyzer:
     def __init__(self):
         # Initialisation des analyseurs
         self.wifi_analyzer = WifiAnalyzer()
-        self.wifi_collector = WifiCollector()
-        self.moxa_analyzer = MoxaLogAnalyzer()
+        # Journal de session à côté des exports (data/) : reconstruit après un plantage
+        self.wifi_collector = WifiCollector(
+            journal_dir=os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'journal')
+        )
+        # Collecteur en direct, mis de côté pendant le rejeu d'une session
+        self._live_collector: Optional[WifiCollector] = None
+        # Analyseur Moxa (requests, client OpenAI...) créé à la première analyse
+        self._moxa_analyzer = None
 
         # État
         self.is_collecting = False
         self.current_wifi_analysis: Optional[WifiAnalysis] = None
         self.current_moxa_analysis = None
-        self.last_wifi_samples: List[WifiSample] = []
+        self.last_wifi_samples = SampleStore()
         self.start_time: Optional[datetime] = None
         self.end_time: Optional[datetime] = None
 
@@ -45,13 +52,24 @@ class NetworkAnalyzer:
             "WLAN-RECEIVE"
         ]
 
+    @property
+    def moxa_analyzer(self):
+        if self._moxa_analyzer is None:
+            from moxa_log_analyzer import MoxaLogAnalyzer
+            self._moxa_analyzer = MoxaLogAnalyzer()
+        return self._moxa_analyzer
+
+    @moxa_analyzer.setter
+    def moxa_analyzer(self, analyzer):
+        self._moxa_analyzer = analyzer
+
     def _setup_logging(self) -> logging.Logger:
         """Configure le système de journalisation"""
         logger = logging.getLogger('NetworkAnalyzer')
         logger.setLevel(logging.DEBUG)
 
-        # Handler pour fichier
-        fh = logging.FileHandler('network_analysis.log', encoding='utf-8')
+        # Handler pour fichier, ouvert au premier message
+        fh = logging.FileHandler('network_analysis.log', encoding='utf-8', delay=True)
         fh.setLevel(logging.DEBUG)
 
         # Handler pour console
@@ -86,6 +104,31 @@ class NetworkAnalyzer:
             self.logger.error(f"Erreur au démarrage de l'analyse: {e}")
             return False
 
+    @property
+    def is_replaying(self) -> bool:
+        return self._live_collector is not None
+
+    def start_replay(self, path: str, speed: Optional[float] = 1.0) -> bool:
+        """
+        Rejoue une session enregistrée (journal ``.wfj`` ou export JSON) dans
+        le même pipeline que la collecte en direct.
+
+        Args:
+            path: fichier de la session
+            speed: facteur d'accélération, None pour rejouer sans attente
+        """
+        if self.is_collecting:
+            return False
+        from wifi.replay_collector import ReplayBackend
+
+        self._live_collector = self.wifi_collector
+        self.wifi_collector = WifiCollector(backend=ReplayBackend(path, speed=speed))
+        self.logger.info(f"Rejeu de la session {path} (vitesse {speed or 'max'})")
+        if not self.start_analysis():
+            self.wifi_collector, self._live_collector = self._live_collector, None
+            return False
+        return True
+
     def stop_analysis(self) -> None:
         """Arrête l'analyse réseau"""
         try:
@@ -94,7 +137,7 @@ class NetworkAnalyzer:
                 samples = self.wifi_collector.stop_collection()
 
                 # Analyser les derniers échantillons
-                if samples:
+                if len(samples):
                     self.current_wifi_analysis = self.wifi_analyzer.analyze_samples(samples)
                     self.last_wifi_samples = samples
 
@@ -103,6 +146,9 @@ class NetworkAnalyzer:
                 self.logger.info("Analyse réseau arrêtée")
         except Exception as e:
             self.logger.error(f"Erreur à l'arrêt de l'analyse: {e}")
+        finally:
+            if self._live_collector is not None:
+                self.wifi_collector, self._live_collector = self._live_collector, None
 
     def analyze_moxa_logs(self, log_content: str) -> dict:
         """
@@ -169,7 +215,7 @@ class NetworkAnalyzer:
                 "dropouts": self.current_wifi_analysis.dropout_count
             }
 
-        if self.last_wifi_samples:
+        if len(self.last_wifi_samples):
             report["ping"] = self._calculate_ping_stats(self.last_wifi_samples)
             report["access_points"] = self._calculate_bssid_stats(self.last_wifi_samples)
 
@@ -210,51 +256,21 @@ class NetworkAnalyzer:
 
         return recommendations
 
-    def _calculate_ping_stats(self, samples: List[WifiSample]) -> Dict[str, float]:
-        """Calcule des statistiques de latence et de jitter."""
-        latencies = [s.ping_latency for s in samples if s.ping_latency >= 0]
-        jitters = [s.jitter for s in samples if s.jitter > 0]
-
-        if not latencies:
-            return {}
+    @staticmethod
+    def _as_store(samples: Union[List[WifiSample], SampleStore]) -> SampleStore:
+        """Accepte indifféremment une liste d'échantillons ou un SampleStore."""
+        if isinstance(samples, SampleStore):
+            return samples
+        return SampleStore.from_samples(samples)
 
-        return {
-            "average_latency": round(sum(latencies) / len(latencies), 1),
-            "max_latency": round(max(latencies), 1),
-            "min_latency": round(min(latencies), 1),
-            "average_jitter": round(sum(jitters) / len(jitters), 1) if jitters else 0.0,
-        }
+    def _calculate_ping_stats(self, samples: Union[List[WifiSample], SampleStore]) -> Dict[str, float]:
+        """Calcule des statistiques de latence et de jitter."""
+        # Cumuls tenus à jour par le SampleStore : coût indépendant de la durée
+        return self._as_store(samples).stats.ping_stats()
 
-    def _calculate_bssid_stats(self, samples: List[WifiSample]) -> Dict[str, Dict[str, float]]:
+    def _calculate_bssid_stats(self, samples: Union[List[WifiSample], SampleStore]) -> Dict[str, Dict[str, float]]:
         """Calcule des statistiques par point d'accès (BSSID)."""
-        stats: Dict[str, Dict[str, Any]] = {}
-        for s in samples:
-            bssid = getattr(s, "bssid", None)
-            if not bssid or bssid in {"00:00:00:00:00:00", "Unknown"}:
-                continue
-
-            if bssid not in stats:
-                stats[bssid] = {
-                    "count": 0,
-                    "signals": [],
-                    "qualities": [],
-                }
-
-            stats[bssid]["count"] += 1
-            stats[bssid]["signals"].append(s.signal_strength)
-            stats[bssid]["qualities"].append(s.quality)
-
-        result: Dict[str, Dict[str, float]] = {}
-        for bssid, data in stats.items():
-            result[bssid] = {
-                "count": data["count"],
-                "average_signal": round(sum(data["signals"]) / len(data["signals"]), 1),
-                "min_signal": float(min(data["signals"])),
-                "max_signal": float(max(data["signals"])),
-                "average_quality": round(sum(data["qualities"]) / len(data["qualities"]), 1),
-            }
-
-        return result
+        return self._as_store(samples).stats.bssid_stats()
 
     def export_data(self, export_dir: str = "exports") -> str:
         """Exporte toutes les données d'analyse"""
@@ -280,6 +296,22 @@ class NetworkAnalyzer:
             self.logger.error(f"Erreur lors de l'export des données: {e}")
             return ""
 
+    def export_samples_columnar(self, filepath: str) -> str:
+        """Exporte les échantillons de la session au format colonnaire compressé (.wfc)"""
+        from wifi.columnar_export import export_columnar
+
+        samples = self.wifi_collector.samples if self.is_collecting else self.last_wifi_samples
+        try:
+            export_columnar(samples, filepath, metadata={
+                'start_time': self.start_time.isoformat() if self.start_time else None,
+                'end_time': self.end_time.isoformat() if self.end_time else None,
+            })
+            self.logger.info(f"Échantillons exportés vers {filepath}")
+            return filepath
+        except Exception as e:
+            self.logger.error(f"Erreur lors de l'export colonnaire: {e}")
+            return ""
+
     def validate_moxa_log(self, log_content: str) -> bool:
         """Valide que le contenu ressemble à un log Moxa."""
         if not log_content or not isinstance(log_content, str):
@@ -289,10 +321,5 @@ class NetworkAnalyzer:
 
     def preprocess_moxa_log(self, log_content: str) -> str:
         """Prétraite les logs Moxa pour améliorer l'analyse."""
-        # Normaliser les sauts de ligne
-        log_content = log_content.replace("\r\n", "\n").strip()
-
-        # Supprimer les lignes vides multiples
-        log_content = "\n".join(line for line in log_content.split("\n") if line.strip())
-
-        return log_content
+        # Normaliser les sauts de ligne et supprimer les lignes vides, en un passage
+        return "\n".join(line for line in iter_log_lines(log_content.strip()) if line.strip())
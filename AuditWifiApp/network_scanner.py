@@ -1,6 +1,7 @@
 import subprocess
 import re
 import os
+import platform
 
 def percentage_to_dbm(percentage):
     """Convertit un pourcentage de signal en dBm (approximation)"""
@@ -158,8 +159,15 @@ def get_channel_from_bssid(bssid):
     except Exception:
         return 0, "Inconnu", 0
 
+def scan_wifi_linux():
+    """Scanne les réseaux Wi-Fi sous Linux via iw (résultats du dernier scan du noyau)."""
+    from wifi.linux_backend import scan_networks
+    return scan_networks()
+
 def scan_wifi():
     """Scanne les réseaux Wi-Fi disponibles en utilisant netsh et retourne une liste de résultats."""
+    if platform.system() == 'Linux':
+        return scan_wifi_linux()
     try:
         # Méthode 1: Commande NETSH principale pour obtenir les réseaux Wi-Fi
         result = subprocess.run(
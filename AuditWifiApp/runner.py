@@ -2,24 +2,18 @@
 # -*- coding: utf-8 -*-
 import sys
 import json
+import hashlib
 import logging
+import queue
+import threading
 from datetime import datetime
+from collections import deque
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog, simpledialog
 
-# Configuration sécurisée de Matplotlib avant les imports
-import matplotlib
-matplotlib.use('TkAgg')  # Backend sûr pour Tkinter
-import matplotlib.pyplot as plt
-plt.ioff()  # Mode non-interactif pour éviter les erreurs de rendu
-
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-from matplotlib.backends._backend_tk import NavigationToolbar2Tk
-from matplotlib.figure import Figure
-from matplotlib.widgets import SpanSelector
-import matplotlib.dates as mdates
 import numpy as np
-from typing import List, Optional, Dict
+from types import SimpleNamespace
+from typing import TYPE_CHECKING, List, Optional, Dict
 import os
 import subprocess
 import re
@@ -27,18 +21,50 @@ import re
 # Seuils de jitter en millisecondes
 JITTER_WARNING_MS = 30
 JITTER_CRITICAL_MS = 50
+# Choix « tous les AP » de la requête sur la base d'événements Moxa
+ALL_APS = "Tous"
+MAX_APS_IN_QUERY_LIST = 200
 from dotenv import load_dotenv
 
 # Charger automatiquement les variables d'environnement depuis un fichier .env
 load_dotenv()
 
 from network_analyzer import NetworkAnalyzer
-from amr_monitor import AMRMonitor
 from wifi.wifi_collector import WifiSample
-from src.ai.simple_moxa_analyzer import analyze_moxa_logs
+from wifi.sample_pipeline import SamplePipeline
+from wifi.sample_store import SampleStore, parse_rate_mbps
+from wifi.rolling_stats import SlidingWindowStats
+from ui.decimation import AlertIndex, MinMaxPyramid
+from ui.blit_renderer import BlitRenderer, stable_limit
+from ui.history_view import HISTORY_COLUMNS, HistoryView, TagCache
+from src.ai.stream_worker import CANCELLED, DONE, ERROR, FIRST_TOKEN, TOKEN, StreamingAnalysis
+from moxa_event_store import ImportResult, MoxaEventStore
 from config_manager import ConfigurationManager
 from mac_tag_manager import MacTagManager
 
+if TYPE_CHECKING:
+    from amr_monitor import AMRMonitor
+
+# Chargés au premier usage (voir _matplotlib) : matplotlib représente à lui
+# seul plus de la moitié du temps d'import de l'application.
+_mpl: Optional[SimpleNamespace] = None
+
+
+def _matplotlib() -> SimpleNamespace:
+    """Importe matplotlib (backend TkAgg) au premier graphique affiché."""
+    global _mpl
+    if _mpl is None:
+        import matplotlib
+        matplotlib.use('TkAgg')  # Backend sûr pour Tkinter
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+        from matplotlib.backends._backend_tk import NavigationToolbar2Tk
+        from matplotlib.collections import LineCollection
+        from matplotlib.figure import Figure
+        _mpl = SimpleNamespace(Figure=Figure, FigureCanvasTkAgg=FigureCanvasTkAgg,
+                               NavigationToolbar2Tk=NavigationToolbar2Tk, LineCollection=LineCollection)
+    return _mpl
+
+
 class NetworkAnalyzerUI:
     def __init__(self, master: tk.Tk):
         self.master = master
@@ -52,14 +78,18 @@ class NetworkAnalyzerUI:
 
         # Initialisation des composants
         self.analyzer = NetworkAnalyzer()
-        self.samples: List[WifiSample] = []
+        self.samples = SampleStore()
         self.amr_ips: List[str] = []
-        self.amr_monitor: Optional[AMRMonitor] = None        # Variables pour la navigation temporelle
+        self.amr_monitor: Optional['AMRMonitor'] = None        # Variables pour la navigation temporelle
         self.current_view_start = 0
         self.current_view_window = 300  # Nombre d'échantillons à afficher (augmenté de 100 à 300)
         self.is_real_time = True  # Mode temps réel vs navigation
         self.realtime_var = tk.BooleanVar(value=True)  # Variable pour le checkbox temps réel
-        self.alert_markers = []  # Marqueurs d'alertes sur les graphiques
+        self.alert_collections = []  # Marqueurs d'alertes : une collection par axe
+        # Niveaux de détail des graphiques, reconstruits quand la session change
+        self.pyramids: Dict[str, MinMaxPyramid] = {}
+        self.alert_index = AlertIndex(self._critical_alert_mask)
+        self._lod_store = None
         self.fullscreen_window = None  # Fenêtre plein écran
         self.slider_update_in_progress = False  # Évite la récursion avec le slider
 
@@ -103,6 +133,15 @@ class NetworkAnalyzerUI:
         # Manager for MAC address tags
         self.mac_manager = MacTagManager()
 
+        # Base des événements Moxa déjà importés ; l'import se fait hors du thread Tk
+        self.moxa_events_db = os.path.join(os.path.dirname(__file__), "logs_moxa", "moxa_events.db")
+        self._moxa_import_lock = threading.Lock()
+        self._last_moxa_import = None
+        # Analyse OpenAI en cours (thread de flux) et intervalle de lecture de sa file (ms)
+        self.moxa_analysis: Optional[StreamingAnalysis] = None
+        self._moxa_stream_context = {}
+        self.stream_poll_interval = 50
+
 
         # Configuration du style
         self.setup_style()
@@ -114,11 +153,25 @@ class NetworkAnalyzerUI:
             self.amr_listbox.insert(tk.END, ip)
 
         # Configuration des graphiques
+        self.fig = None
         self.setup_graphs()        # Variables pour les mises à jour
         self.update_interval = 1000  # ms
         self.max_samples = 500        # Historique pour l'onglet WiFi (augmenté de 100 à 500)
-        self.wifi_history_entries = []
         self.max_history_entries = 5000  # Augmenté de 1000 à 5000 pour plus d'historique
+        # File bornée : les plus anciennes entrées sortent sans recopie de la liste
+        self.wifi_history_entries = deque(maxlen=self.max_history_entries)
+        # Statistiques glissantes du panneau avancé, mises à jour à chaque échantillon
+        self.history_window = 300
+        self.history_stats = {
+            name: SlidingWindowStats(self.history_window)
+            for name in ('signal', 'quality', 'latency', 'jitter', 'alerts')
+        }
+
+        # Collecte dans un thread dédié, l'interface vide la file par lots
+        self.sample_pipeline: Optional[SamplePipeline] = None
+        self.drain_interval = 200  # ms entre deux vidages de la file
+        self.max_batch_size = 50  # échantillons traités par vidage
+        self.pipeline_queue_size = 256
 
     def is_portable_screen(self):
         """Détermine si l'écran est un écran portable basé sur la taille physique et le DPI"""
@@ -250,6 +303,24 @@ class NetworkAnalyzerUI:
         )
         self.stop_button.pack(fill=tk.X, pady=5)
 
+        # Rejeu d'une session enregistrée (journal ou export JSON)
+        replay_frame = ttk.Frame(control_frame)
+        replay_frame.pack(fill=tk.X, pady=5)
+        self.replay_button = ttk.Button(
+            replay_frame,
+            text="⏪ Rejouer une session",
+            command=self.start_replay
+        )
+        self.replay_button.pack(side=tk.LEFT, fill=tk.X, expand=True)
+        self.replay_speed = tk.StringVar(value="10x")
+        ttk.Combobox(
+            replay_frame,
+            textvariable=self.replay_speed,
+            values=["1x", "10x", "max"],
+            width=5,
+            state="readonly"
+        ).pack(side=tk.LEFT, padx=(5, 0))
+
         # Button to manage MAC address tags
         self.mac_manage_button = ttk.Button(
             control_frame,
@@ -303,11 +374,20 @@ class NetworkAnalyzerUI:
         history_tab = ttk.Frame(self.wifi_analysis_notebook)
         self.wifi_analysis_notebook.add(history_tab, text="📋 Historique")
 
-        self.wifi_history_text = tk.Text(history_tab, wrap=tk.WORD)
-        wifi_history_scroll = ttk.Scrollbar(history_tab, command=self.wifi_history_text.yview)
-        self.wifi_history_text.configure(yscrollcommand=wifi_history_scroll.set)
-        self.wifi_history_text.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        # Une ligne par entrée : seules les nouvelles lignes sont insérées
+        self.wifi_history_tree = ttk.Treeview(
+            history_tab, columns=[name for name, _, _ in HISTORY_COLUMNS], show='headings'
+        )
+        for name, title, width in HISTORY_COLUMNS:
+            self.wifi_history_tree.heading(name, text=title)
+            self.wifi_history_tree.column(name, width=width, stretch=(name == 'alerts'))
+        self.wifi_history_tree.tag_configure('alert', foreground='red')
+        wifi_history_scroll = ttk.Scrollbar(history_tab, command=self.wifi_history_tree.yview)
+        self.wifi_history_tree.configure(yscrollcommand=wifi_history_scroll.set)
+        self.wifi_history_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
         wifi_history_scroll.pack(side=tk.RIGHT, fill=tk.Y)
+        self.mac_tag_cache = TagCache(self.mac_manager)
+        self.wifi_history_view = HistoryView(self.wifi_history_tree, self.mac_tag_cache, limit=300)
 
         # === Onglet Statistiques Avancées ===
         advanced_stats_tab = ttk.Frame(self.wifi_analysis_notebook)
@@ -407,14 +487,56 @@ class NetworkAnalyzerUI:
         instr_scroll = ttk.Scrollbar(instr_frame, command=self.custom_instr_text.yview)
         self.custom_instr_text.configure(yscrollcommand=instr_scroll.set)
         self.custom_instr_text.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-        instr_scroll.pack(side=tk.RIGHT, fill=tk.Y)# Bouton d'analyse
+        instr_scroll.pack(side=tk.RIGHT, fill=tk.Y)# Boutons d'analyse et d'annulation
+        analyze_btn_frame = ttk.Frame(self.moxa_frame)
+        analyze_btn_frame.pack(pady=(5, 8))
         self.analyze_button = ttk.Button(
-            self.moxa_frame,
+            analyze_btn_frame,
             text="🔍 Analyser les logs",
             style="Analyze.TButton",
             command=self.analyze_moxa_logs
         )
-        self.analyze_button.pack(pady=(5, 8))
+        self.analyze_button.pack(side=tk.LEFT, padx=5)
+        self.cancel_analysis_button = ttk.Button(
+            analyze_btn_frame,
+            text="⏹ Annuler",
+            command=self.cancel_moxa_analysis,
+            state=tk.DISABLED
+        )
+        self.cancel_analysis_button.pack(side=tk.LEFT, padx=5)
+
+        # Requête sur la base d'événements déjà importés : plage horaire et AP, sans relire les logs
+        store_frame = ttk.LabelFrame(
+            self.moxa_frame,
+            text="Base d'événements Moxa (analyse locale des logs déjà importés) :",
+            padding=(10, 5),
+        )
+        store_frame.pack(fill=tk.X, expand=False, padx=10, pady=(0, 2))
+        ttk.Label(store_frame, text="Du").pack(side=tk.LEFT)
+        self.moxa_range_start = ttk.Entry(store_frame, width=17)
+        self.moxa_range_start.pack(side=tk.LEFT, padx=(2, 8))
+        ttk.Label(store_frame, text="Au").pack(side=tk.LEFT)
+        self.moxa_range_end = ttk.Entry(store_frame, width=17)
+        self.moxa_range_end.pack(side=tk.LEFT, padx=(2, 8))
+        ttk.Label(store_frame, text="AP").pack(side=tk.LEFT)
+        self.moxa_ap_var = tk.StringVar(value=ALL_APS)
+        self.moxa_ap_combo = ttk.Combobox(
+            store_frame,
+            textvariable=self.moxa_ap_var,
+            values=[ALL_APS],
+            width=20,
+            state="readonly",
+            postcommand=self._refresh_moxa_access_points
+        )
+        self.moxa_ap_combo.pack(side=tk.LEFT, padx=(2, 8))
+        self.store_query_button = ttk.Button(
+            store_frame,
+            text="📊 Analyser la base",
+            command=self.analyze_moxa_store
+        )
+        self.store_query_button.pack(side=tk.LEFT, padx=5)
+        ttk.Label(store_frame, text="AAAA-MM-JJ [HH:MM], vide = sans borne",
+                  font=('Arial', 9), foreground='gray').pack(side=tk.LEFT, padx=5)
 
         # Zone des résultats - Agrandie pour prendre tout l'espace restant
         results_frame = ttk.LabelFrame(self.moxa_frame, text="Résultats de l'analyse :", padding=10)
@@ -435,6 +557,16 @@ class NetworkAnalyzerUI:
         )
         self.export_button.pack(pady=5)
 
+        # Barre d'état de l'analyse (progression, délai du premier token)
+        self.moxa_status_var = tk.StringVar(value="Prêt")
+        ttk.Label(
+            self.moxa_frame,
+            textvariable=self.moxa_status_var,
+            relief=tk.SUNKEN,
+            anchor=tk.W,
+            padding=(5, 2)
+        ).pack(fill=tk.X, side=tk.BOTTOM, padx=10, pady=(0, 5))
+
         # === Onglet Monitoring AMR ===
         self.amr_frame = ttk.Frame(self.notebook)
         self.notebook.add(self.amr_frame, text="Monitoring AMR")
@@ -481,7 +613,6 @@ class NetworkAnalyzerUI:
         self.current_view_start = 0
         self.current_view_window = 300  # Consistant avec la valeur du constructeur
         self.is_real_time = True
-        self.alert_markers = []
 
         # Variables pour zoom temporel
         self.temporal_view = "5min"  # Options: "1min", "5min", "total"
@@ -588,8 +719,29 @@ class NetworkAnalyzerUI:
         self.context_label.pack(pady=3)
 
         # === GRAPHIQUES ===
+        # La figure (et matplotlib) est créée une fois la fenêtre affichée
+        self.graph_main_frame = graph_main_frame
+        self.graph_placeholder = ttk.Label(graph_main_frame, text="⏳ Chargement des graphiques...")
+        self.graph_placeholder.pack(fill=tk.BOTH, expand=True)
+        self.master.after_idle(self.create_figure)
+
+        # Raccourcis clavier simples
+        self.master.bind('<Left>', lambda e: self.go_to_previous_alert())
+        self.master.bind('<Right>', lambda e: self.go_to_next_alert())
+        self.master.bind('<Home>', lambda e: self.go_to_start())
+        self.master.bind('<End>', lambda e: self.go_live())
+        self.master.focus_set()
+
+    def create_figure(self):
+        """Crée la figure des graphiques temps réel (premier import de matplotlib)."""
+        if self.fig is not None:
+            return
+        mpl = _matplotlib()
+        graph_main_frame = self.graph_main_frame
+        self.graph_placeholder.destroy()
+
         # Figure principale
-        self.fig = Figure(figsize=(10, 8))
+        self.fig = mpl.Figure(figsize=(10, 8))
         self.fig.subplots_adjust(hspace=0.4)
 
         # Graphique du signal avec marqueurs d'alertes
@@ -622,43 +774,97 @@ class NetworkAnalyzerUI:
         self.ax3.set_ylim(0, 100)
         self.ax3.legend()
 
+        # Marqueurs d'alertes : une seule collection par axe, mise à jour en place
+        self.alert_collections = []
+        for ax in (self.ax1, self.ax2, self.ax3):
+            collection = mpl.LineCollection([], colors='red', alpha=0.5, linewidths=1,
+                                            transform=ax.get_xaxis_transform())
+            ax.add_collection(collection, autolim=False)
+            self.alert_collections.append(collection)
+
         # Canvas Matplotlib
-        self.canvas = FigureCanvasTkAgg(self.fig, master=graph_main_frame)
+        self.canvas = mpl.FigureCanvasTkAgg(self.fig, master=graph_main_frame)
         self.canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
 
+        # Seules les courbes et les marqueurs sont redessinés à chaque échantillon
+        self.blitter = BlitRenderer(
+            self.canvas,
+            [self.signal_line, self.quality_line, self.jitter_line, *self.alert_collections],
+        )
+
         # Toolbar de navigation matplotlib (pour zoom/pan à la souris)
         toolbar_frame = ttk.Frame(graph_main_frame)
         toolbar_frame.pack(fill=tk.X)
-        self.toolbar = NavigationToolbar2Tk(self.canvas, toolbar_frame)
+        self.toolbar = mpl.NavigationToolbar2Tk(self.canvas, toolbar_frame)
         self.toolbar.update()
 
-        # Raccourcis clavier simples
-        self.master.bind('<Left>', lambda e: self.go_to_previous_alert())
-        self.master.bind('<Right>', lambda e: self.go_to_next_alert())
-        self.master.bind('<Home>', lambda e: self.go_to_start())
-        self.master.bind('<End>', lambda e: self.go_live())
-        self.master.focus_set()
-
     def start_collection(self):
         """Démarre la collecte WiFi"""
         try:
             if self.analyzer.start_analysis():
-                self.samples = []
-                self.start_button.config(state=tk.DISABLED)
-                self.stop_button.config(state=tk.NORMAL)
-                target = getattr(self.analyzer.wifi_collector, 'ping_target', 'n/a')
-                self.ax3.set_title(f"Jitter de la latence ({target})")
-                if hasattr(self, 'fs_ax3'):
-                    self.fs_ax3.set_title(f"Jitter de la latence ({target})", fontsize=12)
-                self.update_data()
+                self._start_pipeline()
                 self.update_status("Collection en cours...")
         except Exception as e:
             self.show_error(f"Erreur au démarrage: {str(e)}")
 
+    def start_replay(self):
+        """Rejoue une session enregistrée dans les graphiques et les analyses"""
+        filepath = filedialog.askopenfilename(
+            initialdir=os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data'),
+            filetypes=[("Sessions WiFi", "*.wfj *.json"), ("Tous les fichiers", "*.*")],
+            title="Rejouer une session"
+        )
+        if not filepath:
+            return
+        from wifi.replay_collector import REPLAY_SPEEDS
+
+        speed = REPLAY_SPEEDS.get(self.replay_speed.get(), 1.0)
+        try:
+            if self.analyzer.start_replay(filepath, speed=speed):
+                self._start_pipeline()
+                self.update_status(f"Rejeu de {os.path.basename(filepath)} ({self.replay_speed.get()})...")
+            else:
+                self.show_error(f"Impossible de rejouer {filepath}")
+        except Exception as e:
+            self.show_error(f"Erreur au démarrage du rejeu: {str(e)}")
+
+    def _start_pipeline(self):
+        """Branche le collecteur actif (direct ou rejeu) sur la file de l'interface"""
+        collector = self.analyzer.wifi_collector
+        replay = self.analyzer.is_replaying
+        self.samples = SampleStore()
+        # Rejeu : cadencé par le backend, sans perte d'échantillon
+        self.sample_pipeline = SamplePipeline(
+            collector.collect_sample,
+            interval=0 if replay else self.update_interval / 1000,
+            maxsize=self.pipeline_queue_size * (16 if replay else 1),
+            exhausted=lambda: collector.backend.finished,
+            block=replay,
+        )
+        self.sample_pipeline.start()
+        self.start_button.config(state=tk.DISABLED)
+        self.replay_button.config(state=tk.DISABLED)
+        self.stop_button.config(state=tk.NORMAL)
+        target = getattr(collector, 'ping_target', 'n/a')
+        self.create_figure()
+        self.ax3.set_title(f"Jitter de la latence ({target})")
+        self.blitter.invalidate()
+        if hasattr(self, 'fs_ax3'):
+            self.fs_ax3.set_title(f"Jitter de la latence ({target})", fontsize=12)
+            if getattr(self, 'fs_blitter', None) is not None:
+                self.fs_blitter.invalidate()
+        self.update_data()
+
     def stop_collection(self):
         """Arrête la collecte WiFi"""
+        # Arrêter le producteur avant d'analyser les échantillons du collecteur
+        if self.sample_pipeline is not None:
+            self.sample_pipeline.stop()
+            # Dernier lot : mêmes alertes et rafraîchissement que pendant la collecte
+            self._process_batch(self.sample_pipeline.drain())
         self.analyzer.stop_analysis()
         self.start_button.config(state=tk.NORMAL)
+        self.replay_button.config(state=tk.NORMAL)
         self.stop_button.config(state=tk.DISABLED)
         self.export_button.config(state=tk.NORMAL)
         self.update_status("Collection arrêtée")
@@ -667,7 +873,7 @@ class NetworkAnalyzerUI:
         self.generate_final_network_report()
 
     def analyze_moxa_logs(self):
-        """Analyse les logs Moxa collés avec OpenAI"""
+        """Analyse les logs Moxa collés avec OpenAI ; la réponse s'affiche au fil de sa génération"""
         try:
             logs = self.moxa_input.get('1.0', tk.END).strip()
             if not logs:
@@ -695,12 +901,6 @@ class NetworkAnalyzerUI:
                     )
                     return
 
-            # Mise à jour de l'interface
-            self.moxa_results.delete('1.0', tk.END)
-            self.moxa_results.insert('1.0', "🔄 Analyse en cours avec OpenAI...\n\n")
-            self.analyze_button.config(state=tk.DISABLED)
-            self.moxa_results.update()
-
             # Récupérer la configuration depuis la zone de texte
             try:
                 config_text = self.moxa_config_text.get('1.0', tk.END).strip()
@@ -713,41 +913,306 @@ class NetworkAnalyzerUI:
                 )
                 return
 
+            # Mise à jour de l'interface
+            self.moxa_results.delete('1.0', tk.END)
+            self.moxa_results.insert('1.0', "🔄 Analyse en cours avec OpenAI...\n\n")
+            self.analyze_button.config(state=tk.DISABLED)
+            self.cancel_analysis_button.config(state=tk.NORMAL)
+            self.moxa_status_var.set("⏳ Envoi de la requête à OpenAI...")
+
             # Récupérer les instructions personnalisées
             custom_instr = self.custom_instr_text.get('1.0', tk.END).strip()
 
-            # Appel à l'API OpenAI avec la configuration courante et instructions optionnelles
-            analysis = analyze_moxa_logs(logs, self.current_config, custom_instr)
+            # Appel à l'API OpenAI en flux sur un thread : l'interface reste réactive
+            config = dict(self.current_config)
+            cache_info = {}
+
+            def stream(cancel):
+                # Client OpenAI (requests...) importé sur le thread de travail à la première analyse
+                from src.ai.simple_moxa_analyzer import stream_moxa_logs
+                # Annuler ferme la connexion, même avant le premier fragment
+                return stream_moxa_logs(logs, config, custom_instr, cache_info=cache_info, cancel_event=cancel,
+                                        on_stream=lambda chat: analysis.add_cancel_callback(chat.cancel))
+
+            analysis = self.moxa_analysis = StreamingAnalysis(stream)
+            context = self._moxa_stream_context = {
+                "cache_info": cache_info, "stored": None, "streaming": False, "shown": False,
+                "imports": queue.Queue(), "import_pending": True,
+            }
+            analysis.start()
 
-            if analysis:
-                self.moxa_results.delete('1.0', tk.END)
+            # Enregistrer les événements des logs collés sur un thread séparé (les doublons sont ignorés)
+            threading.Thread(target=lambda: context["imports"].put(self.store_moxa_events(logs)),
+                             name="MoxaEventImport", daemon=True).start()
+            self.master.after(self.stream_poll_interval, self._poll_moxa_analysis, context)
 
-                # Configuration des styles de texte
-                self.moxa_results.tag_configure("title", font=("Arial", 12, "bold"))
-                self.moxa_results.tag_configure("section", font=("Arial", 10, "bold"))
-                self.moxa_results.tag_configure("normal", font=("Arial", 10))
-                self.moxa_results.tag_configure("alert", foreground="red")
-                self.moxa_results.tag_configure("success", foreground="green")
-                self.moxa_results.tag_configure("warning", foreground="orange")
+        except Exception as e:
+            self.show_error(f"Erreur d'analyse: {str(e)}")
+            self._end_moxa_analysis()
 
-                # Affichage de l'analyse avec mise en forme
-                self.moxa_results.insert('end', "Analyse OpenAI des Logs Moxa\n\n", "title")
+    def cancel_moxa_analysis(self):
+        """Annule l'analyse OpenAI en cours."""
+        if self.moxa_analysis is not None:
+            self.moxa_analysis.cancel()
 
-                # Formater et afficher la réponse d'OpenAI
-                self.format_and_display_ai_analysis(analysis)
+    def _end_moxa_analysis(self):
+        self.analyze_button.config(state=tk.NORMAL)
+        self.cancel_analysis_button.config(state=tk.DISABLED)
 
-                # Activer le bouton d'export
-                self.export_button.config(state=tk.NORMAL)
-                messagebox.showinfo("Succès", "Analyse complétée par OpenAI !")
-                self.save_last_config()
+    def _poll_moxa_analysis(self, context):
+        """Ajoute au panneau de résultats les fragments reçus depuis le dernier passage."""
+        if context is not self._moxa_stream_context:
+            # Analyse remplacée par une nouvelle
+            return
+        if context["import_pending"]:
+            try:
+                stored = context["imports"].get_nowait()
+            except queue.Empty:
+                pass
             else:
-                self.moxa_results.insert('1.0', "❌ Aucun résultat d'analyse\n")
+                context["stored"] = stored
+                context["import_pending"] = False
+                if context["shown"] and stored is not None:
+                    self._show_moxa_store_summary(stored)
+
+        analysis = self.moxa_analysis
+        if analysis is not None:
+            for kind, value in analysis.poll():
+                if kind == FIRST_TOKEN:
+                    self.moxa_status_var.set(f"✍️ Réception de la réponse... premier token en {value:.2f} s")
+                elif kind == TOKEN:
+                    if not context["streaming"]:
+                        # Remplacer le message d'attente par le texte reçu
+                        self.moxa_results.delete('1.0', tk.END)
+                        context["streaming"] = True
+                    self.moxa_results.insert('end', value)
+                    self.moxa_results.see('end')
+                elif kind == DONE:
+                    self._show_moxa_analysis(value, context["cache_info"], context["stored"])
+                    context["shown"] = True
+                    ttft = f" (premier token en {analysis.ttft:.2f} s)" if analysis.ttft is not None else ""
+                    self.moxa_status_var.set(f"✅ Analyse terminée{ttft}")
+                elif kind == ERROR:
+                    self.moxa_status_var.set("❌ Échec de l'analyse")
+                    self.show_error(f"Erreur d'analyse: {value}")
+                elif kind == CANCELLED:
+                    self.moxa_results.insert('end', "\n\n⏹ Analyse annulée\n", "alert")
+                    self.moxa_status_var.set("⏹ Analyse annulée")
+
+            if analysis.finished:
+                self.moxa_analysis = None
+                self._end_moxa_analysis()
+
+        if self.moxa_analysis is not None or context["import_pending"]:
+            self.master.after(self.stream_poll_interval, self._poll_moxa_analysis, context)
+
+    def _show_moxa_analysis(self, analysis, cache_info, stored):
+        """Remplace le texte reçu en flux par l'analyse mise en forme."""
+        if not analysis:
+            self.moxa_results.delete('1.0', tk.END)
+            self.moxa_results.insert('1.0', "❌ Aucun résultat d'analyse\n")
+            return
 
+        self.moxa_results.delete('1.0', tk.END)
+
+        # Configuration des styles de texte
+        self.moxa_results.tag_configure("title", font=("Arial", 12, "bold"))
+        self.moxa_results.tag_configure("section", font=("Arial", 10, "bold"))
+        self.moxa_results.tag_configure("normal", font=("Arial", 10))
+        self.moxa_results.tag_configure("alert", foreground="red")
+        self.moxa_results.tag_configure("success", foreground="green")
+        self.moxa_results.tag_configure("warning", foreground="orange")
+
+        # Affichage de l'analyse avec mise en forme
+        self.moxa_results.insert('end', "Analyse OpenAI des Logs Moxa\n", "title")
+        if cache_info.get("hit"):
+            age_minutes = int(cache_info.get("age_seconds", 0) // 60)
+            self.moxa_results.insert(
+                'end', f"⚡ Résultat repris du cache (analyse d'il y a {age_minutes} min)\n", "success"
+            )
+        self.moxa_results.insert('end', "\n")
+
+        # Formater et afficher la réponse d'OpenAI
+        self.format_and_display_ai_analysis(analysis)
+
+        if stored is not None:
+            self._show_moxa_store_summary(stored)
+
+        # Activer le bouton d'export
+        self.export_button.config(state=tk.NORMAL)
+        messagebox.showinfo(
+            "Succès",
+            "Analyse reprise du cache." if cache_info.get("hit") else "Analyse complétée par OpenAI !"
+        )
+        self.save_last_config()
+
+    def _show_moxa_store_summary(self, stored):
+        """Bilan de l'enregistrement des logs collés dans la base d'événements."""
+        result, total = stored
+        self.moxa_results.insert('end', "\nBase d'événements Moxa\n", "section")
+        self.moxa_results.insert(
+            'end',
+            f"{result.new_events} nouveaux événements enregistrés "
+            f"({result.duplicates} déjà connus), {total} au total\n",
+            "normal"
+        )
+
+    def store_moxa_events(self, logs):
+        """
+        Importe les événements des logs dans la base Moxa (hors du thread Tk).
+
+        Une connexion est ouverte pour l'import ; un texte identique au
+        dernier import n'est pas relu.
+
+        Returns:
+            tuple: (ImportResult, nombre total d'événements) ou None en cas d'erreur
+        """
+        digest = hashlib.sha256(logs.encode("utf-8")).digest()
+        try:
+            with self._moxa_import_lock:
+                with MoxaEventStore(self.moxa_events_db) as store:
+                    last = self._last_moxa_import
+                    if last is not None and last[0] == digest:
+                        result = ImportResult(last[1].import_id, last[1].lines, last[1].events, 0)
+                    else:
+                        result = store.import_lines(logs, source="interface")
+                        self._last_moxa_import = (digest, result)
+                    return result, len(store)
         except Exception as e:
-            self.show_error(f"Erreur d'analyse: {str(e)}")
-        finally:
-            self.analyze_button.config(state=tk.NORMAL)
+            logging.error(f"Impossible d'enregistrer les événements Moxa: {e}")
+            return None
+
+    def _refresh_moxa_access_points(self):
+        """Remplit la liste des AP connus de la base d'événements (à l'ouverture de la liste)."""
+        try:
+            with MoxaEventStore(self.moxa_events_db) as store:
+                aps = [entry["ap"] for entry in store.access_points()[:MAX_APS_IN_QUERY_LIST]]
+        except Exception as e:
+            logging.error(f"Impossible de lire les AP de la base Moxa: {e}")
+            aps = []
+        self.moxa_ap_combo.configure(values=[ALL_APS] + aps)
+
+    @staticmethod
+    def _parse_moxa_bound(text):
+        """Borne de plage saisie (``AAAA-MM-JJ`` ou ``AAAA-MM-JJ HH:MM``) ; None si vide."""
+        text = text.strip()
+        if not text:
+            return None
+        for fmt in ("%Y-%m-%d %H:%M:%S", "%Y-%m-%d %H:%M", "%Y-%m-%d"):
+            try:
+                return datetime.strptime(text, fmt)
+            except ValueError:
+                continue
+        raise ValueError(f"Date invalide: {text} (attendu AAAA-MM-JJ ou AAAA-MM-JJ HH:MM)")
+
+    def analyze_moxa_store(self):
+        """Analyse locale des événements de la base sur la plage et l'AP choisis, hors du thread Tk."""
+        try:
+            start = self._parse_moxa_bound(self.moxa_range_start.get())
+            end = self._parse_moxa_bound(self.moxa_range_end.get())
+        except ValueError as e:
+            messagebox.showerror("Plage invalide", str(e))
+            return
+        ap = self.moxa_ap_var.get()
+        ap = None if not ap or ap == ALL_APS else ap
+        try:
+            config_text = self.moxa_config_text.get('1.0', tk.END).strip()
+            config = json.loads(config_text) if config_text else dict(self.current_config)
+        except json.JSONDecodeError:
+            messagebox.showerror("Configuration invalide", "La configuration Moxa n'est pas un JSON valide.")
+            return
+
+        self.store_query_button.config(state=tk.DISABLED)
+        self.moxa_status_var.set("⏳ Analyse de la base d'événements...")
+        results = queue.Queue()
+        threading.Thread(
+            target=lambda: results.put(self._query_moxa_store(start, end, ap, config)),
+            name="MoxaStoreQuery",
+            daemon=True
+        ).start()
+        self.master.after(self.stream_poll_interval, self._poll_moxa_store_query, results, (start, end, ap))
+
+    def _query_moxa_store(self, start, end, ap, config):
+        """Exécuté sur le thread de requête : connexion propre, analyse sans relire les logs."""
+        # Analyseurs importés sur le thread de travail (démarrage de l'interface plus léger)
+        from moxa_log_analyzer import MoxaLogAnalyzer
+        from moxa_roaming_analyzer import MoxaRoamingAnalyzer
+        try:
+            with MoxaEventStore(self.moxa_events_db) as store:
+                counts = store.count_by_kind(start, end, ap)
+                report = MoxaLogAnalyzer().analyze_store(store, config, start=start, end=end, ap=ap)
+                roaming = MoxaRoamingAnalyzer().analyze_store(store, start=start, end=end, ap=ap, config=config)
+            return counts, report, roaming
+        except Exception as e:
+            logging.error(f"Analyse de la base Moxa impossible: {e}")
+            return e
 
+    def _poll_moxa_store_query(self, results, query):
+        try:
+            outcome = results.get_nowait()
+        except queue.Empty:
+            self.master.after(self.stream_poll_interval, self._poll_moxa_store_query, results, query)
+            return
+        self.store_query_button.config(state=tk.NORMAL)
+        if isinstance(outcome, Exception):
+            self.moxa_status_var.set("❌ Échec de l'analyse de la base")
+            self.show_error(f"Erreur d'analyse de la base: {outcome}")
+            return
+        self._show_moxa_store_query(query, *outcome)
+        self.moxa_status_var.set("✅ Analyse de la base terminée")
+
+    def _show_moxa_store_query(self, query, counts, report, roaming):
+        """Affiche l'analyse locale d'une plage de la base d'événements."""
+        start, end, ap = query
+        self.moxa_results.delete('1.0', tk.END)
+        self.moxa_results.tag_configure("title", font=("Arial", 12, "bold"))
+        self.moxa_results.tag_configure("section", font=("Arial", 10, "bold"))
+        self.moxa_results.tag_configure("normal", font=("Arial", 10))
+        self.moxa_results.tag_configure("alert", foreground="red")
+        self.moxa_results.tag_configure("success", foreground="green")
+        self.moxa_results.tag_configure("warning", foreground="orange")
+
+        self.moxa_results.insert('end', "Analyse locale de la base d'événements Moxa\n", "title")
+        period = (f"{start.strftime('%Y-%m-%d %H:%M') if start else 'début'} → "
+                  f"{end.strftime('%Y-%m-%d %H:%M') if end else 'fin'}")
+        self.moxa_results.insert('end', f"Période : {period} — AP : {ap or ALL_APS}\n\n", "normal")
+        if not counts:
+            self.moxa_results.insert('end', "Aucun événement enregistré sur cette sélection\n", "warning")
+            return
+
+        self.moxa_results.insert('end', "Événements:\n", "section")
+        for kind, count in sorted(counts.items(), key=lambda item: -item[1]):
+            self.moxa_results.insert('end', f"• {kind}: {count}\n", "normal")
+        metrics = roaming.get("metrics", {})
+        if metrics.get("total_events"):
+            self.moxa_results.insert('end', "\nRoaming:\n", "section")
+            self.moxa_results.insert(
+                'end',
+                f"• {metrics['total_events']} roamings ({metrics['successful']} réussis, "
+                f"{metrics['failed']} échoués), {metrics['ping_pong_count']} ping-pong\n"
+                f"• Handoff moyen {metrics['avg_handoff_time']:.0f} ms, max {metrics['max_handoff_time']:.0f} ms\n",
+                "normal"
+            )
+        self.moxa_results.insert('end', "\n")
+
+        self.display_structured_analysis({"score_global": report.get("score_global", 0)})
+        problematic = report.get("problematic_aps") or []
+        if problematic:
+            self.moxa_results.insert('end', "AP problématiques:\n", "section")
+            for entry in problematic[:10]:
+                self.moxa_results.insert(
+                    'end', f"• {entry.get('ap_mac')}: {', '.join(entry.get('issues', []))} "
+                           f"({entry.get('occurrences', 0)} occurrences)\n", "normal"
+                )
+            self.moxa_results.insert('end', "\n")
+        recommendations = report.get("recommandations") or []
+        if recommendations:
+            self.moxa_results.insert('end', "Recommandations:\n", "section")
+            for rec in recommendations:
+                if isinstance(rec, dict):
+                    self.moxa_results.insert('end', f"• Problème: {rec.get('probleme', '')}\n", "normal")
+                    self.moxa_results.insert('end', f"  Solution: {rec.get('solution', '')}\n\n", "normal")
+        self.moxa_results.see('1.0')
 
     def load_config(self):
         """Charge un fichier de configuration JSON."""
@@ -892,28 +1357,43 @@ class NetworkAnalyzerUI:
         # If the user provided a tag, save it
         if tag:
             self.mac_manager.add_tag(mac_address, tag)
+            self.mac_tag_cache.invalidate(mac_address)
             return tag
 
         return None
 
     def update_data(self):
-        """Met à jour les données en temps réel"""
-        if not self.analyzer.is_collecting:
+        """Vide la file de collecte et met à jour l'affichage une fois par lot"""
+        if not self.analyzer.is_collecting or self.sample_pipeline is None:
+            return
+
+        replay = self.analyzer.is_replaying
+        self._process_batch(self.sample_pipeline.drain(None if replay else self.max_batch_size))
+
+        if replay and not self.sample_pipeline.is_running and not self.sample_pipeline.depth:
+            # Session rejouée en entier : rapport final comme à l'arrêt d'une collecte
+            self.stop_collection()
             return
+        self.master.after(self.drain_interval, self.update_data)
 
-        sample = self.analyzer.wifi_collector.collect_sample()
-        if sample:
+    def _process_batch(self, batch: List[WifiSample]):
+        """Intègre un lot d'échantillons : alertes par échantillon, un seul rafraîchissement"""
+        replay = self.analyzer.is_replaying
+        for sample in batch:
             self.samples.append(sample)
-            # Prompt for tag if new access point detected
-            if sample.bssid and not self.mac_manager.get_tag(sample.bssid):
+            # Prompt for tag if new access point detected (pas pendant un rejeu)
+            if not replay and sample.bssid and not self.mac_tag_cache.get(sample.bssid):
                 self.prompt_for_tag(sample.bssid)
+            self.check_wifi_issues(sample, refresh=False)
+
+        if batch:
+            # Un seul rafraîchissement même si plusieurs échantillons sont arrivés
             self.update_display()
             self.update_stats()
-            self.check_wifi_issues(sample)
-
-        self.master.after(self.update_interval, self.update_data)
+            self.update_wifi_history_display()
+            self.update_advanced_wifi_stats()
 
-    def check_wifi_issues(self, sample: WifiSample):
+    def check_wifi_issues(self, sample: WifiSample, refresh: bool = True):
         """Vérifie et affiche les problèmes WiFi"""
         alerts = []
         timestamp = datetime.now().strftime('%H:%M:%S')
@@ -938,8 +1418,8 @@ class NetworkAnalyzerUI:
 
         # Débits - Seuils adaptatifs et réalistes
         try:
-            tx_rate = int(sample.raw_data.get('TransmitRate', '0 Mbps').split()[0])
-            rx_rate = int(sample.raw_data.get('ReceiveRate', '0 Mbps').split()[0])
+            tx_rate = int(sample.transmit_rate.split()[0])
+            rx_rate = int(sample.receive_rate.split()[0])
 
             # Seuils adaptatifs et réalistes
             min_tx_critical = 10  # TX critique si < 10 Mbps
@@ -969,12 +1449,13 @@ class NetworkAnalyzerUI:
             self.wifi_alert_text.insert('1.0', msg)
 
         # Ajouter à l'historique (même si pas d'alertes)
-        self.add_to_wifi_history(sample, alerts, timestamp)
+        self.add_to_wifi_history(sample, alerts, timestamp, refresh=refresh)
 
         # Mettre à jour les stats avancées
-        self.update_advanced_wifi_stats()
+        if refresh:
+            self.update_advanced_wifi_stats()
 
-    def add_to_wifi_history(self, sample: WifiSample, alerts: list, timestamp: str):
+    def add_to_wifi_history(self, sample: WifiSample, alerts: list, timestamp: str, refresh: bool = True):
         """Ajoute un échantillon à l'historique WiFi"""
         entry = {
             'timestamp': timestamp,
@@ -989,51 +1470,32 @@ class NetworkAnalyzerUI:
             'jitter': sample.jitter
         }
 
-        self.wifi_history_entries.append(entry)
+        self._push_history_entry(entry)
 
-        # Limiter la taille de l'historique
-        if len(self.wifi_history_entries) > self.max_history_entries:
-            self.wifi_history_entries = self.wifi_history_entries[-self.max_history_entries:]        # Mettre à jour l'affichage de l'historique
-        self.update_wifi_history_display()
+        stats = self.history_stats
+        stats['signal'].add(sample.signal_strength)
+        stats['quality'].add(sample.quality)
+        stats['latency'].add(sample.ping_latency if sample.ping_latency >= 0 else None)
+        stats['jitter'].add(sample.jitter if sample.jitter > 0 else None)
+        stats['alerts'].add(1.0 if alerts else 0.0)
 
-    def update_wifi_history_display(self):
-        """Met à jour l'affichage de l'historique WiFi"""
-        if not hasattr(self, 'wifi_history_text'):
-            return
-
-        try:            # Limiter l'affichage aux 300 dernières entrées pour les performances
-            recent_entries = self.wifi_history_entries[-300:]
-
-            history_text = "=== Historique WiFi (300 dernières entrées) ===\n\n"
-
-            for entry in reversed(recent_entries):  # Plus récent en premier
-                history_text += f"[{entry['timestamp']}] "
-                history_text += f"Signal: {entry['signal']} dBm, "
-                history_text += f"Qualité: {entry['quality']}%"
-                if entry.get('channel'):
-                    history_text += f", Canal: {entry['channel']}"
-                if entry.get('band'):
-                    history_text += f", Bande: {entry['band']}"
-                if entry.get('ssid') and entry['ssid'] != 'N/A':
-                    history_text += f", SSID: {entry['ssid']}"
-
-                # Ajouter le BSSID si disponible
-                if entry.get('bssid') and entry['bssid'] != "Unknown":
-                    tag = self.mac_manager.get_tag(entry['bssid'])
-                    tag_str = f" ({tag})" if tag else ""
-                    history_text += f", AP: {entry['bssid']}{tag_str}"
-
-                history_text += "\n"
-
-                if entry['alerts']:
-                    for alert in entry['alerts']:
-                        history_text += f"  → {alert}\n"
+        # Mettre à jour l'affichage de l'historique
+        if refresh:
+            self.update_wifi_history_display()
 
-                history_text += "\n"
+    def _push_history_entry(self, entry: dict):
+        """Ajoute une entrée à l'historique et la met en attente d'affichage"""
+        self.wifi_history_entries.append(entry)
+        if hasattr(self, 'wifi_history_view'):
+            self.wifi_history_view.append(entry)
 
-            self.wifi_history_text.delete('1.0', tk.END)
-            self.wifi_history_text.insert('1.0', history_text)
+    def update_wifi_history_display(self):
+        """Insère dans l'historique les entrées en attente (les plus anciennes sortent)"""
+        if not hasattr(self, 'wifi_history_view'):
+            return
 
+        try:
+            self.wifi_history_view.flush()
         except Exception as e:
             logging.error(f"Erreur dans update_wifi_history_display: {str(e)}")
 
@@ -1043,7 +1505,7 @@ class NetworkAnalyzerUI:
             return
 
         try:
-            if not self.samples:
+            if not len(self.samples):
                 report = "❌ Aucune donnée disponible pour générer un rapport.\n"
                 report += "Veuillez d'abord effectuer une analyse WiFi."
             else:
@@ -1110,9 +1572,9 @@ class NetworkAnalyzerUI:
                     report += "\n"
 
                 # Score global calculé
-                if self.samples:
-                    avg_signal = sum(s.signal_strength for s in self.samples) / len(self.samples)
-                    avg_quality = sum(s.quality for s in self.samples) / len(self.samples)
+                if len(self.samples):
+                    avg_signal = float(self.samples.signal.mean())
+                    avg_quality = float(self.samples.quality.mean())
 
                     # Calcul du score global (0-100)
                     signal_score = max(0, min(100, (avg_signal + 100) * 2))  # -100 dBm = 0%, -50 dBm = 100%
@@ -1168,64 +1630,64 @@ class NetworkAnalyzerUI:
         """Met à jour les graphiques avec navigation temporelle"""
         if not self.samples:
             return
+        self.create_figure()
 
-        try:            # Créer une copie locale des échantillons pour éviter les problèmes
-            # de concurrence lorsque la liste est modifiée pendant la navigation
-            samples_snapshot = list(self.samples)
+        try:            # Figer la taille : les vues en colonnes restent cohérentes
+            # même si des échantillons arrivent pendant la navigation
+            total = len(self.samples)
 
             # Ajuster current_view_window pour la vue "total"
             if self.temporal_view == "total":
-                self.current_view_window = len(samples_snapshot) if samples_snapshot else 300
+                self.current_view_window = total if total else 300
 
             # Déterminer la plage d'affichage selon le mode
             if self.is_real_time:
                 # Mode temps réel : afficher les derniers échantillons
-                start_idx = max(0, len(samples_snapshot) - self.current_view_window)
-                end_idx = len(samples_snapshot)
+                start_idx = max(0, total - self.current_view_window)
+                end_idx = total
             else:
                 # Mode navigation : afficher la fenêtre sélectionnée
                 start_idx = self.current_view_start
                 # S'assurer qu'on ne dépasse pas la fin des données
-                end_idx = min(len(samples_snapshot), start_idx + self.current_view_window)
+                end_idx = min(total, start_idx + self.current_view_window)
 
                 # Si on essaie d'afficher plus d'échantillons qu'il n'y en a,
                 # ajuster le début pour montrer les derniers échantillons disponibles
-                if end_idx - start_idx < self.current_view_window and end_idx == len(samples_snapshot):
+                if end_idx - start_idx < self.current_view_window and end_idx == total:
                     start_idx = max(0, end_idx - self.current_view_window)
 
-            # Extraire les données à afficher
-            display_samples = samples_snapshot[start_idx:end_idx]
-            if not display_samples:
-                return
-
-            signals = [s.signal_strength for s in display_samples]
-            qualities = [s.quality for s in display_samples]
-            jitters = [s.jitter for s in display_samples]
-            x_data = range(len(signals))
-
             # Vérifier que nous avons des données valides
-            if not signals or not qualities:
+            if end_idx <= start_idx:
                 return
 
+            # Points à tracer : min/max par seau, environ deux points par pixel
+            self._sync_level_of_detail()
+            x_signal, signals = self._decimated('signal', start_idx, end_idx, self.ax1)
+            x_quality, qualities = self._decimated('quality', start_idx, end_idx, self.ax2)
+            x_jitter, jitters = self._decimated('jitter', start_idx, end_idx, self.ax3)
+
             # Mise à jour des lignes principales avec protection
             try:
-                self.signal_line.set_data(x_data, signals)
-                self.quality_line.set_data(x_data, qualities)
-                self.jitter_line.set_data(x_data, jitters)
-
-                # Mise à jour des axes avec valeurs valides
-                if len(signals) > 0:
-                    self.ax1.set_xlim(0, max(1, len(signals)))
-                    self.ax2.set_xlim(0, max(1, len(qualities)))
-                    self.ax3.set_xlim(0, max(1, len(jitters)))
-                    if jitters:
-                        self.ax3.set_ylim(0, max(jitters) + 5)
+                self.signal_line.set_data(x_signal, signals)
+                self.quality_line.set_data(x_quality, qualities)
+                self.jitter_line.set_data(x_jitter, jitters)
+
+                # Mise à jour des axes : limites arrondies pour qu'un nouvel
+                # échantillon ne force pas un rendu complet
+                span = max(1, end_idx - start_idx)
+                if self.temporal_view == "total":
+                    span = stable_limit(span, 60)
+                self.ax1.set_xlim(0, span)
+                self.ax2.set_xlim(0, span)
+                self.ax3.set_xlim(0, span)
+                # La décimation conserve les extremums : le max reste exact
+                self.ax3.set_ylim(0, stable_limit(float(jitters.max()) + 5, 10))
 
                 # Marquer les alertes sur les graphiques
-                self.mark_alerts_on_graphs()
+                self.mark_alerts_on_graphs(start_idx, end_idx)
 
-                # Rafraîchissement avec gestion d'erreur
-                self.canvas.draw_idle()  # Utiliser draw_idle() au lieu de draw()
+                # Blitting des courbes, rendu complet seulement si les limites changent
+                self.blitter.update()
 
             except Exception as graph_error:
                 logging.warning(f"Erreur lors de la mise à jour des graphiques: {graph_error}")
@@ -1260,60 +1722,65 @@ class NetworkAnalyzerUI:
             else:
                 self.context_label.config(text="📊 Mode analyse - Aucune donnée")
 
-    def mark_alerts_on_graphs(self):
+    def mark_alerts_on_graphs(self, start_idx=None, end_idx=None):
         """Marque les points d'alerte sur les graphiques"""
         try:
-            # Effacer les anciens marqueurs
-            for marker in self.alert_markers:
-                try:
-                    marker.remove()
-                except:
-                    pass
-            self.alert_markers = []
-
-            if not self.samples:
-                return
-
-            # Créer une copie locale des échantillons pour éviter les problèmes de concurrence
-            samples_snapshot = list(self.samples)
+            total = len(self.samples)
 
             # Déterminer la plage d'affichage
-            if self.is_real_time:
-                start_idx = max(0, len(samples_snapshot) - self.current_view_window)
-            else:
-                start_idx = self.current_view_start
-
-            # S'assurer que les indices sont valides
-            end_idx = min(len(samples_snapshot), start_idx + self.current_view_window)
-
-            # Marquer les points avec alertes
-            for i, sample in enumerate(samples_snapshot[start_idx:end_idx]):
-                has_alert = False                # Vérifier les différents types d'alertes
-                if sample.signal_strength < -85:
-                    has_alert = True
-                elif sample.quality < 20:
-                    has_alert = True
-                elif self._check_rate_alerts(sample):
-                    has_alert = True
-                if has_alert:
-                    # Marquer sur les trois graphiques
-                    marker1 = self.ax1.axvline(x=i, color='red', alpha=0.5, linewidth=1)
-                    marker2 = self.ax2.axvline(x=i, color='red', alpha=0.5, linewidth=1)
-                    marker3 = self.ax3.axvline(x=i, color='red', alpha=0.5, linewidth=1)
-                    self.alert_markers.extend([marker1, marker2, marker3])
+            if start_idx is None:
+                if self.is_real_time:
+                    start_idx = max(0, total - self.current_view_window)
+                else:
+                    start_idx = self.current_view_start
+            if end_idx is None:
+                end_idx = min(total, start_idx + self.current_view_window)
+
+            # Alertes de la plage, au plus un marqueur par colonne de pixels
+            self._sync_level_of_detail()
+            width = int(self.ax1.bbox.width) or None
+            x = self.alert_index.between(start_idx, end_idx, max_markers=width) - start_idx
+
+            # Un segment vertical (bas → haut de l'axe) par alerte, sur les trois graphiques
+            segments = np.zeros((len(x), 2, 2))
+            segments[:, :, 0] = x[:, None]
+            segments[:, 1, 1] = 1
+            for collection in self.alert_collections:
+                collection.set_segments(segments)
         except Exception as e:
             logging.error(f"Erreur dans mark_alerts_on_graphs: {str(e)}")
             # Éviter le crash en cas d'erreur
 
+    def _critical_alert_mask(self, start, stop):
+        """Échantillons marqués sur les graphiques (signal ou qualité critiques)"""
+        return (
+            (self.samples.column('signal', start, stop) < -85)
+            | (self.samples.column('quality', start, stop) < 20)
+        )
+
+    def _sync_level_of_detail(self):
+        """Intègre les nouveaux échantillons aux pyramides et à l'index d'alertes"""
+        if self._lod_store is not self.samples:
+            # Nouvelle session : repartir de zéro
+            self._lod_store = self.samples
+            self.pyramids = {name: MinMaxPyramid() for name in ('signal', 'quality', 'jitter')}
+            self.alert_index.reset()
+        for name, pyramid in self.pyramids.items():
+            pyramid.sync(self.samples.column(name))
+        self.alert_index.sync(len(self.samples))
+
+    def _decimated(self, name, start, stop, ax):
+        """Points d'une série pour la plage [start, stop), relatifs au début de la vue"""
+        max_points = max(200, int(ax.bbox.width) * 2)
+        positions, values = self.pyramids[name].decimate(self.samples.column(name), start, stop, max_points)
+        return positions - start, values
+
     def update_stats(self):
         """Met à jour les statistiques dans l'interface"""
         if not self.samples:
             return        # Calcul des statistiques
         current_sample = self.samples[-1]  # Dernier échantillon
-        signal_values = [s.signal_strength for s in self.samples[-100:]]  # 100 derniers échantillons (augmenté de 20 à 100)
-        quality_values = [s.quality for s in self.samples[-100:]]
-        latency_values = [s.ping_latency for s in self.samples[-100:] if s.ping_latency >= 0]
-        jitter_values = [s.jitter for s in self.samples[-100:]]
+        recent = self.samples.stats.recent  # 100 derniers échantillons, mis à jour à l'ajout
 
         # Stats WiFi actuelles
         stats_text = "=== État Actuel ===\n"
@@ -1326,26 +1793,32 @@ class NetworkAnalyzerUI:
                 stats_text += f"Cible: {self.analyzer.wifi_collector.ping_target}\n"
 
         # Stats moyennes (100 derniers échantillons)
-        avg_signal = sum(signal_values) / len(signal_values)
-        avg_quality = sum(quality_values) / len(quality_values)
-        stats_text += "\n=== Moyenne (100 éch.) ===\n"
-        stats_text += f"Signal : {avg_signal:.1f} dBm\n"
-        stats_text += f"Qualité: {avg_quality:.1f}%\n"
-        if latency_values:
-            avg_latency = sum(latency_values) / len(latency_values)
-            avg_jitter = sum(jitter_values) / len(jitter_values) if jitter_values else 0
-            stats_text += f"Latence: {avg_latency:.1f} ms\n"
-            stats_text += f"Jitter: {avg_jitter:.1f} ms\n"
+        stats_text += f"\n=== Moyenne ({recent['signal'].slots} éch.) ===\n"
+        stats_text += f"Signal : {recent['signal'].mean:.1f} dBm\n"
+        stats_text += f"Qualité: {recent['quality'].mean:.1f}%\n"
+        if len(recent['latency']):
+            stats_text += f"Latence: {recent['latency'].mean:.1f} ms\n"
+            stats_text += f"Latence P95: {recent['latency'].percentile(95):.1f} ms\n"
+            stats_text += f"Jitter: {recent['jitter'].mean or 0:.1f} ms\n"
 
         # Débits actuels
         try:
-            tx_rate = int(current_sample.raw_data.get('TransmitRate', '0 Mbps').split()[0])
-            rx_rate = int(current_sample.raw_data.get('ReceiveRate', '0 Mbps').split()[0])
+            tx_rate = int(parse_rate_mbps(current_sample.transmit_rate))
+            rx_rate = int(parse_rate_mbps(current_sample.receive_rate))
             stats_text += "\n=== Débits ===\n"
             stats_text += f"TX: {tx_rate} Mbps\n"
             stats_text += f"RX: {rx_rate} Mbps"
         except (ValueError, IndexError, KeyError):
-            pass        # Mise à jour du texte
+            pass
+
+        # État de la file de collecte : signale une interface en retard
+        if self.sample_pipeline is not None:
+            pipeline = self.sample_pipeline.stats()
+            stats_text += "\n\n=== File de collecte ===\n"
+            stats_text += f"En attente: {pipeline['depth']}/{pipeline['maxsize']}\n"
+            stats_text += f"Perdus: {pipeline['dropped']}"
+
+        # Mise à jour du texte
         self.stats_text.delete('1.0', tk.END)
         self.stats_text.insert('1.0', stats_text)
 
@@ -1354,11 +1827,15 @@ class NetworkAnalyzerUI:
         try:
             filepath = filedialog.asksaveasfilename(
                 defaultextension=".json",
-                filetypes=[("Fichiers JSON", "*.json")],
+                filetypes=[("Fichiers JSON", "*.json"), ("Session colonnaire", "*.wfc")],
                 title="Exporter l'analyse"
             )
             if filepath:
-                self.analyzer.export_data(filepath)
+                if filepath.endswith(".wfc"):
+                    # Échantillons bruts, compressés, pour l'analyse a posteriori
+                    self.analyzer.export_samples_columnar(filepath)
+                else:
+                    self.analyzer.export_data(filepath)
                 messagebox.showinfo(
                     "Export réussi",
                     f"Les données ont été exportées vers :\n{filepath}"
@@ -1382,7 +1859,7 @@ class NetworkAnalyzerUI:
                 'quality': 0,
                 'alerts': [f"📢 {message}"]
             }
-            self.wifi_history_entries.append(entry)
+            self._push_history_entry(entry)
             self.update_wifi_history_display()
 
     def show_error(self, error_message: str):
@@ -1399,7 +1876,7 @@ class NetworkAnalyzerUI:
             'quality': 0,
             'alerts': [f"🔴 ERREUR: {error_message}"]
         }
-        self.wifi_history_entries.append(entry)
+        self._push_history_entry(entry)
         self.update_wifi_history_display()
 
     # ===== Fonctions Monitoring AMR =====
@@ -1429,6 +1906,7 @@ class NetworkAnalyzerUI:
 
     def start_amr_monitoring(self) -> None:
         """Démarre le monitoring AMR"""
+        from amr_monitor import AMRMonitor
         self.amr_monitor = AMRMonitor(self.amr_ips)
         self.amr_monitor.start(callback=self.update_amr_status)
         self.amr_start_button.config(state=tk.DISABLED)
@@ -1858,16 +2336,17 @@ class NetworkAnalyzerUI:
 
         current_pos = self.current_view_start if not self.is_real_time else len(self.samples)
 
-        for i, sample in enumerate(self.samples[current_pos:], current_pos):
-            if self._has_alert(sample):
-                self.is_real_time = False
-                self.view_mode.set("analysis")
-                self.current_view_start = max(0, i - 30)  # Centrer sur l'alerte
-                self.current_view_window = 60  # 1 minute de contexte
-                self.update_display()
-                alert_time = self._get_relative_time(i)
-                self.context_label.config(text=f"🚨 Alerte trouvée {alert_time}")
-                return
+        alerts = np.flatnonzero(self._alert_mask(current_pos))
+        if alerts.size:
+            i = current_pos + int(alerts[0])
+            self.is_real_time = False
+            self.view_mode.set("analysis")
+            self.current_view_start = max(0, i - 30)  # Centrer sur l'alerte
+            self.current_view_window = 60  # 1 minute de contexte
+            self.update_display()
+            alert_time = self._get_relative_time(i)
+            self.context_label.config(text=f"🚨 Alerte trouvée {alert_time}")
+            return
 
         self.context_label.config(text="✅ Aucune alerte trouvée après cette position")
 
@@ -1880,16 +2359,17 @@ class NetworkAnalyzerUI:
         current_pos = self.current_view_start if not self.is_real_time else len(self.samples)
 
         # Chercher en arrière
-        for i in range(min(current_pos - 1, len(self.samples) - 1), -1, -1):
-            if self._has_alert(self.samples[i]):
-                self.is_real_time = False
-                self.view_mode.set("analysis")
-                self.current_view_start = max(0, i - 30)
-                self.current_view_window = 60
-                self.update_display()
-                alert_time = self._get_relative_time(i)
-                self.context_label.config(text=f"🚨 Alerte précédente {alert_time}")
-                return
+        alerts = np.flatnonzero(self._alert_mask(0, max(0, current_pos)))
+        if alerts.size:
+            i = int(alerts[-1])
+            self.is_real_time = False
+            self.view_mode.set("analysis")
+            self.current_view_start = max(0, i - 30)
+            self.current_view_window = 60
+            self.update_display()
+            alert_time = self._get_relative_time(i)
+            self.context_label.config(text=f"🚨 Alerte précédente {alert_time}")
+            return
 
         self.context_label.config(text="✅ Aucune alerte trouvée avant cette position")
 
@@ -1899,8 +2379,8 @@ class NetworkAnalyzerUI:
             self.context_label.config(text="❌ Aucune donnée disponible")
             return
 
-        signals = [s.signal_strength for s in self.samples]
-        peak_idx = signals.index(max(signals))
+        signals = self.samples.signal
+        peak_idx = int(np.argmax(signals))
 
         self.is_real_time = False
         self.view_mode.set("analysis")
@@ -1918,7 +2398,7 @@ class NetworkAnalyzerUI:
                 ap_info += f" ({sample.ssid})"
 
         self.context_label.config(
-            text=f"📈 Meilleur signal: {max(signals)} dBm {peak_time}{ap_info}"
+            text=f"📈 Meilleur signal: {signals[peak_idx]} dBm {peak_time}{ap_info}"
         )
 
     def go_to_signal_low(self):
@@ -1927,8 +2407,8 @@ class NetworkAnalyzerUI:
             self.context_label.config(text="❌ Aucune donnée disponible")
             return
 
-        signals = [s.signal_strength for s in self.samples]
-        low_idx = signals.index(min(signals))
+        signals = self.samples.signal
+        low_idx = int(np.argmin(signals))
 
         self.is_real_time = False
         self.view_mode.set("analysis")
@@ -2028,7 +2508,8 @@ class NetworkAnalyzerUI:
         # Créer une nouvelle figure pour le plein écran avec une taille adaptée
         fig_width = max(10, min(16, screen_width / 100))
         fig_height = max(6, min(10, screen_height / 120))
-        fs_fig = Figure(figsize=(fig_width, fig_height))
+        mpl = _matplotlib()
+        fs_fig = mpl.Figure(figsize=(fig_width, fig_height))
         fs_fig.subplots_adjust(hspace=0.4, left=0.1, right=0.95, top=0.95, bottom=0.15)
 
         # Signal subplot
@@ -2066,11 +2547,14 @@ class NetworkAnalyzerUI:
         canvas_frame = ttk.Frame(self.fullscreen_window)
         canvas_frame.pack(fill=tk.BOTH, expand=True)
 
-        self.fs_canvas = FigureCanvasTkAgg(fs_fig, master=canvas_frame)
+        self.fs_canvas = mpl.FigureCanvasTkAgg(fs_fig, master=canvas_frame)
         self.fs_canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+        self.fs_blitter = BlitRenderer(
+            self.fs_canvas, [self.fs_signal_line, self.fs_quality_line, self.fs_jitter_line]
+        )
 
         # Toolbar de navigation
-        fs_toolbar = NavigationToolbar2Tk(self.fs_canvas, canvas_frame)
+        fs_toolbar = mpl.NavigationToolbar2Tk(self.fs_canvas, canvas_frame)
         fs_toolbar.update()
 
         # Frame pour les boutons en bas
@@ -2094,63 +2578,63 @@ class NetworkAnalyzerUI:
 
         try:
             # Utiliser exactement la même logique que la vue principale
-            samples_snapshot = list(self.samples)
+            total = len(self.samples)
 
             # Ajuster current_view_window pour la vue "total" (même logique que update_display)
             if self.temporal_view == "total":
-                self.current_view_window = len(samples_snapshot) if samples_snapshot else 300
+                self.current_view_window = total if total else 300
 
             # Déterminer la plage d'affichage selon le mode (même logique que update_display)
             if self.is_real_time:
-                start_idx = max(0, len(samples_snapshot) - self.current_view_window)
-                end_idx = len(samples_snapshot)
+                start_idx = max(0, total - self.current_view_window)
+                end_idx = total
             else:
                 start_idx = self.current_view_start
-                end_idx = min(len(samples_snapshot), start_idx + self.current_view_window)
+                end_idx = min(total, start_idx + self.current_view_window)
 
             # Extraire les données à afficher (même vue que l'écran principal)
-            display_samples = samples_snapshot[start_idx:end_idx]
-            if not display_samples:
+            if end_idx <= start_idx:
                 return
-
-            signals = [s.signal_strength for s in display_samples]
-            qualities = [s.quality for s in display_samples]
-            jitters = [s.jitter for s in display_samples]
-            x_data = range(len(signals))
+            self._sync_level_of_detail()
+            x_data, signals = self._decimated('signal', start_idx, end_idx, self.fs_ax1)
+            x_quality, qualities = self._decimated('quality', start_idx, end_idx, self.fs_ax2)
+            x_jitter, jitters = self._decimated('jitter', start_idx, end_idx, self.fs_ax3)
+            span = max(1, end_idx - start_idx - 1)
+            if self.temporal_view == "total":
+                span = stable_limit(span, 60)
 
             # Mettre à jour les données
             if hasattr(self, 'fs_signal_line') and self.fs_signal_line is not None:
                 self.fs_signal_line.set_data(x_data, signals)
 
                 # Ajuster automatiquement les axes Y pour le signal
-                if signals and hasattr(self, 'fs_ax1'):
-                    min_signal = min(signals)
-                    max_signal = max(signals)
-                    # Ajouter une marge de 5 dBm de chaque côté
+                if hasattr(self, 'fs_ax1'):
+                    min_signal = int(signals.min())
+                    max_signal = int(signals.max())
+                    # Ajouter une marge de 5 dBm de chaque côté, arrondie au pas de 5 dBm
                     margin = 5
-                    self.fs_ax1.set_ylim(min_signal - margin, max_signal + margin)
+                    self.fs_ax1.set_ylim(-stable_limit(margin - min_signal, 5),
+                                         stable_limit(max_signal + margin, 5))
                     # Ajuster l'axe X
-                    if len(x_data) > 0:
-                        self.fs_ax1.set_xlim(0, max(x_data) if x_data else 1)
+                    self.fs_ax1.set_xlim(0, span)
 
             if hasattr(self, 'fs_quality_line') and self.fs_quality_line is not None:
-                self.fs_quality_line.set_data(x_data, qualities)
+                self.fs_quality_line.set_data(x_quality, qualities)
 
                 # Ajuster l'axe X pour la qualité aussi
-                if hasattr(self, 'fs_ax2') and len(x_data) > 0:
-                    self.fs_ax2.set_xlim(0, max(x_data) if x_data else 1)
+                if hasattr(self, 'fs_ax2'):
+                    self.fs_ax2.set_xlim(0, span)
 
             if hasattr(self, 'fs_jitter_line') and self.fs_jitter_line is not None:
-                self.fs_jitter_line.set_data(x_data, jitters)
+                self.fs_jitter_line.set_data(x_jitter, jitters)
 
-                if hasattr(self, 'fs_ax3') and len(x_data) > 0:
-                    self.fs_ax3.set_xlim(0, max(x_data) if x_data else 1)
-                    if jitters:
-                        self.fs_ax3.set_ylim(0, max(jitters) + 5)
+                if hasattr(self, 'fs_ax3'):
+                    self.fs_ax3.set_xlim(0, span)
+                    self.fs_ax3.set_ylim(0, stable_limit(float(jitters.max()) + 5, 10))
 
-            # Redessiner
-            if hasattr(self, 'fs_canvas') and self.fs_canvas is not None:
-                self.fs_canvas.draw_idle()
+            # Redessiner (blitting si les limites n'ont pas changé)
+            if getattr(self, 'fs_blitter', None) is not None:
+                self.fs_blitter.update()
 
         except Exception as e:
             logging.error(f"Erreur dans update_fullscreen_display: {str(e)}")
@@ -2351,6 +2835,14 @@ class NetworkAnalyzerUI:
         except Exception:
             return False
 
+    def _alert_mask(self, start=None, stop=None):
+        """Masque vectorisé des échantillons en alerte (mêmes seuils que _has_alert)"""
+        return (
+            (self.samples.column('signal', start, stop) < -75)
+            | (self.samples.column('quality', start, stop) < 50)
+            | (self.samples.column('latency', start, stop) > 100)
+        )
+
     def _get_relative_time(self, index):
         """Obtient le temps relatif pour un index donné"""
         try:
@@ -2417,10 +2909,7 @@ class NetworkAnalyzerUI:
             mac_text.insert('1.0', "=== MAC ADDRESSES CONNUES ===\n\n")
 
             # Afficher quelques MAC d'exemple s'il y en a dans les échantillons
-            unique_macs = set()
-            for sample in self.samples:
-                if hasattr(sample, 'bssid') and sample.bssid:
-                    unique_macs.add(sample.bssid)
+            unique_macs = {mac for mac in self.samples.unique_bssids() if mac}
 
             if unique_macs:
                 for mac in sorted(unique_macs):
@@ -2459,27 +2948,26 @@ class NetworkAnalyzerUI:
                     self.wifi_advanced_stats_text.insert('1.0', "=== Statistiques WiFi Avancées ===\n\nAucune donnée disponible.\nDémarrez la collecte pour voir les statistiques.")
                 return
 
-            # Calculer les statistiques sur les dernières entrées
-            recent_entries = self.wifi_history_entries[-300:]  # 300 dernières entrées
+            # Statistiques glissantes sur les 300 derniers échantillons (mises à jour en O(1))
+            stats = self.history_stats
+            total_samples = len(stats['signal'])
+            if not total_samples:
+                return
 
             # Compter les alertes
-            total_samples = len(recent_entries)
-            samples_with_alerts = sum(1 for entry in recent_entries if entry.get('alerts', []))
-            alert_percentage = (samples_with_alerts / total_samples * 100) if total_samples > 0 else 0
-
-            # Calculer les moyennes
-            signals = [entry['signal'] for entry in recent_entries]
-            qualities = [entry['quality'] for entry in recent_entries]
-            latencies = [entry['latency'] for entry in recent_entries if entry.get('latency', -1) >= 0]
-            jitters = [entry['jitter'] for entry in recent_entries if 'jitter' in entry and entry['jitter'] > 0]
-
-            avg_signal = sum(signals) / len(signals) if signals else 0
-            avg_quality = sum(qualities) / len(qualities) if qualities else 0
-            avg_latency = sum(latencies) / len(latencies) if latencies else 0
-            avg_jitter = sum(jitters) / len(jitters) if jitters else 0
-
-            min_signal = min(signals) if signals else 0
-            max_signal = max(signals) if signals else 0
+            samples_with_alerts = int(round(stats['alerts'].mean * total_samples))
+            alert_percentage = stats['alerts'].mean * 100
+
+            # Moyennes
+            avg_signal = stats['signal'].mean
+            avg_quality = stats['quality'].mean
+            latencies = len(stats['latency'])
+            jitters = len(stats['jitter'])
+            avg_latency = stats['latency'].mean if latencies else 0
+            avg_jitter = stats['jitter'].mean if jitters else 0
+
+            min_signal = stats['signal'].min
+            max_signal = stats['signal'].max
 
             # Construire le texte des statistiques
             stats_text = "=== STATISTIQUES WIFI AVANCÉES ===\n\n"
@@ -0,0 +1,151 @@
+"""
+Cache disque des analyses OpenAI.
+
+Relancer l'analyse sur les mêmes logs coûte 10 à 60 s et des tokens. Les
+réponses sont donc conservées sur disque, adressées par une empreinte des
+entrées : logs normalisés, configuration, instructions personnalisées,
+modèle et température. Le cache est borné en taille (éviction des entrées
+les moins récemment utilisées) et les entrées expirent après un délai.
+
+Variables d'environnement :
+    AI_CACHE_DIR : répertoire du cache (défaut : ``cache/ai`` de l'application)
+    AI_CACHE_DISABLED : ``1`` pour désactiver le cache
+"""
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import time
+from typing import Any, Callable, Optional
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+                                 "cache", "ai")
+DEFAULT_MAX_BYTES = 50 * 1024 * 1024
+DEFAULT_TTL_SECONDS = 7 * 24 * 3600
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_logs(logs: str) -> str:
+    """Logs sans différences de fins de ligne, d'espaces finaux ni de lignes vides."""
+    return "\n".join(line.rstrip() for line in logs.replace("\r\n", "\n").split("\n") if line.strip())
+
+
+def cache_key(logs: str, config: Any, custom_instructions: Optional[str], model: str,
+              temperature: float, kind: str = "") -> str:
+    """Empreinte SHA-256 des entrées d'une analyse."""
+    payload = json.dumps({
+        "kind": kind,
+        "logs": normalize_logs(logs),
+        "config": config,
+        "instructions": (custom_instructions or "").strip(),
+        "model": model,
+        "temperature": temperature,
+    }, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class AnalysisCache:
+    """
+    Cache clé → réponse JSON, une entrée par fichier.
+
+    La date de dernière utilisation est la date de modification du fichier,
+    mise à jour à chaque lecture : l'éviction supprime les plus anciennes
+    jusqu'à repasser sous ``max_bytes``.
+
+    Args:
+        directory: répertoire du cache
+        max_bytes: taille totale maximale des entrées
+        ttl_seconds: durée de vie d'une entrée
+        clock: source de temps (remplaçable en test)
+    """
+
+    def __init__(self, directory: str = DEFAULT_CACHE_DIR, max_bytes: int = DEFAULT_MAX_BYTES,
+                 ttl_seconds: float = DEFAULT_TTL_SECONDS, clock: Callable[[], float] = time.time):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.clock = clock
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+
+    def get(self, key: str) -> Optional[dict]:
+        """
+        Entrée ``{"value", "created"}`` de la clé, ou None si absente ou expirée.
+        """
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        now = self.clock()
+        if now - entry.get("created", 0) > self.ttl_seconds:
+            self._remove(path)
+            return None
+        try:
+            os.utime(path, (now, now))
+        except OSError:
+            pass
+        return entry
+
+    def set(self, key: str, value: Any) -> None:
+        """Enregistre une réponse puis applique la limite de taille."""
+        now = self.clock()
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump({"created": now, "value": value}, f, ensure_ascii=False)
+            os.utime(tmp, (now, now))
+            os.replace(tmp, self._path(key))
+        except OSError as e:
+            logger.warning(f"Impossible d'écrire dans le cache d'analyse: {e}")
+            self._remove(tmp)
+            return
+        self.evict()
+
+    def evict(self) -> int:
+        """Supprime les entrées expirées puis les moins récentes au-delà de la taille maximale."""
+        now = self.clock()
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(".json"):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        entries.sort()
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for mtime, size, path in entries:
+            if total <= self.max_bytes and now - mtime <= self.ttl_seconds:
+                continue
+            self._remove(path)
+            total -= size
+            removed += 1
+        return removed
+
+    def clear(self) -> None:
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(".json"):
+                self._remove(entry.path)
+
+    @staticmethod
+    def _remove(path: str) -> None:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+def get_cache() -> Optional[AnalysisCache]:
+    """Cache d'analyse configuré par l'environnement, ou None s'il est désactivé."""
+    if os.getenv("AI_CACHE_DISABLED") == "1":
+        return None
+    try:
+        return AnalysisCache(os.getenv("AI_CACHE_DIR") or DEFAULT_CACHE_DIR)
+    except OSError as e:
+        logger.warning(f"Cache d'analyse indisponible: {e}")
+        return None
@@ -7,6 +7,8 @@ import os
 import json
 import requests
 
+from src.ai.openai_client import get_client
+
 class MoxaAIAnalyzer:
     """Analyseur centralisé utilisant l'IA pour toutes les analyses liées à Moxa."""
     
@@ -16,7 +18,6 @@ class MoxaAIAnalyzer:
         self.model = "gpt-4"
         self.max_tokens = 2000
         self.temperature = 0.2
-        self.api_url = "https://api.openai.com/v1/chat/completions"
 
     def _call_openai_api(self, prompt):
         """
@@ -32,18 +33,12 @@ class MoxaAIAnalyzer:
             Exception: Si une erreur survient lors de l'appel API
         """
         try:
-            response = requests.post(
-                self.api_url,
-                headers={
-                    "Authorization": f"Bearer {self.api_key}",
-                    "Content-Type": "application/json"
-                },
-                json={
-                    "model": self.model,
-                    "messages": [{"role": "user", "content": prompt}],
-                    "temperature": self.temperature,
-                    "max_tokens": self.max_tokens
-                },
+            response = get_client().chat(
+                [{"role": "user", "content": prompt}],
+                model=self.model,
+                temperature=self.temperature,
+                max_tokens=self.max_tokens,
+                api_key=self.api_key,
                 timeout=60
             )
 
@@ -0,0 +1,370 @@
+"""
+Analyse IA des logs Moxa qui dépassent le budget du prompt.
+
+Un export réel fait plusieurs Mo alors que le prompt n'en contient que
+quelques milliers de caractères. Plutôt que d'envoyer le début et la fin :
+
+1. le log est agrégé localement en un résumé compact (comptes par type
+   d'événement, par AP et par tranche horaire, handoff, ping-pong) ;
+2. seules les lignes portant un événement sont conservées et découpées en
+   morceaux qui tiennent dans le budget de tokens ;
+3. chaque morceau est analysé avec le résumé global, plusieurs à la fois ;
+4. les réponses partielles sont fusionnées au format JSON habituel, les
+   comptes du résumé local faisant foi.
+"""
+
+import json
+import logging
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import timedelta
+from typing import Callable, Dict, List, Optional
+
+from moxa_log_parser import HANDOFF, ROAM, TimestampParser, iter_events, iter_log_lines
+from moxa_roaming_analyzer import detect_ping_pong
+
+# Approximation usuelle pour les modèles OpenAI : ~4 caractères par token
+CHARS_PER_TOKEN = 4
+MAX_APS_IN_SUMMARY = 30
+MAX_PING_PONG_IN_SUMMARY = 30
+# Les tranches horaires ne sont pas élargies au-delà d'une journée
+MAX_BUCKET_MINUTES = 24 * 60
+
+logger = logging.getLogger(__name__)
+
+
+def estimate_tokens(text: str) -> int:
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+@dataclass
+class LogDigest:
+    """Résumé local d'un log et lignes d'événements à transmettre."""
+    total_lines: int = 0
+    counts: Counter = field(default_factory=Counter)
+    per_ap: Dict[str, Counter] = field(default_factory=lambda: defaultdict(Counter))
+    per_bucket: Dict[str, Counter] = field(default_factory=lambda: defaultdict(Counter))
+    handoff_times: List[float] = field(default_factory=list)
+    ping_pong: List[dict] = field(default_factory=list)
+    event_lines: List[str] = field(default_factory=list)
+    bucket_minutes: int = 5
+
+    def summary(self) -> dict:
+        """Résumé sérialisable, borné en taille."""
+        top_aps = sorted(self.per_ap.items(), key=lambda item: -sum(item[1].values()))[:MAX_APS_IN_SUMMARY]
+        summary = {
+            "lignes_totales": self.total_lines,
+            "lignes_evenements": len(self.event_lines),
+            "evenements": dict(self.counts),
+            "par_ap": {ap: dict(counts) for ap, counts in top_aps},
+            f"par_tranche_{self.bucket_minutes}min": {bucket: dict(counts)
+                                                       for bucket, counts in sorted(self.per_bucket.items())},
+            "ping_pong": [
+                {"paire": f"{p['ap_a']}-{p['ap_b']}", "occurrences": p["count"],
+                 "intervalle_min_s": p["min_interval_s"]}
+                for p in self.ping_pong[:MAX_PING_PONG_IN_SUMMARY]
+            ],
+        }
+        if self.handoff_times:
+            summary["handoff_ms"] = {
+                "min": min(self.handoff_times),
+                "max": max(self.handoff_times),
+                "moyen": round(sum(self.handoff_times) / len(self.handoff_times), 1),
+                "nombre": len(self.handoff_times),
+            }
+        return summary
+
+    def summary_text(self, max_tokens: int) -> str:
+        """
+        Résumé JSON tenant si possible dans ``max_tokens`` : les tranches
+        horaires sont élargies (jusqu'à une par jour), puis retirées en
+        dernier recours.
+        """
+        summary = self.summary()
+        text = json.dumps(summary, ensure_ascii=False, separators=(",", ":"))
+        while (estimate_tokens(text) > max_tokens and len(self.per_bucket) > 1
+               and self.bucket_minutes < MAX_BUCKET_MINUTES):
+            self._widen_buckets()
+            summary = self.summary()
+            text = json.dumps(summary, ensure_ascii=False, separators=(",", ":"))
+        if estimate_tokens(text) > max_tokens:
+            del summary[f"par_tranche_{self.bucket_minutes}min"]
+            text = json.dumps(summary, ensure_ascii=False, separators=(",", ":"))
+        return text
+
+    def _widen_buckets(self) -> None:
+        self.bucket_minutes = min(self.bucket_minutes * 2, MAX_BUCKET_MINUTES)
+        merged: Dict[str, Counter] = defaultdict(Counter)
+        for bucket, counts in self.per_bucket.items():
+            merged[_bucket_key_from_label(bucket, self.bucket_minutes)].update(counts)
+        self.per_bucket = merged
+
+
+def _bucket_label(timestamp, minutes: int) -> str:
+    if timestamp is None:
+        return "sans_horodatage"
+    floored = timestamp - timedelta(minutes=timestamp.minute % minutes, seconds=timestamp.second,
+                                    microseconds=timestamp.microsecond)
+    return floored.strftime("%Y-%m-%d %H:%M")
+
+
+def _bucket_key_from_label(label: str, minutes: int) -> str:
+    if label == "sans_horodatage":
+        return label
+    day, hour_minute = label.split(" ")
+    hour, minute = hour_minute.split(":")
+    total = int(hour) * 60 + int(minute)
+    total -= total % minutes
+    return f"{day} {total // 60:02d}:{total % 60:02d}"
+
+
+def build_digest(logs, bucket_minutes: int = 5) -> LogDigest:
+    """Agrège un log (texte ou lignes) en un passage."""
+    digest = LogDigest(bucket_minutes=bucket_minutes)
+    roams = []
+    last_line = 0
+    for event in iter_events(_counting(iter_log_lines(logs), digest), timestamps=TimestampParser()):
+        digest.counts[event.kind] += 1
+        if event.mac:
+            digest.per_ap[event.mac][event.kind] += 1
+        digest.per_bucket[_bucket_label(event.timestamp, bucket_minutes)][event.kind] += 1
+        if event.kind == HANDOFF:
+            digest.handoff_times.append(event.value)
+        if event.kind == ROAM and event.detail == "roaming":
+            roams.append((event.timestamp, event.mac, event.previous_mac))
+        if event.line_no != last_line:
+            digest.event_lines.append(event.line)
+            last_line = event.line_no
+    digest.ping_pong = detect_ping_pong(roams)
+    return digest
+
+
+def _counting(lines, digest: LogDigest):
+    for line in lines:
+        digest.total_lines += 1
+        yield line
+
+
+def chunk_lines(lines: List[str], max_tokens: int) -> List[str]:
+    """Regroupe des lignes en morceaux d'au plus ``max_tokens`` (une ligne trop longue est coupée)."""
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    chunks, current, size = [], [], 0
+    for line in lines:
+        line = line[:max_chars]
+        if current and size + len(line) + 1 > max_chars:
+            chunks.append("\n".join(current))
+            current, size = [], 0
+        current.append(line)
+        size += len(line) + 1
+    if current:
+        chunks.append("\n".join(current))
+    return chunks
+
+
+def spread(items: list, limit: int) -> list:
+    """Au plus ``limit`` éléments répartis régulièrement sur toute la liste."""
+    if len(items) <= limit:
+        return items
+    step = len(items) / limit
+    return [items[int(i * step)] for i in range(limit)]
+
+
+def digest_for_prompt(logs: str, max_chars: int) -> str:
+    """
+    Texte de log à placer dans un prompt unique : le log tel quel s'il tient
+    dans ``max_chars``, sinon le résumé local suivi d'un échantillon réparti
+    des lignes d'événements.
+    """
+    if len(logs) <= max_chars:
+        return logs
+    digest = build_digest(logs)
+    summary = digest.summary_text(max_chars // CHARS_PER_TOKEN // 3)
+    remaining = max(0, max_chars - len(summary) - 200)
+    lines = digest.event_lines
+    events_text = "\n".join(lines)
+    if len(events_text) > remaining:
+        # Garder des lignes réparties sur tout le log plutôt que le début et la fin
+        average = max(1, len(events_text) // max(1, len(lines)))
+        keep = max(1, remaining // (average + 1))
+        events_text = "\n".join(spread(lines, keep))[:remaining]
+    return (
+        f"RÉSUMÉ AGRÉGÉ LOCALEMENT ({digest.total_lines} lignes):\n{summary}\n\n"
+        f"LIGNES D'ÉVÉNEMENTS (échantillon de {len(lines)} lignes):\n{events_text}"
+    )
+
+
+def map_chunks(chunks: List[str], analyze_chunk: Callable[[str, int, int], dict],
+               max_workers: int = 4) -> List[Optional[dict]]:
+    """
+    Analyse les morceaux en parallèle (au plus ``max_workers`` appels simultanés).
+    Un morceau en échec donne None.
+    """
+    def run(index: int) -> Optional[dict]:
+        try:
+            result = analyze_chunk(chunks[index], index + 1, len(chunks))
+        except Exception as e:
+            logger.warning(f"Analyse du morceau {index + 1}/{len(chunks)} impossible: {e}")
+            return None
+        if not isinstance(result, dict) or "error" in result:
+            logger.warning(f"Réponse invalide pour le morceau {index + 1}/{len(chunks)}")
+            return None
+        return result
+
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(chunks)))) as pool:
+        return list(pool.map(run, range(len(chunks))))
+
+
+# --- Fusion des réponses partielles ----------------------------------------
+
+def _unique(items):
+    seen, result = set(), []
+    for item in items:
+        key = json.dumps(item, sort_keys=True, ensure_ascii=False) if isinstance(item, (dict, list)) else item
+        if key not in seen:
+            seen.add(key)
+            result.append(item)
+    return result
+
+
+def _numbers(values):
+    result = []
+    for value in values:
+        try:
+            result.append(float(value))
+        except (TypeError, ValueError):
+            pass
+    return result
+
+
+def _section(partials, *path):
+    for partial in partials:
+        node = partial
+        for key in path:
+            node = node.get(key) if isinstance(node, dict) else None
+        if isinstance(node, dict):
+            yield node
+
+
+def reduce_analyses(partials: List[dict], digest: LogDigest) -> dict:
+    """Fusionne les analyses partielles au format de ``MoxaLogAnalyzer.analyze_logs``."""
+    scores = _numbers(p.get("score_global") for p in partials)
+    ping = list(_section(partials, "analyse_detaillee", "ping_pong"))
+    snr = list(_section(partials, "analyse_detaillee", "problemes_snr"))
+    auth = list(_section(partials, "analyse_detaillee", "timeouts_auth"))
+    handoff = list(_section(partials, "analyse_detaillee", "handoff"))
+    wlan = list(_section(partials, "analyse_detaillee", "stabilite_wlan"))
+
+    # Le morceau le plus sévère fournit les suggestions de configuration
+    worst = min(partials, key=lambda p: _numbers([p.get("score_global")]) or [100])
+
+    ping_pairs = digest.ping_pong
+    result = {
+        "adapte_flotte_AMR": all(p.get("adapte_flotte_AMR", True) for p in partials),
+        "score_global": round(min(scores)) if scores else 0,
+        "analyse_detaillee": {
+            "ping_pong": {
+                "detecte": bool(ping_pairs) or any(s.get("detecte") for s in ping),
+                "occurrences": [f"{p['ap_a']}-{p['ap_b']}: {p['count']} fois" for p in ping_pairs]
+                or _unique(o for s in ping for o in s.get("occurrences", [])),
+                "gravite": max(_numbers(s.get("gravite") for s in ping), default=0),
+                "details": {
+                    "temps_min_entre_roaming": (
+                        f"{min(p['min_interval_s'] for p in ping_pairs):g} sec" if ping_pairs
+                        else next((s.get("details", {}).get("temps_min_entre_roaming") for s in ping
+                                   if s.get("details", {}).get("temps_min_entre_roaming")), "N/A")
+                    ),
+                    "paires_ap_affectees": [f"{p['ap_a']}-{p['ap_b']}" for p in ping_pairs]
+                    or _unique(a for s in ping for a in s.get("details", {}).get("paires_ap_affectees", [])),
+                },
+            },
+            "problemes_snr": {
+                "aps_snr_zero": _unique(a for s in snr for a in s.get("aps_snr_zero", [])),
+                "seuil_roaming_inadapte": any(s.get("seuil_roaming_inadapte") for s in snr),
+                "details": {
+                    "seuil_actuel": next((s["details"]["seuil_actuel"] for s in snr
+                                          if s.get("details", {}).get("seuil_actuel")), "N/A"),
+                    "seuil_recommande": next((s["details"]["seuil_recommande"] for s in snr
+                                              if s.get("details", {}).get("seuil_recommande")), "N/A"),
+                    "episodes_critiques": _unique(e for s in snr
+                                                  for e in s.get("details", {}).get("episodes_critiques", []))[:20],
+                },
+            },
+            "timeouts_auth": {
+                "nombre": digest.counts.get("auth_failure", 0),
+                "temps_moyen_ms": (lambda v: round(sum(v) / len(v)) if v else 0)(
+                    _numbers(s.get("temps_moyen_ms") for s in auth)),
+                "details": {
+                    "causes_principales": _unique(c for s in auth
+                                                  for c in s.get("details", {}).get("causes_principales", [])),
+                    "aps_concernes": _unique(a for s in auth for a in s.get("details", {}).get("aps_concernes", [])),
+                },
+            },
+            "handoff": _reduce_handoff(handoff, digest),
+            "stabilite_wlan": {
+                "redemarrages": int(sum(_numbers(s.get("redemarrages") for s in wlan))),
+                "causes": _unique(c for s in wlan for c in s.get("causes", [])),
+                "impact": " ".join(_unique(s.get("impact") for s in wlan if s.get("impact"))),
+            },
+        },
+        "parametres_actuels": {},
+        "recommandations": sorted(
+            _unique_by((r for p in partials for r in p.get("recommandations", []) if isinstance(r, dict)),
+                       "probleme"),
+            key=lambda r: (_numbers([r.get("priorite")]) or [5])[0],
+        )[:10],
+        "details_configuration": {
+            "suggestions": (worst.get("details_configuration") or {}).get("suggestions", {}),
+            "justifications": _unique(j for p in partials
+                                      for j in (p.get("details_configuration") or {}).get("justifications", [])),
+        },
+        "problematic_aps": _reduce_aps(partials),
+        "analysis": "\n\n".join(_unique(p.get("analysis") for p in partials if p.get("analysis"))),
+    }
+    for partial in partials:
+        for key, value in (partial.get("parametres_actuels") or {}).items():
+            result["parametres_actuels"][key] = result["parametres_actuels"].get(key, True) and bool(value)
+    return result
+
+
+def _unique_by(items, key):
+    seen, result = set(), []
+    for item in items:
+        marker = item.get(key)
+        if marker not in seen:
+            seen.add(marker)
+            result.append(item)
+    return result
+
+
+def _reduce_handoff(sections, digest: LogDigest) -> dict:
+    times = digest.handoff_times
+    distribution = next((s.get("distribution") for s in sections if s.get("distribution")), [])
+    return {
+        "min_ms": min(times) if times else min(_numbers(s.get("min_ms") for s in sections), default=0),
+        "max_ms": max(times) if times else max(_numbers(s.get("max_ms") for s in sections), default=0),
+        "moyen_ms": round(sum(times) / len(times), 1) if times else 0,
+        "distribution": distribution,
+        "details": {
+            "performances_par_ap": _unique(a for s in sections
+                                           for a in s.get("details", {}).get("performances_par_ap", [])),
+        },
+    }
+
+
+def _reduce_aps(partials) -> List[dict]:
+    merged: Dict[str, dict] = {}
+    snrs: Dict[str, List[float]] = defaultdict(list)
+    for partial in partials:
+        for ap in partial.get("problematic_aps", []) or []:
+            if not isinstance(ap, dict) or not ap.get("ap_mac"):
+                continue
+            mac = str(ap["ap_mac"]).lower()
+            entry = merged.setdefault(mac, {"ap_mac": mac, "issues": [], "occurrences": 0, "avg_snr": None})
+            entry["issues"] = _unique(entry["issues"] + list(ap.get("issues", [])))
+            entry["occurrences"] += int(sum(_numbers([ap.get("occurrences")])))
+            snrs[mac].extend(_numbers([ap.get("avg_snr")]))
+    for mac, values in snrs.items():
+        if values:
+            merged[mac]["avg_snr"] = round(sum(values) / len(values), 1)
+    return sorted(merged.values(), key=lambda ap: -ap["occurrences"])
@@ -0,0 +1,402 @@
+"""
+Client HTTP partagé pour les appels à l'API OpenAI.
+
+Tous les analyseurs passent par la même session ``requests`` : les connexions
+(et les sessions TLS) sont conservées entre les appels au lieu d'être rouvertes
+à chaque analyse. Le client ajoute :
+
+- des réessais avec attente exponentielle aléatoire (« full jitter ») sur les
+  erreurs de connexion et les réponses 5xx ;
+- la gestion des limites de débit (429) en respectant l'en-tête ``Retry-After`` ;
+- un délai d'attente par appel ;
+- des métriques de latence, de délai du premier token et de consommation de tokens ;
+- la lecture en flux (server-sent events) des réponses ``/chat/completions``.
+
+Variables d'environnement :
+    OPENAI_BASE_URL : URL de base de l'API (défaut : ``https://api.openai.com/v1``),
+        permet de viser un serveur local de test
+"""
+
+import json
+import logging
+import os
+import random
+import socket
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Callable, Iterator, Optional, Tuple, Union
+
+import requests
+from requests.adapters import HTTPAdapter
+
+DEFAULT_BASE_URL = "https://api.openai.com/v1"
+CONNECT_TIMEOUT = 10
+DEFAULT_TIMEOUT = 60
+DEFAULT_MAX_RETRIES = 3
+DEFAULT_BACKOFF = 0.5
+MAX_BACKOFF = 20.0
+# Au-delà, un Retry-After n'est pas attendu : la réponse 429 est rendue à l'appelant
+MAX_RETRY_AFTER = 60.0
+POOL_SIZE = 8
+
+RETRY_STATUSES = (500, 502, 503, 504)
+RATE_LIMIT_STATUS = 429
+
+Timeout = Union[float, Tuple[float, float]]
+
+logger = logging.getLogger(__name__)
+
+
+def get_api_url(path: str = "/chat/completions") -> str:
+    """URL de l'API OpenAI ; OPENAI_BASE_URL permet de viser un serveur local de test."""
+    base_url = os.getenv("OPENAI_BASE_URL") or DEFAULT_BASE_URL
+    return base_url.rstrip("/") + path
+
+
+def create_session(pool_size: int = POOL_SIZE) -> requests.Session:
+    """Session à connexions persistantes ; les réessais sont gérés par le client."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def parse_retry_after(value: Optional[str], now: Optional[datetime] = None) -> Optional[float]:
+    """Délai en secondes d'un en-tête ``Retry-After`` (nombre ou date HTTP)."""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - (now or datetime.now(timezone.utc))).total_seconds())
+
+
+class ClientMetrics:
+    """Compteurs d'appels, de réessais, de latence et de tokens (thread-safe)."""
+
+    def __init__(self, window: int = 200):
+        self._lock = threading.Lock()
+        self._latencies = deque(maxlen=window)
+        self._ttfts = deque(maxlen=window)
+        self.requests = 0
+        self.retries = 0
+        self.rate_limited = 0
+        self.errors = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.total_tokens = 0
+
+    def record(self, latency: float, usage: Optional[dict] = None, error: bool = False) -> None:
+        with self._lock:
+            self.requests += 1
+            self._latencies.append(latency)
+            if error:
+                self.errors += 1
+        if usage:
+            self.add_usage(usage)
+
+    def add_usage(self, usage: dict) -> None:
+        with self._lock:
+            self.prompt_tokens += int(usage.get("prompt_tokens") or 0)
+            self.completion_tokens += int(usage.get("completion_tokens") or 0)
+            self.total_tokens += int(usage.get("total_tokens") or 0)
+
+    def record_ttft(self, ttft: float) -> None:
+        with self._lock:
+            self._ttfts.append(ttft)
+
+    def record_retry(self, rate_limited: bool = False) -> None:
+        with self._lock:
+            self.retries += 1
+            if rate_limited:
+                self.rate_limited += 1
+
+    def snapshot(self) -> dict:
+        """
+        Copie des compteurs avec latences moyenne et p95 et délai moyen du
+        premier token en flux (secondes, derniers appels).
+        """
+        with self._lock:
+            latencies = sorted(self._latencies)
+            ttfts = list(self._ttfts)
+            return {
+                "requests": self.requests,
+                "retries": self.retries,
+                "rate_limited": self.rate_limited,
+                "errors": self.errors,
+                "prompt_tokens": self.prompt_tokens,
+                "completion_tokens": self.completion_tokens,
+                "total_tokens": self.total_tokens,
+                "latency_avg_s": round(sum(latencies) / len(latencies), 3) if latencies else None,
+                "latency_p95_s": round(latencies[int(0.95 * (len(latencies) - 1))], 3) if latencies else None,
+                "ttft_avg_s": round(sum(ttfts) / len(ttfts), 3) if ttfts else None,
+            }
+
+
+class ChatStream:
+    """
+    Réponse en flux de ``/chat/completions`` : itérer produit les fragments de
+    texte au fil de leur arrivée.
+
+    ``cancel`` peut être appelé depuis un autre thread : la connexion est
+    fermée et l'itération s'arrête sans erreur.
+
+    Attributes:
+        ttft: délai entre l'envoi de la requête et le premier fragment (secondes)
+        usage: consommation de tokens annoncée en fin de flux
+        finish_reason: motif de fin de la génération
+        cancelled: vrai si le flux a été annulé
+    """
+
+    def __init__(self, response: requests.Response, started: float, metrics: ClientMetrics):
+        self.response = response
+        self.started = started
+        self.metrics = metrics
+        self.ttft: Optional[float] = None
+        self.usage: Optional[dict] = None
+        self.finish_reason: Optional[str] = None
+        self.cancelled = False
+
+    def cancel(self) -> None:
+        self.cancelled = True
+        # Fermer la réponse ne réveille pas une lecture bloquée dans un autre
+        # thread (attente du premier fragment) : le socket est coupé d'abord
+        connection = getattr(self.response.raw, "connection", None)
+        sock = getattr(connection, "sock", None)
+        if sock is not None:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+        self.response.close()
+
+    def __iter__(self) -> Iterator[str]:
+        try:
+            # Lignes en octets : un flux text/event-stream sans charset serait
+            # décodé en latin-1 par requests
+            for raw in self.response.iter_lines():
+                if self.cancelled:
+                    break
+                if not raw.startswith(b"data:"):
+                    continue
+                data = raw[5:].strip()
+                if data == b"[DONE]":
+                    break
+                chunk = json.loads(data.decode("utf-8"))
+                if chunk.get("usage"):
+                    self.usage = chunk["usage"]
+                for choice in chunk.get("choices") or []:
+                    self.finish_reason = choice.get("finish_reason") or self.finish_reason
+                    text = (choice.get("delta") or {}).get("content")
+                    if text:
+                        if self.ttft is None:
+                            self.ttft = time.perf_counter() - self.started
+                            self.metrics.record_ttft(self.ttft)
+                        yield text
+        except (requests.exceptions.RequestException, OSError, AttributeError):
+            # Connexion fermée par ``cancel`` depuis un autre thread
+            if not self.cancelled:
+                raise
+        finally:
+            self.response.close()
+            if self.usage:
+                self.metrics.add_usage(self.usage)
+
+
+class OpenAIClient:
+    """
+    Client OpenAI à session partagée.
+
+    ``post`` renvoie la dernière ``requests.Response`` obtenue : les appelants
+    gardent leur propre traitement des codes d'erreur. Les exceptions réseau
+    sont propagées une fois les réessais épuisés.
+
+    Args:
+        base_url: URL de base de l'API (défaut : OPENAI_BASE_URL, lue à chaque appel)
+        timeout: délai par défaut, en secondes ou ``(connexion, lecture)``
+        max_retries: nombre de réessais après le premier essai
+        backoff: attente de base, doublée à chaque réessai
+        session: session ``requests`` (créée si absente)
+        sleep: fonction d'attente (remplaçable en test)
+    """
+
+    def __init__(self, base_url: Optional[str] = None, timeout: Timeout = DEFAULT_TIMEOUT,
+                 max_retries: int = DEFAULT_MAX_RETRIES, backoff: float = DEFAULT_BACKOFF,
+                 session: Optional[requests.Session] = None,
+                 sleep: Callable[[float], None] = time.sleep):
+        self.base_url = base_url
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.session = session or create_session()
+        self.sleep = sleep
+        self.metrics = ClientMetrics()
+
+    def url(self, path: str) -> str:
+        if self.base_url:
+            return self.base_url.rstrip("/") + path
+        return get_api_url(path)
+
+    def _timeout(self, timeout: Optional[Timeout]) -> Timeout:
+        timeout = self.timeout if timeout is None else timeout
+        if isinstance(timeout, (int, float)):
+            return (min(CONNECT_TIMEOUT, timeout), timeout)
+        return timeout
+
+    def _backoff_delay(self, attempt: int) -> float:
+        return random.uniform(0, min(MAX_BACKOFF, self.backoff * (2 ** attempt)))
+
+    @staticmethod
+    def _usage(response) -> Optional[dict]:
+        try:
+            usage = response.json().get("usage")
+        except (ValueError, AttributeError):
+            return None
+        return usage if isinstance(usage, dict) else None
+
+    @staticmethod
+    def _quota_exhausted(response) -> bool:
+        # 429 « insufficient_quota » : attendre n'y changera rien
+        try:
+            error = response.json().get("error") or {}
+        except (ValueError, AttributeError):
+            return False
+        return isinstance(error, dict) and error.get("code") == "insufficient_quota"
+
+    def post(self, path: str, payload: dict, api_key: Optional[str] = None,
+             timeout: Optional[Timeout] = None) -> requests.Response:
+        """
+        Envoie ``payload`` en JSON sur ``path`` (ex. ``/chat/completions``).
+
+        Args:
+            path: chemin relatif à l'URL de base
+            payload: corps de la requête
+            api_key: clé API (défaut : OPENAI_API_KEY)
+            timeout: délai de cet appel (défaut : celui du client)
+        """
+        return self._send(path, payload, api_key, timeout)[0]
+
+    def _send(self, path: str, payload: dict, api_key: Optional[str], timeout: Optional[Timeout],
+              stream: bool = False) -> Tuple[requests.Response, float]:
+        # Réponse finale et instant d'envoi de la requête qui l'a produite
+        url = self.url(path)
+        headers = {
+            "Authorization": f"Bearer {api_key or os.getenv('OPENAI_API_KEY', '')}",
+            "Content-Type": "application/json",
+        }
+        timeout = self._timeout(timeout)
+        attempt = 0
+        while True:
+            started = time.perf_counter()
+            try:
+                response = self.session.post(url, headers=headers, json=payload, timeout=timeout,
+                                             stream=stream)
+            except requests.exceptions.ConnectionError as e:
+                self.metrics.record(time.perf_counter() - started, error=True)
+                if attempt >= self.max_retries:
+                    raise
+                delay = self._backoff_delay(attempt)
+                logger.warning(f"Connexion OpenAI impossible ({e.__class__.__name__}), "
+                               f"nouvel essai dans {delay:.1f} s")
+                self.metrics.record_retry()
+                self.sleep(delay)
+                attempt += 1
+                continue
+            except requests.exceptions.RequestException:
+                # Un délai de lecture dépassé n'est pas réessayé : la requête a pu être traitée
+                self.metrics.record(time.perf_counter() - started, error=True)
+                raise
+
+            latency = time.perf_counter() - started
+            status = response.status_code
+            if status == 200:
+                # En flux, la consommation n'est connue qu'à la fin (ChatStream)
+                usage = None if stream else self._usage(response)
+                self.metrics.record(latency, usage)
+                logger.debug(f"OpenAI {path} : {latency:.2f} s, "
+                             f"{(usage or {}).get('total_tokens', '?')} tokens")
+                return response, started
+
+            self.metrics.record(latency, error=True)
+            if attempt >= self.max_retries:
+                return response, started
+            if status == RATE_LIMIT_STATUS:
+                if self._quota_exhausted(response):
+                    return response, started
+                retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                if retry_after is None:
+                    delay = self._backoff_delay(attempt)
+                elif retry_after <= MAX_RETRY_AFTER:
+                    delay = retry_after
+                else:
+                    return response, started
+                logger.warning(f"Limite de débit OpenAI atteinte, nouvel essai dans {delay:.1f} s")
+                self.metrics.record_retry(rate_limited=True)
+            elif status in RETRY_STATUSES:
+                delay = self._backoff_delay(attempt)
+                logger.warning(f"Erreur OpenAI {status}, nouvel essai dans {delay:.1f} s")
+                self.metrics.record_retry()
+            else:
+                return response, started
+            response.close()
+            self.sleep(delay)
+            attempt += 1
+
+    def chat(self, messages: list, model: str, temperature: float, max_tokens: int,
+             api_key: Optional[str] = None, timeout: Optional[Timeout] = None) -> requests.Response:
+        """Appel ``/chat/completions``."""
+        return self.post("/chat/completions", {
+            "model": model,
+            "messages": messages,
+            "temperature": temperature,
+            "max_tokens": max_tokens,
+        }, api_key=api_key, timeout=timeout)
+
+    def stream_chat(self, messages: list, model: str, temperature: float, max_tokens: int,
+                    api_key: Optional[str] = None,
+                    timeout: Optional[Timeout] = None) -> Union[ChatStream, requests.Response]:
+        """
+        Appel ``/chat/completions`` en flux.
+
+        Les réessais ne portent que sur l'établissement de la réponse. Retourne
+        un ``ChatStream`` si la réponse est 200, sinon la ``requests.Response``
+        d'erreur à traiter par l'appelant. Le délai de lecture s'applique entre
+        deux fragments, pas à la réponse entière.
+        """
+        response, started = self._send("/chat/completions", {
+            "model": model,
+            "messages": messages,
+            "temperature": temperature,
+            "max_tokens": max_tokens,
+            "stream": True,
+            "stream_options": {"include_usage": True},
+        }, api_key, timeout, stream=True)
+        if response.status_code != 200:
+            return response
+        return ChatStream(response, started, self.metrics)
+
+
+_shared_client: Optional[OpenAIClient] = None
+_shared_lock = threading.Lock()
+
+
+def get_client() -> OpenAIClient:
+    """Client partagé par tous les analyseurs de l'application."""
+    global _shared_client
+    if _shared_client is None:
+        with _shared_lock:
+            if _shared_client is None:
+                _shared_client = OpenAIClient()
+    return _shared_client
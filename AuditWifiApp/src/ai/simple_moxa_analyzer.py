@@ -16,47 +16,14 @@ import os
 import json
 import requests
 from datetime import datetime
-from requests.adapters import HTTPAdapter
 from pathlib import Path
 
-# Import Retry with proper fallback handling
-try:
-    from urllib3.util.retry import Retry
-    RETRY_AVAILABLE = True
-except ImportError:
-    try:
-        from urllib3.util import Retry
-        RETRY_AVAILABLE = True
-    except ImportError:
-        Retry = None
-        RETRY_AVAILABLE = False
-
-def create_retry_session(
-    retries=3,
-    backoff_factor=0.3,
-    status_forcelist=(500, 502, 504),
-    timeout=60
-):
-    """Crée une session requests avec retry automatique"""
-    session = requests.Session()
-
-    if RETRY_AVAILABLE and Retry is not None:
-        try:
-            retry = Retry(
-                total=retries,
-                read=retries,
-                connect=retries,
-                backoff_factor=backoff_factor,
-                status_forcelist=status_forcelist,
-            )
-            adapter = HTTPAdapter(max_retries=retry)
-            session.mount('http://', adapter)
-            session.mount('https://', adapter)
-        except Exception:
-            # If retry setup fails, continue with basic session
-            pass
-
-    return session
+from src.ai.analysis_cache import cache_key, get_cache
+from src.ai.moxa_map_reduce import digest_for_prompt
+from src.ai.openai_client import get_client
+
+OPENAI_MODEL = "gpt-4"
+OPENAI_TEMPERATURE = 0.7  # Un peu plus de créativité pour s'adapter aux instructions personnalisées
 
 def _log_error(msg: str) -> None:
     """Append API errors to api_errors.log."""
@@ -85,31 +52,20 @@ def get_api_key():
         )
     return api_key
 
-def analyze_moxa_logs(logs, current_config, custom_instructions: str | None = None):
-    """
-    Envoie les logs Moxa et la configuration à OpenAI pour analyse avec support des instructions personnalisées.
+SYSTEM_PROMPT = (
+    "Vous êtes un expert en réseaux WiFi industriels Moxa. Vous pouvez adapter votre analyse selon les "
+    "besoins spécifiques de l'utilisateur et suivre leurs instructions personnalisées avec flexibilité."
+)
 
-    ⚠️  IMPORTANT - MISE À JOUR DU GUIDE OBLIGATOIRE ⚠️
-    Si vous modifiez la logique des instructions personnalisées, le prompt ou les paramètres OpenAI,
-    vous DEVEZ mettre à jour le fichier OPENAI_CUSTOM_INSTRUCTIONS_GUIDE.md car les utilisateurs
-    y ont accès via le bouton "Guide Instructions OpenAI" dans l'interface.
-    Le guide doit refléter exactement le comportement actuel du code.
-
-    Args:
-        logs (str): Les logs Moxa à analyser
-        current_config (dict): La configuration actuelle du Moxa
-        custom_instructions (str, optional): Instructions personnalisées prioritaires pour adapter l'analyse
-
-    Returns:
-        str: La réponse d'OpenAI adaptée selon les instructions
+def build_moxa_messages(logs, current_config, custom_instructions: str | None = None):
     """
-    if not logs or not logs.strip():  # Vérifier si les logs sont vides
-        raise ValueError("Les logs sont vides")
-
-    api_key = get_api_key()
+    Messages envoyés à OpenAI pour l'analyse des logs Moxa.
 
-    # Tronquer les logs si nécessaire
-    truncated_logs = truncate_logs(logs)
+    ⚠️ RAPPEL: Toute modification du prompt doit être reflétée dans OPENAI_CUSTOM_INSTRUCTIONS_GUIDE.md
+    """
+    # Log trop long : résumé agrégé localement + lignes d'événements réparties
+    # (au lieu de ne garder que le début et la fin)
+    truncated_logs = digest_for_prompt(logs, max_chars=8000)
 
     # Prompt de base avec les données techniques
     base_prompt = f"""Vous êtes un expert en analyse de logs et configuration réseau WiFi industriel Moxa.
@@ -172,69 +128,170 @@ Soyez détaillé et professionnel."""
 
     prompt = enhanced_prompt
 
-    session = create_retry_session()
+    return [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": prompt}
+    ]
+
+def _lookup_cache(logs, current_config, custom_instructions, cache_info):
+    """Cache, clé et réponse en cache (ou None) pour ces entrées ; renseigne ``cache_info``."""
+    cache = get_cache()
+    key = cache_key(logs, current_config, custom_instructions, OPENAI_MODEL, OPENAI_TEMPERATURE,
+                    kind="simple_moxa")
+    cached = cache.get(key) if cache else None
+    if cache_info is not None:
+        cache_info["hit"] = cached is not None
+        cache_info["age_seconds"] = cache.clock() - cached["created"] if cached else 0
+    return cache, key, cached["value"] if cached is not None else None
+
+def _api_error_message(response):
+    """Message d'erreur d'une réponse OpenAI non 200."""
+    try:
+        error_detail = response.json().get('error', {}).get('message', '')
+    except ValueError:
+        error_detail = ''
+    return f"Erreur API OpenAI ({response.status_code}): {error_detail}"
+
+def _describe_exception(e):
+    """Message utilisateur pour une erreur survenue pendant l'appel à OpenAI."""
+    if isinstance(e, requests.exceptions.Timeout):
+        return (
+            "Le délai d'attente de l'API OpenAI est dépassé. "
+            "Essayez avec moins de logs ou réessayez plus tard."
+        )
+    if isinstance(e, requests.exceptions.ConnectionError):
+        return (
+            "Impossible de contacter le service OpenAI. "
+            "Vérifiez votre connexion internet ou votre clé API."
+        )
+    if isinstance(e, requests.exceptions.RequestException):
+        return f"Erreur lors de la communication avec l'API OpenAI: {str(e)}"
+    if isinstance(e, json.JSONDecodeError):
+        return "Réponse invalide de l'API OpenAI"
+    return f"Erreur inattendue lors de l'analyse: {str(e)}"
+
+def analyze_moxa_logs(logs, current_config, custom_instructions: str | None = None,
+                      cache_info: dict | None = None):
+    """
+    Envoie les logs Moxa et la configuration à OpenAI pour analyse avec support des instructions personnalisées.
+
+    ⚠️  IMPORTANT - MISE À JOUR DU GUIDE OBLIGATOIRE ⚠️
+    Si vous modifiez la logique des instructions personnalisées, le prompt ou les paramètres OpenAI,
+    vous DEVEZ mettre à jour le fichier OPENAI_CUSTOM_INSTRUCTIONS_GUIDE.md car les utilisateurs
+    y ont accès via le bouton "Guide Instructions OpenAI" dans l'interface.
+    Le guide doit refléter exactement le comportement actuel du code.
+
+    Args:
+        logs (str): Les logs Moxa à analyser
+        current_config (dict): La configuration actuelle du Moxa
+        custom_instructions (str, optional): Instructions personnalisées prioritaires pour adapter l'analyse
+        cache_info (dict, optional): Rempli avec ``hit`` (réponse servie par le cache)
+            et ``age_seconds`` (âge de la réponse en cache)
+
+    Returns:
+        str: La réponse d'OpenAI adaptée selon les instructions
+    """
+    if not logs or not logs.strip():  # Vérifier si les logs sont vides
+        raise ValueError("Les logs sont vides")
+
+    api_key = get_api_key()
+
+    # Même logs, configuration, instructions et paramètres : réutiliser la réponse
+    cache, key, cached = _lookup_cache(logs, current_config, custom_instructions, cache_info)
+    if cached is not None:
+        return cached
+
+    messages = build_moxa_messages(logs, current_config, custom_instructions)
 
     try:
-        response = session.post(
-            "https://api.openai.com/v1/chat/completions",
-            headers={
-                "Authorization": f"Bearer {api_key}",
-                "Content-Type": "application/json"
-            },            json={
-                "model": "gpt-4",
-                "messages": [
-                    {
-                        "role": "system",
-                        "content": "Vous êtes un expert en réseaux WiFi industriels Moxa. Vous pouvez adapter votre analyse selon les besoins spécifiques de l'utilisateur et suivre leurs instructions personnalisées avec flexibilité."
-                    },
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ],
-                "temperature": 0.7,  # Un peu plus de créativité pour s'adapter aux instructions personnalisées
-                "max_tokens": 2000
-            },
+        response = get_client().chat(
+            messages,
+            model=OPENAI_MODEL,
+            temperature=OPENAI_TEMPERATURE,
+            max_tokens=2000,
+            api_key=api_key,
             timeout=60
         )
 
         if response.status_code != 200:
-            error_detail = response.json().get('error', {}).get('message', '')
-            msg = f"Erreur API OpenAI ({response.status_code}): {error_detail}"
+            msg = _api_error_message(response)
             _log_error(msg)
             raise Exception(msg)
 
         result = response.json()
         if "choices" in result and len(result["choices"]) > 0:
-            return result["choices"][0]["message"]["content"]
+            content = result["choices"][0]["message"]["content"]
+            if cache:
+                cache.set(key, content)
+            return content
         else:
             msg = "Réponse invalide de l'API OpenAI"
             _log_error(msg)
             raise Exception(msg)
 
-    except requests.exceptions.Timeout:
-        msg = (
-            "Le délai d'attente de l'API OpenAI est dépassé. "
-            "Essayez avec moins de logs ou réessayez plus tard."
-        )
+    except Exception as e:
+        msg = _describe_exception(e)
         _log_error(msg)
         raise Exception(msg)
-    except requests.exceptions.ConnectionError:
-        msg = (
-            "Impossible de contacter le service OpenAI. "
-            "Vérifiez votre connexion internet ou votre clé API."
+
+def stream_moxa_logs(logs, current_config, custom_instructions: str | None = None,
+                     cache_info: dict | None = None, cancel_event=None, on_stream=None):
+    """
+    Variante en flux de ``analyze_moxa_logs`` : produit le texte de la réponse
+    au fil de sa génération (une réponse en cache est produite d'un bloc).
+
+    Même prompt, mêmes paramètres et même cache que ``analyze_moxa_logs`` ;
+    la réponse n'est mise en cache que si elle a été reçue en entier.
+
+    Args:
+        logs, current_config, custom_instructions, cache_info: voir ``analyze_moxa_logs``
+        cancel_event (threading.Event, optional): arrête la lecture du flux une fois positionné
+        on_stream (callable, optional): reçoit le ``ChatStream`` dès l'ouverture de la
+            réponse ; son ``cancel`` ferme la connexion depuis un autre thread
+
+    Yields:
+        str: fragments successifs de la réponse
+    """
+    if not logs or not logs.strip():
+        raise ValueError("Les logs sont vides")
+
+    api_key = get_api_key()
+
+    cache, key, cached = _lookup_cache(logs, current_config, custom_instructions, cache_info)
+    if cached is not None:
+        yield cached
+        return
+
+    messages = build_moxa_messages(logs, current_config, custom_instructions)
+    parts = []
+    try:
+        stream = get_client().stream_chat(
+            messages,
+            model=OPENAI_MODEL,
+            temperature=OPENAI_TEMPERATURE,
+            max_tokens=2000,
+            api_key=api_key,
+            timeout=60
         )
-        _log_error(msg)
-        raise Exception(msg)
-    except requests.exceptions.RequestException as e:
-        msg = f"Erreur lors de la communication avec l'API OpenAI: {str(e)}"
-        _log_error(msg)
-        raise Exception(msg)
-    except json.JSONDecodeError:
-        msg = "Réponse invalide de l'API OpenAI"
-        _log_error(msg)
-        raise Exception(msg)
+        if isinstance(stream, requests.Response):
+            msg = _api_error_message(stream)
+            _log_error(msg)
+            raise Exception(msg)
+        if on_stream is not None:
+            on_stream(stream)
+        for text in stream:
+            if cancel_event is not None and cancel_event.is_set():
+                stream.cancel()
+                return
+            parts.append(text)
+            yield text
+        if stream.cancelled:
+            # Réponse partielle : ni rendue comme complète ni mise en cache
+            return
     except Exception as e:
-        msg = f"Erreur inattendue lors de l'analyse: {str(e)}"
+        msg = _describe_exception(e)
         _log_error(msg)
         raise Exception(msg)
+
+    if cache and parts:
+        cache.set(key, "".join(parts))
@@ -8,6 +8,8 @@ import json
 import requests
 from datetime import datetime
 
+from src.ai.openai_client import get_client
+
 
 def _log_error(msg: str) -> None:
     """Append API errors to api_errors.log."""
@@ -45,18 +47,12 @@ Veuillez fournir:
 4. Une analyse des risques pour les AMR (robots mobiles)"""
 
     try:
-        response = requests.post(
-            "https://api.openai.com/v1/chat/completions",
-            headers={
-                "Authorization": f"Bearer {api_key}",
-                "Content-Type": "application/json"
-            },
-            json={
-                "model": "gpt-4",
-                "messages": [{"role": "user", "content": prompt}],
-                "temperature": 0.2,
-                "max_tokens": 2000
-            },
+        response = get_client().chat(
+            [{"role": "user", "content": prompt}],
+            model="gpt-4",
+            temperature=0.2,
+            max_tokens=2000,
+            api_key=api_key,
             timeout=30
         )
 
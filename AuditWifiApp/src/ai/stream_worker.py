@@ -0,0 +1,145 @@
+"""
+Analyse IA en flux sur un thread de travail.
+
+Le thread consomme le flux de texte (``stream_moxa_logs``...) et dépose des
+événements dans une file ; l'interface Tk vide la file depuis ``after()`` et
+ajoute le texte au fur et à mesure, sans jamais bloquer sur le réseau.
+
+Événements déposés, sous forme de tuples ``(type, valeur)`` :
+    TOKEN : fragment de texte
+    FIRST_TOKEN : délai du premier fragment depuis le lancement (secondes)
+    DONE : texte complet de la réponse
+    ERROR : message d'erreur
+    CANCELLED : analyse annulée (valeur None)
+"""
+import logging
+import queue
+import threading
+import time
+from typing import Any, Callable, Iterable, List, Optional, Tuple
+
+TOKEN = "token"
+FIRST_TOKEN = "first_token"
+DONE = "done"
+ERROR = "error"
+CANCELLED = "cancelled"
+
+
+class StreamingAnalysis:
+    """
+    Exécute un flux de texte sur un thread et publie ses fragments dans une file.
+
+    Args:
+        stream: fonction recevant l'événement d'annulation et retournant un
+            itérable de fragments de texte
+        logger: journal (défaut : ``StreamingAnalysis``)
+    """
+
+    def __init__(self, stream: Callable[[threading.Event], Iterable[str]],
+                 logger: Optional[logging.Logger] = None):
+        self.stream = stream
+        self.logger = logger or logging.getLogger('StreamingAnalysis')
+        self._queue: "queue.Queue" = queue.Queue()
+        self._cancel = threading.Event()
+        self._cancel_callbacks: List[Callable[[], None]] = []
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self.started_at: Optional[float] = None
+        self.ttft: Optional[float] = None
+        # Vrai une fois l'événement final (DONE, ERROR ou CANCELLED) retiré de la file
+        self.finished = False
+
+    @property
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel.is_set()
+
+    def start(self) -> None:
+        """Démarre le thread d'analyse."""
+        if self.is_running:
+            return
+        self.started_at = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name='StreamingAnalysis', daemon=True)
+        self._thread.start()
+
+    def cancel(self) -> None:
+        """
+        Demande l'arrêt du flux. L'événement CANCELLED est publié
+        immédiatement ; le thread s'arrête au prochain fragment reçu, ou dès
+        qu'un rappel d'annulation a fermé la connexion.
+        """
+        with self._lock:
+            if self._cancel.is_set() or self.finished:
+                return
+            self._cancel.set()
+            callbacks, self._cancel_callbacks = self._cancel_callbacks, []
+        self._queue.put((CANCELLED, None))
+        for callback in callbacks:
+            self._call(callback)
+
+    def add_cancel_callback(self, callback: Callable[[], None]) -> None:
+        """
+        Enregistre une fonction appelée à l'annulation, depuis le thread qui
+        annule (ex: ``ChatStream.cancel`` pour fermer une connexion qui attend
+        encore son premier fragment). Appelée tout de suite si l'analyse est
+        déjà annulée.
+        """
+        with self._lock:
+            if not self._cancel.is_set():
+                self._cancel_callbacks.append(callback)
+                return
+        self._call(callback)
+
+    def _call(self, callback: Callable[[], None]) -> None:
+        try:
+            callback()
+        except Exception as e:
+            self.logger.warning(f"Rappel d'annulation en échec: {e}")
+
+    def join(self, timeout: Optional[float] = None) -> None:
+        if self._thread is not None:
+            self._thread.join(timeout=timeout)
+
+    def poll(self, max_items: Optional[int] = None) -> List[Tuple[str, Any]]:
+        """
+        Retire les événements en attente. Après annulation, seul l'événement
+        CANCELLED est rendu ; rien n'est rendu après l'événement final.
+        """
+        events = []
+        while not self.finished and (max_items is None or len(events) < max_items):
+            try:
+                kind, value = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if self._cancel.is_set() and kind != CANCELLED:
+                continue
+            events.append((kind, value))
+            if kind in (DONE, ERROR, CANCELLED):
+                self.finished = True
+        return events
+
+    def _run(self) -> None:
+        parts = []
+        try:
+            for text in self.stream(self._cancel):
+                if self._cancel.is_set():
+                    return
+                if self.ttft is None:
+                    self.ttft = time.perf_counter() - self.started_at
+                    self.logger.info(f"Premier token reçu en {self.ttft:.2f} s")
+                    self._queue.put((FIRST_TOKEN, self.ttft))
+                parts.append(text)
+                self._queue.put((TOKEN, text))
+        except Exception as e:
+            if not self._cancel.is_set():
+                self.logger.error(f"Erreur pendant l'analyse en flux: {e}")
+                self._queue.put((ERROR, str(e)))
+            return
+        if self._cancel.is_set():
+            return
+        elapsed = time.perf_counter() - self.started_at
+        self.logger.info(f"Analyse en flux terminée en {elapsed:.2f} s ({len(parts)} fragments)")
+        self._queue.put((DONE, "".join(parts)))
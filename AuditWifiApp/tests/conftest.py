@@ -5,7 +5,11 @@ import pytest  # type: ignore
 from unittest.mock import MagicMock, patch
 from contextlib import ExitStack
 from dotenv import load_dotenv
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
 import os
+import threading
+import time
 
 # Charger les variables d'environnement de test
 def pytest_configure(config):
@@ -121,3 +125,133 @@ def patch_ttk_style():
                 # Ignorer les patches qui ne peuvent pas être appliqués
                 pass
         yield
+
+
+@pytest.fixture(autouse=True)
+def ai_cache_dir(tmp_path, monkeypatch):
+    """Cache d'analyse IA propre à chaque test."""
+    cache_dir = tmp_path / "ai_cache"
+    monkeypatch.setenv("AI_CACHE_DIR", str(cache_dir))
+    return cache_dir
+
+
+class OpenAIStub:
+    """Serveur HTTP local qui imite /v1/chat/completions."""
+
+    def __init__(self):
+        self.requests = []
+        self.content = "Analyse stub"
+        self.status = 200
+        # Statuts consommés avant ``status``, ex. [(429, {"Retry-After": "1"})]
+        self.responses = []
+        self.peers = []
+        self.delay = 0.0
+        # Attente entre deux fragments d'une réponse en flux
+        self.stream_delay = 0.0
+        # Attente entre l'envoi des en-têtes et le premier fragment
+        self.first_token_delay = 0.0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.lock = threading.Lock()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                with stub.lock:
+                    stub.requests.append(body)
+                    stub.peers.append(self.client_address)
+                    status, headers = stub.responses.pop(0) if stub.responses else (stub.status, {})
+                    stub.in_flight += 1
+                    stub.max_in_flight = max(stub.max_in_flight, stub.in_flight)
+                if stub.delay:
+                    time.sleep(stub.delay)
+                with stub.lock:
+                    stub.in_flight -= 1
+                content = stub.content(body) if callable(stub.content) else stub.content
+                if status == 200 and body.get("stream"):
+                    self.send_stream(content)
+                    return
+                if status == 200:
+                    payload = {
+                        "choices": [{"message": {"role": "assistant", "content": content}, "index": 0}],
+                        "usage": {"prompt_tokens": 100, "completion_tokens": 50, "total_tokens": 150},
+                    }
+                else:
+                    payload = {"error": {"message": content}}
+                data = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def send_stream(self, content):
+                """Réponse server-sent events, un fragment par mot, en transfert chunked."""
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                words = content.split(" ")
+                chunks = [{"choices": [{"index": 0, "delta": {"content": word if i == 0 else " " + word}}]}
+                          for i, word in enumerate(words)]
+                chunks.append({"choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]})
+                chunks.append({"choices": [], "usage": {"prompt_tokens": 100, "completion_tokens": len(words),
+                                                        "total_tokens": 100 + len(words)}})
+                try:
+                    if stub.first_token_delay:
+                        time.sleep(stub.first_token_delay)
+                    for chunk in chunks:
+                        self.write_chunk(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+                        if stub.stream_delay:
+                            time.sleep(stub.stream_delay)
+                    self.write_chunk(b"data: [DONE]\n\n")
+                    self.write_chunk(b"")
+                except OSError:
+                    # Client parti (annulation)
+                    self.close_connection = True
+
+            def write_chunk(self, data):
+                self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+                self.wfile.flush()
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self.base_url = f"http://127.0.0.1:{self.server.server_address[1]}/v1"
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def openai_stub(monkeypatch):
+    """Serveur OpenAI local ; OPENAI_BASE_URL pointe dessus pendant le test."""
+    from src.ai import openai_client
+
+    stub = OpenAIStub()
+    monkeypatch.setenv("OPENAI_BASE_URL", stub.base_url)
+    # Client neuf : métriques propres au test, pas d'attente entre réessais
+    monkeypatch.setattr(openai_client, "_shared_client", openai_client.OpenAIClient(sleep=lambda delay: None))
+    yield stub
+    stub.close()
+
+
+@pytest.fixture
+def openai_session(monkeypatch):
+    """Session simulée derrière le client OpenAI partagé (sans attente entre réessais)."""
+    from src.ai import openai_client
+
+    session = MagicMock()
+    monkeypatch.setattr(openai_client, "_shared_client",
+                        openai_client.OpenAIClient(session=session, sleep=lambda delay: None))
+    return session
@@ -0,0 +1,42 @@
+"""
+Faux worker de collecte : rejoue des échantillons enregistrés en NDJSON.
+
+Usage: fake_wifi_worker.py SAMPLES [--crash-after N] [--delay S]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("samples")
+    parser.add_argument("--crash-after", type=int, default=0)
+    parser.add_argument("--delay", type=float, default=0.0)
+    args = parser.parse_args()
+
+    with open(args.samples, encoding="utf-8") as f:
+        samples = [json.loads(line) for line in f if line.strip()]
+
+    served = 0
+    for line in sys.stdin:
+        command = line.strip()
+        if command == "quit":
+            break
+        if command != "sample":
+            continue
+        if args.crash_after and served >= args.crash_after:
+            os._exit(3)
+        time.sleep(args.delay)
+        data = dict(samples[served % len(samples)])
+        served += 1
+        data["RequestCount"] = served
+        data["WorkerPid"] = os.getpid()
+        sys.stdout.write(json.dumps(data) + "\n")
+        sys.stdout.flush()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+import json
+
+import pytest
+
+from moxa_log_analyzer import MoxaLogAnalyzer
+from src.ai import openai_client
+from src.ai.analysis_cache import AnalysisCache, cache_key
+from src.ai.simple_moxa_analyzer import analyze_moxa_logs
+
+LOGS = "2025-05-07 10:00:00 Roaming to AP 00:90:e8:00:00:0a completed\r\n\r\n"
+CONFIG = {"roaming_difference": 8}
+
+
+def test_second_identical_analysis_is_served_from_cache(openai_stub):
+    first, second = {}, {}
+    assert analyze_moxa_logs(LOGS, CONFIG, cache_info=first) == "Analyse stub"
+    # Fins de ligne et lignes vides différentes : même clé
+    assert analyze_moxa_logs(LOGS.replace("\r\n", "\n").strip(), CONFIG, cache_info=second) == "Analyse stub"
+
+    assert len(openai_stub.requests) == 1
+    assert first["hit"] is False and second["hit"] is True
+
+    # Autres instructions : nouvel appel
+    analyze_moxa_logs(LOGS, CONFIG, "Format tableau")
+    assert len(openai_stub.requests) == 2
+
+
+def test_errors_are_not_cached(openai_stub, monkeypatch):
+    # Sans réessai : une analyse = une requête
+    monkeypatch.setattr(openai_client, "_shared_client",
+                        openai_client.OpenAIClient(max_retries=0, sleep=lambda delay: None))
+    openai_stub.status = 500
+    openai_stub.content = "surcharge"
+    for _ in range(2):
+        with pytest.raises(Exception, match=r"Erreur API OpenAI \(500\)"):
+            analyze_moxa_logs(LOGS, CONFIG)
+    assert len(openai_stub.requests) == 2
+
+    # Le service répond de nouveau : la réponse est demandée puis mise en cache
+    openai_stub.status = 200
+    openai_stub.content = "Analyse après reprise"
+    cache_info = {}
+    assert analyze_moxa_logs(LOGS, CONFIG, cache_info=cache_info) == "Analyse après reprise"
+    assert cache_info["hit"] is False and len(openai_stub.requests) == 3
+
+
+def test_moxa_log_analyzer_caches_parsed_json(openai_stub):
+    openai_stub.content = json.dumps({"score_global": 80})
+    analyzer = MoxaLogAnalyzer()
+    analyzer.api_key = "sk-local"
+
+    assert analyzer.analyze_logs(LOGS, CONFIG)["analyse_ia"] == {"score_global": 80}
+    assert analyzer.last_cache_hit is False
+    assert analyzer.analyze_logs(LOGS, CONFIG)["analyse_ia"] == {"score_global": 80}
+    assert analyzer.last_cache_hit is True
+    assert len(openai_stub.requests) == 1
+
+
+def test_lru_eviction_and_ttl(tmp_path):
+    now = [1000.0]
+    cache = AnalysisCache(str(tmp_path), max_bytes=200, ttl_seconds=60, clock=lambda: now[0])
+    keys = [cache_key(f"log {i}", {}, None, "m", 0) for i in range(3)]
+
+    cache.set(keys[0], "x" * 50)
+    now[0] += 1
+    cache.set(keys[1], "y" * 50)
+    now[0] += 1
+    assert cache.get(keys[0])["value"] == "x" * 50  # keys[0] devient le plus récent
+    now[0] += 1
+    cache.set(keys[2], "z" * 50)  # dépasse 200 octets : keys[1] est évincé
+
+    assert cache.get(keys[1]) is None
+    assert cache.get(keys[0]) is not None and cache.get(keys[2]) is not None
+
+    now[0] += 120
+    assert cache.get(keys[2]) is None
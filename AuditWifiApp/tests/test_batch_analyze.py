@@ -0,0 +1,98 @@
+import csv
+import json
+import os
+import subprocess
+import sys
+
+from batch_analyze import load_configs, main, match_config, run_batch
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+A, B = "00:90:e8:00:00:0a", "00:90:e8:00:00:0b"
+
+
+def write_fleet(tmp_path):
+    logs, configs = tmp_path / "logs", tmp_path / "config"
+    logs.mkdir()
+    configs.mkdir()
+    (configs / "moxa_config_20250507_080000.json").write_text(json.dumps({"roaming_difference": 8}))
+    (configs / "moxa_config_20250508_080000.json").write_text(json.dumps({"roaming_difference": 12}))
+    (logs / "moxa_log_2025-05-07.txt").write_text("\n".join([
+        f"2025-05-07 10:00:00 Roaming from AP {A} to AP {B} completed, handoff time: 80 ms",
+        f"2025-05-07 10:00:10 Roaming from AP {B} to AP {A} completed, handoff time: 90 ms",
+    ]))
+    (logs / "moxa_log_20250508_080000.log").write_text(
+        "2025-05-08 09:00:00 Authentication timeout\n", encoding="utf-16")
+    (logs / "notes.md").write_text("ignoré")
+    return logs, configs
+
+
+def test_configs_are_matched_by_suffix_then_date(tmp_path):
+    logs, config_dir = write_fleet(tmp_path)
+    configs = load_configs(str(config_dir))
+
+    path, config = match_config(str(logs / "moxa_log_2025-05-07.txt"), configs)
+    assert path.endswith("moxa_config_20250507_080000.json") and config["roaming_difference"] == 8
+    path, _ = match_config(str(logs / "moxa_log_20250508_080000.log"), configs)
+    assert path.endswith("moxa_config_20250508_080000.json")
+
+
+def test_cli_writes_consolidated_json_and_csv(tmp_path, capsys):
+    logs, config_dir = write_fleet(tmp_path)
+    output = tmp_path / "out" / "rapport"
+
+    code = main([str(logs), "--config-dir", str(config_dir), "--output", str(output), "--workers", "2"])
+
+    assert code == 0
+    result = json.loads((tmp_path / "out" / "rapport.json").read_text(encoding="utf-8"))
+    assert result["resume"]["fichiers"] == 2 and result["resume"]["erreurs"] == 0
+    first, second = result["logs"]
+    assert first["rapport"]["analyse_detaillee"]["ping_pong"]["detecte"] is True
+    assert second["rapport"]["analyse_detaillee"]["timeouts_auth"]["nombre"] == 1
+
+    with open(tmp_path / "out" / "rapport.csv", encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+    assert [row["fichier"] for row in rows] == ["moxa_log_2025-05-07.txt", "moxa_log_20250508_080000.log"]
+    assert rows[0]["ping_pong"] == "1" and rows[1]["timeouts_auth"] == "1"
+    assert "2/2 log(s) analysé(s)" in capsys.readouterr().out
+
+    assert main([str(logs), "--config-dir", str(config_dir), "--output", str(output),
+                 "--fail-under", "101"]) == 2
+
+
+def test_ai_enrichment_is_bounded(tmp_path, openai_stub, monkeypatch):
+    logs, config_dir = write_fleet(tmp_path)
+    for i in range(4):
+        (logs / f"extra_{i}.log").write_text(f"2025-05-09 10:00:0{i} Roaming to AP {A} completed\n")
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-local")
+    openai_stub.delay = 0.1
+    openai_stub.content = json.dumps({"analysis": "Commentaire", "recommandations": []})
+
+    result = run_batch(str(logs), str(config_dir), workers=1, use_ai=True, ai_concurrency=2)
+
+    assert len(openai_stub.requests) == 6 and openai_stub.max_in_flight == 2
+    assert all(entry["rapport"]["source"] == "local+ia" for entry in result["logs"])
+
+
+def test_cli_does_not_import_gui_toolkits():
+    code = ("import sys, batch_analyze; "
+            "print(sorted(m for m in ('tkinter', 'matplotlib') if m in sys.modules))")
+    out = subprocess.run([sys.executable, "-c", code], cwd=APP_DIR, capture_output=True, text=True, check=True)
+    assert out.stdout.strip() == "[]"
+
+
+def test_ai_concurrency_caps_chunk_calls_of_long_logs(tmp_path, openai_stub, monkeypatch):
+    logs = tmp_path / "logs"
+    logs.mkdir()
+    for name in ("quai_a", "quai_b"):
+        (logs / f"{name}.log").write_text("\n".join(
+            f"2025-05-07 {10 + m // 60:02d}:{m % 60:02d}:05 Roaming from AP {A} to AP {B} completed, "
+            f"handoff time: {50 + m} ms" for m in range(300)))
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-local")
+    openai_stub.delay = 0.05
+    openai_stub.content = json.dumps({"score_global": 70, "analysis": "Extrait", "recommandations": []})
+
+    result = run_batch(str(logs), str(tmp_path / "config"), workers=1, use_ai=True, ai_concurrency=1)
+
+    # Deux logs découpés en plusieurs extraits, jamais plus d'un appel à la fois
+    assert len(openai_stub.requests) > 2 and openai_stub.max_in_flight == 1
+    assert all(entry["rapport"]["source"] == "local+ia" for entry in result["logs"])
@@ -0,0 +1,51 @@
+import matplotlib
+matplotlib.use("Agg")
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+from ui.blit_renderer import BlitRenderer, stable_limit
+
+
+def make_renderer():
+    fig = Figure(figsize=(4, 3))
+    canvas = FigureCanvasAgg(fig)
+    ax = fig.add_subplot(111)
+    ax.set_xlim(0, 100)
+    ax.set_ylim(-90, -30)
+    line, = ax.plot([], [])
+    return canvas, ax, line, BlitRenderer(canvas, [line])
+
+
+def test_blits_until_limits_change():
+    canvas, ax, line, renderer = make_renderer()
+    assert line.get_animated()
+
+    line.set_data(np.arange(50), np.full(50, -60))
+    assert renderer.update() is False  # premier rendu complet
+    line.set_data(np.arange(60), np.full(60, -50))
+    assert renderer.update() is True
+    assert renderer.update() is True
+
+    ax.set_xlim(0, 200)
+    assert renderer.update() is False
+    assert (renderer.full_draws, renderer.blits) == (2, 2)
+
+
+def test_blitted_frame_matches_full_render():
+    canvas, ax, line, renderer = make_renderer()
+    line.set_data(np.arange(10), np.full(10, -80))
+    renderer.update()
+    line.set_data(np.arange(100), np.linspace(-85, -35, 100))
+    renderer.update()
+    blitted = np.asarray(canvas.buffer_rgba()).copy()
+
+    renderer.invalidate()
+    renderer.update()
+    assert np.array_equal(blitted, np.asarray(canvas.buffer_rgba()))
+
+
+def test_stable_limit():
+    assert stable_limit(301, 60) == 360
+    assert stable_limit(12.5, 10) == 20
+    assert stable_limit(-37, 5) == -35
@@ -0,0 +1,73 @@
+import os
+import sys
+
+from wifi.collector_worker import CommandWorkerProtocol, PersistentCollectorWorker
+from wifi.wifi_collector import WifiCollector
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures", "worker")
+FAKE_WORKER = os.path.join(FIXTURES, "fake_wifi_worker.py")
+RECORDED = os.path.join(FIXTURES, "recorded_samples.ndjson")
+
+
+def make_worker(*extra_args, **kwargs):
+    protocol = CommandWorkerProtocol([sys.executable, FAKE_WORKER, RECORDED, *extra_args])
+    return PersistentCollectorWorker(protocol, **kwargs)
+
+
+def test_worker_streams_samples_from_single_process():
+    worker = make_worker()
+    try:
+        samples = [worker.request_sample(timeout=5) for _ in range(4)]
+    finally:
+        worker.stop()
+
+    assert [s["RequestCount"] for s in samples] == [1, 2, 3, 4]
+    assert samples[2]["BSSID"] == "b2:46:9d:1d:d8:6a"
+    # Un seul interpréteur pour toute la série
+    assert len({s["WorkerPid"] for s in samples}) == 1
+    assert not worker.is_running
+
+
+def test_worker_restarts_after_crash():
+    worker = make_worker("--crash-after", "2")
+    try:
+        first = [worker.request_sample(timeout=5) for _ in range(2)]
+        after_crash = worker.request_sample(timeout=5)
+    finally:
+        worker.stop()
+
+    assert after_crash is not None
+    assert after_crash["RequestCount"] == 1
+    assert after_crash["WorkerPid"] != first[0]["WorkerPid"]
+    assert worker.restart_count == 1
+
+
+def test_worker_applies_back_pressure_when_slow():
+    worker = make_worker("--delay", "0.5")
+    try:
+        # Les requêtes expirées ne s'empilent pas côté worker
+        for _ in range(3):
+            assert worker.request_sample(timeout=0.05) is None
+        pending = worker.request_sample(timeout=5)
+        fresh = worker.request_sample(timeout=5)
+    finally:
+        worker.stop()
+
+    # Une seule requête envoyée malgré les quatre appels
+    assert pending["RequestCount"] == 1
+    assert fresh["RequestCount"] == 2
+
+
+def test_wifi_collector_uses_persistent_worker():
+    worker = make_worker()
+    collector = WifiCollector(worker=worker)
+    assert collector.start_collection()
+    try:
+        sample = collector.collect_sample()
+    finally:
+        collector.stop_collection()
+
+    assert sample.ssid == "AMR-Prod"
+    assert sample.signal_strength == -59
+    assert sample.ping_latency == 4.0
+    assert not worker.is_running
@@ -0,0 +1,81 @@
+import json
+
+import numpy as np
+
+from wifi.columnar_export import ColumnarReader, ColumnarWriter, export_columnar, import_columnar, journal_to_columnar
+from wifi.sample_store import SampleStore
+from wifi.session_journal import SessionJournal
+from wifi.wifi_collector import WifiSample
+
+APS = ["00:90:e8:00:00:0a", "00:90:e8:00:00:0b", "00:90:e8:00:00:0c"]
+
+
+def make_sample(i):
+    return WifiSample(
+        timestamp=f"2025-06-01 10:{i // 60:02d}:{i % 60:02d}.250000",
+        ssid="AMR-Prod",
+        bssid=APS[i // 20 % 3],
+        signal_strength=-50 - i % 30,
+        quality=90 - i % 30,
+        channel=36,
+        band="5 GHz",
+        status="Connected",
+        transmit_rate="390 Mbps",
+        receive_rate="286.5 Mbps",
+        ping_latency=-1.0 if i % 10 == 0 else 10.0 + i % 7,
+        jitter=1.5,
+        ping_target="192.168.1.1",
+        packet_loss=0.0,
+    )
+
+
+def test_store_round_trip_in_row_groups(tmp_path):
+    samples = [make_sample(i) for i in range(500)]
+    store = SampleStore.from_samples(samples)
+    path = export_columnar(store, str(tmp_path / "session.wfc"), row_group_size=64)
+
+    reader = ColumnarReader(path)
+    assert reader.num_rows == 500 and len(reader.row_groups) == 8
+    assert reader.dictionaries["bssids"] == APS
+    assert reader.row_groups[0]["timestamp_min"] == store.timestamps[0]
+
+    restored = import_columnar(path)
+    assert len(restored) == 500
+    for name in ("timestamp", "signal", "quality", "latency", "tx_rate", "rx_rate"):
+        np.testing.assert_array_equal(restored.column(name), store.column(name))
+    assert restored[123] == store[123]
+    assert restored.stats.ping_stats() == store.stats.ping_stats()
+    assert restored.stats.bssid_stats() == store.stats.bssid_stats()
+
+    as_json = tmp_path / "session.json"
+    as_json.write_text(json.dumps([vars(s) for s in samples], indent=2))
+    assert (tmp_path / "session.wfc").stat().st_size * 10 < as_json.stat().st_size
+
+
+def test_streamed_samples_and_column_projection(tmp_path):
+    path = str(tmp_path / "stream.wfc")
+    with ColumnarWriter(path, row_group_size=50) as writer:
+        for i in range(120):
+            writer.write_sample(make_sample(i))
+        # Seul le groupe en cours reste en mémoire
+        assert writer.rows == 100
+
+    reader = ColumnarReader(path)
+    groups = list(reader.iter_row_groups(["signal", "bssid_id"]))
+    assert [len(g["signal"]) for g in groups] == [50, 50, 20]
+    assert set(groups[0]) == {"signal", "bssid_id"}
+    columns = reader.read(["signal", "bssid_id"])
+    assert columns["signal"].dtype == np.int16
+    assert reader.decode("bssid_id", columns["bssid_id"][18:22]) == [APS[0], APS[0], APS[1], APS[1]]
+
+
+def test_journal_converts_without_loading_session(tmp_path):
+    journal = str(tmp_path / "wifi_samples.wfj")
+    with SessionJournal(journal, {"format": "samples"}) as j:
+        for i in range(30):
+            j.append(vars(make_sample(i)))
+
+    store = import_columnar(journal_to_columnar(journal, str(tmp_path / "session.wfc"), row_group_size=8))
+
+    assert [s.timestamp for s in store] == [make_sample(i).timestamp for i in range(30)]
+    assert store[5].ping_target == "192.168.1.1" and store[5].jitter == 1.5
@@ -0,0 +1,52 @@
+import numpy as np
+
+from ui.decimation import AlertIndex, MinMaxPyramid
+
+
+def test_decimation_preserves_extremes_and_bounds_points():
+    values = np.random.default_rng(1).integers(-95, -30, size=100_003).astype(np.int16)
+    pyramid = MinMaxPyramid()
+    pyramid.sync(values)
+
+    for start, stop in [(0, len(values)), (12_345, 98_765)]:
+        x, y = pyramid.decimate(values, start, stop, max_points=2000)
+        window = values[start:stop]
+        assert len(x) <= 2000
+        assert y.min() == window.min() and y.max() == window.max()
+        assert np.all(np.diff(x) >= 0)
+        assert x[0] >= start and x[-1] < stop
+        assert np.array_equal(values[x], y)
+
+
+def test_incremental_sync_matches_full_build():
+    values = np.random.default_rng(2).normal(size=5000)
+    incremental = MinMaxPyramid()
+    for n in (3, 17, 64, 1000, 4097, 5000):
+        incremental.sync(values[:n])
+    full = MinMaxPyramid()
+    full.sync(values)
+
+    assert len(incremental.levels) == len(full.levels)
+    for a, b in zip(incremental.levels, full.levels):
+        assert (a.complete, a.length) == (b.complete, b.length)
+        assert np.array_equal(a.mins[:a.length], b.mins[:b.length])
+        assert np.array_equal(a.max_pos[:a.length], b.max_pos[:b.length])
+
+
+def test_short_ranges_are_not_decimated():
+    values = np.arange(100)
+    x, y = MinMaxPyramid().decimate(values, 10, 60, max_points=500)
+    assert np.array_equal(x, np.arange(10, 60))
+    assert np.array_equal(y, values[10:60])
+
+
+def test_alert_index_collapses_markers_per_pixel():
+    signal = np.full(10_000, -60)
+    signal[::7] = -90
+    index = AlertIndex(lambda start, stop: signal[start:stop] < -85)
+    index.sync(5000)
+    index.sync(10_000)
+
+    assert len(index) == len(range(0, 10_000, 7))
+    assert list(index.between(0, 30)) == [0, 7, 14, 21, 28]
+    assert len(index.between(0, 10_000, max_markers=500)) <= 500
@@ -0,0 +1,73 @@
+import json
+import os
+import time
+from datetime import datetime, timedelta
+
+from history_manager import HistoryManager, ReportSummary
+
+
+def combined_report(zone, connection, signal=-62.0):
+    return {
+        "zone": zone,
+        "wifi_analysis": {"signal_strength": {"average": signal, "min": signal - 10, "max": signal + 5},
+                          "quality": {"connection": connection, "stability": 80.0}, "dropouts": 1},
+        "ping": {"average_latency": 12.5},
+        "recommendations": ["Vérifier le placement des AP"],
+    }
+
+
+def test_save_report_updates_catalog(tmp_path):
+    history = HistoryManager(str(tmp_path))
+    first = history.save_report(combined_report("Quai A", 85.0))
+    second = history.save_report(combined_report("Quai B", 40.0, signal=-75.0))
+
+    # Deux sauvegardes dans la même seconde : deux fichiers distincts
+    assert first != second
+    assert history.get_history() == [second, first]
+    summary = history.get_summary(os.path.basename(second)[:-len(".json")])
+    assert summary.zone == "Quai B" and summary.score == 40.0
+    assert (summary.signal_avg, summary.signal_min, summary.latency_avg) == (-75.0, -85.0, 12.5)
+    assert summary.dropouts == 1 and summary.recommendations == 1
+    assert history.zones() == ["Quai A", "Quai B"]
+    history.close()
+
+
+def test_catalog_catches_up_with_files_changed_outside(tmp_path):
+    with HistoryManager(str(tmp_path)) as history:
+        kept = history.save_report(combined_report("Quai A", 85.0))
+        dropped = history.save_report(combined_report("Quai A", 70.0))
+    os.remove(dropped)
+    (tmp_path / "network_report_20240101_080000.json").write_text(json.dumps(
+        {"timestamp": "2024-01-01T08:00:00", "moxa_analysis": {"score_global": 55}}))
+    (tmp_path / "notes.json").write_text("{}")
+
+    with HistoryManager(str(tmp_path)) as history:
+        assert history.get_history() == [kept, str(tmp_path / "network_report_20240101_080000.json")]
+        assert history.get_summary("network_report_20240101_080000").score == 55.0
+        assert history.sync_catalog() == (0, 0)
+
+
+def test_paging_and_filters_on_large_catalog(tmp_path):
+    history = HistoryManager(str(tmp_path))
+    start = datetime(2025, 1, 1)
+    with history.conn:
+        history._upsert(
+            ReportSummary(f"network_report_{i:05d}", f"network_report_{i:05d}.json",
+                          start + timedelta(hours=i), zone=f"Zone {i % 5}", score=float(i % 101))
+            for i in range(20000)
+        )
+
+    started = time.perf_counter()
+    page = history.query_reports(start=datetime(2025, 3, 1), end=datetime(2025, 4, 1), zone="Zone 2",
+                                 min_score=50, limit=20, offset=20)
+    total = history.count_reports(start=datetime(2025, 3, 1), end=datetime(2025, 4, 1), zone="Zone 2",
+                                  min_score=50)
+    elapsed = time.perf_counter() - started
+
+    assert elapsed < 0.2
+    assert len(page) == 20 and 40 < total < 100
+    assert all(s.zone == "Zone 2" and s.score >= 50 for s in page)
+    assert all(datetime(2025, 3, 1) <= s.timestamp < datetime(2025, 4, 1) for s in page)
+    assert page == sorted(page, key=lambda s: s.timestamp, reverse=True)
+    assert len(history.get_history()) == 20000
+    history.close()
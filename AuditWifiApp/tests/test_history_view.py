@@ -0,0 +1,70 @@
+from unittest.mock import MagicMock
+
+from ui.history_view import HistoryView, TagCache, format_history_row
+
+
+class FakeTree:
+    """Treeview minimal : garde les lignes dans l'ordre d'affichage."""
+
+    def __init__(self):
+        self.rows = []
+        self.inserts = 0
+        self.deletes = 0
+        self._next = 0
+
+    def insert(self, parent, index, values=(), tags=()):
+        self._next += 1
+        item = f"I{self._next}"
+        self.rows.insert(index, (item, values, tags))
+        self.inserts += 1
+        return item
+
+    def delete(self, item):
+        self.rows = [row for row in self.rows if row[0] != item]
+        self.deletes += 1
+
+
+def entry(i, alerts=()):
+    return {"timestamp": f"10:00:{i:02d}", "signal": -60 - i, "quality": 80, "channel": 36,
+            "band": "5 GHz", "ssid": "AMR", "bssid": "b2:46:9d:1d:d8:69", "alerts": list(alerts)}
+
+
+def test_flush_inserts_only_new_rows_and_trims_oldest():
+    manager = MagicMock()
+    manager.get_tag.return_value = "Quai 3"
+    tree = FakeTree()
+    view = HistoryView(tree, TagCache(manager), limit=5)
+
+    for i in range(4):
+        view.append(entry(i))
+    assert tree.inserts == 0
+    assert view.flush() == 4
+
+    for i in range(4, 8):
+        view.append(entry(i, alerts=["⚠️ Signal faible"] if i == 7 else ()))
+        view.flush()
+
+    assert tree.inserts == 8 and tree.deletes == 3
+    assert len(view) == 5
+    # Plus récent en tête
+    assert [row[1][0] for row in tree.rows] == ["10:00:07", "10:00:06", "10:00:05", "10:00:04", "10:00:03"]
+    assert tree.rows[0][2] == ("alert",)
+    # Le tag n'est demandé qu'une fois par BSSID
+    manager.get_tag.assert_called_once_with("b2:46:9d:1d:d8:69")
+
+
+def test_tag_cache_invalidation():
+    manager = MagicMock()
+    manager.get_tag.side_effect = [None, "Quai 3"]
+    cache = TagCache(manager)
+
+    assert cache.get("aa:bb:cc:dd:ee:ff") is None
+    assert cache.get("aa:bb:cc:dd:ee:ff") is None
+    cache.invalidate("aa:bb:cc:dd:ee:ff")
+    assert cache.get("aa:bb:cc:dd:ee:ff") == "Quai 3"
+
+
+def test_format_status_entry():
+    row = format_history_row({"timestamp": "10:00:00", "signal": 0, "quality": 0,
+                              "alerts": ["📢 Collection\ndémarrée"]}, lambda bssid: None)
+    assert row == ("10:00:00", 0, 0, "", "", "", "", "📢 Collection démarrée")
@@ -0,0 +1,151 @@
+import asyncio
+import math
+import socket
+import struct
+import threading
+import time
+
+import pytest
+
+from wifi.collector_backend import CollectorBackend
+from wifi.latency_prober import (
+    LatencyProber,
+    ProbeTransport,
+    RttRing,
+    UdpEchoTransport,
+    compute_stats,
+)
+from wifi.wifi_collector import WifiCollector
+
+
+@pytest.fixture
+def udp_echo_server():
+    """Serveur d'écho UDP local ; ``drop_even`` simule des pertes."""
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.bind(("127.0.0.1", 0))
+    sock.settimeout(0.1)
+    options = {"drop_even": False}
+    running = threading.Event()
+    running.set()
+
+    def serve():
+        while running.is_set():
+            try:
+                data, addr = sock.recvfrom(2048)
+            except socket.timeout:
+                continue
+            if options["drop_even"] and struct.unpack_from("!I", data)[0] % 2 == 0:
+                continue
+            sock.sendto(data, addr)
+
+    thread = threading.Thread(target=serve, daemon=True)
+    thread.start()
+    yield sock.getsockname()[1], options
+    running.clear()
+    thread.join()
+    sock.close()
+
+
+def wait_for_probes(prober, count, timeout=3.0):
+    deadline = time.monotonic() + timeout
+    while len(prober.ring) < count and time.monotonic() < deadline:
+        time.sleep(0.02)
+
+
+def test_ring_and_stats():
+    ring = RttRing(capacity=4)
+    for value in [10.0, None, 14.0, 12.0, 20.0]:
+        ring.push(value)
+
+    values = ring.snapshot()
+    assert len(values) == 4
+    assert math.isnan(values[0])
+    stats = compute_stats(values)
+    assert stats.latency == 20.0
+    assert stats.loss_percent == 25.0
+    assert stats.jitter == pytest.approx((2.0 + 8.0) / 2)
+
+
+def test_prober_measures_udp_echo(udp_echo_server):
+    port, _ = udp_echo_server
+    prober = LatencyProber(UdpEchoTransport("127.0.0.1", port), rate_hz=20, timeout=0.5, window=10)
+    prober.start()
+    try:
+        wait_for_probes(prober, 10)
+    finally:
+        prober.stop()
+
+    stats = prober.latest()
+    assert stats.probes == 10
+    assert stats.loss_percent == 0.0
+    assert 0.0 <= stats.latency < 500.0
+    assert not prober.is_running
+
+
+def test_prober_counts_losses(udp_echo_server):
+    port, options = udp_echo_server
+    options["drop_even"] = True
+    prober = LatencyProber(UdpEchoTransport("127.0.0.1", port), rate_hz=20, timeout=0.1, window=20)
+    prober.start()
+    try:
+        wait_for_probes(prober, 20)
+    finally:
+        prober.stop()
+
+    assert 40.0 <= prober.latest().loss_percent <= 60.0
+
+
+def test_restart_discards_previous_probes(udp_echo_server):
+    port, options = udp_echo_server
+    options["drop_even"] = True
+    transport = UdpEchoTransport("127.0.0.1", port)
+    prober = LatencyProber(transport, rate_hz=20, timeout=0.1, window=20)
+    prober.start()
+    try:
+        wait_for_probes(prober, 20)
+    finally:
+        prober.stop()
+    assert prober.latest().loss_percent > 0
+
+    options["drop_even"] = False
+    prober.start()
+    try:
+        assert len(prober.ring) < 20
+        wait_for_probes(prober, 20)
+    finally:
+        prober.stop()
+
+    # Seules les sondes de la seconde collecte sont comptées
+    stats = prober.latest()
+    assert stats.probes == 20 and stats.loss_percent == 0.0
+    assert transport._sequence == 0
+
+
+class SlowTransport(ProbeTransport):
+    async def probe(self, timeout):
+        await asyncio.sleep(timeout)
+        return None
+
+
+class StaticBackend(CollectorBackend):
+    name = "static"
+
+    def read_sample(self):
+        return {"SSID": "AMR-Prod", "SignalStrength": "80%", "SignalStrengthDBM": -60,
+                "Channel": "36", "Band": "5 GHz", "Status": "Connected"}
+
+
+def test_lost_probes_do_not_block_collection():
+    prober = LatencyProber(SlowTransport(), rate_hz=10, timeout=2.0)
+    collector = WifiCollector(backend=StaticBackend(), latency_prober=prober)
+    assert collector.start_collection()
+    try:
+        started = time.perf_counter()
+        samples = [collector.collect_sample() for _ in range(5)]
+        elapsed = time.perf_counter() - started
+    finally:
+        collector.stop_collection()
+
+    assert elapsed < 0.5
+    assert all(s.ping_latency == -1.0 for s in samples)
+    assert not prober.is_running
@@ -0,0 +1,113 @@
+import os
+
+from wifi.linux_backend import (
+    LinuxIwBackend,
+    frequency_to_channel,
+    parse_iw_dev,
+    parse_iw_link,
+    parse_iw_scan,
+    parse_iw_station_dump,
+    parse_proc_net_wireless,
+)
+from wifi.wifi_collector import WifiCollector, WifiSample
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures", "iw")
+
+
+def read_fixture(name):
+    with open(os.path.join(FIXTURES, name), encoding="utf-8") as f:
+        return f.read()
+
+
+def fake_runner(link_fixture="iw_link_connected.txt"):
+    """Rejoue les sorties enregistrées de iw et compte les appels."""
+    outputs = {
+        "dev": "iw_dev.txt",
+        "link": link_fixture,
+        "dump": "iw_station_dump.txt",
+    }
+    calls = []
+
+    def run(argv):
+        calls.append(argv)
+        return read_fixture(outputs[argv[-1]])
+
+    run.calls = calls
+    return run
+
+
+def test_parse_proc_net_wireless():
+    interfaces = parse_proc_net_wireless(read_fixture("proc_net_wireless.txt"))
+
+    assert list(interfaces) == ["wlp2s0"]
+    assert interfaces["wlp2s0"]["level"] == -61.0
+    assert interfaces["wlp2s0"]["noise"] is None
+    assert interfaces["wlp2s0"]["missed_beacon"] == 3
+
+
+def test_parse_iw_link_and_station_dump():
+    link = parse_iw_link(read_fixture("iw_link_connected.txt"))
+    stations = parse_iw_station_dump(read_fixture("iw_station_dump.txt"))
+
+    assert link["connected"] is True
+    assert link["bssid"] == "b2:46:9d:1d:d8:69"
+    assert link["ssid"] == "AMR-Prod"
+    assert link["freq"] == 5180
+    assert link["tx_bitrate"] == 390.0
+    assert parse_iw_link(read_fixture("iw_link_disconnected.txt")) == {"connected": False}
+    assert stations[0]["signal_avg"] == -62.0
+    assert stations[0]["tx_retries"] == 1843
+    assert parse_iw_dev(read_fixture("iw_dev.txt")) == ["wlp2s0"]
+
+
+def test_parse_iw_scan():
+    networks = parse_iw_scan(read_fixture("iw_scan_dump.txt"))
+
+    assert [n["channel"] for n in networks] == [36, 6, 149]
+    assert networks[1]["frequency"] == "2.4 GHz"
+    assert networks[0]["signal"] == -63
+    assert networks[0]["signal_percent"] == "74%"
+    assert networks[2]["ssid"] == ""
+
+
+def test_frequency_to_channel():
+    assert frequency_to_channel(2412) == 1
+    assert frequency_to_channel(2484) == 14
+    assert frequency_to_channel(5200) == 40
+    assert frequency_to_channel(5955) == 1
+
+
+def test_backend_builds_wifi_sample_from_recorded_outputs():
+    runner = fake_runner()
+    backend = LinuxIwBackend(
+        station_dump_every=10,
+        proc_path=os.path.join(FIXTURES, "proc_net_wireless.txt"),
+        runner=runner,
+    )
+    assert backend.start()
+    data = [backend.read_sample() for _ in range(3)]
+
+    sample = WifiSample.from_powershell_data(data[0])
+    assert sample.bssid == "b2:46:9d:1d:d8:69"
+    # Le niveau vient de /proc/net/wireless, plus frais que iw link
+    assert sample.signal_strength == -61
+    assert sample.quality == 78
+    assert sample.channel == 36
+    assert sample.band == "5 GHz"
+    assert data[0]["TxRetries"] == 1843
+    # Un seul exec iw link par échantillon, station dump à fréquence réduite
+    assert sum(1 for argv in runner.calls if argv[-1] == "dump") == 1
+    assert sum(1 for argv in runner.calls if argv[-1] == "link") == 3
+
+
+def test_wifi_collector_with_linux_backend_disconnected():
+    backend = LinuxIwBackend(
+        interface="wlp2s0",
+        proc_path=os.path.join(FIXTURES, "proc_net_wireless.txt"),
+        runner=fake_runner("iw_link_disconnected.txt"),
+    )
+    collector = WifiCollector(backend=backend)
+    assert collector.start_collection()
+
+    assert collector.collect_sample() is None
+    assert len(collector.samples) == 0
@@ -7,8 +7,7 @@ from wifi_test_manager import WifiTestManager
 from wifi_data_collector import WifiDataCollector
 import time
 
-@patch('src.ai.simple_moxa_analyzer.create_retry_session')
-def test_manual_moxa_workflow(mock_session):
+def test_manual_moxa_workflow(openai_session):
     """Test simplified manual Moxa analysis workflow"""
     # Les logs qu'un utilisateur pourrait coller
     sample_logs = """
@@ -18,12 +17,10 @@ def test_manual_moxa_workflow(mock_session):
     2024-05-15 10:01:00 [WARNING] Roaming initiated
     """
     
-    session = MagicMock()
-    session.post.return_value.status_code = 200
-    session.post.return_value.json.return_value = {
+    openai_session.post.return_value.status_code = 200
+    openai_session.post.return_value.json.return_value = {
         "choices": [{"message": {"content": "Analyse"}}]
     }
-    mock_session.return_value = session
 
     result = analyze_moxa_logs(sample_logs, {"roaming_mechanism": "signal_strength"})
 
@@ -2,12 +2,12 @@
 Tests for Moxa log analysis functionality.
 """
 import pytest
-from unittest.mock import MagicMock, patch
+from unittest.mock import MagicMock
 import requests
 from src.ai.simple_moxa_analyzer import analyze_moxa_logs
 from log_manager import LogManager
 
-def test_moxa_log_analysis(sample_moxa_logs):
+def test_moxa_log_analysis(sample_moxa_logs, openai_session):
     """Test basic Moxa log analysis functionality - simule le copier/coller de logs et le clic sur Analyser"""
     
     # Configuration simple pour le test
@@ -18,8 +18,7 @@ def test_moxa_log_analysis(sample_moxa_logs):
     }
 
     # Mock la réponse OpenAI
-    session = MagicMock()
-    session.post.return_value = MagicMock(
+    openai_session.post.return_value = MagicMock(
         status_code=200,
         json=lambda: {
             "choices": [{
@@ -30,13 +29,12 @@ def test_moxa_log_analysis(sample_moxa_logs):
         }
     )
 
-    with patch('src.ai.simple_moxa_analyzer.create_retry_session', return_value=session):
-        # Simule le clic sur Analyser
-        result = analyze_moxa_logs(sample_moxa_logs, test_config)
-        
-        # Vérifie qu'on obtient une analyse
-        assert "Problèmes détectés" in result
-        assert "Recommandations" in result
+    # Simule le clic sur Analyser
+    result = analyze_moxa_logs(sample_moxa_logs, test_config)
+
+    # Vérifie qu'on obtient une analyse
+    assert "Problèmes détectés" in result
+    assert "Recommandations" in result
 
 def test_empty_moxa_logs():
     """Test handling of empty Moxa logs"""
@@ -44,33 +42,29 @@ def test_empty_moxa_logs():
         analyze_moxa_logs("", {})
     assert "logs sont vides" in str(exc_info.value).lower()
 
-def test_log_manager_moxa_analysis(sample_moxa_logs):
+def test_log_manager_moxa_analysis(sample_moxa_logs, openai_session):
     """Test Moxa log analysis through LogManager"""
     log_manager = LogManager()
-    session = MagicMock()
-    session.post.return_value.status_code = 200
-    session.post.return_value.json.return_value = {
+    openai_session.post.return_value.status_code = 200
+    openai_session.post.return_value.json.return_value = {
         "choices": [{"message": {"content": "Analyse"}}]
     }
-    with patch('src.ai.simple_moxa_analyzer.create_retry_session', return_value=session):
-        result = log_manager.analyze_logs(
-            sample_moxa_logs,
-            {"roaming_mechanism": "signal_strength"},
-            is_moxa_log=True
-        )
+    result = log_manager.analyze_logs(
+        sample_moxa_logs,
+        {"roaming_mechanism": "signal_strength"},
+        is_moxa_log=True
+    )
     assert result is not None
 
 @pytest.mark.integration
-def test_moxa_ui_integration():
+def test_moxa_ui_integration(openai_session):
     """Simplified integration test using analyze_moxa_logs directly."""
-    session = MagicMock()
-    session.post.return_value.status_code = 200
-    session.post.return_value.json.return_value = {
+    openai_session.post.return_value.status_code = 200
+    openai_session.post.return_value.json.return_value = {
         "choices": [{"message": {"content": "Analyse"}}]
     }
-    with patch('src.ai.simple_moxa_analyzer.create_retry_session', return_value=session):
-        result = analyze_moxa_logs("log", {"roaming_mechanism": "signal"})
-        assert "Analyse" in result
+    result = analyze_moxa_logs("log", {"roaming_mechanism": "signal"})
+    assert "Analyse" in result
 
 
 
@@ -85,12 +79,10 @@ def test_deauth_metrics(moxa_logs_with_deauth):
     assert result["analyse_detaillee"]["deauth_requests"]["par_ap"]["aa:bb:cc:dd:ee:ff"] == 1
 
 
-def test_moxa_api_connection_error(sample_moxa_logs):
+def test_moxa_api_connection_error(sample_moxa_logs, openai_session):
     """Ensure a friendly message is raised when the API is unreachable."""
-    session = MagicMock()
-    session.post.side_effect = requests.exceptions.ConnectionError()
-    with patch('src.ai.simple_moxa_analyzer.create_retry_session', return_value=session):
-        with pytest.raises(Exception) as exc_info:
-            analyze_moxa_logs(sample_moxa_logs, {})
-        assert "Impossible de contacter le service OpenAI" in str(exc_info.value)
+    openai_session.post.side_effect = requests.exceptions.ConnectionError()
+    with pytest.raises(Exception) as exc_info:
+        analyze_moxa_logs(sample_moxa_logs, {})
+    assert "Impossible de contacter le service OpenAI" in str(exc_info.value)
 
@@ -0,0 +1,78 @@
+from datetime import datetime
+
+from moxa_event_store import MoxaEventStore
+from moxa_log_analyzer import MoxaLogAnalyzer
+from moxa_log_parser import DEAUTH, ROAM
+from moxa_roaming_analyzer import MoxaRoamingAnalyzer
+
+A, B = "00:90:e8:00:00:0a", "00:90:e8:00:00:0b"
+LOG = "\n".join([
+    f"2025-05-07 10:00:00 Roaming from AP {A} to AP {B} completed, handoff time: 120 ms",
+    f"2025-05-07 10:00:12 Roaming from AP {B} to AP {A} completed, handoff time: 180 ms",
+    f"2025-05-07 10:01:00 Deauthentication from AP {A}",
+    "SNR drop detected: snr 0",
+    "SNR drop detected: snr 0",
+    f"2025-05-07 11:30:00 Roaming to AP {B} failed",
+])
+
+
+def test_reimport_is_deduplicated(tmp_path):
+    path = tmp_path / "export.log"
+    path.write_text(LOG, encoding="utf-8")
+    db = str(tmp_path / "events.db")
+
+    with MoxaEventStore(db) as store:
+        first = store.import_file(str(path))
+        assert first.lines == 6 and first.new_events == first.events == 8
+    with MoxaEventStore(db) as store:
+        again = store.import_file(str(path))
+        assert again.new_events == 0 and again.duplicates == 8
+        # Les lignes identiques sans horodatage restent distinctes
+        assert store.count_by_kind()["snr"] == 2
+        assert len(store) == 8
+
+
+def test_queries_by_time_range_ap_and_kind():
+    store = MoxaEventStore(":memory:")
+    store.import_lines(LOG)
+
+    morning = list(store.events(datetime(2025, 5, 7, 10), datetime(2025, 5, 7, 11)))
+    assert {e.kind for e in morning} == {ROAM, DEAUTH, "handoff"}
+    assert [e.timestamp.second for e in store.events(ap=B, kinds=[ROAM])] == [0, 0]
+    assert store.count_by_kind(ap=A) == {ROAM: 1, DEAUTH: 1, "handoff": 1}
+    assert store.access_points()[0]["ap"] in (A, B)
+
+
+def test_analyzers_read_the_store():
+    store = MoxaEventStore(":memory:")
+    store.import_lines(LOG)
+
+    from_store = MoxaRoamingAnalyzer().analyze_store(store)
+    from_text = MoxaRoamingAnalyzer().analyze(LOG)
+    assert from_store["metrics"] == from_text["metrics"]
+    assert from_store["metrics"]["ping_pong_count"] == 1
+
+    analyzer = MoxaLogAnalyzer()
+    analyzer.analyze_store(store, {}, end=datetime(2025, 5, 7, 11))
+    assert analyzer.metrics["handoff_times"] == [120, 180]
+    assert analyzer.metrics["deauth_requests"]["par_ap"] == {A: 1}
+
+
+def test_repeated_timestamped_lines_are_kept(tmp_path):
+    timeout = f"2025-05-07 10:02:00 Authentication timeout with AP {A}"
+    deauth = f"2025-05-07 10:02:00 Deauthentication from AP {B}"
+    log = "\n".join([timeout, timeout, deauth, timeout, deauth])
+    db = str(tmp_path / "events.db")
+
+    with MoxaEventStore(db) as store:
+        assert store.import_lines(log).new_events == 5
+        assert store.import_lines(log).new_events == 0
+        # Un export qui prolonge le précédent n'ajoute que la répétition supplémentaire
+        assert store.import_lines(log + "\n" + timeout).new_events == 1
+        assert store.count_by_kind() == {"auth_failure": 4, DEAUTH: 2}
+
+        analyzer = MoxaLogAnalyzer()
+        analyzer.analyze_store(store, {})
+        from_store = analyzer.metrics["authentication_failures"]
+        analyzer.analyze_logs(log + "\n" + timeout, {}, use_ai=False)
+        assert from_store == analyzer.metrics["authentication_failures"] == 4
@@ -0,0 +1,111 @@
+import re
+
+from moxa_log_analyzer import MoxaLogAnalyzer
+from moxa_log_parser import (AUTH_FAILURE, DEAUTH, HANDOFF, ROAM, SNR, MoxaMetricsAccumulator,
+                             chunk_ranges, iter_events, iter_file_lines, parse_chunk,
+                             parse_file_parallel, parse_line)
+from moxa_roaming_analyzer import MoxaRoamingAnalyzer
+from network_analyzer import NetworkAnalyzer
+
+LOG = """2025-05-07 10:00:00 Client roaming from AP aa:bb:cc:dd:ee:01 completed, handoff time: 180 ms
+2025-05-07 10:00:05 Deauthentication failed from ap AA:BB:CC:DD:EE:02
+2025-05-07 10:00:07 Client associated with AP aa:bb:cc:dd:ee:01\r
+2025-05-07 10:00:09 SNR drop detected: snr 8
+
+2025-05-07 10:00:10 auth failed, roaming to next AP
+"""
+
+
+def reference_metrics(log_content):
+    """Ancienne boucle ligne par ligne de l'analyse locale."""
+    metrics = {"total": 0, "par_ap": {}, "roaming": 0, "handoff": [], "auth": 0, "snr": []}
+    for line in log_content.split('\n'):
+        lower = line.lower()
+        if "deauth" in lower:
+            metrics["total"] += 1
+            mac = re.search(r'([0-9a-fA-F]{2}(?::[0-9a-fA-F]{2}){5})', line)
+            if mac:
+                key = mac.group(1).lower()
+                metrics["par_ap"][key] = metrics["par_ap"].get(key, 0) + 1
+        if "roaming" in lower or "associated with" in lower or "connected to ap" in lower:
+            metrics["roaming"] += 1
+        handoff = re.search(r'handoff time:\s*(\d+)\s*ms', lower)
+        if handoff:
+            metrics["handoff"].append(int(handoff.group(1)))
+        if "authentication timeout" in lower or "auth failed" in lower or "authentication failed" in lower:
+            metrics["auth"] += 1
+        if "snr" in lower and ("0" in line or "drop" in lower):
+            metrics["snr"].append(line.strip())
+    return metrics
+
+
+def test_parse_line_classifies_overlapping_keywords():
+    kinds = [e.kind for e in parse_line("Deauthentication failed from ap AA:BB:CC:DD:EE:02")]
+    assert kinds == [DEAUTH, AUTH_FAILURE]
+
+    roam, handoff = parse_line("roaming completed, handoff time: 180 ms")
+    assert roam.kind == ROAM and roam.success and roam.detail == "roaming"
+    assert handoff.kind == HANDOFF and handoff.value == 180
+
+    snr, = parse_line("SNR drop detected: snr 8")
+    assert snr.kind == SNR and snr.detail == "drop"
+    assert parse_line("beacon interval 100") == []
+
+
+def test_accumulator_matches_previous_line_scan():
+    metrics = MoxaMetricsAccumulator().consume(iter_events(LOG.splitlines())).metrics()
+    expected = reference_metrics(LOG)
+    assert metrics["deauth_requests"] == {"total": expected["total"], "par_ap": expected["par_ap"]}
+    assert metrics["total_roaming_events"] == expected["roaming"] == 3
+    assert metrics["handoff_times"] == expected["handoff"] == [180]
+    assert metrics["authentication_failures"] == expected["auth"] == 2
+    assert metrics["snr_drops"] == expected["snr"]
+
+
+def test_analyzers_share_the_event_stream(tmp_path):
+    analyzer = MoxaLogAnalyzer()
+    from_text = analyzer.analyze_logs(LOG, {})
+    text_metrics = analyzer.metrics
+
+    path = tmp_path / "moxa.log"
+    path.write_text(LOG, encoding="utf-16")
+    assert analyzer.analyze_log_file(str(path), {}) == from_text
+    assert analyzer.metrics == text_metrics
+    assert len(list(iter_file_lines(str(path)))) == len(LOG.splitlines())
+
+    roaming = MoxaRoamingAnalyzer().analyze(LOG)
+    assert roaming["metrics"]["total_events"] == 2
+    assert roaming["metrics"]["successful"] == 1
+
+    assert NetworkAnalyzer().preprocess_moxa_log(LOG).count("\n") == 4
+
+
+def test_parallel_chunks_merge_to_sequential_result(tmp_path):
+    path = tmp_path / "fleet.log"
+    lines = []
+    for i in range(60):
+        ap = f"aa:bb:cc:dd:ee:{i % 3:02x}"
+        lines.append(f"2025-05-07 10:{i // 60:02d}:{i % 60:02d} Client roaming to AP {ap} completed, "
+                     f"handoff time: {100 + i} ms")
+        lines.append(f"2025-05-07 10:00:{i % 60:02d} Deauthentication from AP {ap}")
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+    ranges = chunk_ranges(str(path), 7, max_chunk_bytes=500)
+    data = path.read_bytes()
+    assert ranges[0][0] == 0 and ranges[-1][1] == len(data)
+    assert all(data[start - 1:start] == b"\n" for start, _ in ranges[1:])
+
+    sequential = MoxaMetricsAccumulator().consume_lines(iter_file_lines(str(path)))
+    merged = MoxaMetricsAccumulator()
+    for start, end in ranges:
+        merged.merge(parse_chunk(str(path), start, end))
+    assert merged.metrics() == sequential.metrics()
+    assert merged.line_count == len(lines)
+    # Changements d'AP y compris ceux à cheval sur deux morceaux
+    assert len(sequential.ap_changes) == 59
+
+    parallel = parse_file_parallel(str(path), workers=2, max_chunk_bytes=500)
+    assert parallel.metrics() == sequential.metrics()
+
+    analyzer = MoxaLogAnalyzer()
+    assert analyzer.analyze_log_file(str(path), {}, workers=2) == analyzer.analyze_logs(path.read_text(), {})
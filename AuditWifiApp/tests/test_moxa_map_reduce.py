@@ -0,0 +1,113 @@
+import json
+import time
+from datetime import datetime, timedelta
+
+from moxa_log_analyzer import MoxaLogAnalyzer
+from src.ai.moxa_map_reduce import build_digest, chunk_lines, digest_for_prompt, estimate_tokens, reduce_analyses
+
+A, B = "00:90:e8:00:00:0a", "00:90:e8:00:00:0b"
+
+
+def fleet_log(minutes=120):
+    lines = []
+    for m in range(minutes):
+        stamp = f"2025-05-07 {10 + m // 60:02d}:{m % 60:02d}"
+        lines.append(f"{stamp}:00 [DEBUG] wlan0 tx rate 54 Mbps, rssi -61 dBm")
+        lines.append(f"{stamp}:05 Roaming from AP {A} to AP {B} completed, handoff time: {50 + m} ms")
+        lines.append(f"{stamp}:15 Roaming from AP {B} to AP {A} completed")
+        if m % 10 == 0:
+            lines.append(f"{stamp}:30 Authentication timeout with AP {B}")
+    return "\n".join(lines)
+
+
+def partial(score, recommendation):
+    return {
+        "adapte_flotte_AMR": score > 70,
+        "score_global": score,
+        "analyse_detaillee": {"ping_pong": {"detecte": True, "gravite": 6}},
+        "recommandations": [{"probleme": recommendation, "solution": "...", "priorite": 2}],
+        "problematic_aps": [{"ap_mac": A.upper(), "issues": ["ping-pong"], "occurrences": 3, "avg_snr": 20}],
+        "analysis": f"Extrait score {score}",
+    }
+
+
+def test_digest_counts_every_event_and_chunks_fit_budget():
+    digest = build_digest(fleet_log())
+    assert digest.total_lines == 120 * 3 + 12
+    assert digest.counts["roam"] == 240 and digest.counts["auth_failure"] == 12
+    assert digest.ping_pong[0]["count"] == 120
+
+    chunks = chunk_lines(digest.event_lines, max_tokens=500)
+    assert len(chunks) > 1 and all(len(c) <= 2000 for c in chunks)
+    assert sum(c.count("\n") + 1 for c in chunks) == len(digest.event_lines)
+
+    text = digest_for_prompt(fleet_log(), max_chars=8000)
+    assert len(text) <= 8000 and "RÉSUMÉ AGRÉGÉ LOCALEMENT" in text
+    # Les dernières heures sont représentées, pas seulement le début et la fin
+    assert "11:30" in text
+
+
+def test_reduce_uses_local_counts_and_merges_partials():
+    digest = build_digest(fleet_log())
+    result = reduce_analyses([partial(80, "Ping-pong A-B"), partial(40, "Timeouts"),
+                              partial(60, "Ping-pong A-B")], digest)
+
+    assert result["score_global"] == 40 and result["adapte_flotte_AMR"] is False
+    assert result["analyse_detaillee"]["timeouts_auth"]["nombre"] == 12
+    assert result["analyse_detaillee"]["handoff"]["max_ms"] == 169
+    assert [r["probleme"] for r in result["recommandations"]] == ["Ping-pong A-B", "Timeouts"]
+    assert result["problematic_aps"] == [{"ap_mac": A, "issues": ["ping-pong"], "occurrences": 9, "avg_snr": 20.0}]
+
+
+def test_chunks_are_analyzed_concurrently(openai_stub):
+    openai_stub.delay = 0.2
+    openai_stub.content = lambda body: json.dumps(partial(70, "Roaming"))
+    analyzer = MoxaLogAnalyzer()
+    analyzer.api_key = "sk-local"
+    analyzer.CHUNK_TOKENS = 400
+    analyzer.MAX_CHUNKS = 8
+    analyzer.MAX_PARALLEL_CHUNKS = 4
+
+    started = time.perf_counter()
+    result = analyzer.analyze_logs(fleet_log(), {"roaming_difference": 5})
+    elapsed = time.perf_counter() - started
+
+    calls = len(openai_stub.requests)
+    assert calls == 8 and result["map_reduce"]["extraits_analyses"] == 8
+    assert openai_stub.max_in_flight == 4
+    # 8 appels de 0,2 s avec 4 en parallèle : ~0,4 s au lieu de 1,6 s en série
+    assert elapsed < calls * openai_stub.delay * 0.75
+    prompts = [request["messages"][1]["content"] for request in openai_stub.requests]
+    assert all("RÉSUMÉ GLOBAL DU LOG" in prompt for prompt in prompts)
+    assert any("EXTRAIT 1/8" in prompt for prompt in prompts)
+
+
+def test_summary_stays_bounded_across_days_and_untimestamped_lines():
+    start = datetime(2025, 5, 7, 20, 0)
+    lines = []
+    for i in range(600):
+        pair = i % 60
+        a, b = f"00:90:e8:00:{pair:02x}:01", f"00:90:e8:00:{pair:02x}:02"
+        stamp = (start + timedelta(minutes=5 * i)).strftime("%Y-%m-%d %H:%M")
+        lines.append(f"{stamp}:00 Roaming from AP {a} to AP {b} completed")
+        lines.append(f"{stamp}:05 Roaming from AP {b} to AP {a} completed")
+        lines.append(f"Deauth received from AP {a}")
+    digest = build_digest("\n".join(lines))
+    assert len(digest.ping_pong) == 60
+
+    text = digest.summary_text(1500)
+    summary = json.loads(text)
+    assert estimate_tokens(text) <= 1500
+    assert len(summary["ping_pong"]) == 30 and len(summary["par_ap"]) == 30
+
+    # Budget inatteignable : du 7 au 9 mai plus les lignes sans horodatage,
+    # jamais une seule tranche ; l'élargissement s'arrête à la journée
+    started = time.perf_counter()
+    summary = json.loads(digest.summary_text(300))
+    assert time.perf_counter() - started < 1
+    assert digest.bucket_minutes == 24 * 60 and len(digest.per_bucket) == 4
+    assert not any(key.startswith("par_tranche") for key in summary)
+    assert summary["evenements"]["deauth"] == 600
+
+    text = digest_for_prompt("\n".join(lines), max_chars=6000)
+    assert len(text) <= 6000 and "RÉSUMÉ AGRÉGÉ LOCALEMENT" in text
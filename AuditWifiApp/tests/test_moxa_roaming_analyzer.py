@@ -0,0 +1,51 @@
+from datetime import datetime, timedelta
+
+from moxa_log_parser import TimestampParser
+from moxa_roaming_analyzer import MoxaRoamingAnalyzer, detect_ping_pong
+
+A, B, C = "00:90:e8:00:00:0a", "00:90:e8:00:00:0b", "00:90:e8:00:00:0c"
+
+
+def test_timestamp_parser_caches_detected_format():
+    parser = TimestampParser(year=2025)
+    assert parser.parse("2025-05-07 10:00:00 roaming") == datetime(2025, 5, 7, 10, 0, 0)
+    assert parser.format == "iso"
+    assert parser.parse("[2025/05/07 10:00:01.25] roaming") == datetime(2025, 5, 7, 10, 0, 1, 250000)
+    assert parser.format == "moxa"
+    assert parser.parse("<13>May  7 10:00:02 moxa roaming") == datetime(2025, 5, 7, 10, 0, 2)
+    assert parser.parse("roaming sans horodatage") is None
+    assert parser.format == "syslog"
+
+
+def test_detect_ping_pong_reports_pairs_intervals_and_ranges():
+    t0 = datetime(2025, 5, 7, 10, 0, 0)
+    roams = [
+        (t0, A, None),
+        (t0 + timedelta(seconds=10), B, None),   # A -> B
+        (t0 + timedelta(seconds=15), A, None),   # retour en 5 s : ping-pong
+        (t0 + timedelta(seconds=35), B, None),   # retour en 20 s : ping-pong, même plage
+        (t0 + timedelta(seconds=200), C, None),
+        (t0 + timedelta(seconds=300), B, None),  # retour après 100 s : normal
+        (None, A, None),                         # sans horodatage : ignoré
+    ]
+    pairs = detect_ping_pong(roams)
+
+    assert len(pairs) == 1
+    pair = pairs[0]
+    assert (pair["ap_a"], pair["ap_b"], pair["count"]) == (A, B, 2)
+    assert pair["min_interval_s"] == 5
+    assert pair["ranges"] == [{"start": "2025-05-07T10:00:10", "end": "2025-05-07T10:00:35"}]
+
+
+def test_roaming_analyzer_uses_log_time():
+    logs = "\n".join([
+        f"2025-05-07 10:00:00 Roaming from AP {A} to AP {B} completed",
+        f"2025-05-07 10:00:12 Roaming from AP {B} to AP {A} completed",
+        f"2025-05-07 10:05:00 Roaming to AP {B} failed",
+    ])
+    result = MoxaRoamingAnalyzer().analyze(logs)
+
+    metrics = result["metrics"]
+    assert metrics["total_events"] == 3 and metrics["failed"] == 1
+    assert metrics["ping_pong_count"] == 1
+    assert metrics["ping_pong"]["pairs"][0]["min_interval_s"] == 12
@@ -0,0 +1,100 @@
+import time
+
+from moxa_log_analyzer import MoxaLogAnalyzer
+from moxa_log_parser import chunk_ranges, iter_file_lines, iter_log_lines, parse_chunk
+from moxa_rule_engine import MoxaRuleEngine, enrich_with_ai
+
+A, B, C = "00:90:e8:00:00:0a", "00:90:e8:00:00:0b", "00:90:e8:00:00:0c"
+
+LOG = "\n".join([
+    f"2025-05-07 10:00:00 Roaming from AP {A} to AP {B} completed, handoff time: 80 ms",
+    f"2025-05-07 10:00:10 Roaming from AP {B} to AP {A} completed, handoff time: 620 ms",
+    f"2025-05-07 10:00:12 SNR: 0 dB on AP {A}",
+    "2025-05-07 10:00:14 Authentication timeout after 3000 ms",
+    f"2025-05-07 10:00:20 Roaming from AP {A} to AP {C} failed",
+    "2025-05-07 10:00:25 WLAN restart: beacon lost",
+    f"2025-05-07 10:00:30 Deauthentication from AP {C}",
+])
+CONFIG = {"roaming_difference": 8, "auth_timeout": 5, "min_transmission_rate": 6}
+
+
+def test_report_fills_the_full_schema():
+    report = MoxaRuleEngine().consume_lines(iter_log_lines(LOG)).report(CONFIG)
+    details = report["analyse_detaillee"]
+
+    assert report["source"] == "local" and report["adapte_flotte_AMR"] is False
+    assert details["ping_pong"]["occurrences"] == [f"{A}-{B}: 1 fois en 10 sec minimum"]
+    assert details["problemes_snr"]["aps_snr_zero"] == [f"{A}: 1 occurrences"]
+    assert details["timeouts_auth"]["nombre"] == 1 and details["timeouts_auth"]["temps_moyen_ms"] == 3000
+    assert details["handoff"]["distribution"] == ["51-100ms: 1", ">500ms: 1"]
+    assert details["stabilite_wlan"]["redemarrages"] == 1
+    assert details["stabilite_wlan"]["causes"] == ["perte_beacon"]
+    assert details["deauth_requests"] == {"total": 1, "par_ap": {C: 1}}
+    assert report["details_configuration"]["suggestions"] == {
+        "min_transmission_rate": 12, "roaming_difference": 11, "auth_timeout": 10}
+    assert any("handoff > 500 ms" in reason.lower() for reason in report["criteres_invalidite"])
+
+    aps = {ap["ap_mac"]: ap for ap in report["problematic_aps"]}
+    assert set(aps) == {A, B, C}
+    assert "SNR nul (1)" in aps[A]["issues"] and aps[A]["avg_snr"] == 0.0
+    # Timeout sans AP : attribué à l'AP courant
+    assert "Échecs d'authentification (1)" in aps[A]["issues"]
+    assert "Roamings en échec (1)" in aps[C]["issues"]
+    params = {c["param"] for c in report["config_changes"]}
+    assert {"roaming_difference", "auth_timeout", "min_transmission_rate", "rts_threshold"} <= params
+
+
+def test_chunk_merge_matches_sequential_report(tmp_path):
+    path = tmp_path / "fleet.log"
+    lines = []
+    for i in range(90):
+        ap = (A, B, C)[i % 3]
+        lines.append(f"2025-05-07 10:{i // 60:02d}:{i % 60:02d} Roaming to AP {ap} completed, "
+                     f"handoff time: {100 + i} ms")
+        lines.append(f"2025-05-07 10:{i // 60:02d}:{i % 60:02d} SNR drop: {i % 12} dB")
+        lines.append("2025-05-07 10:00:00 Authentication failed")
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+    sequential = MoxaRuleEngine(2025).consume_lines(iter_file_lines(str(path)))
+    merged = MoxaRuleEngine(2025)
+    for start, end in chunk_ranges(str(path), 7, max_chunk_bytes=700):
+        merged.merge(parse_chunk(str(path), start, end, factory=lambda: MoxaRuleEngine(2025)))
+    assert merged.report(CONFIG) == sequential.report(CONFIG)
+
+
+def test_analyzer_is_local_first_and_ai_enriches(openai_stub):
+    analyzer = MoxaLogAnalyzer()
+    analyzer.api_key = "sk-local"
+    assert analyzer.analyze_logs(LOG, CONFIG, use_ai=False)["source"] == "local"
+    assert openai_stub.requests == []
+
+    # Erreur de l'API : le rapport local est retourné
+    openai_stub.status = 500
+    assert analyzer.analyze_logs(LOG, CONFIG)["source"] == "local"
+
+    local = MoxaRuleEngine().consume_lines(iter_log_lines(LOG)).report(CONFIG)
+    enriched = enrich_with_ai(local, {
+        "score_global": 95,
+        "recommandations": [local["recommandations"][0], {"probleme": "Canaux", "priorite": 3}],
+        "analysis": "Commentaire IA",
+    })
+    assert enriched["score_global"] == local["score_global"]
+    assert [r["probleme"] for r in enriched["recommandations"]][-1] == "Canaux"
+    assert len(enriched["recommandations"]) == len(local["recommandations"]) + 1
+    assert enriched["analysis"].endswith("Commentaire IA") and enriched["source"] == "local+ia"
+
+
+def test_large_log_is_analyzed_well_under_a_second():
+    lines = []
+    for i in range(10000):
+        stamp = f"2025-05-07 {10 + i // 3600:02d}:{i // 60 % 60:02d}:{i % 60:02d}"
+        lines.append(f"{stamp} [DEBUG] wlan0 tx rate 54 Mbps")
+        lines.append(f"{stamp} Roaming from AP {A if i % 2 else B} to AP {B if i % 2 else A} completed, "
+                     f"handoff time: {50 + i % 300} ms")
+        lines.append(f"{stamp} SNR: {i % 40} dB")
+    log = "\n".join(lines)
+
+    started = time.perf_counter()
+    report = MoxaLogAnalyzer().analyze_logs(log, CONFIG, use_ai=False)
+    assert time.perf_counter() - started < 1.0
+    assert report["analyse_detaillee"]["handoff"]["max_ms"] == 349
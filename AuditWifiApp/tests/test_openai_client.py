@@ -0,0 +1,71 @@
+from datetime import datetime, timezone
+
+from src.ai.openai_client import OpenAIClient, get_client, parse_retry_after
+from src.ai.simple_wifi_analyzer import analyze_wifi_data
+
+
+def test_connections_are_reused_and_metrics_recorded(openai_stub):
+    client = OpenAIClient()
+    for _ in range(3):
+        response = client.chat([{"role": "user", "content": "ping"}], model="m", temperature=0, max_tokens=10)
+        assert response.status_code == 200
+
+    # Une seule connexion TCP pour les trois appels
+    assert len(set(openai_stub.peers)) == 1
+    metrics = client.metrics.snapshot()
+    assert metrics["requests"] == 3 and metrics["errors"] == 0
+    assert metrics["total_tokens"] == 450
+    assert metrics["latency_avg_s"] is not None
+
+
+def test_rate_limit_waits_for_retry_after(openai_stub):
+    sleeps = []
+    client = OpenAIClient(sleep=sleeps.append)
+    openai_stub.responses = [(429, {"Retry-After": "2"}), (503, {})]
+
+    response = client.post("/chat/completions", {"model": "m", "messages": []})
+
+    assert response.status_code == 200
+    assert len(openai_stub.requests) == 3
+    assert sleeps[0] == 2.0
+    assert 0 <= sleeps[1] <= client.backoff * 2
+    metrics = client.metrics.snapshot()
+    assert (metrics["retries"], metrics["rate_limited"], metrics["errors"]) == (2, 1, 2)
+
+
+def test_retries_are_bounded(openai_stub):
+    client = OpenAIClient(max_retries=2, sleep=lambda delay: None)
+    openai_stub.status = 500
+    assert client.post("/chat/completions", {}).status_code == 500
+    assert len(openai_stub.requests) == 3
+
+    # Attente annoncée trop longue : la réponse 429 est rendue sans attendre
+    openai_stub.responses = [(429, {"Retry-After": "3600"})]
+    assert client.post("/chat/completions", {}).status_code == 429
+    assert len(openai_stub.requests) == 4
+
+
+def test_parse_retry_after_accepts_http_dates():
+    now = datetime(2025, 5, 7, 10, 0, 0, tzinfo=timezone.utc)
+    assert parse_retry_after("Wed, 07 May 2025 10:00:30 GMT", now) == 30
+    assert parse_retry_after("1.5") == 1.5
+    assert parse_retry_after("bientôt") is None
+
+
+def test_analyzers_use_shared_client(openai_stub):
+    openai_stub.content = "Couverture correcte"
+    assert analyze_wifi_data({"signal": -60}) == "Couverture correcte"
+    assert get_client().metrics.snapshot()["requests"] == 1
+
+
+def test_stream_chat_yields_fragments_and_records_ttft(openai_stub):
+    openai_stub.content = "Débit stable, roaming à vérifier"
+    client = OpenAIClient()
+    stream = client.stream_chat([{"role": "user", "content": "ping"}], model="m", temperature=0, max_tokens=10)
+
+    fragments = list(stream)
+    assert len(fragments) == 5 and "".join(fragments) == "Débit stable, roaming à vérifier"
+    assert openai_stub.requests[0]["stream"] is True
+    assert stream.ttft is not None and stream.finish_reason == "stop"
+    metrics = client.metrics.snapshot()
+    assert metrics["total_tokens"] == 105 and metrics["ttft_avg_s"] is not None
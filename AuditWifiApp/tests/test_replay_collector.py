@@ -0,0 +1,109 @@
+import json
+import os
+import time
+
+import pytest
+
+from network_analyzer import NetworkAnalyzer
+from wifi.replay_collector import ReplayBackend, convert_to_journal
+from wifi.sample_pipeline import SamplePipeline
+from wifi.wifi_collector import WifiCollector
+
+
+def recorded_samples(count=5):
+    return [{
+        "timestamp": f"2025-05-07 10:00:{i:02d}.000000", "ssid": "AMR-Prod",
+        "bssid": f"00:90:e8:00:00:0{i % 2}", "signal_strength": -60 - i, "quality": 80 - i,
+        "channel": 36, "band": "5 GHz", "status": "Connected", "transmit_rate": "144 Mbps",
+        "receive_rate": "130 Mbps", "raw_data": {"SSID": "AMR-Prod"}, "ping_latency": 10.0 + i,
+        "jitter": 0.0, "ping_target": "10.0.0.1", "packet_loss": 0.0,
+    } for i in range(count)]
+
+
+def test_exported_samples_replay_through_collector(tmp_path):
+    export = tmp_path / "wifi_samples_20250507.json"
+    export.write_text(json.dumps(recorded_samples(), indent=2), encoding="utf-8")
+    collector = WifiCollector(backend=ReplayBackend(str(export), speed=None))
+
+    assert collector.start_collection()
+    replayed = []
+    while collector.is_collecting:
+        sample = collector.collect_sample()
+        if sample is not None:
+            replayed.append(sample)
+
+    assert [s.timestamp for s in replayed] == [r["timestamp"] for r in recorded_samples()]
+    assert [s.signal_strength for s in replayed] == [-60, -61, -62, -63, -64]
+    assert [s.ping_latency for s in replayed] == [10.0, 11.0, 12.0, 13.0, 14.0]
+    assert collector.samples.stats.signal.count == 5
+    assert collector.latency_prober is None
+    # Conversion dans un journal temporaire, supprimé en fin de rejeu
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["wifi_samples_20250507.json"]
+
+
+def convert_to_journal_from(tmp_path, document):
+    path = tmp_path / "wifi_session_s1.json"
+    path.write_text(json.dumps(document), encoding="utf-8")
+    return convert_to_journal(str(path))
+
+
+def test_replay_follows_recorded_timing(tmp_path):
+    journal = convert_to_journal_from(tmp_path, {
+        "session_id": "s1", "timestamp": "2025-05-07T10:00:05",
+        "measurements": [{"SSID": "AMR-Prod", "SignalStrengthDBM": -60, "Status": "Connected",
+                          "timestamp": f"2025-05-07T10:00:0{i}"} for i in range(3)],
+    })
+    backend = ReplayBackend(journal, speed=20)
+    backend.start()
+
+    started = time.perf_counter()
+    data = [backend.read_sample() for _ in range(4)]
+    elapsed = time.perf_counter() - started
+    backend.stop()
+
+    # 2 s enregistrées rejouées à 20x
+    assert 0.08 <= elapsed < 0.5
+    assert data[-1] is None and backend.finished
+    assert data[2]["SampleTimestamp"] == "2025-05-07 10:00:02.000000"
+
+
+def test_replay_pipeline_keeps_every_sample_and_stops(tmp_path):
+    export = tmp_path / "session.json"
+    export.write_text(json.dumps(recorded_samples(40)), encoding="utf-8")
+    analyzer = NetworkAnalyzer()
+    live = analyzer.wifi_collector
+
+    assert analyzer.start_replay(str(export), speed=None)
+    collector = analyzer.wifi_collector
+    pipeline = SamplePipeline(collector.collect_sample, interval=0, maxsize=8, block=True,
+                              exhausted=lambda: collector.backend.finished)
+    pipeline.start()
+    received = []
+    deadline = time.monotonic() + 3
+    while (pipeline.is_running or pipeline.depth) and time.monotonic() < deadline:
+        received.extend(pipeline.drain())
+        time.sleep(0.005)
+    analyzer.stop_analysis()
+
+    assert len(received) == 40 and pipeline.dropped == 0
+    assert analyzer.current_wifi_analysis.min_signal == -99
+    assert analyzer.wifi_collector is live and not analyzer.is_replaying
+
+
+def test_replaying_export_never_touches_existing_journal(tmp_path):
+    export = tmp_path / "session.json"
+    export.write_text(json.dumps(recorded_samples(3)), encoding="utf-8")
+    existing = tmp_path / "session.wfj"
+    existing.write_bytes(b"journal de l'utilisateur")
+    backend = ReplayBackend(str(export), speed=None)
+
+    backend.start()
+    converted = backend.session.path
+    assert converted != str(existing) and len(backend.session) == 3
+    backend.stop()
+
+    assert existing.read_bytes() == b"journal de l'utilisateur"
+    assert not os.path.exists(converted)
+    with pytest.raises(FileExistsError):
+        convert_to_journal(str(export))
+    assert existing.read_bytes() == b"journal de l'utilisateur"
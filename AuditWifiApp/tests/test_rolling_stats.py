@@ -0,0 +1,71 @@
+import random
+
+import numpy as np
+import pytest
+
+from wifi.rolling_stats import RunningStats, SessionStats, SlidingWindowStats
+from wifi.sample_store import SampleStore
+from wifi.wifi_collector import WifiSample
+
+
+def test_running_stats_matches_numpy():
+    values = [random.uniform(-90, -30) for _ in range(500)]
+    stats = RunningStats()
+    for value in values:
+        stats.add(value)
+
+    assert stats.count == 500
+    assert stats.mean == pytest.approx(np.mean(values))
+    assert stats.variance == pytest.approx(np.var(values))
+    assert stats.min == min(values)
+    assert stats.max == max(values)
+
+
+def test_sliding_window_matches_brute_force():
+    random.seed(3)
+    window = SlidingWindowStats(50)
+    stream = []
+    for _ in range(400):
+        value = None if random.random() < 0.2 else random.randint(-90, -40)
+        window.add(value)
+        stream.append(value)
+
+        current = [v for v in stream[-50:] if v is not None]
+        assert window.slots == min(len(stream), 50)
+        assert len(window) == len(current)
+        assert window.mean == pytest.approx(np.mean(current))
+        assert window.std == pytest.approx(np.std(current), abs=1e-6)
+        assert window.min == min(current)
+        assert window.max == max(current)
+        assert window.percentile(95) == pytest.approx(np.percentile(current, 95))
+
+
+def test_empty_window():
+    window = SlidingWindowStats(10)
+    window.add(None)
+    assert window.mean is None
+    assert window.min is None
+    assert window.percentile(50) is None
+
+
+def test_session_stats_follow_sample_store():
+    store = SampleStore(stats_window=3)
+    for i, (signal, latency) in enumerate([(-70, 10.0), (-60, -1.0), (-50, 30.0), (-40, 20.0)]):
+        store.append(WifiSample(
+            timestamp=f"2025-06-01 10:00:0{i}.000000", ssid="AMR", bssid="b2:46:9d:1d:d8:69",
+            signal_strength=signal, quality=80, channel=36, band="5 GHz", status="Connected",
+            transmit_rate="390 Mbps", receive_rate="390 Mbps", ping_latency=latency, jitter=2.0,
+        ))
+
+    recent = store.stats.recent
+    assert recent['signal'].mean == pytest.approx(-50.0)
+    assert len(recent['latency']) == 2
+    assert store.stats.signal.min == -70
+    assert store.stats.ping_stats() == {
+        "average_latency": 20.0, "max_latency": 30.0, "min_latency": 10.0, "average_jitter": 2.0,
+    }
+    assert store.stats.bssid_stats()["b2:46:9d:1d:d8:69"]["count"] == 4
+
+    store.clear()
+    assert store.stats.ping_stats() == {}
+    assert isinstance(store.stats, SessionStats)
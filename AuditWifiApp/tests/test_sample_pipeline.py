@@ -0,0 +1,58 @@
+import itertools
+import time
+
+from wifi.sample_pipeline import SamplePipeline
+
+
+def wait_until(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not predicate() and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+def test_pipeline_drains_batches_in_order():
+    counter = itertools.count()
+    pipeline = SamplePipeline(lambda: next(counter), interval=0.001, maxsize=100)
+    pipeline.start()
+    wait_until(lambda: pipeline.produced >= 10)
+    pipeline.stop()
+
+    first = pipeline.drain(max_items=5)
+    rest = pipeline.drain()
+    assert first == [0, 1, 2, 3, 4]
+    assert rest[0] == 5
+    assert pipeline.consumed == pipeline.produced
+    assert pipeline.dropped == 0
+
+
+def test_pipeline_drops_oldest_when_consumer_lags():
+    counter = itertools.count()
+    pipeline = SamplePipeline(lambda: next(counter), interval=0.001, maxsize=4)
+    pipeline.start()
+    wait_until(lambda: pipeline.dropped >= 5)
+    pipeline.stop()
+
+    stats = pipeline.stats()
+    assert stats["depth"] == 4
+    assert stats["dropped"] >= 5
+    batch = pipeline.drain()
+    # Les échantillons conservés sont les plus récents, dans l'ordre
+    assert batch == list(range(batch[0], batch[0] + 4))
+    assert batch[-1] == stats["produced"] - 1
+
+
+def test_pipeline_survives_collect_errors():
+    calls = itertools.count()
+
+    def collect():
+        if next(calls) % 2 == 0:
+            raise RuntimeError("PowerShell indisponible")
+        return None
+
+    pipeline = SamplePipeline(collect, interval=0.001)
+    pipeline.start()
+    wait_until(lambda: pipeline.errors >= 3)
+    pipeline.stop()
+
+    assert pipeline.errors >= 3
+    assert pipeline.drain() == []
@@ -0,0 +1,99 @@
+import math
+
+import numpy as np
+import pytest
+
+from network_analyzer import NetworkAnalyzer
+from wifi.sample_store import SampleStore, parse_rate_mbps
+from wifi.wifi_collector import WifiSample
+
+
+def make_sample(i, bssid="b2:46:9d:1d:d8:69", signal=-60, latency=12.5):
+    return WifiSample(
+        timestamp=f"2025-06-01 10:00:{i % 60:02d}.250000",
+        ssid="AMR-Prod",
+        bssid=bssid,
+        signal_strength=signal,
+        quality=80,
+        channel=36,
+        band="5 GHz",
+        status="Connected",
+        transmit_rate="390 Mbps",
+        receive_rate="286.5 Mbps",
+        raw_data={"ignored": True},
+        ping_latency=latency,
+        jitter=1.5,
+        ping_target="192.168.1.1",
+        packet_loss=2.0,
+    )
+
+
+def test_round_trip_rebuilds_samples_without_raw_data():
+    original = make_sample(7)
+    store = SampleStore()
+    store.append(original)
+
+    rebuilt = store[0]
+    assert rebuilt.timestamp == original.timestamp
+    assert rebuilt.bssid == original.bssid
+    assert rebuilt.signal_strength == -60
+    assert rebuilt.ping_latency == 12.5
+    assert rebuilt.receive_rate == "286.5 Mbps"
+    assert rebuilt.raw_data is None
+    assert store[-1].ssid == "AMR-Prod"
+    with pytest.raises(IndexError):
+        store[1]
+
+
+def test_strings_are_interned_and_columns_grow():
+    store = SampleStore(capacity=16)
+    for i in range(100):
+        store.append(make_sample(i, bssid=f"aa:bb:cc:dd:ee:0{i % 3}", signal=-50 - i % 40))
+
+    assert len(store) == 100
+    assert len(store.bssids) == 3
+    assert len(store.ssids) == 1
+    assert store.unique_bssids() == ["aa:bb:cc:dd:ee:00", "aa:bb:cc:dd:ee:01", "aa:bb:cc:dd:ee:02"]
+    assert store.signal[99] == -50 - 99 % 40
+    assert [s.signal_strength for s in store[-3:]] == list(store.signal[-3:])
+
+
+def test_column_views_are_read_only_and_zero_copy():
+    store = SampleStore.from_samples(make_sample(i) for i in range(10))
+
+    window = store.column("signal", -5)
+    assert window.size == 5
+    assert np.shares_memory(window, store.signal)
+    with pytest.raises(ValueError):
+        window[0] = 0
+
+
+def test_parse_rate_mbps():
+    assert parse_rate_mbps("300 Mbps") == 300.0
+    assert parse_rate_mbps("54,5 Mbps") == 54.5
+    assert math.isnan(parse_rate_mbps(""))
+
+
+def test_network_analyzer_stats_match_for_list_and_store():
+    samples = [make_sample(0, signal=-70, latency=10.0),
+               make_sample(1, bssid="aa:aa:aa:aa:aa:aa", signal=-55, latency=-1.0),
+               make_sample(2, signal=-60, latency=30.0),
+               make_sample(3, bssid="00:00:00:00:00:00")]
+    analyzer = NetworkAnalyzer()
+
+    from_list = analyzer._calculate_bssid_stats(samples)
+    from_store = analyzer._calculate_bssid_stats(SampleStore.from_samples(samples))
+    assert from_list == from_store
+    assert list(from_store) == ["b2:46:9d:1d:d8:69", "aa:aa:aa:aa:aa:aa"]
+    assert from_store["b2:46:9d:1d:d8:69"] == {
+        "count": 2,
+        "average_signal": -65.0,
+        "min_signal": -70.0,
+        "max_signal": -60.0,
+        "average_quality": 80.0,
+    }
+
+    ping = analyzer._calculate_ping_stats(samples)
+    assert ping["min_latency"] == 10.0
+    assert ping["max_latency"] == 30.0
+    assert ping["average_jitter"] == 1.5
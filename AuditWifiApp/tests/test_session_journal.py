@@ -0,0 +1,132 @@
+import json
+import os
+
+from wifi import session_journal
+from wifi.collector_backend import CollectorBackend
+from wifi.latency_prober import LatencyProber, ProbeTransport
+from wifi.session_journal import (
+    FORMAT_SESSION,
+    SessionJournal,
+    export_journal,
+    journal_complete,
+    prune_journals,
+    read_journal,
+    recover_journal,
+    recover_sessions,
+)
+from wifi.wifi_collector import WifiCollector
+
+
+def measurement(i):
+    return {"SSID": "AMR-Prod", "BSSID": f"00:90:e8:00:00:{i:02x}", "SignalStrengthDBM": -60 - i,
+            "timestamp": f"2025-05-07T10:00:{i:02d}"}
+
+
+def test_journal_round_trip_and_batched_fsync(tmp_path, monkeypatch):
+    syncs = []
+    real_fsync = os.fsync
+    monkeypatch.setattr(session_journal.os, "fsync", lambda fd: (syncs.append(fd), real_fsync(fd)))
+    path = tmp_path / "wifi_session_1.wfj"
+
+    with SessionJournal(str(path), {"format": FORMAT_SESSION, "session_id": "1"}, sync_every=4) as journal:
+        for i in range(10):
+            journal.append(measurement(i))
+
+    # En-tête, deux lots de 4 mesures, puis la clôture
+    assert len(syncs) == 4
+    contents = read_journal(str(path))
+    assert contents.complete and contents.damaged_bytes == 0
+    assert contents.metadata["session_id"] == "1"
+    assert contents.records == [measurement(i) for i in range(10)]
+
+
+def test_recovery_truncates_torn_tail_and_exports(tmp_path):
+    path = tmp_path / "wifi_session_2.wfj"
+    journal = SessionJournal(str(path), {"format": FORMAT_SESSION, "session_id": "2"}, sync_every=1)
+    for i in range(3):
+        journal.append(measurement(i))
+    # Plantage pendant l'écriture de la 4e mesure : trame incomplète, jamais close
+    journal._file.write(session_journal._frame(session_journal.RECORD, b'{"SSID":"AMR')[:-4])
+    journal._file.flush()
+
+    contents = read_journal(str(path))
+    assert not contents.complete and len(contents.records) == 3 and contents.damaged_bytes > 0
+
+    exports = recover_sessions(str(tmp_path))
+    assert exports == [str(tmp_path / "wifi_session_2.json")]
+    assert recover_journal(str(path)).complete
+    assert read_journal(str(path)).damaged_bytes == 0
+    with open(exports[0], encoding="utf-8") as f:
+        document = json.load(f)
+    assert document["session_id"] == "2"
+    assert document["measurements"] == [measurement(i) for i in range(3)]
+    # Journal complet : rien de plus à récupérer
+    assert recover_sessions(str(tmp_path)) == []
+
+
+def test_corrupted_frame_stops_reading(tmp_path):
+    path = tmp_path / "wifi_samples.wfj"
+    with SessionJournal(str(path), {"format": "samples"}) as journal:
+        journal.append(measurement(0))
+        journal.append(measurement(1))
+    data = bytearray(path.read_bytes())
+    data[data.index(b"00:90:e8:00:00:01")] ^= 0xFF
+    path.write_bytes(bytes(data))
+
+    contents = recover_journal(str(path))
+    assert contents.records == [measurement(0)]
+    output = export_journal(str(path), str(tmp_path / "export.json"))
+    with open(output, encoding="utf-8") as f:
+        assert json.load(f) == [measurement(0)]
+
+
+def test_startup_reads_only_interrupted_journals_and_prunes_old_ones(tmp_path, monkeypatch):
+    for i in range(5):
+        with SessionJournal(str(tmp_path / f"wifi_samples_{i}.wfj"), {"format": "samples"}) as journal:
+            for j in range(200):
+                journal.append(measurement(j % 50))
+        os.utime(tmp_path / f"wifi_samples_{i}.wfj", (1000 + i, 1000 + i))
+    interrupted = SessionJournal(str(tmp_path / "wifi_samples_crash.wfj"), {"format": "samples"}, sync_every=1)
+    interrupted.append(measurement(0))
+    os.utime(interrupted.path, (900, 900))
+
+    read = []
+    monkeypatch.setattr(session_journal, "read_journal",
+                        lambda path: (read.append(os.path.basename(path)), read_journal(path))[1])
+    assert [journal_complete(str(tmp_path / f"wifi_samples_{i}.wfj")) for i in range(5)] == [True] * 5
+    assert not journal_complete(interrupted.path)
+    assert recover_sessions(str(tmp_path)) == [str(tmp_path / "wifi_samples_crash.json")]
+    assert read == ["wifi_samples_crash.wfj"]
+
+    # Les deux journaux terminés les plus récents (dont celui qui vient d'être réparé) sont gardés
+    removed = prune_journals(str(tmp_path), keep=2)
+    assert sorted(os.path.basename(p) for p in removed) == [f"wifi_samples_{i}.wfj" for i in range(4)]
+    assert sorted(p.name for p in tmp_path.glob("*.wfj")) == ["wifi_samples_4.wfj", "wifi_samples_crash.wfj"]
+
+
+class StaticBackend(CollectorBackend):
+    name = "static"
+
+    def read_sample(self):
+        return {"SSID": "AMR-Prod", "BSSID": "00:90:e8:00:00:0a", "SignalStrength": "80%",
+                "SignalStrengthDBM": -60, "Channel": "36", "Band": "5 GHz", "Status": "Connected"}
+
+
+class SilentTransport(ProbeTransport):
+    async def probe(self, timeout):
+        return None
+
+
+def test_wifi_collector_journals_each_sample(tmp_path):
+    collector = WifiCollector(backend=StaticBackend(), journal_dir=str(tmp_path),
+                              latency_prober=LatencyProber(SilentTransport()))
+    assert collector.start_collection()
+    try:
+        samples = [collector.collect_sample() for _ in range(3)]
+        path = collector.journal.path
+    finally:
+        collector.stop_collection()
+
+    contents = read_journal(path)
+    assert contents.complete and contents.metadata["format"] == "samples"
+    assert contents.records == [json.loads(json.dumps(vars(s))) for s in samples]
@@ -0,0 +1,16 @@
+from benchmarks.bench_startup import STARTUP_BUDGET_MS, heavy_modules_loaded, measure_imports, parse_importtime
+
+
+def test_parse_importtime_output():
+    stderr = ("import time: self [us] | cumulative | imported package\n"
+              "import time:       120 |        120 |   json.decoder\n"
+              "import time:       300 |        420 | json\n")
+    assert parse_importtime(stderr) == {"json.decoder": (120, 120), "json": (300, 420)}
+
+
+def test_runner_starts_without_heavy_modules():
+    modules = measure_imports("runner")
+
+    assert heavy_modules_loaded(modules) == []
+    # Budget large : la présence des modules lourds est le vrai garde-fou
+    assert modules["runner"][1] / 1000 < STARTUP_BUDGET_MS * 2
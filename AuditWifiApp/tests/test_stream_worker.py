@@ -0,0 +1,80 @@
+import time
+
+from src.ai.simple_moxa_analyzer import stream_moxa_logs
+from src.ai.stream_worker import CANCELLED, DONE, ERROR, FIRST_TOKEN, TOKEN, StreamingAnalysis
+
+LOGS = "2025-05-07 10:00:00 Roaming from AP 00:90:e8:00:00:0a to AP 00:90:e8:00:00:0b completed"
+
+
+def run(analysis, timeout=5.0):
+    events = []
+    analysis.start()
+    deadline = time.monotonic() + timeout
+    while not analysis.finished and time.monotonic() < deadline:
+        events.extend(analysis.poll())
+        time.sleep(0.01)
+    return events
+
+
+def moxa_stream(cache_info=None):
+    analysis = StreamingAnalysis(lambda cancel: stream_moxa_logs(
+        LOGS, {}, None, cache_info=cache_info, cancel_event=cancel,
+        on_stream=lambda chat: analysis.add_cancel_callback(chat.cancel)))
+    return analysis
+
+
+def test_tokens_are_published_progressively_then_cached(openai_stub):
+    openai_stub.content = "Score global 80/100 : roaming correct"
+    events = run(moxa_stream())
+
+    kinds = [kind for kind, _ in events]
+    assert kinds[0] == FIRST_TOKEN and kinds[-1] == DONE
+    assert kinds.count(TOKEN) == 6
+    assert "".join(value for kind, value in events if kind == TOKEN) == events[-1][1]
+
+    # Même analyse : réponse du cache, en un seul fragment et sans requête
+    cache_info = {}
+    events = run(moxa_stream(cache_info))
+    assert [kind for kind, _ in events] == [FIRST_TOKEN, TOKEN, DONE]
+    assert cache_info["hit"] and len(openai_stub.requests) == 1
+
+
+def test_cancel_stops_the_stream_without_caching(openai_stub, ai_cache_dir):
+    openai_stub.content = " ".join(["mot"] * 200)
+    openai_stub.stream_delay = 0.02
+    analysis = moxa_stream()
+    analysis.start()
+    while not any(kind == FIRST_TOKEN for kind, _ in analysis.poll()):
+        time.sleep(0.01)
+
+    analysis.cancel()
+    assert analysis.poll() == [(CANCELLED, None)]
+    assert analysis.finished and analysis.poll() == []
+    analysis.join(timeout=5)
+    assert not analysis.is_running
+    assert not list(ai_cache_dir.glob("*.json"))
+
+
+def test_cancel_closes_a_stream_waiting_for_its_first_token(openai_stub, ai_cache_dir):
+    openai_stub.first_token_delay = 30
+    analysis = moxa_stream()
+    analysis.start()
+    deadline = time.monotonic() + 5
+    while not openai_stub.requests and time.monotonic() < deadline:
+        time.sleep(0.01)
+    time.sleep(0.2)
+
+    started = time.perf_counter()
+    analysis.cancel()
+    analysis.join(timeout=5)
+    # Connexion fermée par l'annulation, sans attendre le délai de lecture
+    assert not analysis.is_running and time.perf_counter() - started < 2
+    assert analysis.poll() == [(CANCELLED, None)]
+    assert not list(ai_cache_dir.glob("*.json"))
+
+
+def test_api_error_is_reported(openai_stub):
+    openai_stub.status = 400
+    openai_stub.content = "modèle inconnu"
+    events = run(moxa_stream())
+    assert events[-1][0] == ERROR and "Erreur API OpenAI (400)" in events[-1][1]
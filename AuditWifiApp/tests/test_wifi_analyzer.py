@@ -8,19 +8,18 @@ import time
 from src.ai.simple_wifi_analyzer import analyze_wifi_data
 from wifi_test_manager import WifiTestManager
 
-def test_wifi_data_analysis(sample_wifi_data, mock_openai_response):
+def test_wifi_data_analysis(sample_wifi_data, mock_openai_response, openai_session):
     """Test WiFi data analysis functionality"""
-    with patch('src.ai.simple_wifi_analyzer.requests.post') as mock_post:
-        # Setup mock response
-        mock_post.return_value.json.return_value = mock_openai_response
-        mock_post.return_value.status_code = 200
-        
-        # Run analysis
-        result = analyze_wifi_data([sample_wifi_data])
-        
-        # Verify analysis result
-        assert isinstance(result, str)
-        assert len(result) > 0
+    # Setup mock response
+    openai_session.post.return_value.json.return_value = mock_openai_response
+    openai_session.post.return_value.status_code = 200
+
+    # Run analysis
+    result = analyze_wifi_data([sample_wifi_data])
+
+    # Verify analysis result
+    assert isinstance(result, str)
+    assert len(result) > 0
 
 def test_wifi_data_collection(mock_wifi_collector):
     """Test WiFi data collection process"""
@@ -82,14 +81,13 @@ def test_wifi_collection_integration(mock_wifi_collector):
         manager.stop_wifi_test()
         assert len(manager.collected_data) > 0
 
-def test_invalid_wifi_data():
+def test_invalid_wifi_data(openai_session):
     """Test handling of invalid WiFi data"""
-    with patch('src.ai.simple_wifi_analyzer.requests.post') as mock_post:
-        # Configure mock to return error
-        mock_post.return_value.status_code = 400
-        with pytest.raises(Exception) as exc_info:
-            analyze_wifi_data([{}])  # Empty data should raise error
-        assert "Erreur API OpenAI" in str(exc_info.value)
+    # Configure mock to return error
+    openai_session.post.return_value.status_code = 400
+    with pytest.raises(Exception) as exc_info:
+        analyze_wifi_data([{}])  # Empty data should raise error
+    assert "Erreur API OpenAI" in str(exc_info.value)
 
 def test_wifi_data_persistence(temp_log_file, mock_wifi_collector):
     """Test saving and loading of WiFi test data"""
@@ -139,9 +137,9 @@ def test_wifi_data_persistence(temp_log_file, mock_wifi_collector):
     assert loaded_data[0]["channel"] == 6
 
 
-def test_wifi_api_connection_error():
+def test_wifi_api_connection_error(openai_session):
     """User should get a friendly message when the API is unreachable."""
-    with patch('src.ai.simple_wifi_analyzer.requests.post', side_effect=requests.exceptions.ConnectionError()):
-        with pytest.raises(Exception) as exc_info:
-            analyze_wifi_data({"signal": -70})
-        assert "Impossible de contacter le service OpenAI" in str(exc_info.value)
+    openai_session.post.side_effect = requests.exceptions.ConnectionError()
+    with pytest.raises(Exception) as exc_info:
+        analyze_wifi_data({"signal": -70})
+    assert "Impossible de contacter le service OpenAI" in str(exc_info.value)
@@ -0,0 +1,55 @@
+import numpy as np
+
+from wifi.sample_store import SampleStore
+from wifi.wifi_analyzer import WifiAnalyzer
+from wifi.wifi_collector import WifiSample
+
+SIGNALS = [-60, -72, -75, -65, -80, -62, -61, -71, -58, -59, -57, -90]
+QUALITIES = [100, 55, 50, 70, 40, 76, 78, 58, 84, 82, 86, 20]
+BANDS = ["5 GHz"] * 6 + ["2.4 GHz"] * 6
+CHANNELS = [36, 36, 40, 40, 36, 36, 6, 6, 11, 11, 6, 6]
+
+
+def make_samples():
+    return [WifiSample(
+        timestamp=f"2025-06-01 10:00:{i:02d}.000000", ssid="AMR-Prod", bssid="00:90:e8:00:00:0a",
+        signal_strength=signal, quality=quality, channel=channel, band=band, status="Connected",
+        transmit_rate="144 Mbps", receive_rate="130 Mbps",
+    ) for i, (signal, quality, channel, band) in enumerate(zip(SIGNALS, QUALITIES, CHANNELS, BANDS))]
+
+
+def test_batch_metrics_match_reference_loops():
+    analyzer = WifiAnalyzer()
+    result = analyzer.analyze_batch(SampleStore.from_samples(make_samples()))
+
+    assert result.count == 12 and result.min_signal == -90 and result.max_signal == -57
+    # Cinq mesures sous -70 dBm, mais quatre passages sous le seuil (indices 1, 4, 7 et 11)
+    assert result.dropout_count == 4 and result.below_threshold == 5
+    assert result.quality_distribution == {"Excellent": 4, "Bon": 3, "Moyen": 4, "Faible": 1, "Mauvais": 0}
+
+    expected = [100 * (1 - np.mean(np.abs(np.diff(SIGNALS[end - 10:end]))) / 30) for end in (10, 11, 12)]
+    np.testing.assert_allclose(result.rolling_stability, np.clip(expected, 0, 100))
+    assert result.signal_stability == round(float(np.clip(expected[-1], 0, 100)), 1)
+    assert result.signal_stability == analyzer.analyze_samples(make_samples()).signal_stability
+
+    assert result.by_band["5 GHz"] == {"count": 6, "average_signal": -69.0, "min_signal": -80.0,
+                                       "average_quality": 65.2, "below_threshold": 3, "dropouts": 2}
+    assert result.by_band["2.4 GHz"]["dropouts"] == 2
+    assert set(result.by_channel) == {6, 11, 36, 40}
+    assert sum(entry["count"] for entry in result.by_channel.values()) == 12
+
+
+def test_batch_accepts_lists_and_column_mappings():
+    analyzer = WifiAnalyzer()
+    from_store = analyzer.analyze_batch(SampleStore.from_samples(make_samples()))
+    from_list = analyzer.analyze_batch(make_samples())
+    from_columns = analyzer.analyze_batch({"signal": np.array(SIGNALS), "quality": QUALITIES,
+                                           "channel": CHANNELS, "band": BANDS})
+
+    for other in (from_list, from_columns):
+        assert other.dropout_count == from_store.dropout_count
+        assert other.by_band == from_store.by_band and other.by_channel == from_store.by_channel
+        np.testing.assert_array_equal(other.rolling_stability, from_store.rolling_stability)
+    assert analyzer._count_dropouts(SIGNALS) == 4
+    assert analyzer.get_quality_distribution(make_samples()) == from_store.quality_distribution
+    assert analyzer.analyze_batch([]).count == 0
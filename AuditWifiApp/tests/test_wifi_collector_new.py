@@ -30,3 +30,17 @@ def test_create_wifi_measurement_from_ps(tmp_path):
     assert measurement.ssid == "TestNet"
     assert measurement.signal_dbm == -60
     assert measurement.frequency_mhz == 2437
+
+
+def test_records_are_journaled_once_and_only_on_request(tmp_path):
+    with patch("wifi_data_collector.PowerShellWiFiCollector") as ps_collector:
+        collector = WifiDataCollector(base_path=str(tmp_path))
+        assert collector.start_collection(zone="Quai A") and collector.stop_collection()
+        assert not list(tmp_path.glob("*.wfj"))
+
+        collector = WifiDataCollector(base_path=str(tmp_path), journal=True)
+        assert collector.start_collection(zone="Quai A") and collector.stop_collection()
+
+    # Le collecteur interne ne tient pas de second journal
+    assert all("journal_dir" not in call.kwargs for call in ps_collector.call_args_list)
+    assert [p.name.startswith("wifi_records_") for p in tmp_path.glob("*.wfj")] == [True]
@@ -0,0 +1,3 @@
+"""
+Package ui - Composants d'affichage de l'interface Tk/matplotlib
+"""
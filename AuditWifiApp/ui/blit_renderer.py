@@ -0,0 +1,117 @@
+"""
+Rafraîchissement des graphiques temps réel par « blitting ».
+
+Un rendu complet redessine axes, graduations, titres et légendes alors
+qu'à chaque échantillon seules les courbes et les marqueurs changent.
+``BlitRenderer`` mémorise le fond statique de chaque axe après un rendu
+complet, puis à chaque mise à jour restaure ce fond, redessine uniquement
+les artistes animés et recopie la zone des axes à l'écran. Un rendu complet
+n'a lieu que si les limites d'un axe ont changé (ou après un redimensionnement).
+"""
+import math
+from typing import TYPE_CHECKING, Dict, Iterable, List, Tuple
+
+if TYPE_CHECKING:  # matplotlib n'est chargé qu'avec le premier graphique
+    from matplotlib.artist import Artist
+
+
+def stable_limit(value: float, step: float) -> float:
+    """Arrondit une limite d'axe au pas supérieur pour éviter les rendus complets."""
+    return math.ceil(value / step) * step
+
+
+class BlitRenderer:
+    """
+    Redessine les artistes animés d'une figure sans refaire le rendu complet.
+
+    Args:
+        canvas: canvas matplotlib (TkAgg, Agg...)
+        artists: courbes et collections mises à jour à chaque échantillon
+    """
+
+    def __init__(self, canvas, artists: Iterable["Artist"] = ()):
+        self.canvas = canvas
+        self.artists: List["Artist"] = []
+        self._backgrounds: Dict[object, Tuple[object, tuple]] = {}
+        self.full_draws = 0
+        self.blits = 0
+        for artist in artists:
+            self.add_artist(artist)
+        self._connections = [
+            canvas.mpl_connect('draw_event', self._on_draw),
+            canvas.mpl_connect('resize_event', self._on_resize),
+        ]
+
+    @property
+    def axes(self) -> List[object]:
+        """Axes portant au moins un artiste animé, dans l'ordre d'ajout."""
+        seen = []
+        for artist in self.artists:
+            if artist.axes not in seen:
+                seen.append(artist.axes)
+        return seen
+
+    def add_artist(self, artist: "Artist") -> None:
+        # Un artiste animé est ignoré par le rendu complet : c'est nous qui le dessinons
+        artist.set_animated(True)
+        self.artists.append(artist)
+        self.invalidate()
+
+    def invalidate(self) -> None:
+        """Force un rendu complet à la prochaine mise à jour (titre, légende...)."""
+        self._backgrounds = {}
+
+    def disconnect(self) -> None:
+        for cid in self._connections:
+            self.canvas.mpl_disconnect(cid)
+        self._connections = []
+
+    @staticmethod
+    def _limits(ax) -> tuple:
+        return tuple(ax.get_xlim()), tuple(ax.get_ylim())
+
+    def needs_full_draw(self) -> bool:
+        axes = self.axes
+        if len(self._backgrounds) != len(axes):
+            return True
+        return any(
+            ax not in self._backgrounds or self._backgrounds[ax][1] != self._limits(ax)
+            for ax in axes
+        )
+
+    def update(self) -> bool:
+        """
+        Affiche l'état courant des artistes.
+
+        Retourne True si la mise à jour a été faite par blitting, False si un
+        rendu complet a été nécessaire.
+        """
+        if self.needs_full_draw():
+            # Le rendu déclenche draw_event, qui capture les nouveaux fonds
+            self.canvas.draw()
+            self.full_draws += 1
+            return False
+
+        for background, _ in self._backgrounds.values():
+            self.canvas.restore_region(background)
+        self._draw_artists()
+        for ax in self._backgrounds:
+            self.canvas.blit(ax.bbox)
+        self.blits += 1
+        return True
+
+    def _draw_artists(self) -> None:
+        for artist in self.artists:
+            if artist.axes is not None and artist.get_visible():
+                artist.axes.draw_artist(artist)
+
+    def _on_draw(self, event) -> None:
+        # Rendu complet terminé (sans les artistes animés) : capturer les fonds
+        self._backgrounds = {
+            ax: (self.canvas.copy_from_bbox(ax.bbox), self._limits(ax))
+            for ax in self.axes
+        }
+        self._draw_artists()
+
+    def _on_resize(self, event) -> None:
+        self.invalidate()
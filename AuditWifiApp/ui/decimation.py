@@ -0,0 +1,235 @@
+"""
+Réduction du nombre de points affichés pour les longues sessions.
+
+Un graphique ne peut pas montrer plus de points qu'il n'a de pixels. La
+``MinMaxPyramid`` pré-calcule, niveau par niveau, le minimum et le maximum
+(avec leur position) de seaux de taille croissante (4, 16, 64...). Pour une
+plage donnée, on choisit le niveau qui donne environ deux points par pixel
+et on trace le min et le max de chaque seau : les pics et les creux restent
+visibles quelle que soit la durée de la session.
+
+La pyramide est mise à jour de façon incrémentale (``sync``) : seuls les
+derniers seaux, encore incomplets, sont recalculés à chaque rafraîchissement.
+
+``AlertIndex`` garde les positions des échantillons en alerte pour dessiner
+les marqueurs sous forme d'une seule collection par axe.
+"""
+from typing import Callable, List, Optional, Tuple
+
+import numpy as np
+
+
+class _Level:
+    """Min/max (valeur et position) des seaux d'un niveau de la pyramide."""
+
+    def __init__(self):
+        self.complete = 0   # nombre de seaux définitifs
+        self.length = 0     # seaux disponibles, dernier seau partiel compris
+        self.mins = np.empty(64, dtype=np.float64)
+        self.min_pos = np.empty(64, dtype=np.int64)
+        self.maxs = np.empty(64, dtype=np.float64)
+        self.max_pos = np.empty(64, dtype=np.int64)
+
+    def write(self, start: int, mins, min_pos, maxs, max_pos) -> None:
+        end = start + len(mins)
+        if end > len(self.mins):
+            capacity = len(self.mins)
+            while capacity < end:
+                capacity *= 2
+            for name in ('mins', 'min_pos', 'maxs', 'max_pos'):
+                grown = np.empty(capacity, dtype=getattr(self, name).dtype)
+                grown[:start] = getattr(self, name)[:start]
+                setattr(self, name, grown)
+        self.mins[start:end] = mins
+        self.min_pos[start:end] = min_pos
+        self.maxs[start:end] = maxs
+        self.max_pos[start:end] = max_pos
+        self.length = end
+
+
+class MinMaxPyramid:
+    """
+    Pyramide multi-résolution min/max d'une série.
+
+    Args:
+        factor: nombre de seaux d'un niveau regroupés dans un seau du niveau supérieur
+    """
+
+    def __init__(self, factor: int = 4):
+        if factor < 2:
+            raise ValueError("Le facteur de la pyramide doit être au moins 2")
+        self.factor = factor
+        self.levels: List[_Level] = []
+        self._synced = 0
+
+    def __len__(self) -> int:
+        """Nombre de valeurs déjà intégrées."""
+        return self._synced
+
+    def reset(self) -> None:
+        self.levels = []
+        self._synced = 0
+
+    def bucket_size(self, level: int) -> int:
+        return self.factor ** (level + 1)
+
+    def sync(self, values: np.ndarray) -> None:
+        """Intègre les valeurs ajoutées depuis le dernier appel."""
+        n = len(values)
+        if n < self._synced:
+            self.reset()
+        if n == self._synced:
+            return
+        self._synced = n
+
+        f = self.factor
+        # Le niveau 0 est construit à partir des valeurs brutes
+        src_complete = n
+        src_len = n
+        src = (values, None, values, None)
+        level_index = 0
+        while src_len > f:
+            if level_index == len(self.levels):
+                self.levels.append(_Level())
+            level = self.levels[level_index]
+
+            first = level.complete
+            lo = first * f
+            count = src_len - lo
+            groups = -(-count // f)
+            padded = groups * f
+            mins, min_pos = self._reduce(src[0], src[1], lo, src_len, padded, np.argmin, np.inf)
+            maxs, max_pos = self._reduce(src[2], src[3], lo, src_len, padded, np.argmax, -np.inf)
+            level.write(first, mins, min_pos, maxs, max_pos)
+            # Un seau n'est définitif que si tous ses sous-seaux le sont
+            level.complete = src_complete // f
+
+            src_complete = level.complete
+            src_len = level.length
+            src = (level.mins, level.min_pos, level.maxs, level.max_pos)
+            level_index += 1
+
+    def _reduce(self, vals, pos, lo, hi, padded, arg, fill) -> Tuple[np.ndarray, np.ndarray]:
+        """Réduit ``vals[lo:hi]`` par groupes de ``factor`` (min ou max et sa position)."""
+        block = np.full(padded, fill, dtype=np.float64)
+        block[:hi - lo] = vals[lo:hi]
+        block = block.reshape(-1, self.factor)
+        rows = np.arange(len(block))
+        index = arg(block, axis=1)
+        source = lo + rows * self.factor + index
+        return block[rows, index], (source if pos is None else pos[source])
+
+    def decimate(
+        self,
+        values: np.ndarray,
+        start: int,
+        stop: int,
+        max_points: int,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Points à tracer pour ``values[start:stop]``.
+
+        Retourne les positions (indices absolus) et les valeurs, au plus
+        environ ``max_points`` points, en conservant min et max de chaque seau.
+        """
+        start = max(0, start)
+        stop = min(stop, len(values))
+        if stop <= start:
+            return np.empty(0, dtype=np.int64), np.empty(0)
+        if stop - start <= max_points:
+            return np.arange(start, stop), np.asarray(values[start:stop])
+
+        self.sync(values)
+        level = 0
+        while (level + 1 < len(self.levels)
+               and (stop - start) / self.bucket_size(level) > max_points / 2):
+            level += 1
+        positions: List[np.ndarray] = []
+        samples: List[np.ndarray] = []
+        self._collect(values, level, start, stop, positions, samples)
+        return np.concatenate(positions), np.concatenate(samples)
+
+    def _collect(self, values, level: int, start: int, stop: int, positions, samples) -> None:
+        if stop <= start:
+            return
+        if level < 0 or level >= len(self.levels):
+            positions.append(np.arange(start, stop))
+            samples.append(np.asarray(values[start:stop], dtype=np.float64))
+            return
+        size = self.bucket_size(level)
+        data = self.levels[level]
+        first = -(-start // size)
+        last = min(stop // size, data.complete)
+        if first >= last:
+            self._collect(values, level - 1, start, stop, positions, samples)
+            return
+
+        # Bords non alignés sur les seaux : niveau plus fin
+        self._collect(values, level - 1, start, first * size, positions, samples)
+
+        pos = np.stack((data.min_pos[first:last], data.max_pos[first:last]), axis=1)
+        vals = np.stack((data.mins[first:last], data.maxs[first:last]), axis=1)
+        order = np.argsort(pos, axis=1)
+        positions.append(np.take_along_axis(pos, order, axis=1).ravel())
+        samples.append(np.take_along_axis(vals, order, axis=1).ravel())
+
+        self._collect(values, level - 1, last * size, stop, positions, samples)
+
+
+class AlertIndex:
+    """
+    Positions des échantillons en alerte, tenues à jour incrémentalement.
+
+    Args:
+        mask: fonction ``mask(start, stop)`` retournant un tableau booléen
+            des alertes pour les échantillons ``[start, stop)``
+    """
+
+    def __init__(self, mask: Callable[[int, int], np.ndarray]):
+        self.mask = mask
+        self._positions = np.empty(256, dtype=np.int64)
+        self._count = 0
+        self._synced = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def reset(self) -> None:
+        self._count = 0
+        self._synced = 0
+
+    def sync(self, total: int) -> None:
+        """Évalue les alertes des échantillons ajoutés depuis le dernier appel."""
+        if total < self._synced:
+            self.reset()
+        if total == self._synced:
+            return
+        found = np.flatnonzero(self.mask(self._synced, total)) + self._synced
+        end = self._count + len(found)
+        if end > len(self._positions):
+            capacity = len(self._positions)
+            while capacity < end:
+                capacity *= 2
+            grown = np.empty(capacity, dtype=np.int64)
+            grown[:self._count] = self._positions[:self._count]
+            self._positions = grown
+        self._positions[self._count:end] = found
+        self._count = end
+        self._synced = total
+
+    def between(self, start: int, stop: int, max_markers: Optional[int] = None) -> np.ndarray:
+        """
+        Positions en alerte dans ``[start, stop)``.
+
+        Avec ``max_markers`` (largeur en pixels), les alertes qui tombent sur
+        la même colonne de pixels ne produisent qu'un seul marqueur.
+        """
+        positions = self._positions[:self._count]
+        lo, hi = np.searchsorted(positions, [start, stop])
+        found = positions[lo:hi]
+        span = stop - start
+        if max_markers and span > max_markers and len(found) > max_markers:
+            columns = ((found - start) * max_markers) // span
+            _, first = np.unique(columns, return_index=True)
+            found = found[first]
+        return found
@@ -0,0 +1,109 @@
+"""
+Historique WiFi affiché dans un ``ttk.Treeview`` de taille bornée.
+
+L'ancien affichage reconstruisait un texte de 300 entrées et remplaçait
+tout le contenu du widget à chaque échantillon. Ici chaque entrée devient
+une ligne : on insère les nouvelles lignes en tête et on supprime les plus
+anciennes au-delà de la limite, soit un coût constant par échantillon.
+Les tags des points d'accès sont mis en cache par BSSID.
+"""
+from collections import deque
+from typing import Callable, Deque, Dict, List, Optional, Tuple
+
+# (identifiant, titre, largeur) des colonnes du Treeview
+HISTORY_COLUMNS: List[Tuple[str, str, int]] = [
+    ('time', 'Heure', 70),
+    ('signal', 'Signal (dBm)', 90),
+    ('quality', 'Qualité (%)', 80),
+    ('channel', 'Canal', 60),
+    ('band', 'Bande', 70),
+    ('ssid', 'SSID', 120),
+    ('ap', 'Point d\'accès', 220),
+    ('alerts', 'Alertes', 400),
+]
+
+
+class TagCache:
+    """Cache des tags ``MacTagManager`` par BSSID."""
+
+    def __init__(self, mac_manager):
+        self.mac_manager = mac_manager
+        self._tags: Dict[str, Optional[str]] = {}
+
+    def get(self, bssid: str) -> Optional[str]:
+        try:
+            return self._tags[bssid]
+        except KeyError:
+            tag = self._tags[bssid] = self.mac_manager.get_tag(bssid)
+            return tag
+
+    def invalidate(self, bssid: Optional[str] = None) -> None:
+        """Oublie le tag d'un BSSID (ou de tous) après une modification."""
+        if bssid is None:
+            self._tags.clear()
+        else:
+            self._tags.pop(bssid, None)
+
+
+def format_history_row(entry: dict, tag_lookup: Callable[[str], Optional[str]]) -> Tuple[str, ...]:
+    """Valeurs d'une ligne de l'historique à partir d'une entrée."""
+    ap = ''
+    bssid = entry.get('bssid')
+    if bssid and bssid != 'Unknown':
+        tag = tag_lookup(bssid)
+        ap = f"{bssid} ({tag})" if tag else bssid
+    ssid = entry.get('ssid')
+    return (
+        entry.get('timestamp', ''),
+        entry.get('signal', ''),
+        entry.get('quality', ''),
+        entry.get('channel') or '',
+        entry.get('band') or '',
+        ssid if ssid and ssid != 'N/A' else '',
+        ap,
+        ' | '.join(alert.replace('\n', ' ') for alert in entry.get('alerts') or []),
+    )
+
+
+class HistoryView:
+    """
+    Vue bornée de l'historique : les entrées sont ajoutées en attente puis
+    insérées en une fois par ``flush()``.
+
+    Args:
+        tree: ``ttk.Treeview`` configuré avec ``HISTORY_COLUMNS``
+        tags: cache des tags de points d'accès
+        limit: nombre maximal de lignes affichées
+    """
+
+    def __init__(self, tree, tags: TagCache, limit: int = 300):
+        self.tree = tree
+        self.tags = tags
+        self.limit = limit
+        self._rows: Deque[str] = deque()
+        self._pending: Deque[dict] = deque(maxlen=limit)
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def append(self, entry: dict) -> None:
+        """Met une entrée en attente d'affichage (sans toucher au widget)."""
+        self._pending.append(entry)
+
+    def flush(self) -> int:
+        """Insère les entrées en attente, la plus récente en tête ; retourne leur nombre."""
+        inserted = 0
+        while self._pending:
+            entry = self._pending.popleft()
+            row_tags = ('alert',) if entry.get('alerts') else ()
+            item = self.tree.insert('', 0, values=format_history_row(entry, self.tags.get), tags=row_tags)
+            self._rows.append(item)
+            inserted += 1
+        while len(self._rows) > self.limit:
+            self.tree.delete(self._rows.popleft())
+        return inserted
+
+    def clear(self) -> None:
+        self._pending.clear()
+        while self._rows:
+            self.tree.delete(self._rows.popleft())
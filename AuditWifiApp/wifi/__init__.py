@@ -3,5 +3,6 @@ Package wifi - Outils de collecte et analyse WiFi
 """
 
 from .powershell_collector import PowerShellWiFiCollector
+from .collector_worker import PersistentCollectorWorker
 
-__all__ = ['PowerShellWiFiCollector']
+__all__ = ['PowerShellWiFiCollector', 'PersistentCollectorWorker']
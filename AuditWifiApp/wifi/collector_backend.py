@@ -0,0 +1,88 @@
+"""
+Sources d'échantillons WiFi interchangeables.
+
+Chaque backend renvoie un dictionnaire au format produit historiquement
+par wifi_monitor.ps1 (clés SSID, BSSID, SignalStrength, SignalStrengthDBM,
+Channel, Band, Status, TransmitRate, ReceiveRate, PingLatency) afin que
+``WifiSample.from_powershell_data`` reste le seul point de conversion.
+"""
+import logging
+import os
+import platform
+from typing import Dict, Optional
+
+from .collector_worker import PersistentCollectorWorker, PowerShellWorkerProtocol
+
+
+class CollectorBackend:
+    """Interface commune des backends de collecte."""
+
+    name = "abstract"
+    # Mesures en direct (sonde de latence utile) ; False pour un rejeu
+    live = True
+
+    @property
+    def finished(self) -> bool:
+        """Source épuisée (fin d'un rejeu) ; une source en direct ne l'est jamais."""
+        return False
+
+    def start(self) -> bool:
+        """Prépare la source (processus, interface...)."""
+        return True
+
+    def stop(self) -> None:
+        """Libère les ressources de la source."""
+
+    def read_sample(self) -> Optional[Dict]:
+        """Lit un échantillon, ou None si la lecture a échoué."""
+        raise NotImplementedError
+
+
+class PowerShellBackend(CollectorBackend):
+    """Backend Windows : wifi_monitor.ps1 via un worker PowerShell persistant."""
+
+    name = "powershell"
+
+    def __init__(
+        self,
+        script_path: str,
+        worker: Optional[PersistentCollectorWorker] = None,
+        logger: Optional[logging.Logger] = None,
+    ):
+        self.script_path = script_path
+        self.worker = worker
+        self.logger = logger
+
+    def start(self) -> bool:
+        if self.worker is None:
+            if not os.path.exists(self.script_path):
+                raise FileNotFoundError(f"Script PowerShell introuvable: {self.script_path}")
+            self.worker = PersistentCollectorWorker(
+                PowerShellWorkerProtocol(self.script_path), logger=self.logger
+            )
+        return self.worker.start()
+
+    def stop(self) -> None:
+        if self.worker is not None:
+            self.worker.stop()
+
+    def read_sample(self) -> Optional[Dict]:
+        if self.worker is None:
+            return None
+        return self.worker.request_sample()
+
+
+def detect_native_backend(logger: Optional[logging.Logger] = None) -> Optional[CollectorBackend]:
+    """Retourne le backend natif de la plateforme s'il existe (Linux : iw)."""
+    if platform.system() == 'Linux':
+        from .linux_backend import LinuxIwBackend
+        if LinuxIwBackend.is_available():
+            return LinuxIwBackend(logger=logger)
+    return None
+
+
+def create_default_backend(
+    script_path: str, logger: Optional[logging.Logger] = None
+) -> CollectorBackend:
+    """Choisit le backend adapté : natif si disponible, sinon PowerShell."""
+    return detect_native_backend(logger) or PowerShellBackend(script_path, logger=logger)
@@ -0,0 +1,323 @@
+"""
+Worker de collecte WiFi persistant.
+
+Au lieu de lancer un nouvel interpréteur PowerShell à chaque échantillon,
+un seul processus reste ouvert et échange des échantillons au format JSON
+délimité par des retours à la ligne (NDJSON) sur stdin/stdout :
+
+    Python  -> worker : "sample\\n"
+    worker  -> Python : {"SSID": "...", "Signal": 80, ...}\\n
+
+Le protocole (commande à lancer, requête, décodage) est interchangeable
+afin de pouvoir tester la mécanique sous Linux avec un faux worker.
+"""
+import base64
+import json
+import logging
+import queue
+import subprocess
+import threading
+import time
+from typing import Dict, List, Optional
+
+# Marqueur déposé dans la file quand le worker ferme sa sortie standard
+_EOF = object()
+
+
+class WorkerProtocol:
+    """Décrit comment lancer le worker et dialoguer avec lui."""
+
+    request_line = "sample"
+    quit_line = "quit"
+    encoding = "utf-8"
+
+    def command(self) -> List[str]:
+        """Retourne la ligne de commande du processus worker."""
+        raise NotImplementedError
+
+    def encode_request(self) -> str:
+        """Ligne envoyée pour demander un échantillon."""
+        return self.request_line + "\n"
+
+    def encode_quit(self) -> str:
+        """Ligne envoyée pour demander un arrêt propre."""
+        return self.quit_line + "\n"
+
+    def decode_response(self, line: str) -> Optional[Dict]:
+        """Convertit une ligne NDJSON en dictionnaire."""
+        line = line.strip()
+        if not line:
+            return None
+        data = json.loads(line)
+        if not isinstance(data, dict):
+            raise ValueError(f"Format de données inattendu: {type(data)}")
+        return data
+
+
+class CommandWorkerProtocol(WorkerProtocol):
+    """Protocole générique : n'importe quelle commande parlant NDJSON."""
+
+    def __init__(self, command: List[str], encoding: str = "utf-8"):
+        self._command = list(command)
+        self.encoding = encoding
+
+    def command(self) -> List[str]:
+        return list(self._command)
+
+
+class PowerShellWorkerProtocol(WorkerProtocol):
+    """Garde un interpréteur PowerShell ouvert autour de wifi_monitor.ps1."""
+
+    # Boucle exécutée dans l'interpréteur : une ligne lue = un échantillon écrit
+    LOOP_TEMPLATE = """
+$ErrorActionPreference = 'Stop'
+[Console]::OutputEncoding = [System.Text.Encoding]::UTF8
+$script = '{script}'
+while ($true) {{
+    $line = [Console]::In.ReadLine()
+    if ($line -eq $null -or $line -eq 'quit') {{ break }}
+    try {{
+        $raw = & $script | Out-String
+        $json = $raw | ConvertFrom-Json | ConvertTo-Json -Compress -Depth 5
+    }} catch {{
+        $json = @{{ WorkerError = $_.Exception.Message }} | ConvertTo-Json -Compress
+    }}
+    [Console]::Out.WriteLine($json)
+    [Console]::Out.Flush()
+}}
+"""
+
+    def __init__(self, script_path: str, executable: str = "powershell.exe"):
+        self.script_path = script_path
+        self.executable = executable
+
+    def command(self) -> List[str]:
+        loop = self.LOOP_TEMPLATE.format(script=self.script_path.replace("'", "''"))
+        # -EncodedCommand évite tout problème d'échappement des guillemets
+        encoded = base64.b64encode(loop.encode("utf-16-le")).decode("ascii")
+        return [
+            self.executable,
+            "-NoProfile",
+            "-NonInteractive",
+            "-ExecutionPolicy", "Bypass",
+            "-EncodedCommand", encoded,
+        ]
+
+
+class PersistentCollectorWorker:
+    """
+    Processus de collecte persistant avec redémarrage et contre-pression.
+
+    - Un seul processus est lancé et réutilisé pour tous les échantillons.
+    - S'il meurt (crash, pipe cassé), il est relancé et la requête rejouée
+      une fois, dans la limite de ``max_restarts`` par ``restart_window``.
+    - Au plus ``max_pending`` requêtes sont en vol : si le worker est lent,
+      aucune requête supplémentaire n'est envoyée et le lecteur cesse de
+      consommer sa sortie, ce qui le bloque au lieu d'accumuler des mesures.
+    """
+
+    def __init__(
+        self,
+        protocol: WorkerProtocol,
+        response_timeout: float = 10.0,
+        max_restarts: int = 5,
+        restart_window: float = 60.0,
+        max_pending: int = 1,
+        logger: Optional[logging.Logger] = None,
+    ):
+        self.protocol = protocol
+        self.response_timeout = response_timeout
+        self.max_restarts = max_restarts
+        self.restart_window = restart_window
+        self.max_pending = max(1, max_pending)
+        self.logger = logger or logging.getLogger('CollectorWorker')
+
+        self.restart_count = 0
+        self._restart_times: List[float] = []
+        self._process: Optional[subprocess.Popen] = None
+        self._responses: "queue.Queue" = queue.Queue(maxsize=self.max_pending)
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    @property
+    def is_running(self) -> bool:
+        """Indique si le processus worker est vivant."""
+        return self._process is not None and self._process.poll() is None
+
+    @property
+    def pid(self) -> Optional[int]:
+        """PID du processus courant (utile pour le diagnostic)."""
+        return self._process.pid if self._process else None
+
+    def start(self) -> bool:
+        """Lance le processus worker s'il ne tourne pas déjà."""
+        with self._lock:
+            return self._ensure_process()
+
+    def stop(self) -> None:
+        """Demande un arrêt propre puis tue le processus si nécessaire."""
+        with self._lock:
+            process = self._process
+            self._process = None
+            if process is None:
+                return
+            try:
+                if process.poll() is None:
+                    process.stdin.write(self.protocol.encode_quit())
+                    process.stdin.flush()
+                process.stdin.close()
+            except (OSError, ValueError):
+                pass
+            try:
+                process.wait(timeout=2.0)
+            except subprocess.TimeoutExpired:
+                process.kill()
+                process.wait()
+            self.logger.debug("Worker de collecte arrêté")
+
+    def request_sample(self, timeout: Optional[float] = None) -> Optional[Dict]:
+        """
+        Demande un échantillon au worker.
+
+        Returns:
+            Le dictionnaire renvoyé par le worker, ou None en cas d'échec
+            (délai dépassé, crash non récupérable, réponse invalide).
+        """
+        timeout = self.response_timeout if timeout is None else timeout
+        with self._lock:
+            for attempt in range(2):
+                if not self._ensure_process():
+                    return None
+
+                self._discard_stale_responses()
+                if self._pending < self.max_pending:
+                    try:
+                        self._process.stdin.write(self.protocol.encode_request())
+                        self._process.stdin.flush()
+                        self._pending += 1
+                    except (OSError, ValueError) as e:
+                        self._handle_crash(f"écriture impossible ({e})")
+                        continue
+
+                try:
+                    item = self._responses.get(timeout=timeout)
+                except queue.Empty:
+                    self.logger.warning(
+                        f"Pas de réponse du worker après {timeout:.1f}s "
+                        f"({self._pending} requête(s) en attente)"
+                    )
+                    return None
+
+                if item is _EOF:
+                    self._handle_crash("sortie standard fermée")
+                    continue
+
+                self._pending -= 1
+                return self._decode(item)
+            return None
+
+    def _decode(self, line: str) -> Optional[Dict]:
+        """Décode une réponse et journalise les erreurs côté worker."""
+        try:
+            data = self.protocol.decode_response(line)
+        except (json.JSONDecodeError, ValueError) as e:
+            self.logger.error(f"Réponse invalide du worker: {e}")
+            return None
+        if data and 'WorkerError' in data:
+            self.logger.error(f"Erreur remontée par le worker: {data['WorkerError']}")
+            return None
+        return data
+
+    def _discard_stale_responses(self) -> None:
+        """Jette les réponses tardives d'une requête dont le délai a expiré."""
+        while True:
+            try:
+                item = self._responses.get_nowait()
+            except queue.Empty:
+                return
+            if item is _EOF:
+                # Remis en file pour être traité comme un crash par l'appelant
+                self._responses.put(item)
+                return
+            self._pending -= 1
+            self.logger.debug("Réponse tardive du worker ignorée")
+
+    def _ensure_process(self) -> bool:
+        """Démarre (ou redémarre) le processus si besoin."""
+        if self.is_running:
+            return True
+
+        if self._process is not None:
+            self._handle_crash(f"processus terminé (code {self._process.returncode})")
+
+        now = time.monotonic()
+        self._restart_times = [t for t in self._restart_times if now - t < self.restart_window]
+        if len(self._restart_times) > self.max_restarts:
+            self.logger.error(
+                f"Worker relancé {len(self._restart_times)} fois en "
+                f"{self.restart_window:.0f}s, abandon"
+            )
+            return False
+
+        command = self.protocol.command()
+        try:
+            self._process = subprocess.Popen(
+                command,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                text=True,
+                encoding=self.protocol.encoding,
+                errors='replace',
+                bufsize=1,
+                creationflags=getattr(subprocess, 'CREATE_NO_WINDOW', 0),
+            )
+        except OSError as e:
+            self.logger.error(f"Impossible de lancer le worker {command[0]}: {e}")
+            self._process = None
+            return False
+
+        self._responses = queue.Queue(maxsize=self.max_pending)
+        self._pending = 0
+        self._restart_times.append(now)
+        threading.Thread(
+            target=self._read_stdout, args=(self._process, self._responses), daemon=True
+        ).start()
+        threading.Thread(target=self._read_stderr, args=(self._process,), daemon=True).start()
+        self.logger.info(f"Worker de collecte démarré (pid {self._process.pid})")
+        return True
+
+    def _handle_crash(self, reason: str) -> None:
+        """Nettoie un processus mort pour qu'il soit relancé."""
+        process = self._process
+        self._process = None
+        self._pending = 0
+        if process is None:
+            return
+        self.restart_count += 1
+        self.logger.warning(f"Worker de collecte perdu: {reason}, redémarrage")
+        try:
+            process.kill()
+            process.wait(timeout=2.0)
+        except (OSError, subprocess.TimeoutExpired):
+            pass
+
+    @staticmethod
+    def _read_stdout(process: subprocess.Popen, responses: "queue.Queue") -> None:
+        """Transfère les lignes du worker vers la file (bloquant si pleine)."""
+        try:
+            for line in process.stdout:
+                if line.strip():
+                    responses.put(line)
+        except (OSError, ValueError):
+            pass
+        responses.put(_EOF)
+
+    def _read_stderr(self, process: subprocess.Popen) -> None:
+        """Vide stderr pour éviter que le worker ne bloque sur un pipe plein."""
+        try:
+            for line in process.stderr:
+                if line.strip():
+                    self.logger.debug(f"worker stderr: {line.rstrip()}")
+        except (OSError, ValueError):
+            pass
@@ -0,0 +1,267 @@
+"""
+Export colonnaire compressé des sessions WiFi (fichiers ``.wfc``).
+
+Format inspiré de Parquet, sans dépendance autre que NumPy : les
+échantillons sont écrits par groupes de lignes (``row_group_size``), chaque
+colonne typée (``sample_store.COLUMNS``) compressée séparément avec zlib.
+BSSID, SSID, bande, statut et cible de ping sont encodés par dictionnaire :
+les colonnes ne contiennent que des identifiants entiers, les chaînes sont
+stockées une seule fois dans le pied de fichier.
+
+Disposition :
+    ``WFC1``
+    groupe de lignes * N : pour chaque colonne ``<longueur:u32>`` + données zlib
+    pied de fichier : JSON (schéma, dictionnaires, position et bornes de chaque groupe)
+    ``<position du pied:u64>WFC1``
+
+L'écriture est en flux : la mémoire reste bornée à un groupe de lignes quelle
+que soit la durée de la session. La lecture peut se limiter à quelques
+colonnes (seules celles-ci sont décompressées) ou reconstruire un
+``SampleStore``.
+"""
+import json
+import math
+import struct
+import zlib
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Sequence
+
+import numpy as np
+
+from .sample_store import COLUMNS, DICTIONARY_COLUMNS, TIMESTAMP_FORMAT, SampleStore, StringInterner, parse_rate_mbps
+from .session_journal import FORMAT_SAMPLES
+
+MAGIC = b"WFC1"
+COLUMNAR_EXTENSION = ".wfc"
+DEFAULT_ROW_GROUP_SIZE = 8192
+COMPRESSION_LEVEL = 6
+
+_LENGTH = struct.Struct("<I")
+_TRAILER = struct.Struct("<Q")
+
+
+class ColumnarWriter:
+    """
+    Écrit une session en colonnes, groupe de lignes par groupe de lignes.
+
+    Args:
+        path: fichier ``.wfc`` à créer
+        row_group_size: lignes par groupe (mémoire tampon de l'écriture)
+        metadata: informations libres conservées dans le pied de fichier
+    """
+
+    def __init__(self, path: str, row_group_size: int = DEFAULT_ROW_GROUP_SIZE, metadata: Optional[Dict] = None):
+        self.path = path
+        self.row_group_size = max(1, row_group_size)
+        self.metadata = dict(metadata or {})
+        self.rows = 0
+        self.row_groups: List[Dict] = []
+        self.dictionaries = {name: StringInterner() for name in DICTIONARY_COLUMNS.values()}
+        self._buffer = {name: np.empty(self.row_group_size, dtype=dtype) for name, dtype in COLUMNS.items()}
+        self._buffered = 0
+        self._file = open(path, "wb")
+        self._file.write(MAGIC)
+
+    def write_sample(self, sample) -> None:
+        """Ajoute un ``WifiSample``."""
+        try:
+            ts = datetime.strptime(sample.timestamp, TIMESTAMP_FORMAT).timestamp()
+        except (TypeError, ValueError):
+            ts = math.nan
+        row = {
+            'timestamp': ts,
+            'signal': sample.signal_strength,
+            'quality': sample.quality,
+            'channel': sample.channel,
+            'latency': sample.ping_latency,
+            'jitter': sample.jitter,
+            'packet_loss': getattr(sample, 'packet_loss', 0.0),
+            'tx_rate': parse_rate_mbps(sample.transmit_rate),
+            'rx_rate': parse_rate_mbps(sample.receive_rate),
+            'bssid_id': self.dictionaries['bssids'].intern(sample.bssid),
+            'ssid_id': self.dictionaries['ssids'].intern(sample.ssid),
+            'band_id': self.dictionaries['bands'].intern(sample.band),
+            'status_id': self.dictionaries['statuses'].intern(sample.status),
+            'target_id': self.dictionaries['targets'].intern(sample.ping_target),
+        }
+        index = self._buffered
+        for name, value in row.items():
+            self._buffer[name][index] = value
+        self._buffered += 1
+        if self._buffered == self.row_group_size:
+            self.flush()
+
+    def write_store(self, store: SampleStore) -> None:
+        """Ajoute toutes les lignes d'un ``SampleStore`` sans reconstruire d'échantillons."""
+        remaps = {}
+        for column, dictionary in DICTIONARY_COLUMNS.items():
+            interner = self.dictionaries[dictionary]
+            values = getattr(store, dictionary).values
+            remaps[column] = np.array([interner.intern(v) for v in values] or [0], dtype=COLUMNS[column])
+        for start in range(0, len(store), self.row_group_size):
+            stop = min(start + self.row_group_size, len(store))
+            self.write_columns({
+                name: remaps[name][store.column(name, start, stop)] if name in remaps else store.column(name, start, stop)
+                for name in COLUMNS
+            })
+
+    def write_columns(self, columns: Dict[str, np.ndarray]) -> None:
+        """Ajoute un bloc de lignes en colonnes (identifiants déjà dans les dictionnaires du writer)."""
+        count = len(columns['signal'])
+        offset = 0
+        while offset < count:
+            take = min(count - offset, self.row_group_size - self._buffered)
+            for name in COLUMNS:
+                self._buffer[name][self._buffered:self._buffered + take] = columns[name][offset:offset + take]
+            self._buffered += take
+            offset += take
+            if self._buffered == self.row_group_size:
+                self.flush()
+
+    def flush(self) -> None:
+        """Écrit le groupe de lignes en cours."""
+        count = self._buffered
+        if not count:
+            return
+        group = {'offset': self._file.tell(), 'rows': count, 'columns': {}}
+        for name in COLUMNS:
+            values = self._buffer[name][:count]
+            data = zlib.compress(values.astype(values.dtype.newbyteorder('<'), copy=False).tobytes(),
+                                 COMPRESSION_LEVEL)
+            self._file.write(_LENGTH.pack(len(data)) + data)
+            group['columns'][name] = len(data)
+        timestamps = self._buffer['timestamp'][:count]
+        if not np.isnan(timestamps).all():
+            group['timestamp_min'] = float(np.nanmin(timestamps))
+            group['timestamp_max'] = float(np.nanmax(timestamps))
+        self.row_groups.append(group)
+        self.rows += count
+        self._buffered = 0
+
+    def close(self) -> None:
+        """Écrit le dernier groupe puis le pied de fichier."""
+        if self._file.closed:
+            return
+        self.flush()
+        footer = {
+            'version': 1,
+            'rows': self.rows,
+            'schema': {name: np.dtype(dtype).str for name, dtype in COLUMNS.items()},
+            'dictionary_columns': DICTIONARY_COLUMNS,
+            'dictionaries': {name: interner.values for name, interner in self.dictionaries.items()},
+            'row_groups': self.row_groups,
+            'metadata': self.metadata,
+        }
+        position = self._file.tell()
+        self._file.write(json.dumps(footer, ensure_ascii=False, separators=(",", ":")).encode("utf-8"))
+        self._file.write(_TRAILER.pack(position) + MAGIC)
+        self._file.close()
+
+    def __enter__(self) -> "ColumnarWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class ColumnarReader:
+    """Lecture d'un fichier ``.wfc`` : schéma, dictionnaires et groupes de lignes."""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"{path} n'est pas un export colonnaire")
+            f.seek(-(_TRAILER.size + len(MAGIC)), 2)
+            trailer = f.read()
+            if trailer[_TRAILER.size:] != MAGIC:
+                raise ValueError(f"{path} : export colonnaire incomplet (pied de fichier absent)")
+            position, = _TRAILER.unpack(trailer[:_TRAILER.size])
+            f.seek(position)
+            self.footer = json.loads(f.read()[:-len(trailer)])
+        self.schema = {name: np.dtype(dtype) for name, dtype in self.footer['schema'].items()}
+        self.dictionaries: Dict[str, List[str]] = self.footer['dictionaries']
+        self.row_groups: List[Dict] = self.footer['row_groups']
+        self.metadata: Dict = self.footer.get('metadata', {})
+
+    @property
+    def num_rows(self) -> int:
+        return self.footer['rows']
+
+    def iter_row_groups(self, columns: Optional[Sequence[str]] = None) -> Iterator[Dict[str, np.ndarray]]:
+        """Groupes de lignes ``{colonne: tableau}`` ; seules ``columns`` sont décompressées."""
+        wanted = list(columns or self.schema)
+        unknown = set(wanted) - set(self.schema)
+        if unknown:
+            raise KeyError(f"Colonnes inconnues : {', '.join(sorted(unknown))}")
+        with open(self.path, "rb") as f:
+            for group in self.row_groups:
+                f.seek(group['offset'])
+                block = {}
+                for name, size in group['columns'].items():
+                    if name not in wanted:
+                        f.seek(_LENGTH.size + size, 1)
+                        continue
+                    length, = _LENGTH.unpack(f.read(_LENGTH.size))
+                    block[name] = np.frombuffer(zlib.decompress(f.read(length)), dtype=self.schema[name])
+                yield block
+
+    def read(self, columns: Optional[Sequence[str]] = None) -> Dict[str, np.ndarray]:
+        """Colonnes complètes (concaténation de tous les groupes)."""
+        names = list(columns or self.schema)
+        blocks = list(self.iter_row_groups(names))
+        return {name: np.concatenate([b[name] for b in blocks]) if blocks else np.empty(0, self.schema[name])
+                for name in names}
+
+    def decode(self, column: str, ids: np.ndarray) -> List[str]:
+        """Chaînes d'une colonne encodée par dictionnaire (ex: ``bssid_id``)."""
+        values = self.dictionaries[DICTIONARY_COLUMNS[column]]
+        return [values[i] for i in ids.tolist()]
+
+    def to_store(self) -> SampleStore:
+        """Reconstruit la session dans un ``SampleStore`` (statistiques comprises)."""
+        store = SampleStore(capacity=self.num_rows)
+        for block in self.iter_row_groups():
+            store.append_columns(block, self.dictionaries)
+        return store
+
+
+def export_columnar(samples, path: str, row_group_size: int = DEFAULT_ROW_GROUP_SIZE,
+                    metadata: Optional[Dict] = None) -> str:
+    """Exporte un ``SampleStore`` ou une suite de ``WifiSample`` au format colonnaire."""
+    with ColumnarWriter(path, row_group_size, metadata) as writer:
+        if isinstance(samples, SampleStore):
+            writer.write_store(samples)
+        else:
+            for sample in samples:
+                writer.write_sample(sample)
+    return path
+
+
+def import_columnar(path: str) -> SampleStore:
+    """Relit un export colonnaire dans un ``SampleStore``."""
+    return ColumnarReader(path).to_store()
+
+
+def journal_to_columnar(journal_path: str, path: str, row_group_size: int = DEFAULT_ROW_GROUP_SIZE) -> str:
+    """
+    Convertit un journal de session en export colonnaire, en flux : les
+    mesures sont lues une à une depuis le journal projeté en mémoire.
+    """
+    # Import local : le rejeu dépend de wifi_collector, qui n'est pas requis ici
+    from .replay_collector import ReplaySession, to_powershell_data
+    from .wifi_collector import WifiSample
+
+    session = ReplaySession(journal_path)
+    try:
+        with ColumnarWriter(path, row_group_size, {'source': journal_path, **session.metadata}) as writer:
+            for index in range(len(session)):
+                record = session.record(index)
+                sample = WifiSample.from_powershell_data(to_powershell_data(record, session.format))
+                if session.format == FORMAT_SAMPLES:
+                    sample.jitter = record.get('jitter') or 0.0
+                    sample.ping_target = record.get('ping_target') or ''
+                writer.write_sample(sample)
+    finally:
+        session.close()
+    return path
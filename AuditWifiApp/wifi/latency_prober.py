@@ -0,0 +1,311 @@
+"""
+Sonde de latence asynchrone, indépendante du rythme d'échantillonnage WiFi.
+
+Une boucle asyncio tourne dans un thread dédié et envoie des sondes à son
+propre rythme (2 à 20 par seconde). Chaque sonde est une tâche : un paquet
+perdu n'occupe qu'un créneau et ne bloque ni les sondes suivantes ni la
+collecte. Les RTT sont écrits dans un anneau sans verrou (un seul
+écrivain) que ``WifiCollector`` lit à chaque échantillon.
+
+Le transport est interchangeable : ping système ou écho UDP non privilégié
+(utile pour tester hors ligne contre un serveur d'écho local). Le ping
+système lance un processus par sonde : il est cadencé plus lentement
+(``SUBPROCESS_PING_RATE_HZ``) que les transports sans processus.
+"""
+import asyncio
+import logging
+import math
+import platform
+import re
+import struct
+import threading
+import time
+from array import array
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+_PING_PATTERNS = [
+    re.compile(r"temps[<=>]\s*([0-9]+[,.]?[0-9]*) ?ms"),
+    re.compile(r"time[<=>]?\s*([0-9]+[,.]?[0-9]*) ?ms"),
+    re.compile(r"Average = ([0-9]+[,.]?[0-9]*)"),
+]
+
+# Rythme par défaut avec SubprocessPingTransport : chaque sonde coûte un
+# processus ``ping`` (création, chargement, sortie), trop cher à 10 par seconde
+SUBPROCESS_PING_RATE_HZ = 2.0
+
+
+@dataclass
+class LatencyStats:
+    """Vue instantanée de la latence sur la fenêtre récente."""
+    latency: float = -1.0       # dernier RTT réussi en ms, -1 si aucun
+    jitter: float = 0.0         # moyenne des écarts entre RTT consécutifs
+    loss_percent: float = 0.0   # pertes sur la fenêtre
+    probes: int = 0             # nombre de sondes prises en compte
+
+
+class RttRing:
+    """
+    Anneau de RTT de taille fixe.
+
+    Un seul thread écrit (la boucle asyncio) ; les lecteurs copient une
+    tranche sans verrou. Une perte est stockée sous forme de NaN.
+    """
+
+    def __init__(self, capacity: int = 256):
+        self.capacity = capacity
+        self._values = array('d', [math.nan] * capacity)
+        self._count = 0
+
+    def __len__(self) -> int:
+        return min(self._count, self.capacity)
+
+    def push(self, rtt_ms: Optional[float]) -> None:
+        """Ajoute un RTT (None = sonde perdue)."""
+        self._values[self._count % self.capacity] = math.nan if rtt_ms is None else rtt_ms
+        self._count += 1
+
+    def clear(self) -> None:
+        """Vide l'anneau (à n'appeler que lorsqu'aucun écrivain n'est actif)."""
+        self._count = 0
+        for i in range(self.capacity):
+            self._values[i] = math.nan
+
+    def snapshot(self, size: Optional[int] = None) -> List[float]:
+        """Copie les ``size`` dernières valeurs, de la plus ancienne à la plus récente."""
+        count = self._count
+        size = min(size or self.capacity, count, self.capacity)
+        start = count - size
+        return [self._values[i % self.capacity] for i in range(start, count)]
+
+
+def compute_stats(values: List[float]) -> LatencyStats:
+    """Calcule latence, jitter et pertes à partir d'une tranche de l'anneau."""
+    if not values:
+        return LatencyStats()
+    ok = [v for v in values if not math.isnan(v)]
+    loss = 100.0 * (len(values) - len(ok)) / len(values)
+    if not ok:
+        return LatencyStats(loss_percent=loss, probes=len(values))
+    jitter = 0.0
+    if len(ok) > 1:
+        jitter = sum(abs(ok[i] - ok[i - 1]) for i in range(1, len(ok))) / (len(ok) - 1)
+    return LatencyStats(latency=ok[-1], jitter=jitter, loss_percent=loss, probes=len(values))
+
+
+class ProbeTransport:
+    """Moyen d'envoyer une sonde et de mesurer son RTT."""
+
+    async def probe(self, timeout: float) -> Optional[float]:
+        """Retourne le RTT en ms, ou None si la sonde est perdue."""
+        raise NotImplementedError
+
+    async def close(self) -> None:
+        """Libère les ressources du transport."""
+
+
+class SubprocessPingTransport(ProbeTransport):
+    """
+    Ping système lancé de façon asynchrone (un processus par sonde).
+
+    À utiliser avec ``rate_hz=SUBPROCESS_PING_RATE_HZ`` : au rythme par
+    défaut de ``LatencyProber``, cela ferait 10 processus par seconde.
+    """
+
+    def __init__(self, target: str):
+        self.target = target
+
+    def _command(self, timeout: float) -> List[str]:
+        if platform.system().lower().startswith('win'):
+            return ["ping", "-n", "1", "-w", str(int(timeout * 1000)), self.target]
+        return ["ping", "-c", "1", "-W", str(max(1, math.ceil(timeout))), self.target]
+
+    async def probe(self, timeout: float) -> Optional[float]:
+        try:
+            process = await asyncio.create_subprocess_exec(
+                *self._command(timeout),
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.DEVNULL,
+            )
+        except OSError:
+            return None
+        try:
+            stdout, _ = await asyncio.wait_for(process.communicate(), timeout + 1.0)
+        except asyncio.TimeoutError:
+            process.kill()
+            await process.wait()
+            return None
+        except asyncio.CancelledError:
+            process.kill()
+            raise
+        output = stdout.decode('latin1', errors='replace')
+        for pattern in _PING_PATTERNS:
+            match = pattern.search(output)
+            if match:
+                return float(match.group(1).replace(',', '.'))
+        return None
+
+
+class _EchoProtocol(asyncio.DatagramProtocol):
+    """Associe chaque réponse UDP à la sonde en attente via son numéro."""
+
+    def __init__(self):
+        self.waiters: Dict[int, asyncio.Future] = {}
+
+    def datagram_received(self, data, addr):
+        if len(data) >= 4:
+            waiter = self.waiters.pop(struct.unpack_from('!I', data)[0], None)
+            if waiter is not None and not waiter.done():
+                waiter.set_result(time.perf_counter())
+
+
+class UdpEchoTransport(ProbeTransport):
+    """Écho UDP vers un serveur (pas de privilège requis, testable en local)."""
+
+    def __init__(self, host: str, port: int = 7, payload_size: int = 32):
+        self.host = host
+        self.port = port
+        self.payload_size = max(4, payload_size)
+        self._transport = None
+        self._protocol: Optional[_EchoProtocol] = None
+        self._sequence = 0
+
+    async def probe(self, timeout: float) -> Optional[float]:
+        loop = asyncio.get_running_loop()
+        if self._transport is None:
+            self._transport, self._protocol = await loop.create_datagram_endpoint(
+                _EchoProtocol, remote_addr=(self.host, self.port)
+            )
+        self._sequence = (self._sequence + 1) & 0xFFFFFFFF
+        sequence = self._sequence
+        waiter = loop.create_future()
+        self._protocol.waiters[sequence] = waiter
+        payload = struct.pack('!I', sequence).ljust(self.payload_size, b'\0')
+        sent_at = time.perf_counter()
+        self._transport.sendto(payload)
+        try:
+            received_at = await asyncio.wait_for(waiter, timeout)
+        except asyncio.TimeoutError:
+            return None
+        finally:
+            self._protocol.waiters.pop(sequence, None)
+        return (received_at - sent_at) * 1000.0
+
+    async def close(self) -> None:
+        if self._transport is not None:
+            self._transport.close()
+            self._transport = None
+        self._sequence = 0
+
+
+class LatencyProber:
+    """
+    Envoie des sondes en continu dans un thread asyncio dédié.
+
+    Args:
+        transport: transport de sonde (ping, écho UDP...)
+        rate_hz: nombre de sondes par seconde
+        timeout: délai au-delà duquel une sonde est comptée perdue
+        window: nombre de sondes récentes utilisées pour les statistiques
+    """
+
+    def __init__(
+        self,
+        transport: ProbeTransport,
+        rate_hz: float = 10.0,
+        timeout: float = 1.0,
+        window: int = 50,
+        logger: Optional[logging.Logger] = None,
+    ):
+        self.transport = transport
+        self.rate_hz = rate_hz
+        self.timeout = timeout
+        self.window = window
+        self.ring = RttRing(capacity=max(window, 256))
+        self.logger = logger or logging.getLogger('LatencyProber')
+        # Sondes simultanées nécessaires pour tenir le rythme malgré les pertes
+        self.max_in_flight = max(1, math.ceil(timeout * rate_hz) + 1)
+        self._thread: Optional[threading.Thread] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._stop: Optional[asyncio.Event] = None
+        self._ready = threading.Event()
+
+    @property
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        """Démarre la boucle de sondes en arrière-plan, avec un anneau vide."""
+        if self.is_running:
+            return
+        # Les RTT et pertes d'une collecte précédente ne doivent pas fausser la nouvelle
+        self.ring.clear()
+        self._ready.clear()
+        self._thread = threading.Thread(target=self._run, name='LatencyProber', daemon=True)
+        self._thread.start()
+        self._ready.wait(timeout=2.0)
+
+    def stop(self) -> None:
+        """Arrête la boucle et attend la fin du thread."""
+        if not self.is_running:
+            return
+        if self._loop is not None and self._stop is not None:
+            self._loop.call_soon_threadsafe(self._stop.set)
+        self._thread.join(timeout=self.timeout + 3.0)
+        self._thread = None
+
+    def latest(self) -> LatencyStats:
+        """Statistiques courantes, sans attente."""
+        return compute_stats(self.ring.snapshot(self.window))
+
+    def _run(self) -> None:
+        loop = asyncio.new_event_loop()
+        self._loop = loop
+        try:
+            loop.run_until_complete(self._probe_loop())
+        except Exception as e:
+            self.logger.error(f"Boucle de sondes interrompue: {e}")
+        finally:
+            loop.close()
+            self._loop = None
+
+    async def _probe_loop(self) -> None:
+        self._stop = asyncio.Event()
+        self._ready.set()
+        slots = asyncio.Semaphore(self.max_in_flight)
+        tasks = set()
+        interval = 1.0 / self.rate_hz
+        next_at = time.monotonic()
+        while not self._stop.is_set():
+            await slots.acquire()
+            task = asyncio.ensure_future(self._probe_once(slots))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+
+            next_at += interval
+            delay = next_at - time.monotonic()
+            if delay < 0:
+                # En retard (machine chargée) : on ne rattrape pas en rafale
+                next_at = time.monotonic()
+                delay = 0
+            try:
+                await asyncio.wait_for(self._stop.wait(), delay)
+            except asyncio.TimeoutError:
+                pass
+
+        for task in list(tasks):
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await self.transport.close()
+
+    async def _probe_once(self, slots: asyncio.Semaphore) -> None:
+        try:
+            rtt = await self.transport.probe(self.timeout)
+            self.ring.push(rtt)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self.logger.debug(f"Sonde en échec: {e}")
+            self.ring.push(None)
+        finally:
+            slots.release()
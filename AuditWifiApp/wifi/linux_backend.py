@@ -0,0 +1,327 @@
+"""
+Backend de collecte Linux basé sur /proc/net/wireless et ``iw``.
+
+Le niveau de signal est lu dans /proc/net/wireless (simple lecture de
+fichier, sans processus), l'association courante via ``iw dev <if> link``
+(un seul exec, sans shell) et les compteurs de la station via
+``iw dev <if> station dump`` à une fréquence réduite. Cela permet
+d'échantillonner à 10 Hz sur les passerelles AMR.
+
+Les fonctions ``parse_*`` sont pures et testées sur des sorties enregistrées.
+"""
+import logging
+import re
+import shutil
+import subprocess
+from typing import Callable, Dict, List, Optional
+
+from .collector_backend import CollectorBackend
+
+PROC_NET_WIRELESS = "/proc/net/wireless"
+
+_MAC_RE = r"([0-9a-fA-F]{2}(?::[0-9a-fA-F]{2}){5})"
+_LINK_CONNECTED_RE = re.compile(r"^Connected to " + _MAC_RE)
+_STATION_RE = re.compile(r"^Station " + _MAC_RE)
+_BSS_RE = re.compile(r"^BSS " + _MAC_RE)
+_NUMBER_RE = re.compile(r"-?\d+(?:\.\d+)?")
+
+
+def frequency_to_channel(freq_mhz: int) -> int:
+    """Convertit une fréquence centrale (MHz) en numéro de canal 802.11."""
+    if freq_mhz == 2484:
+        return 14
+    if 2412 <= freq_mhz < 2484:
+        return (freq_mhz - 2407) // 5
+    if 5000 <= freq_mhz < 5925:
+        return (freq_mhz - 5000) // 5
+    if 5925 <= freq_mhz <= 7125:
+        return (freq_mhz - 5950) // 5
+    return 0
+
+
+def frequency_to_band(freq_mhz: int) -> str:
+    """Retourne la bande (libellé utilisé dans toute l'application)."""
+    if 2400 <= freq_mhz < 2500:
+        return "2.4 GHz"
+    if 5000 <= freq_mhz < 5925:
+        return "5 GHz"
+    if 5925 <= freq_mhz <= 7125:
+        return "6 GHz"
+    return "N/A"
+
+
+def dbm_to_quality(dbm: float) -> int:
+    """Convertit un niveau dBm en qualité % (convention Windows, inverse du collecteur PowerShell)."""
+    return int(max(0, min(100, 2 * (dbm + 100))))
+
+
+def _first_number(text: str) -> Optional[float]:
+    match = _NUMBER_RE.search(text)
+    return float(match.group()) if match else None
+
+
+def parse_proc_net_wireless(text: str) -> Dict[str, Dict]:
+    """
+    Analyse /proc/net/wireless.
+
+    Returns:
+        {interface: {'status', 'link', 'level', 'noise', 'discarded_retry',
+        'missed_beacon'}} ; niveaux en dBm, None si non fournis (-256).
+    """
+    interfaces = {}
+    for line in text.splitlines():
+        if ':' not in line or '|' in line:
+            continue
+        name, values = line.split(':', 1)
+        fields = values.split()
+        if len(fields) < 10:
+            continue
+        numbers = [float(f.rstrip('.')) for f in fields[1:10]]
+        interfaces[name.strip()] = {
+            'status': int(fields[0], 16),
+            'link': numbers[0],
+            'level': numbers[1] if numbers[1] > -256 else None,
+            'noise': numbers[2] if numbers[2] > -256 else None,
+            'discarded_retry': int(numbers[6]),
+            'missed_beacon': int(numbers[8]),
+        }
+    return interfaces
+
+
+def parse_iw_dev(text: str) -> List[str]:
+    """Liste les interfaces déclarées par ``iw dev``."""
+    return [
+        line.split()[1]
+        for line in text.splitlines()
+        if line.strip().startswith('Interface ')
+    ]
+
+
+def parse_iw_link(text: str) -> Dict:
+    """Analyse ``iw dev <if> link``."""
+    info = {'connected': False}
+    for raw in text.splitlines():
+        line = raw.strip()
+        match = _LINK_CONNECTED_RE.match(line)
+        if match:
+            info['connected'] = True
+            info['bssid'] = match.group(1).lower()
+            continue
+        key, sep, value = line.partition(':')
+        if not sep:
+            continue
+        value = value.strip()
+        if key == 'SSID':
+            info['ssid'] = value
+        elif key == 'freq':
+            info['freq'] = int(float(value))
+        elif key == 'signal':
+            info['signal'] = _first_number(value)
+        elif key == 'rx bitrate':
+            info['rx_bitrate'] = _first_number(value)
+        elif key == 'tx bitrate':
+            info['tx_bitrate'] = _first_number(value)
+    return info
+
+
+def parse_iw_station_dump(text: str) -> List[Dict]:
+    """Analyse ``iw dev <if> station dump`` (une entrée par station)."""
+    numeric_keys = {
+        'signal': 'signal',
+        'signal avg': 'signal_avg',
+        'tx bitrate': 'tx_bitrate',
+        'rx bitrate': 'rx_bitrate',
+        'tx retries': 'tx_retries',
+        'tx failed': 'tx_failed',
+        'beacon loss': 'beacon_loss',
+        'inactive time': 'inactive_ms',
+        'connected time': 'connected_s',
+    }
+    stations = []
+    current = None
+    for raw in text.splitlines():
+        line = raw.strip()
+        match = _STATION_RE.match(line)
+        if match:
+            current = {'bssid': match.group(1).lower()}
+            stations.append(current)
+            continue
+        if current is None:
+            continue
+        key, sep, value = line.partition(':')
+        name = numeric_keys.get(key.strip())
+        if sep and name:
+            current[name] = _first_number(value)
+    return stations
+
+
+def parse_iw_scan(text: str) -> List[Dict]:
+    """
+    Analyse ``iw dev <if> scan dump``.
+
+    Returns:
+        Liste au format de ``network_scanner.scan_wifi()`` (ssid, bssid,
+        signal, signal_percent, channel, frequency, frequency_mhz).
+    """
+    networks = []
+    current = None
+    for raw in text.splitlines():
+        line = raw.strip()
+        match = _BSS_RE.match(line)
+        if match:
+            current = {'bssid': match.group(1).lower(), 'ssid': ''}
+            networks.append(current)
+            continue
+        if current is None:
+            continue
+        key, sep, value = line.partition(':')
+        if not sep:
+            continue
+        value = value.strip()
+        if key == 'freq':
+            freq = int(float(value))
+            current['frequency_mhz'] = freq
+            current['frequency'] = frequency_to_band(freq)
+            current.setdefault('channel', frequency_to_channel(freq))
+        elif key == 'signal':
+            dbm = _first_number(value)
+            if dbm is not None:
+                current['signal'] = int(round(dbm))
+                current['signal_percent'] = f"{dbm_to_quality(dbm)}%"
+        elif key == 'SSID':
+            current['ssid'] = value
+        elif key in ('DS Parameter set', '* primary channel'):
+            channel = _first_number(value)
+            if channel is not None:
+                current['channel'] = int(channel)
+    return networks
+
+
+def _run_command(argv: List[str]) -> str:
+    """Exécute une commande sans shell et retourne sa sortie standard."""
+    result = subprocess.run(argv, capture_output=True, text=True, timeout=2, check=False)
+    if result.returncode != 0:
+        raise RuntimeError(f"{' '.join(argv)} a échoué: {result.stderr.strip()}")
+    return result.stdout
+
+
+class LinuxIwBackend(CollectorBackend):
+    """Backend Linux : /proc/net/wireless + iw (nl80211)."""
+
+    name = "linux-iw"
+
+    def __init__(
+        self,
+        interface: Optional[str] = None,
+        station_dump_every: int = 10,
+        proc_path: str = PROC_NET_WIRELESS,
+        iw_path: str = "iw",
+        runner: Optional[Callable[[List[str]], str]] = None,
+        logger: Optional[logging.Logger] = None,
+    ):
+        self.interface = interface
+        self.station_dump_every = max(1, station_dump_every)
+        self.proc_path = proc_path
+        self.iw_path = iw_path
+        self._run = runner or _run_command
+        self.logger = logger or logging.getLogger('LinuxIwBackend')
+        self._reads = 0
+        self._station: Dict = {}
+
+    @staticmethod
+    def is_available(iw_path: str = "iw") -> bool:
+        """Vérifie la présence de ``iw`` sur la machine."""
+        return shutil.which(iw_path) is not None
+
+    def _read_proc(self) -> Dict[str, Dict]:
+        try:
+            with open(self.proc_path, encoding='ascii', errors='replace') as f:
+                return parse_proc_net_wireless(f.read())
+        except OSError:
+            return {}
+
+    def _detect_interface(self) -> Optional[str]:
+        interfaces = list(self._read_proc())
+        if not interfaces:
+            try:
+                interfaces = parse_iw_dev(self._run([self.iw_path, 'dev']))
+            except (OSError, RuntimeError, subprocess.TimeoutExpired) as e:
+                self.logger.error(f"Impossible de lister les interfaces WiFi: {e}")
+        return interfaces[0] if interfaces else None
+
+    def start(self) -> bool:
+        if self.interface is None:
+            self.interface = self._detect_interface()
+        if self.interface is None:
+            self.logger.error("Aucune interface WiFi détectée")
+            return False
+        self._reads = 0
+        self._station = {}
+        self.logger.info(f"Collecte Linux sur l'interface {self.interface}")
+        return True
+
+    def read_sample(self) -> Optional[Dict]:
+        if self.interface is None:
+            return None
+        iface = self.interface
+        try:
+            link = parse_iw_link(self._run([self.iw_path, 'dev', iface, 'link']))
+            if link['connected'] and self._reads % self.station_dump_every == 0:
+                stations = parse_iw_station_dump(
+                    self._run([self.iw_path, 'dev', iface, 'station', 'dump'])
+                )
+                self._station = next(
+                    (s for s in stations if s['bssid'] == link['bssid']), {}
+                )
+        except (OSError, RuntimeError, subprocess.TimeoutExpired) as e:
+            self.logger.error(f"Lecture iw impossible sur {iface}: {e}")
+            return None
+        self._reads += 1
+
+        if not link['connected']:
+            return {'Status': 'Disconnected', 'Interface': iface}
+
+        proc = self._read_proc().get(iface, {})
+        return self.build_sample(iface, link, proc, self._station)
+
+    @staticmethod
+    def build_sample(iface: str, link: Dict, proc: Dict, station: Dict) -> Dict:
+        """Assemble un échantillon au format PowerShell à partir des sorties brutes."""
+        # /proc est relu à chaque tick, iw link peut être légèrement plus ancien
+        dbm = proc.get('level')
+        if dbm is None:
+            dbm = link.get('signal')
+        if dbm is None:
+            dbm = -100
+        freq = link.get('freq', 0)
+        tx = link.get('tx_bitrate') or station.get('tx_bitrate') or 0
+        rx = link.get('rx_bitrate') or station.get('rx_bitrate') or 0
+        return {
+            'Interface': iface,
+            'SSID': link.get('ssid', 'N/A'),
+            'BSSID': link.get('bssid', '00:00:00:00:00:00'),
+            'SignalStrength': f"{dbm_to_quality(dbm)}%",
+            'SignalStrengthDBM': int(round(dbm)),
+            'Noise': proc.get('noise'),
+            'Channel': frequency_to_channel(freq),
+            'Band': frequency_to_band(freq),
+            'Status': 'Connected',
+            'TransmitRate': f"{tx:g} Mbps",
+            'ReceiveRate': f"{rx:g} Mbps",
+            'TxRetries': station.get('tx_retries'),
+            'TxFailed': station.get('tx_failed'),
+            'BeaconLoss': station.get('beacon_loss'),
+            'PingLatency': -1,
+        }
+
+
+def scan_networks(interface: Optional[str] = None, iw_path: str = "iw") -> List[Dict]:
+    """Retourne les réseaux visibles (cache du noyau, pas besoin d'être root)."""
+    backend = LinuxIwBackend(interface=interface, iw_path=iw_path)
+    if not backend.start():
+        return []
+    try:
+        output = _run_command([iw_path, 'dev', backend.interface, 'scan', 'dump'])
+    except (OSError, RuntimeError, subprocess.TimeoutExpired):
+        return []
+    return parse_iw_scan(output)
@@ -1,7 +1,6 @@
 """
 Interface avec le script PowerShell de collecte WiFi
 """
-import subprocess
 import json
 from typing import Optional, Dict, List
 import os
@@ -9,8 +8,17 @@ from datetime import datetime
 import threading
 import time
 
+from .collector_backend import CollectorBackend
+from .collector_worker import PersistentCollectorWorker, PowerShellWorkerProtocol
+from .session_journal import FORMAT_SESSION, JOURNAL_EXTENSION, SessionJournal, prune_journals, recover_sessions
+
 class PowerShellWiFiCollector:
-    def __init__(self):
+    def __init__(
+        self,
+        worker: Optional[PersistentCollectorWorker] = None,
+        backend: Optional[CollectorBackend] = None,
+        journal_dir: Optional[str] = None,
+    ):
         self.script_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'wifi_monitor.ps1')
         self.is_collecting = False
         self.collection_thread = None
@@ -18,81 +26,78 @@ class PowerShellWiFiCollector:
         self.collection_interval = 1.0  # Intervalle en secondes
         self.current_session = None
         self.session_data = []
-
-    def get_wifi_data(self) -> Optional[Dict]:
-        """
-        Exécute le script PowerShell pour obtenir les données WiFi
-        """
-        try:
+        # Interpréteur PowerShell gardé ouvert entre deux mesures
+        self.worker = worker
+        # Backend natif (ex: iw sous Linux) renvoyant des données déjà normalisées
+        self.backend = backend
+        self._backend_started = False
+        # Journal binaire de la session : les mesures survivent à un arrêt brutal
+        self.journal_dir = journal_dir
+        self.journal: Optional[SessionJournal] = None
+
+    def _get_worker(self) -> Optional[PersistentCollectorWorker]:
+        """Crée le worker persistant au premier appel."""
+        if self.worker is None:
             # Vérifier que le script existe
             if not os.path.exists(self.script_path):
                 print(f"ERREUR: Script PowerShell non trouvé: {self.script_path}")
                 return None
+            self.worker = PersistentCollectorWorker(PowerShellWorkerProtocol(self.script_path))
+        return self.worker
 
-            # Exécuter Get-WifiStatus du script PowerShell
-            cmd = [
-                "powershell.exe",
-                "-NoProfile",
-                "-ExecutionPolicy", "Bypass",
-                "-File", self.script_path
-            ]
-
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                encoding='latin1',  # Important pour le décodage des caractères spéciaux
-                timeout=10  # Timeout de 10 secondes
-            )
+    def get_wifi_data(self) -> Optional[Dict]:
+        """
+        Demande un échantillon au worker PowerShell persistant
+        """
+        try:
+            if self.backend is not None:
+                if not self._backend_started:
+                    self._backend_started = self.backend.start()
+                return self.backend.read_sample() if self._backend_started else None
 
-            if result.returncode != 0:
-                print(f"ERREUR PowerShell (code {result.returncode}): {result.stderr}")
+            worker = self._get_worker()
+            if worker is None:
                 return None
 
-            # Convertir la sortie JSON en dictionnaire
-            try:
-                # Nettoyer les caractères non-JSON
-                output = result.stdout.strip()
-                if not output:
-                    print("ERREUR: Sortie PowerShell vide")
-                    return None
-
-                wifi_data = json.loads(output)
-                if not isinstance(wifi_data, dict):
-                    print(f"ERREUR: Format de données inattendu: {type(wifi_data)}")
-                    return None
-
-                # Normaliser les noms des champs
-                normalized_data = {
-                    "SSID": wifi_data.get("SSID", "N/A"),
-                    "BSSID": wifi_data.get("BSSID", "00:00:00:00:00:00"),
-                    "SignalStrength": str(wifi_data.get("Signal", 0)) + "%",
-                    "SignalStrengthDBM": -100 + int(wifi_data.get("Signal", 0)) * 0.5,
-                    "Channel": wifi_data.get("Channel", "N/A"),
-                    "Band": wifi_data.get("Band", "2.4 GHz"),
-                    "Status": wifi_data.get("Status", "Déconnecté"),
-                    "TransmitRate": wifi_data.get("TransmitRate", "0 Mbps"),
-                    "ReceiveRate": wifi_data.get("ReceiveRate", "0 Mbps"),
-                    "Authentication": wifi_data.get("Authentication", "N/A"),
-                    "PingLatency": wifi_data.get("PingLatency", -1),
-                    "Gateway": wifi_data.get("Gateway", "N/A")
-                }
-                return normalized_data
-
-            except json.JSONDecodeError as je:
-                print(f"ERREUR décodage JSON: {je}")
-                print(f"SORTIE brute: {output}")
+            wifi_data = worker.request_sample(timeout=10)  # Timeout de 10 secondes
+            if wifi_data is None:
+                print("ERREUR: Aucune donnée reçue du worker PowerShell")
                 return None
 
-        except subprocess.TimeoutExpired:
-            print("ERREUR: Timeout lors de l'exécution du script PowerShell")
-            return None
+            return self._normalize(wifi_data)
+
         except Exception as e:
             print(f"ERREUR lors de la collecte WiFi: {str(e)}")
             import traceback
             traceback.print_exc()
             return None
 
+    @staticmethod
+    def _normalize(wifi_data: Dict) -> Dict:
+        """Normalise les noms des champs renvoyés par le script"""
+        return {
+            "SSID": wifi_data.get("SSID", "N/A"),
+            "BSSID": wifi_data.get("BSSID", "00:00:00:00:00:00"),
+            "SignalStrength": str(wifi_data.get("Signal", 0)) + "%",
+            "SignalStrengthDBM": -100 + int(wifi_data.get("Signal", 0)) * 0.5,
+            "Channel": wifi_data.get("Channel", "N/A"),
+            "Band": wifi_data.get("Band", "2.4 GHz"),
+            "Status": wifi_data.get("Status", "Déconnecté"),
+            "TransmitRate": wifi_data.get("TransmitRate", "0 Mbps"),
+            "ReceiveRate": wifi_data.get("ReceiveRate", "0 Mbps"),
+            "Authentication": wifi_data.get("Authentication", "N/A"),
+            "PingLatency": wifi_data.get("PingLatency", -1),
+            "Gateway": wifi_data.get("Gateway", "N/A")
+        }
+
+    def close(self):
+        """Arrête le worker PowerShell persistant ou le backend natif"""
+        if self.worker is not None:
+            self.worker.stop()
+        if self.backend is not None and self._backend_started:
+            self.backend.stop()
+            self._backend_started = False
+
     def _collection_loop(self):
         """Boucle de collecte des données"""
         while self.is_collecting:
@@ -102,6 +107,9 @@ class PowerShellWiFiCollector:
                     # Ajouter timestamp
                     data['timestamp'] = datetime.now().isoformat()
                     self.session_data.append(data)
+                    journal = self.journal
+                    if journal is not None and not journal.closed:
+                        journal.append(data)
 
                     # Appeler le callback si défini
                     if self.data_callback:
@@ -131,6 +139,13 @@ class PowerShellWiFiCollector:
         self.collection_interval = interval
         self.current_session = datetime.now().strftime("%Y%m%d_%H%M%S")
         self.session_data = []
+        if self.journal_dir:
+            recover_sessions(self.journal_dir)
+            prune_journals(self.journal_dir)
+            self.journal = SessionJournal(
+                os.path.join(self.journal_dir, f"wifi_session_{self.current_session}{JOURNAL_EXTENSION}"),
+                {'format': FORMAT_SESSION, 'session_id': self.current_session},
+            )
 
         # Démarrer la collecte dans un thread séparé
         self.collection_thread = threading.Thread(target=self._collection_loop)
@@ -149,6 +164,9 @@ class PowerShellWiFiCollector:
         self.is_collecting = False
         if self.collection_thread and self.collection_thread.is_alive():
             self.collection_thread.join(timeout=2.0)
+        self.close()
+        if self.journal is not None:
+            self.journal.close()
 
         return self.session_data
 
@@ -170,4 +188,9 @@ class PowerShellWiFiCollector:
                 'measurements': self.session_data
             }, f, indent=2, ensure_ascii=False)
 
+        # L'export JSON remplace le journal de la session, devenu inutile
+        if self.journal is not None and self.journal.closed:
+            os.remove(self.journal.path)
+            self.journal = None
+
         return filepath
@@ -0,0 +1,262 @@
+"""
+Rejeu d'une session WiFi enregistrée.
+
+``ReplayBackend`` est un backend de collecte comme les autres : branché sur
+un ``WifiCollector``, il alimente le même pipeline que la collecte réelle
+(``collect_sample``, ``SamplePipeline``, statistiques, graphiques) à partir
+d'un journal de session (``.wfj``) projeté en mémoire avec ``mmap``. Les
+mesures sont décodées à la demande, sans charger le fichier, et cadencées
+sur leurs horodatages d'origine à la vitesse demandée (1x, 10x...) ou
+aussi vite que possible (``speed=None``).
+
+Les exports JSON (échantillons, session PowerShell, enregistrements) sont
+d'abord convertis par ``convert_to_journal`` dans un journal temporaire,
+supprimé à l'arrêt du rejeu : les fichiers de l'utilisateur ne sont jamais
+modifiés.
+"""
+import json
+import mmap
+import os
+import tempfile
+import time
+from datetime import datetime
+from typing import Dict, Optional
+
+from .collector_backend import CollectorBackend
+from .sample_store import TIMESTAMP_FORMAT
+from .session_journal import (
+    END,
+    FORMAT_RECORDS,
+    FORMAT_SAMPLES,
+    FORMAT_SESSION,
+    FRAME,
+    HEADER,
+    JOURNAL_EXTENSION,
+    MAGIC,
+    RECORD,
+    SessionJournal,
+)
+
+# Vitesses proposées par l'interface ; None = sans attente
+REPLAY_SPEEDS = {"1x": 1.0, "10x": 10.0, "max": None}
+
+
+def convert_to_journal(json_path: str, output: Optional[str] = None) -> str:
+    """
+    Convertit un export JSON de session en journal binaire rejouable
+    (par défaut à côté de l'export, avec l'extension ``.wfj``).
+
+    Raises:
+        FileExistsError: si le journal de destination existe déjà et n'est pas vide
+    """
+    with open(json_path, encoding='utf-8') as f:
+        document = json.load(f)
+    if isinstance(document, dict):
+        metadata = {'format': FORMAT_SESSION, 'session_id': document.get('session_id')}
+        records = document.get('measurements', [])
+    else:
+        records = document
+        is_record = bool(records) and 'wifi' in records[0]
+        metadata = {'format': FORMAT_RECORDS if is_record else FORMAT_SAMPLES}
+    metadata['source'] = os.path.basename(json_path)
+
+    output = output or os.path.splitext(json_path)[0] + JOURNAL_EXTENSION
+    if os.path.exists(output) and os.path.getsize(output) > 0:
+        raise FileExistsError(f"{output} existe déjà, conversion abandonnée")
+    with SessionJournal(output, metadata, sync_every=len(records) + 1) as journal:
+        for record in records:
+            journal.append(record)
+    return output
+
+
+class ReplaySession:
+    """
+    Journal de session projeté en mémoire, accès direct aux mesures.
+
+    Seuls les en-têtes de trame sont lus à l'ouverture (index des positions) ;
+    le contenu d'une mesure n'est décodé qu'à sa lecture.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, 'rb')
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._map[:len(MAGIC)] != MAGIC:
+            self.close()
+            raise ValueError(f"{path} n'est pas un journal de session")
+        self.metadata: Dict = {}
+        self._offsets = []
+        offset = len(MAGIC)
+        size = len(self._map)
+        while offset + FRAME.size <= size:
+            kind, length, _ = FRAME.unpack_from(self._map, offset)
+            start = offset + FRAME.size
+            if kind not in (HEADER, RECORD, END) or start + length > size:
+                break  # Fin de session interrompue : on s'arrête à la dernière trame entière
+            if kind == HEADER:
+                self.metadata = json.loads(self._map[start:start + length])
+            elif kind == RECORD:
+                self._offsets.append((start, length))
+            else:
+                break
+            offset = start + length
+
+    @property
+    def format(self) -> str:
+        return self.metadata.get('format', FORMAT_SAMPLES)
+
+    def __len__(self) -> int:
+        return len(self._offsets)
+
+    def record(self, index: int) -> Dict:
+        start, length = self._offsets[index]
+        return json.loads(self._map[start:start + length])
+
+    def close(self) -> None:
+        if not self._map.closed:
+            self._map.close()
+        self._file.close()
+
+
+def _parse_time(value) -> Optional[float]:
+    try:
+        return datetime.fromisoformat(value).timestamp()
+    except (TypeError, ValueError):
+        return None
+
+
+def to_powershell_data(record: Dict, fmt: str) -> Dict:
+    """Convertit une mesure enregistrée au format renvoyé par les backends."""
+    if fmt == FORMAT_SESSION:
+        data = dict(record)
+        stamp = record.get('timestamp')
+    elif fmt == FORMAT_RECORDS:
+        wifi = record.get('wifi') or {}
+        ping = record.get('ping') or {}
+        dbm = wifi.get('signal_dbm', wifi.get('signal_strength', -100))
+        data = {
+            'SSID': wifi.get('ssid', 'N/A'),
+            'BSSID': wifi.get('bssid', '00:00:00:00:00:00'),
+            'SignalStrength': f"{wifi.get('signal_percent', 0)}%",
+            'SignalStrengthDBM': dbm,
+            'Channel': wifi.get('channel', 0),
+            'Band': wifi.get('band', 'N/A'),
+            'Status': 'Connected' if wifi else 'Disconnected',
+            'PingLatency': ping.get('latency', -1),
+            'PacketLoss': ping.get('packet_loss', 0),
+        }
+        stamp = record.get('timestamp')
+    else:
+        data = dict(record.get('raw_data') or {})
+        data.update({
+            'SSID': record.get('ssid', 'N/A'),
+            'BSSID': record.get('bssid', '00:00:00:00:00:00'),
+            'SignalStrength': f"{record.get('quality', 0)}%",
+            'SignalStrengthDBM': record.get('signal_strength', -100),
+            'Channel': record.get('channel', 0),
+            'Band': record.get('band', 'N/A'),
+            'Status': record.get('status', 'Disconnected'),
+            'TransmitRate': record.get('transmit_rate', '0 Mbps'),
+            'ReceiveRate': record.get('receive_rate', '0 Mbps'),
+            'PingLatency': record.get('ping_latency', -1),
+            'PacketLoss': record.get('packet_loss', 0),
+        })
+        # Déjà au format de WifiSample : repris tel quel
+        if record.get('timestamp'):
+            data['SampleTimestamp'] = record['timestamp']
+            return data
+        stamp = None
+
+    # Horodatage d'origine conservé par WifiSample.from_powershell_data
+    ts = _parse_time(stamp)
+    if ts is not None:
+        data['SampleTimestamp'] = datetime.fromtimestamp(ts).strftime(TIMESTAMP_FORMAT)
+    return data
+
+
+class ReplayBackend(CollectorBackend):
+    """
+    Backend rejouant une session enregistrée.
+
+    Args:
+        path: journal ``.wfj`` ou export JSON (converti à l'ouverture dans
+            un journal temporaire, supprimé par ``stop``)
+        speed: facteur d'accélération (1.0 = temps réel), None pour ne pas attendre
+        default_interval: écart supposé entre deux mesures sans horodatage (s)
+    """
+
+    name = "replay"
+    live = False
+
+    def __init__(self, path: str, speed: Optional[float] = 1.0, default_interval: float = 1.0):
+        self.path = path
+        self.speed = speed
+        self.default_interval = default_interval
+        self.session: Optional[ReplaySession] = None
+        self.position = 0
+        self._origin: Optional[float] = None   # horodatage de la première mesure
+        self._started_at = 0.0                  # horloge monotone au début du rejeu
+        self._converted: Optional[str] = None   # journal temporaire issu d'un export JSON
+
+    @property
+    def finished(self) -> bool:
+        return self.session is not None and self.position >= len(self.session)
+
+    def __len__(self) -> int:
+        return len(self.session) if self.session is not None else 0
+
+    def start(self) -> bool:
+        path = self.path
+        if not path.endswith(JOURNAL_EXTENSION):
+            fd, path = tempfile.mkstemp(prefix='replay_', suffix=JOURNAL_EXTENSION)
+            os.close(fd)
+            self._converted = path
+            try:
+                convert_to_journal(self.path, path)
+            except Exception:
+                self._remove_converted()
+                raise
+        self.session = ReplaySession(path)
+        self.position = 0
+        self._origin = None
+        self._started_at = time.monotonic()
+        return True
+
+    def stop(self) -> None:
+        if self.session is not None:
+            self.session.close()
+        self._remove_converted()
+
+    def _remove_converted(self) -> None:
+        """Supprime le journal temporaire créé pour rejouer un export JSON."""
+        if self._converted is not None:
+            try:
+                os.remove(self._converted)
+            except OSError:
+                pass
+            self._converted = None
+
+    def _wait_until(self, data: Dict) -> None:
+        """Attend l'instant de la mesure, rapporté à la vitesse de rejeu."""
+        if not self.speed:
+            return
+        stamp = data.get('SampleTimestamp')
+        ts = datetime.strptime(stamp, TIMESTAMP_FORMAT).timestamp() if stamp else None
+        if ts is None:
+            offset = (self.position - 1) * self.default_interval
+        else:
+            if self._origin is None:
+                self._origin = ts
+            offset = ts - self._origin
+        delay = self._started_at + offset / self.speed - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+
+    def read_sample(self) -> Optional[Dict]:
+        if self.session is None or self.finished:
+            return None
+        # Avance avant le décodage : une mesure illisible est sautée, pas relue en boucle
+        self.position += 1
+        data = to_powershell_data(self.session.record(self.position - 1), self.session.format)
+        self._wait_until(data)
+        return data
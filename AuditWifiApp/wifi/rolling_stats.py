@@ -0,0 +1,237 @@
+"""
+Statistiques incrémentales pour les panneaux temps réel.
+
+Chaque échantillon met à jour les accumulateurs en O(1) amorti ; les
+panneaux et les rapports interrogent les résultats sans relire la session.
+
+- ``RunningStats`` : moyenne, variance (Welford), min et max cumulés ;
+- ``SlidingWindowStats`` : mêmes grandeurs sur les N derniers échantillons,
+  avec min/max par files monotones et centiles sur une copie triée ;
+- ``SessionStats`` : regroupe les métriques d'une session WiFi (fenêtre
+  récente, cumul de latence/jitter, cumul par BSSID).
+"""
+import math
+from bisect import bisect_left, insort
+from collections import deque
+from typing import Deque, Dict, Iterable, List, Optional, Tuple
+
+# BSSID sans signification pour les statistiques par point d'accès
+IGNORED_BSSIDS = {"", "00:00:00:00:00:00", "Unknown"}
+
+
+class RunningStats:
+    """Moyenne et variance en ligne (algorithme de Welford)."""
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (value - self.mean)
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    @property
+    def variance(self) -> float:
+        """Variance de population (0 si moins de deux valeurs)."""
+        return self._m2 / self.count if self.count > 1 else 0.0
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(self.variance)
+
+
+class SlidingWindowStats:
+    """
+    Statistiques sur les ``size`` derniers échantillons.
+
+    Une valeur ``None`` occupe une place dans la fenêtre sans être comptée
+    (latence non mesurée par exemple) : la fenêtre reste alignée sur les
+    échantillons, comme les tranches ``[-100:]`` qu'elle remplace.
+    """
+
+    def __init__(self, size: int):
+        if size < 1:
+            raise ValueError("La taille de fenêtre doit être positive")
+        self.size = size
+        self._values: Deque[Optional[float]] = deque()
+        self._index = 0
+        self._sum = 0.0
+        self._sum_sq = 0.0
+        self._count = 0
+        # Files monotones (index, valeur) : la tête est le min / max courant
+        self._min: Deque[Tuple[int, float]] = deque()
+        self._max: Deque[Tuple[int, float]] = deque()
+        self._sorted: List[float] = []
+
+    def __len__(self) -> int:
+        """Nombre de valeurs comptées dans la fenêtre."""
+        return self._count
+
+    @property
+    def slots(self) -> int:
+        """Nombre d'échantillons couverts par la fenêtre, valeurs vides comprises."""
+        return len(self._values)
+
+    def add(self, value: Optional[float]) -> None:
+        index = self._index
+        self._index += 1
+
+        if len(self._values) == self.size:
+            expired = self._values.popleft()
+            if expired is not None:
+                self._sum -= expired
+                self._sum_sq -= expired * expired
+                self._count -= 1
+                del self._sorted[bisect_left(self._sorted, expired)]
+        oldest = index - self.size
+        while self._min and self._min[0][0] <= oldest:
+            self._min.popleft()
+        while self._max and self._max[0][0] <= oldest:
+            self._max.popleft()
+
+        self._values.append(value)
+        if value is None:
+            return
+        self._sum += value
+        self._sum_sq += value * value
+        self._count += 1
+        insort(self._sorted, value)
+        while self._min and self._min[-1][1] >= value:
+            self._min.pop()
+        self._min.append((index, value))
+        while self._max and self._max[-1][1] <= value:
+            self._max.pop()
+        self._max.append((index, value))
+
+    def clear(self) -> None:
+        self.__init__(self.size)
+
+    @property
+    def mean(self) -> Optional[float]:
+        return self._sum / self._count if self._count else None
+
+    @property
+    def std(self) -> Optional[float]:
+        if not self._count:
+            return None
+        mean = self._sum / self._count
+        return math.sqrt(max(0.0, self._sum_sq / self._count - mean * mean))
+
+    @property
+    def min(self) -> Optional[float]:
+        return self._min[0][1] if self._min else None
+
+    @property
+    def max(self) -> Optional[float]:
+        return self._max[0][1] if self._max else None
+
+    def percentile(self, percent: float) -> Optional[float]:
+        """Centile par interpolation linéaire (même convention que numpy)."""
+        if not self._sorted:
+            return None
+        position = (len(self._sorted) - 1) * percent / 100.0
+        lower = math.floor(position)
+        upper = min(lower + 1, len(self._sorted) - 1)
+        fraction = position - lower
+        return self._sorted[lower] + (self._sorted[upper] - self._sorted[lower]) * fraction
+
+
+class _BssidStats:
+    """Cumul du signal et de la qualité pour un point d'accès."""
+
+    __slots__ = ("signal", "quality_sum")
+
+    def __init__(self):
+        self.signal = RunningStats()
+        self.quality_sum = 0.0
+
+
+class SessionStats:
+    """
+    Statistiques d'une session de collecte, tenues à jour échantillon par échantillon.
+
+    Args:
+        window: nombre d'échantillons récents pour les moyennes glissantes
+    """
+
+    def __init__(self, window: int = 100):
+        self.window = window
+        self.signal = RunningStats()
+        self.quality = RunningStats()
+        self.latency = RunningStats()   # mesures valides uniquement (>= 0)
+        self.jitter = RunningStats()    # valeurs non nulles uniquement
+        self.recent = {
+            'signal': SlidingWindowStats(window),
+            'quality': SlidingWindowStats(window),
+            'latency': SlidingWindowStats(window),
+            'jitter': SlidingWindowStats(window),
+        }
+        self._bssids: Dict[str, _BssidStats] = {}
+
+    @classmethod
+    def from_samples(cls, samples: Iterable, window: int = 100) -> 'SessionStats':
+        stats = cls(window)
+        for sample in samples:
+            stats.add_sample(sample)
+        return stats
+
+    def add_sample(self, sample) -> None:
+        self.add(sample.signal_strength, sample.quality, sample.ping_latency,
+                 sample.jitter, sample.bssid)
+
+    def add(self, signal: float, quality: float, latency: float, jitter: float, bssid: str) -> None:
+        """Intègre un échantillon (valeurs brutes, latence -1 si non mesurée)."""
+        self.signal.add(signal)
+        self.quality.add(quality)
+        self.recent['signal'].add(signal)
+        self.recent['quality'].add(quality)
+        self.recent['jitter'].add(jitter)
+        if latency >= 0:
+            self.latency.add(latency)
+            self.recent['latency'].add(latency)
+        else:
+            self.recent['latency'].add(None)
+        if jitter > 0:
+            self.jitter.add(jitter)
+
+        entry = self._bssids.get(bssid)
+        if entry is None:
+            entry = self._bssids[bssid] = _BssidStats()
+        entry.signal.add(signal)
+        entry.quality_sum += quality
+
+    def ping_stats(self) -> Dict[str, float]:
+        """Latence et jitter sur toute la session (format des rapports)."""
+        if not self.latency.count:
+            return {}
+        return {
+            "average_latency": round(self.latency.mean, 1),
+            "max_latency": round(self.latency.max, 1),
+            "min_latency": round(self.latency.min, 1),
+            "average_jitter": round(self.jitter.mean, 1) if self.jitter.count else 0.0,
+        }
+
+    def bssid_stats(self) -> Dict[str, Dict[str, float]]:
+        """Statistiques par point d'accès, dans l'ordre de première apparition."""
+        result: Dict[str, Dict[str, float]] = {}
+        for bssid, entry in self._bssids.items():
+            if bssid in IGNORED_BSSIDS:
+                continue
+            count = entry.signal.count
+            result[bssid] = {
+                "count": count,
+                "average_signal": round(entry.signal.mean, 1),
+                "min_signal": float(entry.signal.min),
+                "max_signal": float(entry.signal.max),
+                "average_quality": round(entry.quality_sum / count, 1),
+            }
+        return result
@@ -0,0 +1,142 @@
+"""
+Pipeline producteur/consommateur entre la collecte WiFi et l'interface.
+
+Un thread producteur appelle la fonction de collecte à intervalle régulier
+et dépose les échantillons dans une file bornée ; l'interface Tk vide la
+file par lots depuis ``after()``. Si l'interface prend du retard, les plus
+anciens échantillons en attente sont écartés (compteur ``dropped``) pour
+que l'affichage reste sur les données les plus récentes.
+
+Avec ``block=True`` (rejeu d'une session), le producteur attend au contraire
+que l'interface libère de la place : aucun échantillon n'est écarté.
+"""
+import logging
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+
+class SamplePipeline:
+    """File bornée alimentée par un thread de collecte."""
+
+    def __init__(
+        self,
+        collect: Callable[[], Optional[Any]],
+        interval: float = 1.0,
+        maxsize: int = 256,
+        logger: Optional[logging.Logger] = None,
+        exhausted: Optional[Callable[[], bool]] = None,
+        block: bool = False,
+    ):
+        self.collect = collect
+        # Indique la fin de la source (rejeu terminé) : le thread s'arrête alors de lui-même
+        self.exhausted = exhausted
+        self.block = block
+        self.interval = interval
+        self.maxsize = maxsize
+        self.logger = logger or logging.getLogger('SamplePipeline')
+        self._queue: "queue.Queue" = queue.Queue(maxsize=maxsize)
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+        # Compteurs exposés à l'interface (un seul écrivain chacun)
+        self.produced = 0
+        self.consumed = 0
+        self.dropped = 0
+        self.errors = 0
+
+    @property
+    def depth(self) -> int:
+        """Nombre d'échantillons en attente de traitement par l'interface."""
+        return self._queue.qsize()
+
+    @property
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        """Démarre le thread de collecte."""
+        if self.is_running:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='SamplePipeline', daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Arrête le thread ; les échantillons en file restent disponibles."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=timeout)
+            self._thread = None
+
+    def drain(self, max_items: Optional[int] = None) -> List[Any]:
+        """Retire jusqu'à ``max_items`` échantillons, du plus ancien au plus récent."""
+        batch = []
+        while max_items is None or len(batch) < max_items:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        self.consumed += len(batch)
+        return batch
+
+    def stats(self) -> Dict[str, int]:
+        """Compteurs de la file pour l'affichage et le diagnostic."""
+        return {
+            'depth': self.depth,
+            'maxsize': self.maxsize,
+            'produced': self.produced,
+            'consumed': self.consumed,
+            'dropped': self.dropped,
+            'errors': self.errors,
+        }
+
+    def _publish(self, item: Any) -> None:
+        """Dépose un échantillon, en écartant le plus ancien si la file est pleine."""
+        if self.block:
+            while not self._stop.is_set():
+                try:
+                    self._queue.put(item, timeout=0.1)
+                    self.produced += 1
+                    return
+                except queue.Full:
+                    continue
+            return
+        while True:
+            try:
+                self._queue.put_nowait(item)
+                self.produced += 1
+                return
+            except queue.Full:
+                try:
+                    self._queue.get_nowait()
+                    self.dropped += 1
+                except queue.Empty:
+                    pass
+                if self.dropped and self.dropped % 50 == 1:
+                    self.logger.warning(
+                        f"Interface en retard : {self.dropped} échantillon(s) écarté(s)"
+                    )
+
+    def _run(self) -> None:
+        next_at = time.monotonic()
+        while not self._stop.is_set():
+            try:
+                item = self.collect()
+                if item is not None:
+                    self._publish(item)
+                elif self.exhausted is not None and self.exhausted():
+                    self.logger.info("Source de collecte épuisée, arrêt du thread")
+                    return
+            except Exception as e:
+                self.errors += 1
+                self.logger.error(f"Erreur dans le thread de collecte: {e}")
+
+            next_at += self.interval
+            delay = next_at - time.monotonic()
+            if delay < 0:
+                # Collecte plus lente que l'intervalle : on repart de maintenant
+                next_at = time.monotonic()
+                delay = 0
+            self._stop.wait(delay)
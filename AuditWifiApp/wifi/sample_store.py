@@ -0,0 +1,280 @@
+"""
+Stockage en colonnes des échantillons WiFi.
+
+Une session de plusieurs heures représente des dizaines de milliers de
+``WifiSample``. ``SampleStore`` garde chaque champ numérique dans un
+tableau NumPy extensible et remplace les chaînes répétitives (BSSID, SSID,
+bande, statut, cible de ping) par des identifiants entiers. Les graphiques
+et analyseurs lisent des vues sans copie (``store.signal[-300:]``) ; un
+``WifiSample`` n'est reconstruit qu'à la demande (``store[i]``). Les
+statistiques de session (``store.stats``) sont mises à jour à chaque ajout.
+
+L'objet se comporte comme une séquence d'échantillons (len, index, tranches,
+itération) pour rester compatible avec le code qui manipulait une liste.
+"""
+import math
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional
+
+import numpy as np
+
+from .rolling_stats import SessionStats
+
+TIMESTAMP_FORMAT = '%Y-%m-%d %H:%M:%S.%f'
+
+# Colonnes numériques et leur type
+COLUMNS = {
+    'timestamp': np.float64,   # secondes epoch, NaN si inconnu
+    'signal': np.int16,        # dBm
+    'quality': np.int16,       # %
+    'channel': np.int16,
+    'latency': np.float32,     # ms, -1 si non mesurée
+    'jitter': np.float32,      # ms
+    'packet_loss': np.float32, # %
+    'tx_rate': np.float32,     # Mbps, NaN si illisible
+    'rx_rate': np.float32,     # Mbps
+    'bssid_id': np.int32,
+    'ssid_id': np.int32,
+    'band_id': np.int32,
+    'status_id': np.int32,
+    'target_id': np.int32,
+}
+
+# Colonnes d'identifiants et dictionnaire (StringInterner) correspondant
+DICTIONARY_COLUMNS = {
+    'bssid_id': 'bssids',
+    'ssid_id': 'ssids',
+    'band_id': 'bands',
+    'status_id': 'statuses',
+    'target_id': 'targets',
+}
+
+
+def parse_rate_mbps(value) -> float:
+    """Extrait le débit numérique d'une chaîne du type '300 Mbps'."""
+    try:
+        return float(str(value).split()[0].replace(',', '.'))
+    except (ValueError, IndexError):
+        return math.nan
+
+
+class StringInterner:
+    """Associe chaque chaîne distincte à un identifiant entier stable."""
+
+    def __init__(self):
+        self._ids: Dict[str, int] = {}
+        self.values: List[str] = []
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def intern(self, value: str) -> int:
+        value = '' if value is None else str(value)
+        index = self._ids.get(value)
+        if index is None:
+            index = len(self.values)
+            self._ids[value] = index
+            self.values.append(value)
+        return index
+
+    def lookup(self, index: int) -> str:
+        return self.values[index]
+
+    def id_of(self, value: str) -> Optional[int]:
+        """Identifiant d'une chaîne déjà vue, None sinon."""
+        return self._ids.get(value)
+
+
+class SampleStore:
+    """Séquence d'échantillons WiFi stockée en colonnes NumPy."""
+
+    def __init__(self, capacity: int = 1024, stats_window: int = 100):
+        self._size = 0
+        self.stats = SessionStats(stats_window)
+        self._capacity = max(16, capacity)
+        self._columns = {name: np.empty(self._capacity, dtype=dtype) for name, dtype in COLUMNS.items()}
+        self.bssids = StringInterner()
+        self.ssids = StringInterner()
+        self.bands = StringInterner()
+        self.statuses = StringInterner()
+        self.targets = StringInterner()
+
+    @classmethod
+    def from_samples(cls, samples: Iterable['WifiSample']) -> 'SampleStore':
+        samples = list(samples)
+        store = cls(capacity=len(samples))
+        store.extend(samples)
+        return store
+
+    # ----- Écriture -----
+
+    def _grow(self, minimum: int) -> None:
+        capacity = self._capacity
+        while capacity < minimum:
+            capacity *= 2
+        for name, column in self._columns.items():
+            grown = np.empty(capacity, dtype=column.dtype)
+            grown[:self._size] = column[:self._size]
+            # Remplacement atomique : une vue prise avant reste cohérente
+            self._columns[name] = grown
+        self._capacity = capacity
+
+    def append(self, sample: 'WifiSample') -> None:
+        """Ajoute un échantillon ; ``raw_data`` n'est pas conservé."""
+        index = self._size
+        if index >= self._capacity:
+            self._grow(index + 1)
+        try:
+            ts = datetime.strptime(sample.timestamp, TIMESTAMP_FORMAT).timestamp()
+        except (TypeError, ValueError):
+            ts = math.nan
+        c = self._columns
+        c['timestamp'][index] = ts
+        c['signal'][index] = sample.signal_strength
+        c['quality'][index] = sample.quality
+        c['channel'][index] = sample.channel
+        c['latency'][index] = sample.ping_latency
+        c['jitter'][index] = sample.jitter
+        c['packet_loss'][index] = getattr(sample, 'packet_loss', 0.0)
+        c['tx_rate'][index] = parse_rate_mbps(sample.transmit_rate)
+        c['rx_rate'][index] = parse_rate_mbps(sample.receive_rate)
+        bssid_id = self.bssids.intern(sample.bssid)
+        c['bssid_id'][index] = bssid_id
+        c['ssid_id'][index] = self.ssids.intern(sample.ssid)
+        c['band_id'][index] = self.bands.intern(sample.band)
+        c['status_id'][index] = self.statuses.intern(sample.status)
+        c['target_id'][index] = self.targets.intern(sample.ping_target)
+        self.stats.add(sample.signal_strength, sample.quality, sample.ping_latency,
+                       sample.jitter, self.bssids.lookup(bssid_id))
+        # La taille est publiée en dernier : un lecteur ne voit que des lignes complètes
+        self._size = index + 1
+
+    def extend(self, samples: Iterable['WifiSample']) -> None:
+        for sample in samples:
+            self.append(sample)
+
+    def append_columns(self, columns: Dict[str, np.ndarray], dictionaries: Dict[str, List[str]]) -> None:
+        """
+        Ajoute un bloc de lignes déjà en colonnes (import d'un export colonnaire).
+
+        Les colonnes d'identifiants se réfèrent à ``dictionaries`` (nom du
+        dictionnaire -> valeurs) et sont renumérotées dans ceux du store.
+        """
+        count = len(columns['signal'])
+        start = self._size
+        if start + count > self._capacity:
+            self._grow(start + count)
+        c = self._columns
+        for name in COLUMNS:
+            values = columns[name]
+            if name in DICTIONARY_COLUMNS:
+                interner = getattr(self, DICTIONARY_COLUMNS[name])
+                remap = np.array([interner.intern(v) for v in dictionaries[DICTIONARY_COLUMNS[name]]] or [0],
+                                 dtype=COLUMNS[name])
+                values = remap[values]
+            c[name][start:start + count] = values
+        for signal, quality, latency, jitter, bssid_id in zip(
+            c['signal'][start:start + count].tolist(), c['quality'][start:start + count].tolist(),
+            c['latency'][start:start + count].tolist(), c['jitter'][start:start + count].tolist(),
+            c['bssid_id'][start:start + count].tolist(),
+        ):
+            self.stats.add(signal, quality, latency, jitter, self.bssids.lookup(bssid_id))
+        self._size = start + count
+
+    def clear(self) -> None:
+        self._size = 0
+        self.stats = SessionStats(self.stats.window)
+
+    # ----- Vues en colonnes (sans copie) -----
+
+    def column(self, name: str, start: Optional[int] = None, stop: Optional[int] = None) -> np.ndarray:
+        """Vue en lecture seule sur une colonne, éventuellement tronquée."""
+        view = self._columns[name][:self._size][start:stop]
+        view.flags.writeable = False
+        return view
+
+    @property
+    def timestamps(self) -> np.ndarray:
+        return self.column('timestamp')
+
+    @property
+    def signal(self) -> np.ndarray:
+        return self.column('signal')
+
+    @property
+    def quality(self) -> np.ndarray:
+        return self.column('quality')
+
+    @property
+    def channel(self) -> np.ndarray:
+        return self.column('channel')
+
+    @property
+    def latency(self) -> np.ndarray:
+        return self.column('latency')
+
+    @property
+    def jitter(self) -> np.ndarray:
+        return self.column('jitter')
+
+    @property
+    def packet_loss(self) -> np.ndarray:
+        return self.column('packet_loss')
+
+    @property
+    def tx_rate(self) -> np.ndarray:
+        return self.column('tx_rate')
+
+    @property
+    def rx_rate(self) -> np.ndarray:
+        return self.column('rx_rate')
+
+    @property
+    def bssid_ids(self) -> np.ndarray:
+        return self.column('bssid_id')
+
+    def unique_bssids(self) -> List[str]:
+        """BSSID effectivement présents dans la session."""
+        return [self.bssids.lookup(i) for i in np.unique(self.bssid_ids)]
+
+    # ----- Protocole de séquence -----
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __iter__(self) -> Iterator['WifiSample']:
+        for index in range(self._size):
+            yield self._build(index)
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return [self._build(i) for i in range(*key.indices(self._size))]
+        index = key + self._size if key < 0 else key
+        if not 0 <= index < self._size:
+            raise IndexError("index d'échantillon hors limites")
+        return self._build(index)
+
+    def _build(self, index: int) -> 'WifiSample':
+        """Reconstruit un WifiSample à partir d'une ligne."""
+        # Import local : wifi_collector importe lui-même ce module
+        from .wifi_collector import WifiSample
+        c = self._columns
+        ts = float(c['timestamp'][index])
+        tx = float(c['tx_rate'][index])
+        rx = float(c['rx_rate'][index])
+        return WifiSample(
+            timestamp='' if math.isnan(ts) else datetime.fromtimestamp(ts).strftime(TIMESTAMP_FORMAT),
+            ssid=self.ssids.lookup(c['ssid_id'][index]),
+            bssid=self.bssids.lookup(c['bssid_id'][index]),
+            signal_strength=int(c['signal'][index]),
+            quality=int(c['quality'][index]),
+            channel=int(c['channel'][index]),
+            band=self.bands.lookup(c['band_id'][index]),
+            status=self.statuses.lookup(c['status_id'][index]),
+            transmit_rate='0 Mbps' if math.isnan(tx) else f"{tx:g} Mbps",
+            receive_rate='0 Mbps' if math.isnan(rx) else f"{rx:g} Mbps",
+            ping_latency=float(c['latency'][index]),
+            jitter=float(c['jitter'][index]),
+            ping_target=self.targets.lookup(c['target_id'][index]),
+            packet_loss=float(c['packet_loss'][index]),
+        )
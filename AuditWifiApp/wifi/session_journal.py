@@ -0,0 +1,268 @@
+"""
+Journal binaire des sessions de collecte, en ajout seul.
+
+Chaque mesure est écrite dès sa collecte dans un fichier ``.wfj`` sous forme
+de trames préfixées par leur longueur ; un arrêt brutal (plantage, batterie
+vide) ne perd au plus que les mesures non encore synchronisées. Le ``fsync``
+est groupé toutes les ``sync_every`` mesures.
+
+Format du fichier :
+    ``WFJ1`` puis une suite de trames ``<type:u8><longueur:u32><crc32:u32><contenu>``
+    (petit-boutiste). Le contenu est du JSON compact UTF-8.
+    HEADER : métadonnées de la session (format d'export, identifiant...)
+    RECORD : une mesure
+    END : fin normale de la session (nombre de mesures)
+
+À la relecture, la lecture s'arrête à la première trame incomplète ou dont
+le CRC ne correspond pas (écriture interrompue). ``recover_journal`` tronque
+le fichier à la dernière trame valide et le clôt ; ``export_journal``
+produit le fichier JSON au format des exports existants.
+
+``journal_complete`` ne lit que la fin du fichier : au démarrage, seuls les
+journaux interrompus sont relus en entier. ``prune_journals`` ne garde que
+les derniers journaux terminés d'un répertoire.
+"""
+import glob
+import json
+import logging
+import os
+import struct
+import zlib
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+MAGIC = b"WFJ1"
+JOURNAL_EXTENSION = ".wfj"
+DEFAULT_SYNC_EVERY = 20
+# Journaux terminés conservés par répertoire (rejeu des dernières sessions)
+DEFAULT_KEEP_COMPLETED = 10
+# La trame de fin (quelques dizaines d'octets) tient dans la fin du fichier lue
+_TAIL_BYTES = 512
+
+HEADER = 1
+RECORD = 2
+END = 3
+
+FRAME = struct.Struct("<BII")
+
+# Formats d'export JSON reproduits par export_journal()
+FORMAT_SAMPLES = "samples"    # WifiCollector.export_samples : liste d'échantillons
+FORMAT_SESSION = "session"    # PowerShellWiFiCollector.save_session_data
+FORMAT_RECORDS = "records"    # WifiDataCollector.export_records : liste d'enregistrements
+
+logger = logging.getLogger('SessionJournal')
+
+
+def _encode(value: Any) -> bytes:
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"), default=str).encode("utf-8")
+
+
+def _frame(kind: int, payload: bytes) -> bytes:
+    return FRAME.pack(kind, len(payload), zlib.crc32(payload)) + payload
+
+
+class SessionJournal:
+    """
+    Journal d'une session ouvert en ajout.
+
+    Args:
+        path: fichier ``.wfj`` (créé avec son en-tête s'il n'existe pas)
+        metadata: métadonnées de l'en-tête (``format``, ``session_id``...)
+        sync_every: nombre de mesures entre deux ``fsync``
+    """
+
+    def __init__(self, path: str, metadata: Optional[Dict] = None, sync_every: int = DEFAULT_SYNC_EVERY):
+        self.path = path
+        self.sync_every = max(1, sync_every)
+        self.count = 0
+        self._pending = 0
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        new = not os.path.exists(path) or os.path.getsize(path) == 0
+        self._file = open(path, "ab")
+        if new:
+            header = dict(metadata or {})
+            header.setdefault("created", datetime.now().isoformat())
+            self._file.write(MAGIC + _frame(HEADER, _encode(header)))
+            self.sync()
+
+    @property
+    def closed(self) -> bool:
+        return self._file.closed
+
+    def append(self, record: Dict) -> None:
+        """Ajoute une mesure ; synchronise sur disque toutes les ``sync_every`` mesures."""
+        self._file.write(_frame(RECORD, _encode(record)))
+        self.count += 1
+        self._pending += 1
+        if self._pending >= self.sync_every:
+            self.sync()
+
+    def sync(self) -> None:
+        """Force l'écriture sur disque des mesures en attente."""
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._pending = 0
+
+    def close(self) -> None:
+        """Termine la session : trame de fin puis synchronisation."""
+        if self._file.closed:
+            return
+        self._file.write(_frame(END, _encode({"records": self.count, "closed": datetime.now().isoformat()})))
+        self.sync()
+        self._file.close()
+
+    def __enter__(self) -> "SessionJournal":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+@dataclass
+class JournalContents:
+    """Contenu relu d'un journal."""
+    metadata: Dict = field(default_factory=dict)
+    records: List[Dict] = field(default_factory=list)
+    complete: bool = False      # trame de fin présente
+    valid_bytes: int = 0        # octets jusqu'à la dernière trame valide
+    damaged_bytes: int = 0      # octets ignorés après (écriture interrompue)
+
+
+def _iter_frames(data: bytes) -> Iterator[Tuple[int, bytes, int]]:
+    """Trames valides ``(type, contenu, fin)`` jusqu'à la première trame tronquée ou corrompue."""
+    offset = len(MAGIC)
+    while offset + FRAME.size <= len(data):
+        kind, length, crc = FRAME.unpack_from(data, offset)
+        start = offset + FRAME.size
+        payload = data[start:start + length]
+        if kind not in (HEADER, RECORD, END) or len(payload) < length or zlib.crc32(payload) != crc:
+            return
+        offset = start + length
+        yield kind, payload, offset
+
+
+def read_journal(path: str) -> JournalContents:
+    """Relit un journal, y compris celui d'une session interrompue."""
+    with open(path, "rb") as f:
+        data = f.read()
+    if not data.startswith(MAGIC):
+        raise ValueError(f"{path} n'est pas un journal de session")
+
+    contents = JournalContents(valid_bytes=len(MAGIC))
+    for kind, payload, end in _iter_frames(data):
+        value = json.loads(payload)
+        if kind == RECORD:
+            contents.records.append(value)
+        elif kind == HEADER:
+            contents.metadata = value
+        else:
+            contents.complete = True
+        contents.valid_bytes = end
+        if contents.complete:
+            break
+    contents.damaged_bytes = len(data) - contents.valid_bytes
+    return contents
+
+
+def recover_journal(path: str) -> JournalContents:
+    """
+    Répare le journal d'une session interrompue : le fichier est tronqué à la
+    dernière trame valide puis clos par une trame de fin. Sans effet sur un
+    journal déjà complet.
+    """
+    contents = read_journal(path)
+    if contents.complete:
+        return contents
+    with open(path, "r+b") as f:
+        f.truncate(contents.valid_bytes)
+        f.seek(contents.valid_bytes)
+        f.write(_frame(END, _encode({"records": len(contents.records), "recovered": datetime.now().isoformat()})))
+        f.flush()
+        os.fsync(f.fileno())
+    if contents.damaged_bytes:
+        logger.warning(f"Journal {path} : {contents.damaged_bytes} octets illisibles ignorés en fin de fichier")
+    logger.info(f"Session récupérée depuis {path} : {len(contents.records)} mesures")
+    contents.complete = True
+    return contents
+
+
+def export_journal(path: str, output: Optional[str] = None, indent: Optional[int] = 2,
+                   contents: Optional[JournalContents] = None) -> str:
+    """
+    Convertit un journal au format JSON de l'export correspondant à son
+    en-tête (``format``) ; par défaut à côté du journal, avec l'extension ``.json``.
+    ``contents`` évite de relire un journal déjà lu.
+    """
+    contents = contents or read_journal(path)
+    output = output or os.path.splitext(path)[0] + ".json"
+    metadata = contents.metadata
+    if metadata.get("format") == FORMAT_SESSION:
+        document = {
+            'session_id': metadata.get("session_id"),
+            'timestamp': datetime.now().isoformat(),
+            'measurements': contents.records,
+        }
+    else:
+        document = contents.records
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(document, f, indent=indent, ensure_ascii=False)
+    return output
+
+
+def journal_complete(path: str) -> bool:
+    """Vrai si le journal se termine par une trame de fin valide (seule la fin du fichier est lue)."""
+    with open(path, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        size = f.tell()
+        f.seek(max(len(MAGIC), size - _TAIL_BYTES))
+        tail = f.read()
+    for offset in range(len(tail) - FRAME.size, -1, -1):
+        kind, length, crc = FRAME.unpack_from(tail, offset)
+        if (kind == END and offset + FRAME.size + length == len(tail)
+                and zlib.crc32(tail[offset + FRAME.size:]) == crc):
+            return True
+    return False
+
+
+def recover_sessions(directory: str) -> List[str]:
+    """
+    Reconstruit les sessions interrompues d'un répertoire : chaque journal
+    sans trame de fin est réparé puis exporté en JSON. Retourne les exports créés.
+    """
+    exports = []
+    for path in sorted(glob.glob(os.path.join(directory, "*" + JOURNAL_EXTENSION))):
+        try:
+            if journal_complete(path):
+                continue
+            contents = recover_journal(path)
+            if contents.records:
+                exports.append(export_journal(path, contents=contents))
+        except (OSError, ValueError) as e:
+            logger.error(f"Impossible de récupérer le journal {path}: {e}")
+    return exports
+
+
+def prune_journals(directory: str, keep: int = DEFAULT_KEEP_COMPLETED) -> List[str]:
+    """
+    Supprime les journaux terminés les plus anciens d'un répertoire pour
+    n'en garder que ``keep`` ; les journaux interrompus ne sont jamais
+    supprimés. Retourne les fichiers supprimés.
+    """
+    completed = []
+    for path in glob.glob(os.path.join(directory, "*" + JOURNAL_EXTENSION)):
+        try:
+            if journal_complete(path):
+                completed.append((os.path.getmtime(path), path))
+        except OSError:
+            continue
+    removed = []
+    for _, path in sorted(completed, reverse=True)[max(0, keep):]:
+        try:
+            os.remove(path)
+            removed.append(path)
+        except OSError as e:
+            logger.error(f"Impossible de supprimer le journal {path}: {e}")
+    if removed:
+        logger.info(f"{len(removed)} journal(aux) de session terminé(s) supprimé(s) dans {directory}")
+    return removed
@@ -1,8 +1,16 @@
 import numpy as np
-from typing import List, Tuple, Dict
+from typing import List, Mapping, Tuple, Dict, Sequence, Union
 from datetime import datetime
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from .wifi_collector import WifiSample
+from .sample_store import SampleStore
+
+# Plages de qualité (%) de get_quality_distribution, bornes basses croissantes
+QUALITY_BINS = (0, 20, 40, 60, 80)
+QUALITY_LABELS = ("Mauvais", "Faible", "Moyen", "Bon", "Excellent")
+
+# Variation moyenne (dBm) d'un échantillon à l'autre correspondant à 0 % de stabilité
+STABILITY_MAX_VARIATION = 30
 
 @dataclass
 class WifiAnalysis:
@@ -12,9 +20,30 @@ class WifiAnalysis:
     signal_stability: float
     connection_quality: float
     dropout_count: int
-    timestamps: List[str]
-    signal_values: List[float]
-    quality_values: List[float]
+    # Listes, ou vues NumPy sans copie quand l'analyse porte sur un SampleStore
+    timestamps: Sequence
+    signal_values: Sequence
+    quality_values: Sequence
+
+@dataclass
+class WifiBatchAnalysis:
+    """Métriques d'une session calculées en une passe sur les colonnes."""
+    count: int
+    average_signal: float
+    min_signal: float
+    max_signal: float
+    signal_std: float
+    connection_quality: float
+    signal_stability: float        # dernière fenêtre, comme WifiAnalysis
+    average_stability: float       # moyenne des fenêtres glissantes de la session
+    below_threshold: int           # échantillons sous le seuil de signal
+    dropout_count: int             # passages sous le seuil
+    quality_distribution: Dict[str, int]
+    # Stabilité de chaque fenêtre glissante (vide si moins de stability_window échantillons)
+    rolling_stability: np.ndarray = field(repr=False)
+    by_band: Dict[str, Dict[str, float]] = field(default_factory=dict)
+    by_channel: Dict[int, Dict[str, float]] = field(default_factory=dict)
+
 
 class WifiAnalyzer:
     def __init__(self):
@@ -33,34 +62,43 @@ class WifiAnalyzer:
             "packet_loss_percent": 2,
         }
 
-    def analyze_samples(self, samples: List[WifiSample]) -> WifiAnalysis:
-        """Analyse une liste d'échantillons WiFi"""
-        if not samples:
+    def analyze_samples(self, samples: Union[List[WifiSample], SampleStore]) -> WifiAnalysis:
+        """Analyse une liste d'échantillons WiFi (ou un SampleStore)"""
+        if not len(samples):
             return self._create_empty_analysis()
 
-        # Extraction des données
-        timestamps = [s.timestamp for s in samples]
-        signals = [s.signal_strength for s in samples]
-        qualities = [s.quality for s in samples]
-
-        # Calcul des statistiques de signal
-        avg_signal = np.mean(signals)
-        min_signal = np.min(signals)
-        max_signal = np.max(signals)
+        # Extraction des données (une seule conversion en tableaux pour une liste)
+        if isinstance(samples, SampleStore):
+            timestamps = samples.timestamps
+            signals = samples.signal
+            qualities = samples.quality
+            signal_array = signals
+        else:
+            timestamps = [s.timestamp for s in samples]
+            signals = [s.signal_strength for s in samples]
+            qualities = [s.quality for s in samples]
+            signal_array = np.asarray(signals, dtype=np.float64)
+
+        # Calcul des statistiques de signal (cumuls déjà tenus par le SampleStore)
+        if isinstance(samples, SampleStore):
+            avg_signal = samples.stats.signal.mean
+            min_signal = samples.stats.signal.min
+            max_signal = samples.stats.signal.max
+            connection_quality = samples.stats.quality.mean
+        else:
+            avg_signal = signal_array.mean()
+            min_signal = signal_array.min()
+            max_signal = signal_array.max()
+            connection_quality = np.mean(qualities)
 
         # Calcul de la stabilité du signal
         if len(signals) >= self.stability_window:
-            signal_variations = np.abs(np.diff(signals[-self.stability_window:]))
-            stability = 100 * (1 - np.mean(signal_variations) / 30)  # 30dBm comme variation max
-            stability = max(0, min(100, stability))  # Limiter entre 0 et 100%
+            stability = float(self._rolling_stability(signal_array[-self.stability_window:])[-1])
         else:
             stability = 0
 
-        # Calcul de la qualité de connexion globale
-        connection_quality = np.mean(qualities)
-
         # Détection des déconnexions (signal < threshold)
-        dropouts = sum(1 for s in signals if s < self.signal_threshold)
+        dropouts = int(np.count_nonzero(signal_array < self.signal_threshold))
 
         return WifiAnalysis(
             average_signal=round(avg_signal, 1),
@@ -74,6 +112,122 @@ class WifiAnalyzer:
             quality_values=qualities
         )
 
+    def analyze_batch(
+        self,
+        samples: Union[SampleStore, Mapping[str, Sequence], List[WifiSample]]
+    ) -> WifiBatchAnalysis:
+        """
+        Calcule toutes les métriques d'une session en passes vectorisées.
+
+        Args:
+            samples: ``SampleStore`` (colonnes lues sans copie), dictionnaire de
+                colonnes (``signal``, ``quality``, ``channel``, ``band``) ou
+                liste de ``WifiSample`` (convertie une seule fois)
+        """
+        signal, quality, channel, band_ids, band_names = self._batch_columns(samples)
+        count = len(signal)
+        if not count:
+            return WifiBatchAnalysis(0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0, 0,
+                                     self._quality_histogram(quality), np.empty(0))
+
+        below = signal < self.signal_threshold
+        # Passage sous le seuil : échantillon sous le seuil précédé d'un échantillon au-dessus
+        transitions = np.zeros(count, dtype=bool)
+        transitions[1:] = below[1:] & ~below[:-1]
+        rolling = self._rolling_stability(signal)
+
+        return WifiBatchAnalysis(
+            count=count,
+            average_signal=round(float(signal.mean()), 1),
+            min_signal=round(float(signal.min()), 1),
+            max_signal=round(float(signal.max()), 1),
+            signal_std=round(float(signal.std()), 2),
+            connection_quality=round(float(quality.mean()), 1),
+            signal_stability=round(float(rolling[-1]), 1) if len(rolling) else 0.0,
+            average_stability=round(float(rolling.mean()), 1) if len(rolling) else 0.0,
+            below_threshold=int(np.count_nonzero(below)),
+            dropout_count=int(np.count_nonzero(transitions)),
+            quality_distribution=self._quality_histogram(quality),
+            rolling_stability=rolling,
+            by_band=self._group_stats(band_ids, band_names, signal, quality, transitions),
+            by_channel=self._group_stats(*self._encode(channel), signal, quality, transitions),
+        )
+
+    @staticmethod
+    def _encode(values: np.ndarray) -> Tuple[np.ndarray, list]:
+        """Identifiants entiers et valeurs distinctes d'une colonne."""
+        names, ids = np.unique(values, return_inverse=True)
+        return ids.reshape(-1), [v.item() if hasattr(v, 'item') else v for v in names]
+
+    def _batch_columns(self, samples):
+        """Colonnes signal, qualité, canal et bande (identifiants + noms) en tableaux NumPy."""
+        if isinstance(samples, SampleStore):
+            band_ids = samples.column('band_id')
+            return (samples.signal.astype(np.float64), samples.quality.astype(np.float64),
+                    samples.channel, band_ids, list(samples.bands.values))
+        if isinstance(samples, Mapping):
+            columns = samples
+        else:
+            columns = {
+                'signal': [s.signal_strength for s in samples],
+                'quality': [s.quality for s in samples],
+                'channel': [s.channel for s in samples],
+                'band': [s.band for s in samples],
+            }
+        signal = np.asarray(columns['signal'], dtype=np.float64)
+        quality = np.asarray(columns.get('quality', np.zeros(len(signal))), dtype=np.float64)
+        channel = np.asarray(columns.get('channel', np.zeros(len(signal))), dtype=np.int64)
+        band_ids, band_names = self._encode(np.asarray(columns.get('band', [''] * len(signal)), dtype=str))
+        return signal, quality, channel, band_ids, band_names
+
+    def _rolling_stability(self, signals) -> np.ndarray:
+        """
+        Stabilité (%) de chaque fenêtre de ``stability_window`` échantillons :
+        100 % moins la variation moyenne entre échantillons consécutifs,
+        rapportée à ``STABILITY_MAX_VARIATION`` dBm.
+        """
+        signals = np.asarray(signals, dtype=np.float64)
+        steps = self.stability_window - 1
+        if steps < 1 or len(signals) < self.stability_window:
+            return np.empty(0)
+        variations = np.abs(np.diff(signals))
+        # Sommes glissantes par différence de sommes cumulées
+        cumulative = np.concatenate(([0.0], np.cumsum(variations)))
+        mean_variation = (cumulative[steps:] - cumulative[:-steps]) / steps
+        return np.clip(100 * (1 - mean_variation / STABILITY_MAX_VARIATION), 0, 100)
+
+    @staticmethod
+    def _quality_histogram(qualities) -> Dict[str, int]:
+        """Nombre d'échantillons par plage de qualité (100 % compris dans « Excellent »)."""
+        qualities = np.asarray(qualities, dtype=np.float64)
+        valid = qualities[(qualities >= QUALITY_BINS[0]) & (qualities <= 100)]
+        counts = np.bincount(np.digitize(valid, QUALITY_BINS) - 1, minlength=len(QUALITY_BINS))
+        # Ordre d'affichage : de la meilleure à la plus mauvaise plage
+        return {label: int(counts[i]) for i, label in reversed(list(enumerate(QUALITY_LABELS)))}
+
+    def _group_stats(self, ids, names, signal, quality, transitions) -> Dict:
+        """Statistiques par groupe (bande, canal) via bincount sur les identifiants."""
+        ids = np.asarray(ids, dtype=np.int64)
+        size = len(names)
+        counts = np.bincount(ids, minlength=size)
+        signal_sum = np.bincount(ids, weights=signal, minlength=size)
+        quality_sum = np.bincount(ids, weights=quality, minlength=size)
+        dropouts = np.bincount(ids, weights=transitions, minlength=size)
+        minimum = np.full(size, np.inf)
+        np.minimum.at(minimum, ids, signal)
+        below = np.bincount(ids, weights=signal < self.signal_threshold, minlength=size)
+        return {
+            names[i]: {
+                "count": int(counts[i]),
+                "average_signal": round(float(signal_sum[i] / counts[i]), 1),
+                "min_signal": float(minimum[i]),
+                "average_quality": round(float(quality_sum[i] / counts[i]), 1),
+                "below_threshold": int(below[i]),
+                "dropouts": int(dropouts[i]),
+            }
+            for i in np.flatnonzero(counts)
+        }
+
     def _create_empty_analysis(self) -> WifiAnalysis:
         """Crée une analyse vide"""
         return WifiAnalysis(
@@ -134,16 +288,11 @@ class WifiAnalyzer:
 
     def _count_dropouts(self, signals: List[float]) -> int:
         """Compte le nombre de déconnexions"""
-        if not signals:
+        if not len(signals):
             return 0
 
-        dropouts = 0
-        for i in range(1, len(signals)):
-            if (signals[i] < self.signal_threshold and
-                signals[i-1] >= self.signal_threshold):
-                dropouts += 1
-
-        return dropouts
+        below = np.asarray(signals) < self.signal_threshold
+        return int(np.count_nonzero(below[1:] & ~below[:-1]))
 
     def get_signal_trends(
         self,
@@ -158,31 +307,13 @@ class WifiAnalyzer:
 
         return timestamps, signals
 
-    def get_quality_distribution(self, samples: List[WifiSample]) -> Dict[str, int]:
+    def get_quality_distribution(self, samples: Union[List[WifiSample], SampleStore]) -> Dict[str, int]:
         """Analyse la distribution de la qualité du signal"""
-        if not samples:
+        if not len(samples):
             return {}
-
-        # Définition des plages de qualité
-        ranges = {
-            "Excellent": (80, 100),
-            "Bon": (60, 80),
-            "Moyen": (40, 60),
-            "Faible": (20, 40),
-            "Mauvais": (0, 20)
-        }
-
-        # Comptage des échantillons dans chaque plage
-        distribution = {range_name: 0 for range_name in ranges}
-
-        for sample in samples:
-            quality = sample.quality
-            for range_name, (min_val, max_val) in ranges.items():
-                if min_val <= quality < max_val:
-                    distribution[range_name] += 1
-                    break
-
-        return distribution
+        if isinstance(samples, SampleStore):
+            return self._quality_histogram(samples.quality)
+        return self._quality_histogram([s.quality for s in samples])
 
     # ------------------------------------------------------------------
     # Logic merged from the previous wifi_signal_analyzer implementation
@@ -8,6 +8,12 @@ from dataclasses import dataclass
 import platform
 import re
 
+from .collector_backend import CollectorBackend, PowerShellBackend, create_default_backend
+from .collector_worker import PersistentCollectorWorker
+from .latency_prober import SUBPROCESS_PING_RATE_HZ, LatencyProber, SubprocessPingTransport
+from .sample_store import SampleStore
+from .session_journal import FORMAT_SAMPLES, JOURNAL_EXTENSION, SessionJournal, prune_journals, recover_sessions
+
 @dataclass
 class WifiSample:
     timestamp: str
@@ -24,6 +30,7 @@ class WifiSample:
     ping_latency: float = -1.0
     jitter: float = 0.0
     ping_target: str = ""
+    packet_loss: float = 0.0  # en % sur la fenêtre de la sonde
 
     @classmethod
     def from_powershell_data(
@@ -49,8 +56,14 @@ class WifiSample:
         if prev_latency is not None and latency >= 0 and prev_latency >= 0:
             jitter = abs(latency - prev_latency)
 
+        try:
+            packet_loss = float(str(data.get('PacketLoss', 0)).replace('%', '') or 0)
+        except ValueError:
+            packet_loss = 0.0
+
         return cls(
-            timestamp=datetime.now().strftime('%Y-%m-%d %H:%M:%S.%f'),
+            # Horodatage d'origine lors d'un rejeu, sinon l'instant de la mesure
+            timestamp=data.get('SampleTimestamp') or datetime.now().strftime('%Y-%m-%d %H:%M:%S.%f'),
             ssid=data.get('SSID', 'N/A'),
             bssid=data.get('BSSID', '00:00:00:00:00:00'),
             signal_strength=int(data.get('SignalStrengthDBM', -100)),
@@ -62,20 +75,37 @@ class WifiSample:
             receive_rate=data.get('ReceiveRate', '0 Mbps'),
             ping_latency=latency,
             jitter=jitter,
+            packet_loss=packet_loss,
             raw_data=data
         )
 
 class WifiCollector:
-    def __init__(self, script_path: str = None):
+    def __init__(
+        self,
+        script_path: str = None,
+        worker: Optional[PersistentCollectorWorker] = None,
+        backend: Optional[CollectorBackend] = None,
+        latency_prober: Optional[LatencyProber] = None,
+        journal_dir: Optional[str] = None,
+    ):
         self.script_path = script_path or os.path.join(os.path.dirname(os.path.dirname(__file__)), 'wifi_monitor.ps1')
         self.is_collecting = False
-        self.samples: List[WifiSample] = []
+        self.samples = SampleStore()
         self.error_count = 0
         self.max_errors = 5
         self.logger = self._setup_logging()
         self.last_latency: Optional[float] = None
         self.latency_history: List[float] = []
         self.ping_target: str = ""
+        # Source des échantillons (PowerShell, iw sous Linux...) ; choisie au démarrage si absente
+        if backend is None and worker is not None:
+            backend = PowerShellBackend(self.script_path, worker=worker, logger=self.logger)
+        self.backend = backend
+        # Sonde de latence en tâche de fond ; créée vers la gateway au démarrage si absente
+        self.latency_prober = latency_prober
+        # Journal binaire de la session (chaque échantillon écrit dès sa collecte)
+        self.journal_dir = journal_dir
+        self.journal: Optional[SessionJournal] = None
 
     def _setup_logging(self) -> logging.Logger:
         """Configure le système de journalisation avec rotation des fichiers"""
@@ -102,7 +132,8 @@ class WifiCollector:
 
         file_handler = logging.FileHandler(
             os.path.join(log_dir, 'wifi_collector.log'),
-            encoding='utf-8'
+            encoding='utf-8',
+            delay=True  # fichier ouvert au premier message, pas au démarrage
         )
         file_handler.setLevel(logging.DEBUG)
         file_formatter = logging.Formatter(
@@ -130,43 +161,6 @@ class WifiCollector:
             self.logger.debug(f"Impossible de d\xE9tecter la gateway: {e}")
         return "8.8.8.8"
 
-    def _perform_ping(self, target: str) -> float:
-        """R\xE9alise un ping non bloquant vers la cible."""
-        try:
-            if platform.system().lower().startswith('win'):
-                cmd = ["ping", "-n", "1", "-w", "2000", target]
-
-            else:
-                cmd = ["ping", "-c", "1", "-W", "2", target]
-
-            output = subprocess.check_output(
-                cmd, text=True, encoding='latin1', stderr=subprocess.DEVNULL
-            )
-
-            patterns = [
-                r"temps[<=>]\s*([0-9]+[,.]?[0-9]*) ?ms",
-                r"time[<=>]?\s*([0-9]+[,.]?[0-9]*) ?ms",
-                r"Average = ([0-9]+[,.]?[0-9]*)",
-            ]
-            for pattern in patterns:
-                match = re.search(pattern, output)
-                if match:
-                    return float(match.group(1).replace(',', '.'))
-
-                regex = r"temps[<=](\d+)ms"
-            else:
-                cmd = ["ping", "-c", "1", "-W", "2", target]
-                regex = r"time[<=](\d+\.?\d*) ms"
-
-            output = subprocess.check_output(cmd, text=True, encoding='latin1', stderr=subprocess.DEVNULL)
-            match = re.search(regex, output)
-            if match:
-                return float(match.group(1))
-
-        except Exception as e:
-            self.logger.debug(f"Ping failed: {e}")
-        return -1.0
-
     def _update_jitter(self, latency: float) -> float:
         """Calcule le jitter moyen sur une fen\xEAtre glissante."""
         if latency < 0:
@@ -182,16 +176,31 @@ class WifiCollector:
     def start_collection(self) -> bool:
         """Démarre la collecte WiFi"""
         try:
-            if not os.path.exists(self.script_path):
-                raise FileNotFoundError(f"Script PowerShell introuvable: {self.script_path}")
+            if self.backend is None:
+                self.backend = create_default_backend(self.script_path, logger=self.logger)
+            if not self.backend.start():
+                raise RuntimeError(f"Impossible de démarrer le backend de collecte {self.backend.name}")
 
-            self.logger.info("Démarrage de la collecte WiFi")
+            self.logger.info(f"Démarrage de la collecte WiFi (backend {self.backend.name})")
             self.error_count = 0
             self.is_collecting = True
-            self.samples = []
+            self.samples = SampleStore()
             self.latency_history = []
-            self.ping_target = self._detect_ping_target()
-            self.logger.info(f"Cible de ping utilisée: {self.ping_target}")
+            if self.backend.live:
+                self.ping_target = self._detect_ping_target()
+                self.logger.info(f"Cible de ping utilisée: {self.ping_target}")
+                if self.latency_prober is None:
+                    # Un processus ping par sonde : rythme réduit
+                    self.latency_prober = LatencyProber(
+                        SubprocessPingTransport(self.ping_target),
+                        rate_hz=SUBPROCESS_PING_RATE_HZ,
+                        logger=self.logger,
+                    )
+                self.latency_prober.start()
+            else:
+                # Rejeu : les latences enregistrées remplacent la sonde
+                self.ping_target = "rejeu"
+            self._open_journal()
             return True
 
         except Exception as e:
@@ -199,38 +208,42 @@ class WifiCollector:
             return False
 
     def collect_sample(self) -> Optional[WifiSample]:
-        """Collecte un échantillon de données WiFi via PowerShell"""
+        """Collecte un échantillon de données WiFi via le backend actif"""
         if not self.is_collecting:
             return None
 
         try:
-            # Exécute le script PowerShell
-            result = subprocess.run(
-                ['powershell.exe', '-ExecutionPolicy', 'Bypass', '-File', self.script_path],
-                capture_output=True,
-                text=True,
-                check=True
-            )
-
-            # Parse le JSON retourné
-            data = json.loads(result.stdout)
+            # Demande un échantillon au backend (worker persistant, iw...)
+            data = self.backend.read_sample()
+            if data is None:
+                if self.backend.finished:
+                    self.logger.info("Fin de la session rejouée")
+                    self.stop_collection()
+                else:
+                    self._handle_error("Aucune donnée reçue du backend de collecte")
+                return None
 
             # Si nous sommes connectés, créer l'échantillon
             if data.get('Status') == 'Connected':
                 sample = WifiSample.from_powershell_data(data)
 
-                # Mesurer la latence si nécessaire
+                # Latence fournie par le backend, sinon dernière mesure de la sonde (sans attente)
                 latency = sample.ping_latency
-                if latency < 0:
-                    latency = self._perform_ping(self.ping_target)
+                if latency < 0 and self.latency_prober is not None and self.backend.live:
+                    stats = self.latency_prober.latest()
+                    latency = stats.latency
+                    sample.jitter = stats.jitter
+                    sample.packet_loss = stats.loss_percent
+                else:
+                    # Calculer le jitter moyen
+                    sample.jitter = self._update_jitter(latency)
                 sample.ping_latency = latency
-
-                # Calculer le jitter moyen
-                sample.jitter = self._update_jitter(latency)
                 sample.ping_target = self.ping_target
 
                 self.last_latency = latency
                 self.samples.append(sample)
+                if self.journal is not None:
+                    self.journal.append(vars(sample))
                 if len(self.samples) % 10 == 0:
                     self.logger.debug(f"{len(self.samples)} échantillons collectés")
                 self.error_count = 0  # Réinitialise le compteur d'erreurs
@@ -240,16 +253,6 @@ class WifiCollector:
                 self.logger.warning(f"Pas de connexion WiFi: {data.get('Status')}")
                 return None
 
-        except subprocess.CalledProcessError as e:
-            self.error_count += 1
-            self.logger.error(f"Erreur lors de l'exécution du script PowerShell: {e}")
-            if self.error_count >= self.max_errors:
-                self.logger.critical("Trop d'erreurs consécutives, arrêt de la collecte")
-                self.stop_collection()
-            return None
-        except json.JSONDecodeError as e:
-            self.logger.error(f"Erreur de parsing JSON: {e}")
-            return None
         except Exception as e:
             self.logger.error(f"Erreur inattendue: {e}")
             return None
@@ -265,15 +268,36 @@ class WifiCollector:
             )
             self.stop_collection()
 
-    def stop_collection(self) -> List[WifiSample]:
+    def stop_collection(self) -> SampleStore:
         """Arrête la collecte et retourne les échantillons collectés"""
         self.logger.info("Arrêt de la collecte WiFi")
         self.is_collecting = False
+        if self.backend is not None:
+            self.backend.stop()
+        if self.latency_prober is not None:
+            self.latency_prober.stop()
+        if self.journal is not None:
+            self.journal.close()
+            self.journal = None
         return self.samples
 
+    def _open_journal(self) -> None:
+        """
+        Récupère les sessions interrompues, ne garde que les derniers journaux
+        terminés puis ouvre le journal de la nouvelle session
+        """
+        if not self.journal_dir:
+            return
+        for path in recover_sessions(self.journal_dir):
+            self.logger.warning(f"Session interrompue reconstruite: {path}")
+        prune_journals(self.journal_dir)
+        session_id = datetime.now().strftime("%Y%m%d_%H%M%S")
+        path = os.path.join(self.journal_dir, f"wifi_samples_{session_id}{JOURNAL_EXTENSION}")
+        self.journal = SessionJournal(path, {'format': FORMAT_SAMPLES, 'session_id': session_id})
+
     def get_latest_sample(self) -> Optional[WifiSample]:
         """Retourne le dernier échantillon collecté"""
-        return self.samples[-1] if self.samples else None
+        return self.samples[-1] if len(self.samples) else None
 
     def export_samples(self, filename: str = None) -> str:
         """Exporte les échantillons au format JSON"""
@@ -298,3 +322,23 @@ class WifiCollector:
         except Exception as e:
             self.logger.error(f"Erreur lors de l'export: {str(e)}")
             return ""
+
+    def export_columnar(self, filename: str = None) -> str:
+        """Exporte les échantillons au format colonnaire compressé (.wfc)"""
+        from .columnar_export import COLUMNAR_EXTENSION, export_columnar
+
+        if not filename:
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            filename = f"wifi_samples_{timestamp}{COLUMNAR_EXTENSION}"
+
+        export_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data')
+        os.makedirs(export_dir, exist_ok=True)
+        export_path = os.path.join(export_dir, filename)
+
+        try:
+            export_columnar(self.samples, export_path, metadata={'ping_target': self.ping_target})
+            self.logger.info(f"Données exportées vers {export_path}")
+            return export_path
+        except Exception as e:
+            self.logger.error(f"Erreur lors de l'export: {str(e)}")
+            return ""
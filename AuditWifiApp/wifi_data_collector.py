@@ -15,6 +15,8 @@ from typing import List, Optional, Dict
 from models.measurement_record import WifiMeasurement, PingMeasurement, NetworkStatus
 from models.wifi_record import WifiRecord
 from wifi.powershell_collector import PowerShellWiFiCollector
+from wifi.collector_backend import detect_native_backend
+from wifi.session_journal import FORMAT_RECORDS, JOURNAL_EXTENSION, SessionJournal, prune_journals, recover_sessions
 
 # Constantes de configuration
 RETRY_CONFIG = {
@@ -52,11 +54,30 @@ def _channel_to_frequency_mhz(channel: int) -> int:
         return 5000 + (channel * 5)
     return 0
 
+def _record_to_dict(record: WifiRecord) -> Dict:
+    """Enregistrement au format de export_records()"""
+    return {
+        "timestamp": record.timestamp.isoformat(),
+        "zone": record.zone,
+        "location_tag": record.location_tag,
+        "cycle": record.cycle,
+        "wifi": record.wifi_measurement.__dict__ if record.wifi_measurement else None,
+        "ping": record.ping_measurement.__dict__ if record.ping_measurement else None
+    }
+
+
 class WifiDataCollector:
     """Collecte des données WiFi et les stocke dans des enregistrements."""
 
-    def __init__(self, base_path: str = "logs_moxa"):
-        """Initialise le collecteur avec le chemin de base pour les logs"""
+    def __init__(self, base_path: str = "logs_moxa", journal: bool = False):
+        """
+        Initialise le collecteur avec le chemin de base pour les logs
+
+        Args:
+            base_path: répertoire des logs, exports et journaux de session
+            journal: journaliser chaque enregistrement dès sa collecte (récupération
+                après plantage) ; un seul journal, celui des enregistrements
+        """
         self.base_path = base_path
         self.current_cycle: int = 0
         self.current_zone: str = "Non spécifiée"
@@ -64,8 +85,11 @@ class WifiDataCollector:
         self.is_collecting = False
         self.measurement_lock = threading.Lock()
         self._setup_logging()
-        self.ps_collector = PowerShellWiFiCollector()
+        # Sous Linux, iw remplace le script PowerShell
+        self.ps_collector = PowerShellWiFiCollector(backend=detect_native_backend(self.logger))
         self.records: List[WifiRecord] = []
+        self.journal_enabled = journal
+        self.journal: Optional[SessionJournal] = None
         self.last_latency: Optional[float] = None
 
     def _setup_logging(self):
@@ -146,6 +170,15 @@ class WifiDataCollector:
         self.current_zone = zone
         self.current_location_tag = location_tag
         self.is_collecting = True
+        if self.journal_enabled:
+            for path in recover_sessions(self.base_path):
+                self.logger.warning(f"Session interrompue reconstruite: {path}")
+            prune_journals(self.base_path)
+            session_id = datetime.now().strftime('%Y%m%d_%H%M%S')
+            self.journal = SessionJournal(
+                os.path.join(self.base_path, f"wifi_records_{session_id}{JOURNAL_EXTENSION}"),
+                {'format': FORMAT_RECORDS, 'session_id': session_id, 'zone': zone},
+            )
 
         # Démarre la collecte PowerShell avec callback
         self.ps_collector.start_collection(
@@ -167,6 +200,10 @@ class WifiDataCollector:
         session_data = self.ps_collector.stop_collection()
         if session_data:
             self.ps_collector.save_session_data(self.base_path)
+        with self.measurement_lock:
+            if self.journal is not None:
+                self.journal.close()
+                self.journal = None
 
         self.logger.info("Collection arrêtée")
         return True
@@ -206,8 +243,7 @@ class WifiDataCollector:
                 )
 
                 # Ajouter à la liste des records
-                self.records.append(record)
-                self.current_cycle += 1
+                self._store_record(record)
 
                 self.logger.debug(f"Nouvelle mesure enregistrée: {record}")
 
@@ -310,8 +346,7 @@ class WifiDataCollector:
 
             # Save record
             with self.measurement_lock:
-                self.records.append(record)
-                self.current_cycle += 1
+                self._store_record(record)
 
             collection_time = time.time() - start_time
             self.logger.info(f"Collecte terminée en {collection_time:.2f}s")
@@ -328,23 +363,20 @@ class WifiDataCollector:
             self.logger.error(f"Erreur lors de la collecte: {str(e)}", exc_info=True)
             return None
 
+    def _store_record(self, record: WifiRecord) -> None:
+        """Ajoute un enregistrement (et au journal de session) ; appelé sous measurement_lock"""
+        self.records.append(record)
+        self.current_cycle += 1
+        if self.journal is not None:
+            self.journal.append(_record_to_dict(record))
+
     def export_records(self, filename: Optional[str] = None) -> str:
         """Exporte les enregistrements dans un fichier JSON"""
         if not filename:
             filename = f"wifi_records_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
 
         filepath = os.path.join(self.base_path, filename)
-        records_data = [
-            {
-                "timestamp": record.timestamp.isoformat(),
-                "zone": record.zone,
-                "location_tag": record.location_tag,
-                "cycle": record.cycle,
-                "wifi": record.wifi_measurement.__dict__ if record.wifi_measurement else None,
-                "ping": record.ping_measurement.__dict__ if record.ping_measurement else None
-            }
-            for record in self.records
-        ]
+        records_data = [_record_to_dict(record) for record in self.records]
 
         with open(filepath, 'w') as f:
             json.dump(records_data, f, indent=2)